@@ -4,20 +4,105 @@ Replaces Flask's filesystem session-based auth with JWT tokens in httpOnly cooki
 """
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
+from collections import OrderedDict
 from fastapi import Request, HTTPException, Depends, Response
 from fastapi.responses import JSONResponse
 import os
+import time
+import hashlib
+import importlib
+import threading
+
+from services.startup import on_startup
 
 SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-key")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_DAYS = 30
 
+# Verified-token cache: skips jwt.decode for tokens seen recently by this worker
+TOKEN_CACHE_SIZE = int(os.getenv("FARDI_TOKEN_CACHE_SIZE", 10000))
+TOKEN_CACHE_TTL = float(os.getenv("FARDI_TOKEN_CACHE_TTL", 300))
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of decoded JWT payloads keyed by a digest of the token.
+    An entry lives until the token's own `exp` or TOKEN_CACHE_TTL, whichever
+    comes first. Only successfully verified tokens are stored.
+    """
+
+    def __init__(self, max_entries=TOKEN_CACHE_SIZE, ttl=TOKEN_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+        self.decodes = 0
+        self.decode_seconds = 0.0
+
+    @staticmethod
+    def _digest(token):
+        return hashlib.blake2b(token.encode("utf-8"), digest_size=20).digest()
+
+    def get(self, token):
+        key = self._digest(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                payload, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return payload
+                del self._entries[key]
+            self.misses += 1
+        return None
+
+    def put(self, token, payload):
+        expires_at = time.time() + self.ttl
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, exp)
+        key = self._digest(token)
+        with self._lock:
+            self._entries[key] = (payload, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def record_decode(self, seconds, ok):
+        with self._lock:
+            self.decodes += 1
+            self.decode_seconds += seconds
+            if not ok:
+                self.rejected += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            decodes = self.decodes
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "decodes": self.decodes,
+                "rejected": self.rejected,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "avg_decode_us": round(self.decode_seconds / decodes * 1e6, 1) if decodes else None,
+            }
+
+
+token_cache = VerifiedTokenCache()
+
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(days=ACCESS_TOKEN_EXPIRE_DAYS))
     to_encode.update({"exp": expire})
+    from jose import jwt
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
@@ -26,11 +111,21 @@ def get_token_from_cookie(request: Request) -> Optional[str]:
 
 
 def decode_token(token: str) -> dict:
+    cached = token_cache.get(token) if TOKEN_CACHE_SIZE > 0 else None
+    if cached is not None:
+        return dict(cached)
+    # python-jose (and its cryptography backend) loads on first use or during warm-up
+    from jose import JWTError, jwt
+    started = time.perf_counter()
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
     except JWTError:
+        token_cache.record_decode(time.perf_counter() - started, ok=False)
         raise HTTPException(status_code=401, detail="Invalid or expired token")
+    token_cache.record_decode(time.perf_counter() - started, ok=True)
+    if TOKEN_CACHE_SIZE > 0:
+        token_cache.put(token, payload)
+    return dict(payload)
 
 
 def set_auth_cookie(response: Response, token: str):
@@ -78,3 +173,6 @@ async def get_optional_user(request: Request) -> Optional[dict]:
         return decode_token(token)
     except HTTPException:
         return None
+
+
+on_startup("JWT backend", lambda: importlib.import_module("jose.jwt"), required=False)
@@ -0,0 +1,215 @@
+"""
+Admin dashboard and analytics: per-view aggregates vs rollups.
+
+/api/admin/dashboard and /api/admin/analytics used to run their aggregates
+over the raw tables on every page view. They now read the rollup tables
+kept by services/analytics_rollup.py. LEGACY_QUERIES below are the
+statements the two pages ran per view (the largest ones), timed as one view.
+
+For each size the database is seeded with benchmarks/seed_dataset.py. The
+benchmark times:
+- a legacy view
+- a full rollup refresh
+- an incremental refresh after a little new activity
+- a rollup-served dashboard and analytics view
+It then checks the rollups give the same CEFR distribution and phase
+completion counts as the legacy queries.
+
+    cd backend && python benchmarks/bench_admin_analytics.py --sizes 1000 10000
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_ACTIVITY = '''
+    SELECT user_id, completed_at as activity_date FROM assessment_results
+    WHERE completed_at >= datetime('now', '-{days} days')
+    UNION
+    SELECT user_id, last_activity as activity_date FROM phase2_progress
+    WHERE last_activity >= datetime('now', '-{days} days')
+    UNION
+    SELECT user_id, updated_at as activity_date FROM phase5_progress
+    WHERE updated_at >= datetime('now', '-{days} days')
+    UNION
+    SELECT user_id, updated_at as activity_date FROM phase6_progress
+    WHERE updated_at >= datetime('now', '-{days} days')
+'''
+
+LEGACY_QUERIES = {
+    'cefr_distribution': '''
+        SELECT overall_level as level, COUNT(*) as count
+        FROM assessment_results ar
+        INNER JOIN (
+            SELECT user_id, MAX(completed_at) as latest_date
+            FROM assessment_results GROUP BY user_id
+        ) latest ON ar.user_id = latest.user_id
+                AND ar.completed_at = latest.latest_date
+        GROUP BY overall_level
+    ''',
+    'phase_completion': '''
+        SELECT
+            COUNT(DISTINCT u.id) as total_users,
+            COUNT(DISTINCT ar.user_id) as phase1_completed,
+            COUNT(DISTINCT p2.user_id) as phase2_started,
+            COUNT(DISTINCT CASE WHEN p2.steps_completed >= 4
+                  THEN p2.user_id END) as phase2_completed,
+            COUNT(DISTINCT pc3.user_id) as phase3_completed,
+            COUNT(DISTINCT pc4.user_id) as phase4_completed,
+            COUNT(DISTINCT pc5.user_id) as phase5_completed,
+            COUNT(DISTINCT pc6.user_id) as phase6_completed
+        FROM users u
+        LEFT JOIN assessment_results ar ON u.id = ar.user_id
+        LEFT JOIN (
+            SELECT user_id,
+                   COUNT(DISTINCT CASE WHEN step_completed = 1
+                         THEN step_id END) as steps_completed
+            FROM phase2_progress GROUP BY user_id
+        ) p2 ON u.id = p2.user_id
+        LEFT JOIN (SELECT user_id FROM user_phase_completion
+                   WHERE phase_number = 3 AND completed = 1) pc3 ON u.id = pc3.user_id
+        LEFT JOIN (SELECT user_id FROM user_phase_completion
+                   WHERE phase_number = 4 AND completed = 1) pc4 ON u.id = pc4.user_id
+        LEFT JOIN (SELECT user_id FROM user_phase_completion
+                   WHERE phase_number = 5 AND completed = 1) pc5 ON u.id = pc5.user_id
+        LEFT JOIN (SELECT user_id FROM user_phase_completion
+                   WHERE phase_number = 6 AND completed = 1) pc6 ON u.id = pc6.user_id
+        WHERE u.is_admin = 0
+    ''',
+    'avg_assessment_times': '''
+        SELECT 'Phase 1' as phase, AVG(time_taken) / 60.0 as avg_minutes FROM assessment_results
+        UNION ALL
+        SELECT 'Phase 2 - ' || step_id as phase,
+               AVG(CAST((julianday(completed_at) - julianday(started_at)) * 24 * 60 AS INTEGER))
+        FROM phase2_progress WHERE completed_at IS NOT NULL GROUP BY step_id
+    ''',
+    'active_users_7d': f'SELECT COUNT(DISTINCT user_id) FROM ({_ACTIVITY.format(days=7)})',
+    'active_users_30d': f'SELECT COUNT(DISTINCT user_id) FROM ({_ACTIVITY.format(days=30)})',
+    'daily_activity': f'''
+        SELECT DATE(activity_date) as date, COUNT(DISTINCT user_id) as active_users
+        FROM ({_ACTIVITY.format(days=30)})
+        GROUP BY DATE(activity_date) ORDER BY date DESC LIMIT 30
+    ''',
+    'challenging_steps': '''
+        SELECT step_id, COUNT(*) as attempts,
+               COUNT(CASE WHEN step_completed = 1 THEN 1 END) as completions
+        FROM phase2_progress GROUP BY step_id
+    ''',
+    'at_risk_students': '''
+        SELECT u.id,
+               MAX(COALESCE(ar.completed_at, p2.last_activity, p5.updated_at, p6.updated_at, u.created_at))
+                   as last_activity,
+               COUNT(DISTINCT ar.id) as assessments_completed,
+               COUNT(DISTINCT p2.step_id) as phase2_steps_attempted
+        FROM users u
+        LEFT JOIN assessment_results ar ON u.id = ar.user_id
+        LEFT JOIN phase2_progress p2 ON u.id = p2.user_id
+        LEFT JOIN phase5_progress p5 ON u.id = p5.user_id
+        LEFT JOIN phase6_progress p6 ON u.id = p6.user_id
+        WHERE u.is_admin = 0
+        GROUP BY u.id
+        HAVING last_activity < datetime('now', '-7 days') OR assessments_completed = 0
+        ORDER BY last_activity ASC
+        LIMIT 10
+    ''',
+    'dashboard_totals': '''
+        SELECT (SELECT COUNT(*) FROM users), (SELECT COUNT(*) FROM assessment_results),
+               (SELECT COUNT(DISTINCT user_id) FROM phase2_responses)
+    ''',
+}
+
+
+def legacy_view(conn):
+    return {name: conn.execute(sql).fetchall() for name, sql in LEGACY_QUERIES.items()}
+
+
+def timed(call, rounds):
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = call()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), result
+
+
+def add_activity(conn, rng, users):
+    """A few new assessments and phase completions, as between two refreshes"""
+    ids = [row[0] for row in conn.execute('SELECT id FROM users WHERE is_admin = 0 ORDER BY RANDOM() LIMIT ?',
+                                          (users,))]
+    for user_id in ids:
+        conn.execute(
+            "INSERT INTO assessment_results (user_id, session_id, overall_level, xp_earned, time_taken) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (user_id, f'bench-{user_id}', rng.choice(['A2', 'B1', 'B2']), 300, 900)
+        )
+        conn.execute(
+            'INSERT OR REPLACE INTO user_phase_completion (user_id, phase_number, completed) VALUES (?, 3, 1)',
+            (user_id,)
+        )
+    conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="admin analytics: per-view aggregates vs rollups")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix='fardi-bench-')
+    os.environ['FARDI_DB_PATH'] = os.path.join(tmp, 'bench.db')
+
+    from dependencies import db_manager
+    from routers.admin import api_admin_analytics, api_admin_dashboard
+    from services.analytics_rollup import get_analytics_rollups
+    from benchmarks.seed_dataset import seed
+
+    rollups = get_analytics_rollups()
+    loop = asyncio.new_event_loop()
+    seeded_total, rng = 0, random.Random(5)
+    print(f"{'users':>7s} {'variant':34s} {'median ms':>10s}")
+    for size in sorted(args.sizes):
+        conn = db_manager.get_connection()
+        try:
+            ids = seed(conn, size - seeded_total, rng)
+            admin = {'user_id': ids['admin_ids'][0], 'is_admin': True}
+            seeded_total = size
+
+            legacy_ms, legacy = timed(lambda: legacy_view(conn), args.rounds)
+            conn.execute("DELETE FROM analytics_snapshot WHERE name = 'refresh'")
+            conn.commit()
+            full_ms, _ = timed(lambda: rollups.refresh(force=True), 1)
+
+            # A full refresh runs once a day; the rest only redo what changed
+            add_activity(conn, rng, 20)
+            incremental_ms, _ = timed(lambda: rollups.refresh(force=True), 1)
+            legacy = legacy_view(conn)
+        finally:
+            conn.close()
+
+        dashboard_ms, dashboard = timed(lambda: loop.run_until_complete(api_admin_dashboard(user=admin)), args.rounds)
+        analytics_ms, analytics = timed(lambda: loop.run_until_complete(api_admin_analytics(user=admin)), args.rounds)
+
+        # Same numbers as the legacy queries after the incremental refresh
+        progress = analytics['data']['learning_progress']
+        assert progress['phase_completion'] == dict(legacy['phase_completion'][0]), \
+            (progress['phase_completion'], dict(legacy['phase_completion'][0]))
+        assert {row['level']: row['count'] for row in progress['cefr_distribution']} == \
+            {row['level']: row['count'] for row in legacy['cefr_distribution']}
+        assert analytics['data']['engagement']['active_users_30d'] == legacy['active_users_30d'][0][0]
+        assert dashboard['data']['stats']['overall']['total_users'] == legacy['dashboard_totals'][0][0]
+
+        print(f"{size:7d} {'legacy: one view, per-view SQL':34s} {legacy_ms:10.1f}")
+        print(f"{size:7d} {'rollups: full refresh':34s} {full_ms:10.1f}")
+        print(f"{size:7d} {'rollups: incremental refresh':34s} {incremental_ms:10.1f}")
+        print(f"{size:7d} {'dashboard view':34s} {dashboard_ms:10.1f}")
+        print(f"{size:7d} {'analytics view':34s} {analytics_ms:10.1f}")
+
+
+if __name__ == '__main__':
+    main()
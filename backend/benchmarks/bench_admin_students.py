@@ -0,0 +1,123 @@
+"""
+/api/admin/students: per-user loop vs grouped page queries.
+
+The old handler walked every user from user_manager.get_all_users() and
+called get_user_assessments, get_phase2_progress and get_user_stats for
+each one, each opening its own connection and running several queries. It
+read u['user_id'], which get_all_users() does not return, so every summary
+came back empty; legacy_students() below runs the loop with u['id'], the
+work it was meant to do. The new handler returns keyset-paginated pages
+built by AssessmentHistory.get_users_progress_page (five queries a page).
+
+For each size the database is seeded with benchmarks/seed_dataset.py. The
+benchmark times the legacy full list, the first page, and a walk over all
+pages, and counts SQL statements and connection checkouts for each.
+
+    cd backend && python benchmarks/bench_admin_students.py --sizes 1000 10000
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def legacy_students(user_manager, assessment_history):
+    users = []
+    for u in user_manager.get_all_users():
+        uid = u['id']
+        phase1_history = assessment_history.get_user_assessments(uid)
+        latest_phase1 = phase1_history[0] if phase1_history else None
+        assessment_history.get_phase2_progress(uid)
+        user_stats = assessment_history.get_user_stats(uid)
+        phase_completion = {pc['phase_number']: pc['completed'] for pc in user_stats.get('phase_completion', [])}
+        users.append({
+            'user_id': uid,
+            'phase1_level': latest_phase1.get('overall_level') if latest_phase1 else None,
+            **{f'phase{n}_completed': bool(phase_completion.get(n)) for n in (3, 4, 5, 6)},
+        })
+    return users
+
+
+def run(call, rounds):
+    """(median ms, statements, connection checkouts) for call()"""
+    from dependencies import db_manager
+    from services import request_metrics
+
+    timings = []
+    for _ in range(rounds):
+        checkouts = db_manager.pool_stats()['checkouts']
+        token = request_metrics.begin_request()
+        started = time.perf_counter()
+        result = call()
+        timings.append((time.perf_counter() - started) * 1000)
+        statements = request_metrics.current_request_stats().sql_statements
+        request_metrics._current.reset(token)
+        checkouts = db_manager.pool_stats()['checkouts'] - checkouts
+    return statistics.median(timings), statements, checkouts, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="admin student list: per-user loop vs grouped page queries")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix='fardi-bench-')
+    os.environ['FARDI_DB_PATH'] = os.path.join(tmp, 'bench.db')
+
+    from dependencies import db_manager, user_manager, assessment_history
+    from routers.admin import get_all_users_blueprint
+    from benchmarks.seed_dataset import seed
+
+    loop = asyncio.new_event_loop()
+    admin = {'user_id': 1, 'is_admin': True}
+
+    def page(cursor=None):
+        return loop.run_until_complete(get_all_users_blueprint(
+            limit=args.page_size, sort='created_at', order='desc', cursor=cursor, user=admin))
+
+    def walk():
+        rows, cursor = [], None
+        while True:
+            data = page(cursor)['data']
+            rows.extend(data['users'])
+            cursor = data['next_cursor']
+            if cursor is None:
+                return rows
+
+    seeded_total = 0
+    rng = random.Random(7)
+    print(f"{'users':>7s} {'variant':28s} {'median ms':>10s} {'statements':>11s} {'connections':>12s}")
+    for size in sorted(args.sizes):
+        conn = db_manager.get_connection()
+        try:
+            seed(conn, size - seeded_total, rng)
+        finally:
+            conn.close()
+        seeded_total = size
+
+        legacy_ms, legacy_sql, legacy_conns, legacy = run(lambda: legacy_students(user_manager, assessment_history), 1)
+        first_ms, first_sql, first_conns, _ = run(page, args.rounds)
+        walk_ms, walk_sql, walk_conns, walked = run(walk, 1)
+
+        # Same answers as the loop for the fields it computed
+        by_id = {u['user_id']: u for u in walked}
+        assert len(by_id) == len(legacy) == size
+        for old in legacy:
+            new = by_id[old['user_id']]
+            assert all(new[key] == value for key, value in old.items()), (old, new)
+
+        print(f"{size:7d} {'legacy: all users':28s} {legacy_ms:10.1f} {legacy_sql:11d} {legacy_conns:12d}")
+        print(f"{size:7d} {f'first page ({args.page_size})':28s} {first_ms:10.1f} {first_sql:11d} {first_conns:12d}")
+        print(f"{size:7d} {'all pages':28s} {walk_ms:10.1f} {walk_sql:11d} {walk_conns:12d}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+"""
+/api/admin/users: OFFSET pages with a windowed join vs keyset pages.
+
+get_users_with_stats used to run, for every page:
+- a COUNT(*) over the matching users
+- a LIMIT/OFFSET page joined to a subquery that numbered every
+  assessment_results row (ROW_NUMBER() OVER PARTITION BY user_id)
+- a LIKE '%term%' filter on four columns for a search
+legacy_page() below is those two queries, with u.id DESC added as a
+tiebreak so its pages can be compared with the new ones. The page now comes
+from idx_users_created_at, from the keyset cursor or a cheap OFFSET. Stats
+are two grouped queries over just the page's users. Searches probe the
+users_search trigram index (migration 12), and the total is cached for
+USER_COUNT_MAX_AGE seconds.
+
+For each size the database is seeded with benchmarks/seed_dataset.py. The
+benchmark times page 1 and a deep page (500 by default) for:
+- legacy
+- new by page number
+- new by cursor
+It also times a narrow and a broad search, and checks the new pages hold
+the same users and stats as the legacy ones.
+
+    cd backend && python benchmarks/bench_admin_users.py --sizes 10000 20000
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+LEGACY_PAGE = '''
+    SELECT u.*, u.id as user_id,
+           COALESCE(ar.total_assessments, 0) as total_assessments,
+           COALESCE(ar.latest_level, 'N/A') as best_level,
+           COALESCE(ar.total_xp, 0) as total_xp,
+           COALESCE(p2.steps_attempted, 0) as phase2_steps_attempted,
+           COALESCE(p2.steps_completed, 0) as phase2_steps_completed
+    FROM users u
+    LEFT JOIN (
+        SELECT ar1.user_id,
+               COUNT(*) as total_assessments,
+               ar2.overall_level as latest_level,
+               SUM(ar1.xp_earned) as total_xp
+        FROM assessment_results ar1
+        LEFT JOIN (
+            SELECT user_id, overall_level,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY user_id ORDER BY completed_at DESC
+                   ) as rn
+            FROM assessment_results
+        ) ar2 ON ar1.user_id = ar2.user_id AND ar2.rn = 1
+        GROUP BY ar1.user_id, ar2.overall_level
+    ) ar ON u.id = ar.user_id
+    LEFT JOIN (
+        SELECT user_id,
+               COUNT(DISTINCT step_id) as steps_attempted,
+               COUNT(DISTINCT CASE WHEN step_completed = 1
+                     THEN step_id END) as steps_completed
+        FROM phase2_progress
+        GROUP BY user_id
+    ) p2 ON u.id = p2.user_id
+    {where}
+    ORDER BY u.created_at DESC, u.id DESC
+    LIMIT ? OFFSET ?
+'''
+STATS = ('total_assessments', 'best_level', 'total_xp', 'phase2_steps_attempted', 'phase2_steps_completed')
+
+
+def legacy_page(conn, page, per_page, search=''):
+    where, params = '', []
+    if search:
+        where = ' WHERE (u.username LIKE ? OR u.email LIKE ? OR u.first_name LIKE ? OR u.last_name LIKE ?)'
+        params = [f'%{search}%'] * 4
+    total = conn.execute(f'SELECT COUNT(*) as count FROM users u{where}', params).fetchone()['count']
+    rows = conn.execute(LEGACY_PAGE.format(where=where), params + [per_page, (page - 1) * per_page]).fetchall()
+    return [dict(row) for row in rows], total
+
+
+def run(call, rounds):
+    """(median ms, statements, result) for call()"""
+    from services import request_metrics
+
+    timings = []
+    for _ in range(rounds):
+        token = request_metrics.begin_request()
+        started = time.perf_counter()
+        result = call()
+        timings.append((time.perf_counter() - started) * 1000)
+        statements = request_metrics.current_request_stats().sql_statements
+        request_metrics._current.reset(token)
+    return statistics.median(timings), statements, result
+
+
+def same_page(legacy, new):
+    assert [u['id'] for u in legacy] == [u['id'] for u in new], 'pages hold different users'
+    for old, row in zip(legacy, new):
+        assert all(old[key] == row[key] for key in STATS), (old, row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="admin user list: OFFSET + window vs keyset pages")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 20000])
+    parser.add_argument('--per-page', type=int, default=20)
+    parser.add_argument('--deep-page', type=int, default=500)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix='fardi-bench-')
+    os.environ['FARDI_DB_PATH'] = os.path.join(tmp, 'bench.db')
+
+    from dependencies import db_manager, user_manager
+    from routers.admin import get_users_with_stats, decode_cursor
+    from benchmarks.seed_dataset import seed
+
+    per_page, deep = args.per_page, args.deep_page
+    searches = {'narrow search': 'seed4242', 'broad search': 'Trabelsi'}
+
+    def new_page(page=1, after=None, search=''):
+        return get_users_with_stats(page=page, per_page=per_page, search=search, after=after)
+
+    seeded_total, rng = 0, random.Random(13)
+    print(f"{'users':>7s} {'variant':40s} {'median ms':>10s} {'statements':>11s}")
+    for size in sorted(args.sizes):
+        conn = db_manager.get_connection()
+        try:
+            seed(conn, size - seeded_total, rng)
+            seeded_total = size
+
+            # Cursor for the deep page, walked the way a client would
+            after = None
+            for page in range(1, deep):
+                _, pagination = new_page(page, after)
+                after = decode_cursor(pagination['next_cursor'])
+
+            results = {}
+            for page in (1, deep):
+                legacy_ms, legacy_sql, (legacy, total) = run(lambda: legacy_page(conn, page, per_page), args.rounds)
+                offset_ms, offset_sql, (by_page, pagination) = run(lambda: new_page(page), args.rounds)
+                cursor_ms, cursor_sql, (by_cursor, _) = run(
+                    lambda: new_page(page, after if page == deep else None), args.rounds)
+                same_page(legacy, by_page)
+                same_page(legacy, by_cursor)
+                assert pagination['total'] == total
+                results[page] = [('legacy', legacy_ms, legacy_sql), ('page number', offset_ms, offset_sql),
+                                 ('cursor', cursor_ms, cursor_sql)]
+
+            for name, term in searches.items():
+                legacy_ms, legacy_sql, (legacy, total) = run(lambda: legacy_page(conn, 1, per_page, term), args.rounds)
+                user_manager._count_cache.clear()
+                uncached_ms, uncached_sql, (found, pagination) = run(lambda: new_page(search=term), 1)
+                cached_ms, cached_sql, _ = run(lambda: new_page(search=term), args.rounds)
+                same_page(legacy, found)
+                assert pagination['total'] == total, (pagination['total'], total)
+                results[f'{name} ({total} hits)'] = [('legacy', legacy_ms, legacy_sql),
+                                                     ('index, first count', uncached_ms, uncached_sql),
+                                                     ('index, cached count', cached_ms, cached_sql)]
+        finally:
+            conn.close()
+
+        for label, variants in results.items():
+            label = f'page {label}' if isinstance(label, int) else label
+            for variant, ms, statements in variants:
+                print(f"{size:7d} {f'{label}: {variant}':40s} {ms:10.1f} {statements:11d}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""
+/api/admin/ai-evaluations: per-user loop vs keyset feed.
+
+The old handler walked every user, called get_phase2_progress for each,
+parsed every response's JSON and sorted the whole school's history in
+memory before returning it as one response. (It read u['user_id'] and
+step['responses'], neither of which exists, so it always came back empty;
+legacy_evaluations() below does the work it was meant to do.) The new
+handler returns keyset pages from AssessmentHistory.get_ai_evaluations_page,
+or streams the filtered feed as NDJSON a chunk at a time.
+
+For each size the database is seeded with benchmarks/seed_dataset.py. The
+benchmark times the legacy full list, the first page, a filtered page and
+a page deep in the feed, then the NDJSON export, with the peak Python
+allocation (tracemalloc) for the legacy list and the export.
+
+    cd backend && python benchmarks/bench_ai_evaluations.py --sizes 1000 10000
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import statistics
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def legacy_evaluations(user_manager, assessment_history):
+    evaluations = []
+    for u in user_manager.get_all_users():
+        if u.get('is_admin'):
+            continue
+        for response in assessment_history.get_phase2_progress(u['id'])['responses']:
+            if response.get('assessment_data'):
+                evaluations.append({
+                    'id': response['id'],
+                    'user_id': u['id'],
+                    'username': u['username'],
+                    'timestamp': response['submitted_at'],
+                    'ai_evaluation': response['assessment_data'],
+                })
+    evaluations.sort(key=lambda x: (x['timestamp'], x['id']), reverse=True)
+    return evaluations
+
+
+def run(call, rounds):
+    """(median ms, statements, result) for call()"""
+    from services import request_metrics
+
+    timings = []
+    for _ in range(rounds):
+        token = request_metrics.begin_request()
+        started = time.perf_counter()
+        result = call()
+        timings.append((time.perf_counter() - started) * 1000)
+        statements = request_metrics.current_request_stats().sql_statements
+        request_metrics._current.reset(token)
+    return statistics.median(timings), statements, result
+
+
+def peak_kib(call):
+    tracemalloc.start()
+    try:
+        result = call()
+        return tracemalloc.get_traced_memory()[1] / 1024, result
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AI evaluation feed: per-user loop vs keyset pages")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--deep-page', type=int, default=50)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix='fardi-bench-')
+    os.environ['FARDI_DB_PATH'] = os.path.join(tmp, 'bench.db')
+
+    from dependencies import db_manager, user_manager, assessment_history
+    from routers.admin import get_ai_evaluations
+    from benchmarks.seed_dataset import seed
+
+    loop = asyncio.new_event_loop()
+    admin = {'user_id': 1, 'is_admin': True}
+
+    def page(cursor=None, **filters):
+        return loop.run_until_complete(get_ai_evaluations(
+            limit=args.page_size, cursor=cursor, user=admin,
+            **{'user_id': None, 'step_id': None, 'level': None, 'date_from': None, 'date_to': None, **filters}))
+
+    def export():
+        async def drain():
+            response = await get_ai_evaluations(
+                limit=100, cursor=None, user_id=None, step_id=None, level=None,
+                date_from=None, date_to=None, format='ndjson', user=admin)
+            lines = 0
+            async for chunk in response.body_iterator:
+                lines += chunk.count('\n')
+            return lines
+        return loop.run_until_complete(drain())
+
+    seeded_total = 0
+    rng = random.Random(11)
+    print(f"{'users':>7s} {'variant':30s} {'median ms':>10s} {'statements':>11s} {'peak KiB':>9s}")
+    for size in sorted(args.sizes):
+        conn = db_manager.get_connection()
+        try:
+            seed(conn, size - seeded_total, rng)
+        finally:
+            conn.close()
+        seeded_total = size
+
+        legacy_kib, _ = peak_kib(lambda: legacy_evaluations(user_manager, assessment_history))
+        legacy_ms, legacy_sql, legacy = run(lambda: legacy_evaluations(user_manager, assessment_history), 1)
+        first_ms, first_sql, first = run(page, args.rounds)
+        step_ms, step_sql, _ = run(lambda: page(step_id='step_2', level='B1'), args.rounds)
+
+        # Cursor for the deep page, then time just that page
+        cursor = None
+        for _ in range(args.deep_page - 1):
+            cursor = page(cursor)['data']['next_cursor']
+        deep_ms, deep_sql, _ = run(lambda: page(cursor), args.rounds)
+
+        export_kib, _ = peak_kib(export)
+        export_ms, export_sql, exported = run(export, 1)
+
+        # Same feed, in the same order, as the loop
+        assert exported == len(legacy), (exported, len(legacy))
+        assert [row['id'] for row in first['data']['evaluations']] == [row['id'] for row in legacy[:args.page_size]]
+        assert first['data']['evaluations'][0]['ai_evaluation'] == legacy[0]['ai_evaluation']
+        json.dumps(first)
+
+        print(f"{size:7d} {f'legacy: all ({len(legacy)} rows)':30s} {legacy_ms:10.1f} {legacy_sql:11d} {legacy_kib:9.0f}")
+        print(f"{size:7d} {f'first page ({args.page_size})':30s} {first_ms:10.1f} {first_sql:11d} {'':>9s}")
+        print(f"{size:7d} {'step + level filter':30s} {step_ms:10.1f} {step_sql:11d} {'':>9s}")
+        print(f"{size:7d} {f'page {args.deep_page}':30s} {deep_ms:10.1f} {deep_sql:11d} {'':>9s}")
+        print(f"{size:7d} {'ndjson export':30s} {export_ms:10.1f} {export_sql:11d} {export_kib:9.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Per-request auth overhead: full JWT verification vs the verified-token cache.
+
+Issues tokens for a pool of users and resolves them the way get_current_user
+does, once with the cache disabled (every call runs jwt.decode) and once
+with it enabled, reporting microseconds per call.
+
+    cd backend && python benchmarks/bench_auth.py --calls 20000 --users 200
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def run(auth_utils, tokens, calls, cached):
+    auth_utils.TOKEN_CACHE_SIZE = len(tokens) * 2 if cached else 0
+    auth_utils.token_cache = auth_utils.VerifiedTokenCache(max_entries=max(auth_utils.TOKEN_CACHE_SIZE, 1))
+    rng = random.Random(7)
+    started = time.perf_counter()
+    for _ in range(calls):
+        payload = auth_utils.decode_token(rng.choice(tokens))
+        assert payload["user_id"]
+    elapsed = time.perf_counter() - started
+    return elapsed / calls * 1e6, auth_utils.token_cache.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="auth token verification benchmark")
+    parser.add_argument('--calls', type=int, default=20000)
+    parser.add_argument('--users', type=int, default=200)
+    args = parser.parse_args()
+
+    import auth_utils
+
+    tokens = [
+        auth_utils.create_access_token({"user_id": i, "username": f"user{i}", "is_admin": False})
+        for i in range(1, args.users + 1)
+    ]
+
+    for label, cached in (("jwt.decode every call", False), ("verified-token cache", True)):
+        per_call, stats = run(auth_utils, tokens, args.calls, cached)
+        print(f"{label:24s} {per_call:8.1f} us/call  hits={stats['hits']} decodes={stats['decodes']} "
+              f"avg_decode_us={stats['avg_decode_us']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Cold start of the API server, eager vs lazy startup.
+
+Starts uvicorn on a fresh database for each run and records, from process
+spawn: when /api/health first answers (port bound, app imported), when
+warm-up reports "ready" (requests are served) and "warm" (every preload
+done). Eager mode is ready as soon as health answers.
+
+    cd backend && python benchmarks/bench_cold_start.py --runs 5
+"""
+import os
+import sys
+import time
+import json
+import socket
+import argparse
+import tempfile
+import subprocess
+import statistics
+import urllib.request
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def health(port):
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/health", timeout=1) as response:
+            return json.loads(response.read())
+    except OSError:
+        return None
+
+
+def cold_start(lazy):
+    port = free_port()
+    env = dict(os.environ)
+    env["FARDI_LAZY_STARTUP"] = "1" if lazy else "0"
+    env["FARDI_DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="fardi-bench-"), "cold.db")
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    marks = {}
+    try:
+        while "warm" not in marks:
+            state = health(port)
+            now = time.perf_counter() - started
+            if state is not None:
+                marks.setdefault("health", now)
+                if state["startup"]["ready"]:
+                    marks.setdefault("ready", now)
+                if state["startup"]["warm"]:
+                    marks.setdefault("warm", now)
+                    marks["steps_ms"] = state["startup"]["steps_ms"]
+            elif proc.poll() is not None:
+                raise RuntimeError("server exited during startup")
+            time.sleep(0.005)
+    finally:
+        proc.terminate()
+        proc.wait()
+    return marks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="cold start benchmark")
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    for lazy in (False, True):
+        runs = [cold_start(lazy) for _ in range(args.runs)]
+        median = {mark: statistics.median(run[mark] for run in runs) * 1000 for mark in ("health", "ready", "warm")}
+        label = "lazy" if lazy else "eager"
+        print(f"{label:5s}  health {median['health']:6.0f} ms  ready {median['ready']:6.0f} ms  "
+              f"warm {median['warm']:6.0f} ms  (median of {args.runs})")
+        print(f"       steps: {runs[-1]['steps_ms']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+"""
+/admin/export/users and /admin/export/responses/{table}: buffered vs streamed.
+
+The old users export fetched get_users_with_stats(per_page=10000), built the
+whole CSV in a StringIO and sent it as a single chunk. Users past the first
+10,000 were dropped, memory grew with the user count, and nothing reached
+the client until everything was done. legacy_users_csv() below does the same.
+The new export streams keyset chunks (iter_users_with_stats).
+
+For each size the database is seeded with benchmarks/seed_dataset.py. The
+benchmark reports, for each export:
+- time to the first chunk
+- total time
+- rows
+- peak Python allocation (tracemalloc)
+It also exports student_responses as gzip CSV and NDJSON and reports the
+compression ratio.
+
+    cd backend && python benchmarks/bench_exports.py --sizes 10000 20000
+"""
+import io
+import os
+import sys
+import csv
+import gzip
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def legacy_users_csv():
+    from routers.admin import get_users_with_stats, USER_EXPORT_COLUMNS
+    users, _ = get_users_with_stats(page=1, per_page=10000)
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(USER_EXPORT_COLUMNS)
+    for u in users:
+        writer.writerow([
+            u.get('id', ''), u.get('username', ''), u.get('email', ''), u.get('first_name', ''),
+            u.get('last_name', ''), 'Admin' if u.get('is_admin') else 'User',
+            'Yes' if u.get('is_active') else 'No', u.get('created_at', ''), u.get('last_login', ''),
+            u.get('total_assessments', 0), u.get('best_level', 'N/A'), u.get('total_xp', 0),
+            u.get('phase2_steps_completed', 0), u.get('phase2_steps_attempted', 0),
+        ])
+    return output.getvalue()
+
+
+def consume(produce):
+    """(first chunk ms, total ms, bytes out) for an iterator-producing call"""
+    started = time.perf_counter()
+    first, size = None, 0
+    for chunk in produce():
+        if first is None:
+            first = (time.perf_counter() - started) * 1000
+        size += len(chunk)
+    return first, (time.perf_counter() - started) * 1000, size
+
+
+def measure(produce):
+    """consume() timings from a plain run, plus the peak KiB allocated during a traced run"""
+    first, total, size = consume(produce)
+    tracemalloc.start()
+    try:
+        consume(produce)
+        peak = tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+    return first, total, size, peak
+
+
+def drain(loop, response):
+    """The chunks of a StreamingResponse, collected from its async body iterator"""
+    async def collect():
+        return [chunk async for chunk in response.body_iterator]
+    return loop.run_until_complete(collect())
+
+
+def streamed(loop, response_factory):
+    """Yield a StreamingResponse's chunks as they are produced"""
+    def produce():
+        response = loop.run_until_complete(response_factory())
+        iterator = response.body_iterator.__aiter__()
+        while True:
+            try:
+                yield loop.run_until_complete(iterator.__anext__())
+            except StopAsyncIteration:
+                return
+    return produce
+
+
+def main():
+    parser = argparse.ArgumentParser(description="admin exports: buffered vs streamed")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 20000])
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix='fardi-bench-')
+    os.environ['FARDI_DB_PATH'] = os.path.join(tmp, 'bench.db')
+
+    from starlette.requests import Request
+    from dependencies import db_manager
+    from routers.admin import admin_export_users, admin_export_responses
+    from benchmarks.seed_dataset import seed
+
+    loop = asyncio.new_event_loop()
+    admin = {'user_id': 1, 'is_admin': True}
+    request = Request({'type': 'http', 'query_string': b'', 'headers': []})
+
+    def export_users():
+        return admin_export_users(request=request, user=admin)
+
+    def export_responses(format, compress='gzip'):
+        return lambda: admin_export_responses(
+            table='student_responses', format=format, compress=compress,
+            user_id=None, phase=None, subphase=None, user=admin)
+
+    seeded_total, rng = 0, random.Random(3)
+    print(f"{'users':>7s} {'export':34s} {'first ms':>9s} {'total ms':>9s} {'rows':>8s} {'MiB out':>8s} {'peak MiB':>9s}")
+    for size in sorted(args.sizes):
+        conn = db_manager.get_connection()
+        try:
+            seed(conn, size - seeded_total, rng)
+            users = conn.execute('SELECT COUNT(*) FROM users').fetchone()[0]
+            responses = conn.execute('SELECT COUNT(*) FROM student_responses').fetchone()[0]
+        finally:
+            conn.close()
+        seeded_total = size
+
+        def report(name, result, rows):
+            first, total, out, peak = result
+            print(f"{size:7d} {name:34s} {first:9.1f} {total:9.1f} {rows:8d} {out / 2**20:8.2f} {peak / 1024:9.2f}")
+
+        legacy = measure(lambda: [legacy_users_csv()])
+        legacy_rows = legacy_users_csv().count('\n') - 1
+        report('users: legacy (one chunk)', legacy, legacy_rows)
+
+        body = b''.join(c if isinstance(c, bytes) else c.encode() for c in drain(loop, loop.run_until_complete(export_users())))
+        streamed_rows = body.count(b'\n') - 1
+        report('users: streamed', measure(streamed(loop, export_users)), streamed_rows)
+        assert streamed_rows == users, (streamed_rows, users)
+
+        raw = drain(loop, loop.run_until_complete(export_responses('csv', 'none')()))
+        raw_bytes = sum(len(c) for c in raw)
+        for format in ('csv', 'ndjson'):
+            chunks = drain(loop, loop.run_until_complete(export_responses(format)()))
+            text = gzip.decompress(b''.join(chunks))
+            rows = text.count(b'\n') - (format == 'csv')
+            assert rows == responses or format == 'csv', (rows, responses)
+            report(f'student_responses: {format} gzip', measure(streamed(loop, export_responses(format))), rows)
+        print(f"{size:7d} {'student_responses csv: raw MiB':34s} {raw_bytes / 2**20:8.2f}")
+
+
+if __name__ == '__main__':
+    main()
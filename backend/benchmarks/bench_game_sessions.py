@@ -0,0 +1,81 @@
+"""
+Per-submit cost of Phase 2 session writes: JSON blob vs game_session_items.
+
+Simulates one student submitting N Phase 2 answers. The legacy path reads the
+session row, parses the phase2_responses/phase2_assessments blobs, adds the
+answer and writes both blobs back (what update_game_session used to do); the
+item path writes two small rows. Prints the average cost per submit for each
+block of submits, so growth with history length is visible.
+
+    cd backend && python benchmarks/bench_game_sessions.py --submits 1000
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ASSESSMENT = {
+    'score': 4, 'max_score': 6, 'level': 'B1',
+    'feedback': 'Good use of connectors; watch verb agreement in the second sentence.' * 2,
+    'strengths': ['vocabulary range', 'task completion'], 'improvements': ['grammar accuracy'],
+}
+
+
+def legacy_submit(db_manager, user_id, key, response):
+    conn = db_manager.get_connection()
+    try:
+        row = conn.execute('SELECT * FROM game_sessions WHERE user_id = ?', (user_id,)).fetchone()
+        responses = json.loads(row['phase2_responses'])
+        assessments = json.loads(row['phase2_assessments'])
+        responses[key] = response
+        assessments[key] = ASSESSMENT
+        conn.execute(
+            'UPDATE game_sessions SET phase2_responses = ?, phase2_assessments = ?, '
+            'updated_at = CURRENT_TIMESTAMP WHERE user_id = ?',
+            (json.dumps(responses), json.dumps(assessments), user_id)
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="game_sessions blob vs item-table submit cost")
+    parser.add_argument('--submits', type=int, default=1000)
+    parser.add_argument('--block', type=int, default=200)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix='fardi-bench-')
+    os.environ['FARDI_DB_PATH'] = os.path.join(tmp, 'bench.db')
+
+    from dependencies import db_manager
+    from services.game_session_service import get_game_session, put_session_item
+
+    get_game_session(1)
+    get_game_session(2)
+
+    def item_submit(user_id, key, response):
+        put_session_item(user_id, 'phase2_responses', key, response)
+        put_session_item(user_id, 'phase2_assessments', key, ASSESSMENT)
+
+    runs = [
+        ('blob', lambda key, response: legacy_submit(db_manager, 1, key, response)),
+        ('items', lambda key, response: item_submit(2, key, response)),
+    ]
+    print(f"{'submits':>12} " + " ".join(f"{name + ' us/submit':>18}" for name, _ in runs))
+    for start in range(0, args.submits, args.block):
+        timings = []
+        for name, submit in runs:
+            started = time.perf_counter()
+            for i in range(start, start + args.block):
+                submit(f"phase2_step_{i // 5}_{i % 5}", {'response': f"answer {i} " * 20, 'ai_score': 0.1})
+            timings.append((time.perf_counter() - started) / args.block * 1e6)
+        print(f"{start:>5}-{start + args.block:<6} " + " ".join(f"{t:>18.1f}" for t in timings))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Per-endpoint latency on a 100k-user database, without vs with the hot-path
+indexes (migration 8, migrations/runner.py HOT_PATH_INDEXES).
+
+Builds a synthetic database with benchmarks/seed_dataset.py, then calls the
+real route handlers and services for random students: first with the
+migration 8 indexes dropped, then with them recreated. Prints p50/p95 per
+endpoint for both runs.
+
+    cd backend && python benchmarks/bench_indexes.py --users 100000 --requests 200
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def endpoints(db_manager, admin_ids):
+    from models.auth import AssessmentHistory
+    from routers.auth import api_profile
+    from routers.chat import chat_conversations, chat_get_messages, chat_unread_count
+    from services.achievement_service import AchievementService
+    from services.streak_service import StreakService
+
+    loop = asyncio.new_event_loop()
+    history = AssessmentHistory(db_manager)
+
+    def with_conn(func):
+        conn = db_manager.get_connection()
+        try:
+            return func(conn)
+        finally:
+            conn.close()
+
+    return {
+        'GET /auth/api/profile': lambda u: loop.run_until_complete(api_profile(user={'user_id': u})),
+        'GET /api/dashboard (phase 2 part)': lambda u: history.get_phase2_progress(u),
+        'GET /api/gamification/achievements/{id}/progress': lambda u: with_conn(
+            lambda conn: AchievementService(conn).get_achievement_progress(u, 'getting_started')),
+        'GET /api/gamification/streak/statistics': lambda u: with_conn(
+            lambda conn: StreakService(conn).get_streak_statistics(u)),
+        'GET /api/gamification/streak/leaderboard': lambda u: with_conn(
+            lambda conn: StreakService(conn).get_streak_leaderboard(10)),
+        'GET /api/chat/conversations': lambda u: loop.run_until_complete(
+            chat_conversations(user={'user_id': u, 'is_admin': False})),
+        'GET /api/chat/messages/{id}': lambda u: loop.run_until_complete(
+            chat_get_messages(admin_ids[u % len(admin_ids)], user={'user_id': u})),
+        'GET /api/chat/unread-count': lambda u: loop.run_until_complete(chat_unread_count(user={'user_id': u})),
+    }
+
+
+def measure(calls, user_ids):
+    results = {}
+    for name, call in calls.items():
+        samples = []
+        for u in user_ids:
+            started = time.perf_counter()
+            call(u)
+            samples.append((time.perf_counter() - started) * 1000)
+        samples.sort()
+        results[name] = (statistics.median(samples), samples[int(len(samples) * 0.95) - 1])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="latency with and without the hot-path indexes")
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix='fardi-bench-')
+    os.environ['FARDI_DB_PATH'] = os.path.join(tmp, 'bench.db')
+
+    from dependencies import db_manager
+    from migrations.runner import HOT_PATH_INDEXES, _hot_path_indexes
+    from benchmarks.seed_dataset import seed
+
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    conn = db_manager.get_connection()
+    try:
+        seeded = seed(conn, args.users, rng)
+    finally:
+        conn.close()
+    print(f"seeded {args.users} users in {time.perf_counter() - started:.1f} s")
+
+    calls = endpoints(db_manager, seeded['admin_ids'])
+    user_ids = [rng.choice(seeded['student_ids']) for _ in range(args.requests)]
+
+    with db_manager.connection() as conn:
+        for name, _ in HOT_PATH_INDEXES:
+            conn.execute(f'DROP INDEX IF EXISTS {name}')
+    before = measure(calls, user_ids)
+
+    with db_manager.connection() as conn:
+        _hot_path_indexes(conn)
+    after = measure(calls, user_ids)
+
+    print(f"{'endpoint':52s} {'p50 before':>11s} {'p50 after':>10s} {'p95 before':>11s} {'p95 after':>10s}")
+    for name in calls:
+        (p50_before, p95_before), (p50_after, p95_after) = before[name], after[name]
+        print(f"{name:52s} {p50_before:9.2f}ms {p50_after:8.2f}ms {p95_before:9.2f}ms {p95_after:8.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
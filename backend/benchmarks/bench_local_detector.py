@@ -0,0 +1,157 @@
+"""
+Local AI-text detector micro-benchmark.
+
+Compares services.local_ai_detector with the previous per-call
+implementation (kept below as legacy_detect), checks that both return the
+same results on every sample, and reports per-text cost and throughput.
+
+    cd backend && python benchmarks/bench_local_detector.py --texts 2000
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.local_ai_detector import detect, detect_batch  # noqa: E402
+
+WORDS = (
+    "je pense que le festival doit montrer la musique traditionnelle et la cuisine de chaque région "
+    "nous pouvons inviter les artistes locaux à peindre des fresques dans la vieille ville "
+    "les visiteurs comprendront mieux notre histoire grâce aux contes des anciens le soir"
+).split()
+PHRASES = ["en tant que", "il est important de noter que", "pour résumer", "en conclusion", "en effet,", "par conséquent,"]
+
+
+def make_texts(n, seed=7):
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(n):
+        sentences = []
+        for _ in range(rng.randint(2, 12)):
+            words = [rng.choice(WORDS) for _ in range(rng.randint(4, 25))]
+            if rng.random() < 0.3:
+                words.insert(0, rng.choice(PHRASES))
+            sentences.append(" ".join(words).capitalize())
+        texts.append(". ".join(sentences) + ".")
+    return texts
+
+
+def legacy_detect(text):
+    """Pre-rewrite AIService._is_ai_generated_local, kept verbatim for comparison"""
+    import re
+    import math
+    from collections import Counter
+
+    # Don't analyze texts that are too short
+    if len(text) < 50:
+        return (False, 0, "Text too short for reliable detection")
+
+    # Score initialization and indicators
+    total_score = 0
+    reasons = []
+
+    # 1. Check length (AI responses tend to be long and elaborate)
+    if len(text) > 500:
+        total_score += 0.15
+        reasons.append("Unusually long response")
+
+    # 2. Check for typical AI phrasings
+    ai_phrases = [
+        "en tant que", "je suis heureux de", "je suis ravi de", "il est important de noter que",
+        "il convient de souligner", "comme mentionné précédemment", "pour résumer", 
+        "en conclusion", "je n'ai pas accès à", "je ne peux pas", "en effet,", "par conséquent,"
+    ]
+
+    phrases_found = sum(1 for phrase in ai_phrases if phrase.lower() in text.lower())
+    if phrases_found >= 2:
+        total_score += min(0.25 * phrases_found / 3, 0.25)  # Capped at 0.25
+        reasons.append(f"Contains {phrases_found} phrases often used by AI")
+
+    # 3. Analyze sentence structure
+    sentences = re.split(r'[.!?]+', text)
+    sentences = [s.strip() for s in sentences if s.strip()]
+
+    if len(sentences) > 3:
+        # Calculate sentence length variability
+        sentence_lengths = [len(s) for s in sentences]
+        avg_length = sum(sentence_lengths) / len(sentence_lengths)
+
+        # Standard deviation of lengths
+        variance = sum((length - avg_length) ** 2 for length in sentence_lengths) / len(sentence_lengths)
+        std_dev = math.sqrt(variance)
+
+        # Coefficient of variation
+        variation_coeff = std_dev / max(avg_length, 1)
+
+        if variation_coeff < 0.4:
+            total_score += 0.2
+            reasons.append("Unusually consistent sentence structure")
+
+    # 4. Analyze vocabulary diversity (TTR - Type-Token Ratio)
+    words = re.findall(r'\b\w+\b', text.lower())
+    unique_words = len(set(words))
+
+    if len(words) > 30:
+        ttr = unique_words / len(words)
+        if ttr > 0.8:
+            total_score += 0.2
+            reasons.append("Unusually high vocabulary diversity")
+
+    # 5. Check n-gram consistency (word triplets)
+    if len(words) > 20:
+        # Create word triplets
+        triplets = [' '.join(words[i:i+3]) for i in range(len(words)-2)]
+        # Count occurrences
+        triplet_counts = Counter(triplets)
+        # Check if certain triplets are repeated
+        repeated_triplets = sum(1 for count in triplet_counts.values() if count > 1)
+
+        if repeated_triplets == 0 and len(triplets) > 10:
+            # Human texts tend to repeat certain patterns
+            total_score += 0.1
+            reasons.append("No repeated phrase patterns (unusual for human writing)")
+
+    # Round the score for readability
+    final_score = min(round(total_score, 2), 1.0)
+
+    # Consider as AI-generated if score is above 0.5
+    return (final_score > 0.5, final_score, reasons)
+
+
+def bench(fn, texts, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn(texts)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local AI detector micro-benchmark")
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    texts = make_texts(args.texts)
+    mismatches = sum(1 for text in texts if legacy_detect(text) != detect(text))
+    print(f"{len(texts)} texts, avg {sum(map(len, texts)) // len(texts)} chars, mismatches: {mismatches}")
+
+    runs = [
+        ("legacy", lambda batch: [legacy_detect(t) for t in batch]),
+        ("detect", lambda batch: [detect(t) for t in batch]),
+        ("detect_batch", detect_batch),
+    ]
+    baseline = None
+    for name, fn in runs:
+        elapsed = bench(fn, texts, args.rounds)
+        baseline = baseline or elapsed
+        print(f"{name:<13} {elapsed / len(texts) * 1e6:8.1f} us/text  {len(texts) / elapsed:10.0f} texts/s  "
+              f"x{baseline / elapsed:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Login storm: a classroom signing in at once.
+
+Creates users (half with legacy salt:sha256 hashes, which get upgraded on
+their first login), then fires --logins logins spread evenly over --seconds,
+once with authenticate_user called inline on the event loop and once through
+the password hashing pool. Reports login latency p50/p99 and the worst
+event-loop stall seen by a 10 ms ticker, which is what every other request
+on the worker waits behind.
+
+    cd backend && python benchmarks/bench_login_storm.py --logins 300 --seconds 10
+"""
+import os
+import sys
+import time
+import asyncio
+import hashlib
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PASSWORD = "Classroom9am"
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def seed_users(db_manager, hashed, count):
+    """(Re)create the storm accounts; every other one keeps a pre-scrypt hash, as after an upgrade deploy"""
+    rows = []
+    for i in range(count):
+        if i % 2:
+            password_hash = hashed
+        else:
+            salt = f"{i:032x}"
+            password_hash = f"{salt}:{hashlib.sha256((PASSWORD + salt).encode()).hexdigest()}"
+        rows.append((f"storm{i}", f"storm{i}@example.com", password_hash))
+    with db_manager.connection() as conn:
+        conn.execute("DELETE FROM users WHERE username LIKE 'storm%'")
+        conn.executemany('INSERT INTO users (username, email, password_hash) VALUES (?, ?, ?)', rows)
+
+
+async def storm(user_manager, run_password_task, logins, seconds, users, pooled):
+    latencies = []
+    stalls = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            expected = time.perf_counter() + 0.01
+            await asyncio.sleep(0.01)
+            stalls.append(max(0.0, time.perf_counter() - expected))
+
+    async def login(i, scheduled):
+        # Measured from the scheduled arrival, so time spent waiting behind a blocked loop counts
+        if pooled:
+            user = await run_password_task(user_manager.authenticate_user, f"storm{i % users}", PASSWORD)
+        else:
+            user = user_manager.authenticate_user(f"storm{i % users}", PASSWORD)
+        assert user is not None
+        latencies.append(time.perf_counter() - scheduled)
+
+    ticker_task = asyncio.create_task(ticker())
+    tasks = []
+    interval = seconds / logins
+    began = time.perf_counter()
+    for i in range(logins):
+        scheduled = began + i * interval
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(login(i, scheduled)))
+    await asyncio.gather(*tasks)
+    done.set()
+    await ticker_task
+    return latencies, stalls
+
+
+def main():
+    parser = argparse.ArgumentParser(description="login storm benchmark")
+    parser.add_argument('--logins', type=int, default=300)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--users', type=int, default=300)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix='fardi-bench-')
+    os.environ['FARDI_DB_PATH'] = os.path.join(tmp, 'bench.db')
+
+    from dependencies import db_manager, user_manager
+    from services import password_hasher
+
+    started = time.perf_counter()
+    password_hasher.hash_password(PASSWORD)
+    print(f"scrypt n={password_hasher.SCRYPT_N} r={password_hasher.SCRYPT_R} p={password_hasher.SCRYPT_P}: "
+          f"{(time.perf_counter() - started) * 1000:.1f} ms/hash, "
+          f"{password_hasher.PASSWORD_HASH_WORKERS} hashing threads")
+
+    hashed = password_hasher.hash_password(PASSWORD)
+    for pooled in (False, True):
+        seed_users(db_manager, hashed, args.users)
+        latencies, stalls = asyncio.run(storm(
+            user_manager, password_hasher.run_password_task, args.logins, args.seconds, args.users, pooled
+        ))
+        label = "hashing pool" if pooled else "inline on event loop"
+        print(f"{label:22s} p50={percentile(latencies, 50) * 1000:7.1f} ms  "
+              f"p99={percentile(latencies, 99) * 1000:7.1f} ms  "
+              f"loop stall p99={percentile(stalls, 99) * 1000:6.1f} ms max={max(stalls) * 1000:6.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Sapling call latency and connection reuse, against the local fake server.
+
+Compares a fresh requests.post per call (the old behaviour) with the shared
+keep-alive session, and measures the async path used by request handlers.
+Runs against a temporary database with the AI-detection cache off, so every
+call reaches the fake server; exits 1 if one did not, or if the pooled
+session did not actually reuse connections.
+
+    cd backend && python benchmarks/bench_sapling.py --requests 500 --concurrency 8
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_sapling import FakeSaplingServer  # noqa: E402
+
+TEXT = ("I think the festival should include local music because it brings people together "
+        "and shows visitors what our town is really like. ") * 2
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))] * 1000  # noqa: E731
+    return {'p50': pick(0.50), 'p95': pick(0.95), 'p99': pick(0.99), 'mean': statistics.mean(samples) * 1000}
+
+
+def run_threaded(call, n, concurrency):
+    def timed(_):
+        started = time.perf_counter()
+        call()
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(timed, range(n)))
+    return samples, time.perf_counter() - started
+
+
+async def run_async(service, n, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def timed():
+        async with semaphore:
+            started = time.perf_counter()
+            await service.check_with_sapling_api_async(TEXT)
+            return time.perf_counter() - started
+
+    started = time.perf_counter()
+    samples = await asyncio.gather(*(timed() for _ in range(n)))
+    return samples, time.perf_counter() - started
+
+
+def report(name, fake, samples, elapsed):
+    stats = percentiles(samples)
+    print(f"{name:<14} {len(samples) / elapsed:8.1f} req/s  p50 {stats['p50']:6.1f}ms  "
+          f"p95 {stats['p95']:6.1f}ms  p99 {stats['p99']:6.1f}ms  connections {fake.connections}")
+    return fake.requests, fake.connections
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.01, help='fake server think time (s)')
+    args = parser.parse_args()
+
+    # Keep migrations off the real fardi.db, and the detection cache from
+    # answering repeat texts without a Sapling call
+    os.environ['FARDI_DB_PATH'] = os.path.join(tempfile.mkdtemp(prefix='fardi-bench-'), 'bench.db')
+    os.environ['FARDI_AI_DETECT_CACHE'] = '0'
+
+    with FakeSaplingServer(latency=args.latency) as fake:
+        os.environ['SAPLING_API_URL'] = fake.url
+        os.environ['SAPLING_API_KEY'] = 'fake'
+        from services.ai_service import AIService, _post_with_retries
+
+        payload = {'key': 'fake', 'text': TEXT, 'options': {'detail': True}}
+
+        fake.reset_counters()
+        samples, elapsed = run_threaded(
+            lambda: requests.post(fake.url, json=payload, timeout=(3, 10)), args.requests, args.concurrency)
+        report('fresh post', fake, samples, elapsed)
+
+        fake.reset_counters()
+        samples, elapsed = run_threaded(lambda: _post_with_retries(fake.url, payload), args.requests, args.concurrency)
+        pooled = report('pooled session', fake, samples, elapsed)
+
+        service = AIService()
+        fake.reset_counters()
+        samples, elapsed = asyncio.run(run_async(service, args.requests, args.concurrency))
+        routed = report('async route', fake, samples, elapsed)
+
+    # The async route shares the pooled session, so it may open no new connections at all
+    problems = []
+    for name, (served, connections), fewest in (('pooled session', pooled, 1), ('async route', routed, 0)):
+        if served < args.requests:
+            problems.append(f"{name}: fake server saw {served} of {args.requests} requests")
+        if not fewest <= connections < served:
+            problems.append(f"{name}: {connections} connections for {served} requests, expected reuse")
+    if problems:
+        print('\n'.join(problems))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Schema initialisation at worker start: per-import CREATE TABLE passes vs the
+versioned migration runner.
+
+Starts N worker processes at the same instant against one database, the way
+`uvicorn --workers N` (or a restart of several workers) does, and times each
+worker's schema step:
+
+  legacy  every import-time initialiser runs its DDL/backfill and commits on
+          every start (what models/auth.py, game_session_service, chat and
+          the two caches used to do)
+  runner  migrations.runner.migrate(): one read of schema_version when the
+          database is current
+
+Each mode is measured on a fresh database (first start) and on an existing,
+current one (every later restart). The runner's first start does more work
+than legacy: it also applies the gamification and Phase 5 migrations. "locked" counts workers that gave up with
+"database is locked" after the busy timeout; "other errors" are workers that
+tripped over each other's half-applied DDL. Any worker error is printed and
+makes the benchmark exit 1, since its timings are then not comparable.
+
+    cd backend && python benchmarks/bench_schema_startup.py --workers 8 --rounds 5
+"""
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import tempfile
+import statistics
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from migrations.runner import (  # noqa: E402
+    migrate, _core_tables, _game_sessions, _chat_messages, _llm_cache, _ai_detection_cache
+)
+
+
+# The initialisers that ran at import before the runner, frozen: the
+# gamification / Phase 5 tables were manual scripts, and later migrations
+# (indexes on tables these don't create) never ran this way
+LEGACY_STEPS = [_core_tables, _game_sessions, _chat_messages, _llm_cache, _ai_detection_cache]
+
+
+def legacy_init(conn):
+    # Each initialiser committed separately, as the old import-time calls did
+    for step in LEGACY_STEPS:
+        step(conn)
+        conn.commit()
+
+
+def worker(db_path, mode, start_at, busy_timeout_ms, results):
+    conn = sqlite3.connect(db_path, timeout=busy_timeout_ms / 1000)
+    conn.execute('PRAGMA journal_mode=WAL')
+    time.sleep(max(0.0, start_at - time.time()))
+    started = time.perf_counter()
+    error = None
+    try:
+        if mode == 'legacy':
+            legacy_init(conn)
+        else:
+            migrate(conn)
+    except Exception as e:
+        conn.rollback()
+        error = f'{type(e).__name__}: {e}' if not isinstance(e, sqlite3.Error) else str(e)
+    finally:
+        conn.close()
+    results.put(((time.perf_counter() - started) * 1000, error))
+
+
+def start_workers(db_path, mode, workers, busy_timeout_ms):
+    results = multiprocessing.Queue()
+    start_at = time.time() + 0.3
+    procs = [
+        multiprocessing.Process(target=worker, args=(db_path, mode, start_at, busy_timeout_ms, results))
+        for _ in range(workers)
+    ]
+    for proc in procs:
+        proc.start()
+    rows = [results.get() for _ in procs]
+    for proc in procs:
+        proc.join()
+    return rows
+
+
+def report(label, rows):
+    """Print one line of timings; returns the distinct worker errors"""
+    times = sorted(ms for ms, _ in rows)
+    errors = [error for _, error in rows if error]
+    locked = sum(1 for error in errors if 'locked' in error)
+    print(f"  {label:26s} p50 {statistics.median(times):8.2f} ms   max {times[-1]:8.2f} ms   "
+          f"locked {locked}   other errors {len(errors) - locked}")
+    return set(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="schema init at worker start")
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--busy-timeout-ms', type=int, default=int(os.getenv('FARDI_DB_BUSY_TIMEOUT_MS', 5000)))
+    args = parser.parse_args()
+
+    print(f"{args.workers} workers starting together, busy timeout {args.busy_timeout_ms} ms")
+    errors = set()
+    for mode in ('legacy', 'runner'):
+        print(mode)
+        fresh, restarts = [], []
+        for _ in range(args.rounds):
+            db_path = os.path.join(tempfile.mkdtemp(prefix='fardi-bench-'), 'schema.db')
+            fresh.extend(start_workers(db_path, mode, args.workers, args.busy_timeout_ms))
+            restarts.extend(start_workers(db_path, mode, args.workers, args.busy_timeout_ms))
+        errors |= {f'{mode}: {error}' for error in report('first start (empty db)', fresh)}
+        errors |= {f'{mode}: {error}' for error in report('restart (current schema)', restarts)}
+
+    if errors:
+        for error in sorted(errors):
+            print(f"worker error: {error}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+game_sessions access per request, with and without the worker session cache.
+
+Replays the call pattern of a Phase 2 submit (three get_game_session reads
+and two scalar update_game_session writes inside one request scope) for
+many users, and reports time and SQL statements per request.
+
+    cd backend && python benchmarks/bench_session_cache.py --requests 2000 --users 50
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="game session cache benchmark")
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--users', type=int, default=50)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix='fardi-bench-')
+    os.environ['FARDI_DB_PATH'] = os.path.join(tmp, 'bench.db')
+
+    import services.game_session_service as sessions
+    from dependencies import db_manager
+
+    statements = [0]
+
+    def count_statement(_sql):
+        statements[0] += 1
+
+    # Count SQL on every pooled connection handed out from here on
+    acquire = db_manager.pool.acquire
+
+    def traced_acquire():
+        conn = acquire()
+        conn.set_trace_callback(count_statement)
+        return conn
+
+    db_manager.pool.acquire = traced_acquire
+
+    def submit(user_id, n):
+        token = sessions.begin_session_request()
+        try:
+            gs = sessions.get_game_session(user_id)
+            sessions.update_game_session(user_id, phase2_session_id=gs.get('phase2_session_id') or f"s{user_id}")
+            gs = sessions.get_game_session(user_id)
+            sessions.update_game_session(user_id, current_step=n, xp=(gs.get('xp') or 0) + 10)
+            sessions.get_game_session(user_id)
+        finally:
+            sessions.end_session_request(token)
+
+    rng = random.Random(3)
+    for enabled in (False, True):
+        sessions.SESSION_CACHE_ENABLED = enabled
+        statements[0] = 0
+        started = time.perf_counter()
+        for n in range(args.requests):
+            submit(rng.randrange(args.users) + 1, n)
+        elapsed = time.perf_counter() - started
+        print(f"cache {'on ' if enabled else 'off'}  {elapsed / args.requests * 1e6:8.1f} us/request  "
+              f"{statements[0] / args.requests:5.1f} SQL statements/request")
+    print(sessions.session_cache_stats())
+
+
+if __name__ == '__main__':
+    main()
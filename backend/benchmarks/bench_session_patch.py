@@ -0,0 +1,121 @@
+"""
+Lost-update check and benchmark for marking Phase 2 activities completed.
+
+Three ways to add an activity index to phase2_level_completed[key]:
+
+  blob   read the whole phase2_level_completed JSON column, append in Python,
+         write the column back (behaviour before game_session_items)
+  rmw    read the item's list, append in Python, put the item back
+  patch  add_to_session_list: one UPSERT with json_insert, checked in SQL
+
+The concurrency check runs several threads marking distinct indexes on the
+same key and counts how many survive; it exits non-zero if `patch` loses any.
+The timing run spreads marks over many keys, like real remedial progress.
+
+    cd backend && python benchmarks/bench_session_patch.py --threads 8 --marks 50
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+KIND = 'phase2_level_completed'
+KEY = 'step_1_A2_completed'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="phase2_level_completed update strategies")
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--marks', type=int, default=50, help='activities marked per thread')
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix='fardi-bench-')
+    os.environ['FARDI_DB_PATH'] = os.path.join(tmp, 'bench.db')
+
+    from dependencies import db_manager
+    from services.game_session_service import (
+        get_game_session, load_session_items, put_session_item, add_to_session_list,
+    )
+
+    def blob(user_id, index, key=KEY):
+        conn = db_manager.get_connection()
+        try:
+            row = conn.execute(f'SELECT {KIND} FROM game_sessions WHERE user_id = ?', (user_id,)).fetchone()
+            data = json.loads(row[0] or '{}')
+            data.setdefault(key, [])
+            if index not in data[key]:
+                data[key].append(index)
+                conn.execute(f'UPDATE game_sessions SET {KIND} = ? WHERE user_id = ?', (json.dumps(data), user_id))
+                conn.commit()
+        finally:
+            conn.close()
+
+    def blob_result(user_id):
+        conn = db_manager.get_connection()
+        try:
+            return json.loads(conn.execute(f'SELECT {KIND} FROM game_sessions WHERE user_id = ?', (user_id,)).fetchone()[0]).get(KEY, [])
+        finally:
+            conn.close()
+
+    def rmw(user_id, index, key=KEY):
+        current = load_session_items(user_id, KIND, [key]).get(key, [])
+        if index not in current:
+            put_session_item(user_id, KIND, key, current + [index])
+
+    def patch(user_id, index, key=KEY):
+        add_to_session_list(user_id, KIND, key, index)
+
+    def item_result(user_id):
+        return load_session_items(user_id, KIND, [KEY]).get(KEY, [])
+
+    strategies = [('blob', blob, blob_result), ('rmw', rmw, item_result), ('patch', patch, item_result)]
+    expected = args.threads * args.marks
+    lost_by_patch = 0
+
+    print(f"Concurrency: {args.threads} threads x {args.marks} distinct marks on one key")
+    for offset, (name, mark, result) in enumerate(strategies):
+        user_id = 100 + offset
+        get_game_session(user_id)
+        start = threading.Barrier(args.threads)
+
+        def worker(thread_no):
+            start.wait()
+            for n in range(args.marks):
+                mark(user_id, thread_no * args.marks + n)
+
+        threads = [threading.Thread(target=worker, args=(t,)) for t in range(args.threads)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        stored = len(set(result(user_id)))
+        if name == 'patch':
+            lost_by_patch = expected - stored
+        print(f"  {name:<6} stored {stored:>5}/{expected}  lost {expected - stored}")
+
+    # Realistic shape: 6 activities per step/level key, progress accumulating over many keys
+    print("Single-writer cost per mark as progress accumulates (6 activities per key):")
+    for offset, (name, mark, _) in enumerate(strategies):
+        user_id = 200 + offset
+        get_game_session(user_id)
+        timings = []
+        for block in range(3):
+            started = time.perf_counter()
+            for n in range(block * 300, block * 300 + 300):
+                mark(user_id, n % 6, f"step_{n // 6}_completed")
+            timings.append((time.perf_counter() - started) / 300 * 1e6)
+        print(f"  {name:<6} " + "  ".join(f"marks {b * 300:>3}-{b * 300 + 299}: {t:7.1f} us" for b, t in enumerate(timings)))
+
+    if lost_by_patch:
+        print(f"FAIL: patch lost {lost_by_patch} updates")
+        sys.exit(1)
+    print("OK: no lost updates with add_to_session_list")
+
+
+if __name__ == '__main__':
+    main()
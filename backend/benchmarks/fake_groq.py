@@ -0,0 +1,122 @@
+"""
+Local stand-in for Groq's OpenAI-compatible chat completions API, for
+offline load tests.
+
+Answers POST /openai/v1/chat/completions after a configurable delay with a
+completion whose content is one JSON object carrying the fields the app's
+parsers look for (level, score, feedback, justification, ...), so both the
+Phase 1/2 assessors and the Phase 3-6 evaluators take their normal path.
+The groq client is pointed at it with GROQ_BASE_URL.
+
+    python benchmarks/fake_groq.py --port 8766 --latency 0.3
+    GROQ_BASE_URL=http://127.0.0.1:8766 GROQ_API_KEY=fake uvicorn main:app
+"""
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LEVELS = ['A2', 'B1', 'B1', 'B2', 'C1']
+
+
+def fake_evaluation(rng):
+    level = rng.choice(LEVELS)
+    score = LEVELS.index(level) + 2
+    return {
+        'level': level, 'score': score, 'points': score, 'is_correct': score >= 3,
+        'feedback': f'Clear answer at {level} level; add one more linking word.',
+        'justification': 'Relevant content with mostly accurate grammar.',
+        'vocabulary_assessment': 'Appropriate', 'grammar_assessment': 'Mostly accurate',
+        'spelling_assessment': 'Good', 'comprehension_assessment': 'Good', 'fluency_assessment': 'Good',
+        'specific_strengths': ['task completion'], 'specific_areas_for_improvement': ['connectors'],
+        'tips_for_improvement': 'Use because/however to link ideas.',
+        'strengths': ['task completion'], 'improvements': ['connectors'], 'vocabulary_used': ['festival'],
+    }
+
+
+class FakeGroqServer:
+    def __init__(self, host='127.0.0.1', port=0, latency=0.3, jitter=0.5, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread = None
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            wbufsize = -1
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                payload = json.loads(self.rfile.read(length) or b'{}')
+                with server._lock:
+                    server.requests += 1
+                    evaluation = fake_evaluation(server._rng)
+                    delay = server.latency * (1 + server.jitter * (server._rng.random() * 2 - 1))
+                time.sleep(max(0.0, delay))
+
+                content = json.dumps(evaluation)
+                body = {
+                    'id': f'chatcmpl-fake-{server.requests}',
+                    'object': 'chat.completion',
+                    'created': int(time.time()),
+                    'model': payload.get('model', 'fake'),
+                    'choices': [{
+                        'index': 0,
+                        'message': {'role': 'assistant', 'content': content},
+                        'finish_reason': 'stop',
+                    }],
+                    'usage': {'prompt_tokens': 200, 'completion_tokens': 80, 'total_tokens': 280},
+                }
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Fake Groq chat completions')
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--latency', type=float, default=0.3)
+    args = parser.parse_args()
+
+    fake = FakeGroqServer(port=args.port, latency=args.latency)
+    print(f"Fake Groq listening on {fake.base_url}")
+    try:
+        fake.httpd.serve_forever()
+    except KeyboardInterrupt:
+        fake.stop()
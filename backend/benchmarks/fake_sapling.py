@@ -0,0 +1,110 @@
+"""
+Local stand-in for Sapling's AI detector, for offline benchmarks.
+
+Answers POST /api/v1/aidetect with a Sapling-shaped JSON body after a
+configurable delay, optionally failing a share of requests with 503. It
+counts requests and TCP connections so connection reuse can be checked.
+
+    python benchmarks/fake_sapling.py --port 8765 --latency 0.05
+    SAPLING_API_URL=http://127.0.0.1:8765/api/v1/aidetect SAPLING_API_KEY=fake uvicorn main:app
+"""
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeSaplingServer:
+    def __init__(self, host='127.0.0.1', port=0, latency=0.02, score=0.2, error_rate=0.0):
+        self.latency = latency
+        self.score = score
+        self.error_rate = error_rate
+        self.requests = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive
+            # Buffered writes + TCP_NODELAY, otherwise Nagle/delayed-ACK adds ~40ms per reused connection
+            wbufsize = -1
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                payload = json.loads(self.rfile.read(length) or b'{}')
+                with server._lock:
+                    server.requests += 1
+                time.sleep(server.latency)
+
+                if random.random() < server.error_rate:
+                    status, body = 503, {'msg': 'fake outage'}
+                else:
+                    status = 200
+                    body = {
+                        'score': server.score,
+                        'detail': {'explanations': [{'explanation': 'fake explanation'}]},
+                        'text_length': len(payload.get('text', '')),
+                    }
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/api/v1/aidetect"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def reset_counters(self):
+        with self._lock:
+            self.requests = 0
+            self.connections = 0
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Fake Sapling AI detector')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--score', type=float, default=0.2)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    fake = FakeSaplingServer(port=args.port, latency=args.latency, score=args.score, error_rate=args.error_rate)
+    print(f"Fake Sapling listening on {fake.url}")
+    try:
+        fake.httpd.serve_forever()
+    except KeyboardInterrupt:
+        fake.stop()
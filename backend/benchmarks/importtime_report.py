@@ -0,0 +1,85 @@
+"""
+`python -X importtime` profile of `import main`, eager vs lazy startup.
+
+For each mode, imports the app in a fresh interpreter against an empty
+database and summarises the importtime log: total, the heaviest top-level
+packages (cumulative) and the app's own modules by self time, which is
+where import-time side effects and route registration show up.
+
+    cd backend && python benchmarks/importtime_report.py [--top 12] [--output benchmarks/importtime_report.txt]
+"""
+import os
+import sys
+import argparse
+import tempfile
+import subprocess
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIRST_PARTY = ("main", "routers", "services", "models", "utils", "dependencies", "auth_utils", "migrations")
+
+
+def profile(lazy):
+    env = dict(os.environ)
+    env["FARDI_LAZY_STARTUP"] = "1" if lazy else "0"
+    env["FARDI_DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="fardi-bench-"), "importtime.db")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND, env=env, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def summarise(rows, top):
+    lines = []
+    # Children are logged before their parent: keep only what `import main` pulled in
+    end = next(i for i, row in enumerate(rows) if row[0] == "main" and row[3] == 0)
+    start = end
+    while start > 0 and rows[start - 1][3] > 0:
+        start -= 1
+    total = rows[end][2]
+    rows = rows[start:end]
+    lines.append(f"import main: {total / 1000:.0f} ms")
+
+    packages = {}
+    for name, _, cumulative, _ in rows:
+        root = name.split(".")[0]
+        if root not in FIRST_PARTY and name == root:
+            packages[root] = max(packages.get(root, 0), cumulative)
+    lines.append("  heaviest third-party packages (cumulative ms):")
+    for root, cumulative in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        lines.append(f"    {cumulative / 1000:8.1f}  {root}")
+
+    own = [(name, self_us) for name, self_us, _, _ in rows if name.split(".")[0] in FIRST_PARTY]
+    lines.append("  app modules by self time (ms):")
+    for name, self_us in sorted(own, key=lambda item: -item[1])[:top]:
+        lines.append(f"    {self_us / 1000:8.1f}  {name}")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="import-time profile of the API app")
+    parser.add_argument('--top', type=int, default=12)
+    parser.add_argument('--output')
+    args = parser.parse_args()
+
+    report = []
+    for lazy in (False, True):
+        report.append(f"== {'lazy' if lazy else 'eager'} startup (FARDI_LAZY_STARTUP={int(lazy)})")
+        report.extend(summarise(profile(lazy), args.top))
+        report.append("")
+    text = "\n".join(report)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+if __name__ == '__main__':
+    main()
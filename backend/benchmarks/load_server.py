@@ -0,0 +1,52 @@
+"""
+The API server as load_test.py runs it: uvicorn on main:app with Edge TTS
+replaced by a local fake.
+
+services/audio_service.py imports edge_tts on first use, so registering a
+stand-in module before the app is imported is enough. Its Communicate.save()
+sleeps FARDI_FAKE_TTS_LATENCY seconds (default 0.2) and writes nothing, so
+load runs leave static/audio untouched. The LLM and Sapling fakes are
+separate servers, reached through GROQ_BASE_URL / SAPLING_API_URL.
+
+    cd backend && python benchmarks/load_server.py --port 5011
+"""
+import os
+import sys
+import types
+import asyncio
+import argparse
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+
+class FakeCommunicate:
+    def __init__(self, text, voice, **kwargs):
+        self.text = text
+        self.voice = voice
+
+    async def save(self, path):
+        await asyncio.sleep(float(os.getenv('FARDI_FAKE_TTS_LATENCY', 0.2)))
+
+
+def install_fake_tts():
+    module = types.ModuleType('edge_tts')
+    module.Communicate = FakeCommunicate
+    sys.modules['edge_tts'] = module
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API server with fake TTS")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5011)
+    args = parser.parse_args()
+
+    install_fake_tts()
+    os.chdir(BACKEND)
+    import uvicorn
+    from main import app
+    uvicorn.run(app, host=args.host, port=args.port, log_level='warning')
+
+
+if __name__ == '__main__':
+    main()
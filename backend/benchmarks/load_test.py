@@ -0,0 +1,308 @@
+"""
+End-to-end load test: virtual students playing through the game against a
+real server, with the LLM, AI detector and TTS replaced by local fakes.
+
+Seeds a temporary database with benchmarks/seed_dataset.py (or uses --db),
+starts the fake Groq (benchmarks/fake_groq.py) and Sapling
+(benchmarks/fake_sapling.py) servers, and launches benchmarks/load_server.py
+pointed at them. Each of --vus virtual users logs in as a different seeded
+student and repeats JOURNEY, the request sequence the SPA sends through
+Phase 1 (/start-game, /api/game/*), Phase 2 (/api/phase2/*), the resume
+pointer (/api/progress/*), Phases 3-6 and the dashboards, with --think
+seconds of random pause between requests. Answers are varied per user and
+iteration so the LLM response cache does not hide the assessment path.
+
+Prints per-route request count, throughput, errors (HTTP >= 400 or no
+response) and p50/p95/p99 latency. --save writes the result as a JSON
+baseline; --compare prints the change against one and exits 1 when a
+route's errors or p95 grew by more than --tolerance (and, for p95, by more
+than --min-delta-ms, so a 10 ms route jittering to 14 ms is not flagged).
+
+    cd backend && python benchmarks/load_test.py --users 20000 --vus 20 --duration 60 --save baseline.json
+    cd backend && python benchmarks/load_test.py --users 20000 --vus 20 --duration 60 --compare baseline.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import socket
+import sqlite3
+import argparse
+import tempfile
+import threading
+import subprocess
+import statistics
+
+import requests
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+from benchmarks.fake_groq import FakeGroqServer  # noqa: E402
+from benchmarks.fake_sapling import FakeSaplingServer  # noqa: E402
+from benchmarks.seed_dataset import PHASE2_STEPS, SEED_PASSWORD  # noqa: E402
+
+IDEAS = ['a music concert', 'a food tasting', 'a dance show', 'a poster contest', 'a charity run', 'a photo exhibition']
+REASONS = ['it brings people together', 'students can show their talents', 'it is cheap to organise',
+           'families can join', 'we can raise money for the club']
+
+
+def answer(rng, vu, iteration):
+    """A plausible student answer, different for every user and iteration"""
+    return (f"I think we should organise {rng.choice(IDEAS)} because {rng.choice(REASONS)}. "
+            f"Group {vu} can prepare it before day {iteration + 1}.")
+
+
+# (route, method, path, json body builder(rng, vu, iteration) or None)
+JOURNEY = [
+    ('POST /start-game', 'POST', '/start-game', None),
+    ('GET /api/game/state', 'GET', '/api/game/state', None),
+    ('POST /api/game/submit', 'POST', '/api/game/submit',
+     lambda rng, vu, i: {'response': answer(rng, vu, i), 'question_type': 'open'}),
+    ('GET /api/phase2/get-step-state', 'GET', '/api/phase2/get-step-state?step_id=step_1', None),
+    ('POST /api/phase2/submit-response', 'POST', '/api/phase2/submit-response',
+     lambda rng, vu, i: {'step_id': 'step_1', 'action_item_id': rng.choice(PHASE2_STEPS['step_1']),
+                         'response': answer(rng, vu, i)}),
+    ('POST /api/phase2/generate-character-audio', 'POST', '/api/phase2/generate-character-audio',
+     lambda rng, vu, i: {'text': answer(rng, vu, i), 'character': 'SKANDER',
+                         'step_id': 'step_1', 'action_item_id': 'role_suggestion'}),
+    ('POST /api/progress/save', 'POST', '/api/progress/save',
+     lambda rng, vu, i: {'phase': 3, 'step': 1, 'interaction': 2, 'item_index': i % 5, 'context': 'main',
+                         'response': {'item_id': f'p3s1i2_{i % 5}', 'item_type': 'open',
+                                      'prompt': 'Which sponsor should we contact?',
+                                      'answer': answer(rng, vu, i), 'score': rng.randint(1, 5)}}),
+    ('GET /api/progress/resume', 'GET', '/api/progress/resume?phase=3', None),
+    ('POST /api/phase3/step/{id}/submit', 'POST', '/api/phase3/step/1/submit',
+     lambda rng, vu, i: {'response': answer(rng, vu, i)}),
+    ('GET /api/phase4/step/{id}', 'GET', '/api/phase4/step/1', None),
+    ('POST /api/phase4/step/{id}/submit', 'POST', '/api/phase4/step/1/submit',
+     lambda rng, vu, i: {'response': answer(rng, vu, i)}),
+    ('POST /api/phase5/step1/interaction2/evaluate', 'POST', '/api/phase5/step1/interaction2/evaluate',
+     lambda rng, vu, i: {'response': answer(rng, vu, i)}),
+    ('POST /api/phase6/step1/interaction2/evaluate', 'POST', '/api/phase6/step1/interaction2/evaluate',
+     lambda rng, vu, i: {'response': answer(rng, vu, i)}),
+    ('GET /api/dashboard', 'GET', '/api/dashboard', None),
+    ('GET /api/gamification/dashboard', 'GET', '/api/gamification/dashboard', None),
+]
+LOGIN_ROUTE = 'POST /auth/api/login'
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def prepare_db(args):
+    """Path of the database to load and the seeded student usernames"""
+    from migrations.runner import run_migrations
+    from benchmarks.seed_dataset import seed
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix='fardi-load-'), 'load.db')
+    run_migrations(db_path)
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute('PRAGMA journal_mode=WAL')
+        if not args.db:
+            started = time.perf_counter()
+            seed(conn, args.users, random.Random(args.seed))
+            print(f"seeded {args.users} users in {time.perf_counter() - started:.1f} s")
+        usernames = [row[0] for row in conn.execute(
+            "SELECT username FROM users WHERE username LIKE 'seed%' AND is_admin = 0")]
+    finally:
+        conn.close()
+    if len(usernames) < args.vus:
+        raise SystemExit(f"{db_path} has {len(usernames)} seeded students, need one per virtual user")
+    return db_path, usernames
+
+
+def start_server(args, db_path, groq, sapling):
+    port = free_port()
+    env = dict(os.environ)
+    env.update({
+        'FARDI_DB_PATH': db_path,
+        'GROQ_API_KEY': 'fake', 'GROQ_BASE_URL': groq.base_url,
+        'SAPLING_API_KEY': 'fake', 'SAPLING_API_URL': sapling.url,
+        'FARDI_FAKE_TTS_LATENCY': str(args.tts_latency),
+    })
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join('benchmarks', 'load_server.py'), '--port', str(port)],
+        cwd=BACKEND, env=env, stdout=subprocess.DEVNULL, stderr=None if args.server_log else subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit("server exited during startup")
+        try:
+            if requests.get(f"{base_url}/api/health", timeout=1).json()['startup']['ready']:
+                return proc, base_url
+        except (requests.RequestException, ValueError, KeyError):
+            pass
+        time.sleep(0.1)
+    proc.terminate()
+    raise SystemExit("server did not become ready within 60 s")
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = {}
+        self.errors = {}
+        self._lock = threading.Lock()
+
+    def add(self, route, ms, ok):
+        with self._lock:
+            self.samples.setdefault(route, []).append(ms)
+            if not ok:
+                self.errors[route] = self.errors.get(route, 0) + 1
+
+
+def request(session, recorder, route, method, url, body=None):
+    started = time.perf_counter()
+    try:
+        response = session.request(method, url, json=body, timeout=60)
+        ok = response.status_code < 400
+    except requests.RequestException:
+        response, ok = None, False
+    recorder.add(route, (time.perf_counter() - started) * 1000, ok)
+    return response
+
+
+def virtual_user(vu, username, base_url, args, recorder, stop_at):
+    rng = random.Random(args.seed * 1000 + vu)
+    session = requests.Session()
+    response = request(session, recorder, LOGIN_ROUTE, 'POST', f"{base_url}/auth/api/login",
+                       {'username_or_email': username, 'password': SEED_PASSWORD})
+    if response is None or response.status_code != 200:
+        return
+    iteration = 0
+    while time.time() < stop_at:
+        for route, method, path, body in JOURNEY:
+            if time.time() >= stop_at:
+                return
+            request(session, recorder, route, method, base_url + path, body(rng, vu, iteration) if body else None)
+            time.sleep(rng.uniform(0, args.think))
+        iteration += 1
+
+
+def summarise(recorder, elapsed):
+    routes = {}
+    for route in [LOGIN_ROUTE] + [step[0] for step in JOURNEY]:
+        samples = recorder.samples.get(route)
+        if not samples:
+            continue
+        routes[route] = {
+            'count': len(samples),
+            'rps': len(samples) / elapsed,
+            'errors': recorder.errors.get(route, 0),
+            'p50_ms': statistics.median(samples),
+            'p95_ms': percentile(samples, 95),
+            'p99_ms': percentile(samples, 99),
+        }
+    return routes
+
+
+def report(routes):
+    print(f"{'route':46s} {'count':>6s} {'req/s':>7s} {'errors':>6s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s}")
+    for route, row in routes.items():
+        print(f"{route:46s} {row['count']:6d} {row['rps']:7.2f} {row['errors']:6d} "
+              f"{row['p50_ms']:8.1f} {row['p95_ms']:8.1f} {row['p99_ms']:8.1f}")
+
+
+def compare(routes, baseline, tolerance, min_delta_ms):
+    """Prints per-route change against a saved baseline; returns the regressed routes"""
+    regressed = []
+    print(f"\nagainst baseline ({baseline['meta']['timestamp']}), tolerance {tolerance:.0%}")
+    print(f"{'route':46s} {'req/s':>14s} {'p95 ms':>18s} {'errors':>10s}")
+    for route, row in routes.items():
+        before = baseline['routes'].get(route)
+        if before is None:
+            print(f"{route:46s} (not in baseline)")
+            continue
+        change = (row['p95_ms'] - before['p95_ms']) / before['p95_ms'] if before['p95_ms'] else 0.0
+        slower = change > tolerance and row['p95_ms'] - before['p95_ms'] > min_delta_ms
+        worse = slower or row['errors'] > before['errors'] * (1 + tolerance)
+        if worse:
+            regressed.append(route)
+        print(f"{route:46s} {before['rps']:6.2f}->{row['rps']:6.2f} "
+              f"{before['p95_ms']:7.1f}->{row['p95_ms']:7.1f} ({change:+.0%}) "
+              f"{before['errors']:4d}->{row['errors']:4d}{'  REGRESSED' if worse else ''}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="end-to-end load test with fake LLM/TTS")
+    parser.add_argument('--users', type=int, default=10000, help="students to seed (ignored with --db)")
+    parser.add_argument('--db', help="load an existing database (seeded by seed_dataset.py) instead")
+    parser.add_argument('--vus', type=int, default=10, help="concurrent virtual students")
+    parser.add_argument('--duration', type=float, default=60, help="seconds of load")
+    parser.add_argument('--think', type=float, default=0.5, help="max pause between requests, seconds")
+    parser.add_argument('--llm-latency', type=float, default=0.3)
+    parser.add_argument('--detector-latency', type=float, default=0.05)
+    parser.add_argument('--tts-latency', type=float, default=0.2)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--save', help="write the result to this JSON baseline")
+    parser.add_argument('--compare', help="compare against this JSON baseline")
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    parser.add_argument('--min-delta-ms', type=float, default=50)
+    parser.add_argument('--server-log', action='store_true', help="show the server's stderr")
+    args = parser.parse_args()
+
+    db_path, usernames = prepare_db(args)
+    students = random.Random(args.seed).sample(usernames, args.vus)
+
+    with FakeGroqServer(latency=args.llm_latency, seed=args.seed) as groq, \
+            FakeSaplingServer(latency=args.detector_latency) as sapling:
+        proc, base_url = start_server(args, db_path, groq, sapling)
+        try:
+            recorder = Recorder()
+            started = time.time()
+            stop_at = started + args.duration
+            threads = [
+                threading.Thread(target=virtual_user, args=(vu, username, base_url, args, recorder, stop_at))
+                for vu, username in enumerate(students)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.time() - started
+        finally:
+            proc.terminate()
+            proc.wait()
+        llm_calls = groq.requests
+
+    routes = summarise(recorder, elapsed)
+    total = sum(row['count'] for row in routes.values())
+    print(f"{args.vus} virtual students for {elapsed:.0f} s: {total} requests ({total / elapsed:.1f} req/s), "
+          f"{llm_calls} LLM calls\n")
+    report(routes)
+
+    result = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'users': None if args.db else args.users, 'vus': args.vus, 'duration': args.duration,
+            'think': args.think, 'llm_latency': args.llm_latency, 'tts_latency': args.tts_latency,
+        },
+        'routes': routes,
+    }
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"\nbaseline written to {args.save}")
+    if args.compare:
+        with open(args.compare) as f:
+            regressed = compare(routes, json.load(f), args.tolerance, args.min_delta_ms)
+        if regressed:
+            print(f"\n{len(regressed)} route(s) regressed")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
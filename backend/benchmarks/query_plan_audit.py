@@ -0,0 +1,300 @@
+"""
+EXPLAIN QUERY PLAN audit of the app's hot SQL.
+
+QUERIES is a registry of the statements request paths run per user or per
+page (copied from the routers/services named in each entry). The audit
+prints each plan and flags full table scans ("SCAN <table>" without an
+index). Temp B-trees are marked (~) but not flagged: after an index SEARCH
+they only sort one user's rows. Whole-table admin aggregates that scan by
+nature are registered with expected_scan=True and reported but not flagged.
+
+Exits 1 when a statement scans unexpectedly, so it can run before a release:
+
+    cd backend && python benchmarks/query_plan_audit.py [db_path]
+
+Without db_path it audits a fresh database built by migrations/runner.py.
+When adding a query on a per-user path, register it here.
+"""
+import os
+import re
+import sys
+import sqlite3
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from migrations.runner import run_migrations  # noqa: E402
+from migrations.game_session_items import session_items_query  # noqa: E402
+
+# (name, sql, params, expected_scan)
+QUERIES = [
+    # services/game_session_service.py
+    ('game session by user', 'SELECT * FROM game_sessions WHERE user_id = ?', (1,), False),
+    ('game session items: kind', *session_items_query(1, 'responses'), False),
+    ('game session items: keys', *session_items_query(1, 'phase2_responses', ['step_1', 'step_2']), False),
+    ('game session item', 'SELECT value FROM game_session_items WHERE user_id = ? AND kind = ? AND key = ?',
+     (1, 'responses', '000003'), False),
+
+    # services/achievement_service.py _get_condition_count, services/streak_service.py
+    ('xp: action items completed', """
+        SELECT COUNT(*) FROM xp_history
+        WHERE user_id = ? AND reason IN ('action_item_completed', 'action_item_perfect')
+    """, (1,), False),
+    ('xp: phases completed', """
+        SELECT COUNT(*) FROM xp_history
+        WHERE user_id = ? AND reason LIKE '%_phase_%_completed'
+    """, (1,), False),
+    ('xp: speed bonuses', "SELECT COUNT(*) FROM xp_history WHERE user_id = ? AND reason = 'speed_bonus'", (1,), False),
+    ('xp: remedial level', 'SELECT COUNT(*) FROM xp_history WHERE user_id = ? AND reason LIKE ?', (1, 'remedial_A1%'), False),
+    ('xp: active days', 'SELECT COUNT(DISTINCT DATE(timestamp)) FROM xp_history WHERE user_id = ?', (1,), False),
+    # models/gamification_models.py
+    ('xp: history page', """
+        SELECT id, xp_amount, reason, activity_id, activity_type, timestamp
+        FROM xp_history WHERE user_id = ? ORDER BY timestamp DESC LIMIT ?
+    """, (1, 50), False),
+    ('xp: today', "SELECT SUM(xp_amount) FROM xp_history WHERE user_id = ? AND DATE(timestamp) = DATE('now')", (1,), False),
+    ('streak by user', 'SELECT * FROM user_streaks WHERE user_id = ?', (1,), False),
+    ('streak leaderboard', """
+        SELECT us.user_id, us.current_streak, us.longest_streak, u.username
+        FROM user_streaks us
+        JOIN users u ON us.user_id = u.id
+        WHERE us.current_streak > 0
+        ORDER BY us.current_streak DESC, us.longest_streak DESC
+        LIMIT ?
+    """, (10,), False),
+    ('friends count', "SELECT COUNT(*) FROM friendships WHERE user_id = ? AND status = 'accepted'", (1,), False),
+
+    # routers/chat.py
+    ('chat: last message per conversation', """
+        SELECT message FROM chat_messages
+        WHERE (sender_id = ? AND receiver_id = ?) OR (sender_id = ? AND receiver_id = ?)
+        ORDER BY created_at DESC LIMIT 1
+    """, (1, 2, 2, 1), False),
+    ('chat: unread from user', """
+        SELECT COUNT(*) FROM chat_messages WHERE sender_id = ? AND receiver_id = ? AND is_read = 0
+    """, (2, 1), False),
+    ('chat: thread', """
+        SELECT id, sender_id, receiver_id, message, is_read, created_at
+        FROM chat_messages
+        WHERE (sender_id = ? AND receiver_id = ?) OR (sender_id = ? AND receiver_id = ?)
+        ORDER BY created_at ASC
+    """, (1, 2, 2, 1), False),
+    ('chat: admins for a student', 'SELECT u.id, u.username FROM users u WHERE u.is_admin = 1', (), False),
+    ('chat: unread count', 'SELECT COUNT(*) as count FROM chat_messages WHERE receiver_id = ? AND is_read = 0', (1,), False),
+
+    # models/auth.py AssessmentHistory
+    ('assessments: recent', 'SELECT * FROM assessment_results WHERE user_id = ? ORDER BY completed_at DESC LIMIT ?', (1, 5), False),
+    ('assessments: user stats', """
+        SELECT COUNT(*), MAX(overall_level), AVG(xp_earned), SUM(xp_earned), AVG(ai_usage_percentage)
+        FROM assessment_results WHERE user_id = ?
+    """, (1,), False),
+    ('phase2: progress', 'SELECT * FROM phase2_progress WHERE user_id = ? ORDER BY started_at', (1,), False),
+    ('phase2: progress lookup', """
+        SELECT id FROM phase2_progress WHERE user_id = ? AND session_id = ? AND step_id = ?
+    """, (1, 's', 'step_1'), False),
+    ('phase2: completed steps', """
+        SELECT COUNT(DISTINCT step_id), SUM(step_score), AVG(step_score), MAX(last_activity)
+        FROM phase2_progress WHERE user_id = ? AND step_completed = 1
+    """, (1,), False),
+    ('phase2: current step', """
+        SELECT step_id, current_item, total_items, needs_remedial, remedial_level
+        FROM phase2_progress WHERE user_id = ? AND step_completed = 0
+        ORDER BY last_activity DESC LIMIT 1
+    """, (1,), False),
+    ('phase2: responses', 'SELECT * FROM phase2_responses WHERE user_id = ? ORDER BY submitted_at', (1,), False),
+    ('phase2: remedial', 'SELECT * FROM phase2_remedial WHERE user_id = ? ORDER BY submitted_at', (1,), False),
+    ('phase completion', """
+        SELECT phase_number, completed, completion_date, final_level
+        FROM user_phase_completion WHERE user_id = ? ORDER BY phase_number
+    """, (1,), False),
+
+    # routers/progress.py, routers/api.py
+    ('resume pointer', """
+        SELECT phase, subphase, step, interaction, item_index, context, session_id
+        FROM student_progress WHERE user_id = ? AND phase = ?
+    """, (1, 1), False),
+    ('responses for phase', 'SELECT COUNT(*) as cnt FROM student_responses WHERE user_id = ? AND phase = ?', (1, 1), False),
+
+    # models/auth.py get_users_progress_page (/api/admin/students)
+    ('admin students: page by created_at', """
+        SELECT u.id AS user_id, u.username FROM users u
+        WHERE COALESCE(u.created_at, '') <= ? AND (COALESCE(u.created_at, '') < ? OR u.id < ?)
+        ORDER BY COALESCE(u.created_at, '') DESC, u.id DESC LIMIT ?
+    """, ('2026-01-01', '2026-01-01', 100, 101), False),
+    ('admin students: page by last_login', """
+        SELECT u.id AS user_id, u.username FROM users u
+        WHERE COALESCE(u.last_login, '') >= ? AND (COALESCE(u.last_login, '') > ? OR u.id > ?)
+        ORDER BY COALESCE(u.last_login, '') ASC, u.id ASC LIMIT ?
+    """, ('2026-01-01', '2026-01-01', 100, 101), False),
+    ('admin students: latest assessment', """
+        SELECT user_id, overall_level, MAX(completed_at) AS completed_at
+        FROM assessment_results WHERE user_id IN (?, ?) GROUP BY user_id
+    """, (1, 2), False),
+    ('admin students: phase 2 best scores', """
+        SELECT user_id, COUNT(*) AS steps_completed, SUM(best_score) AS score
+        FROM (
+            SELECT user_id, step_id, MAX(step_score) AS best_score
+            FROM phase2_progress
+            WHERE user_id IN (?, ?) AND step_completed = 1
+            GROUP BY user_id, step_id
+        )
+        GROUP BY user_id
+    """, (1, 2), False),
+    ('admin students: remedial counts',
+     'SELECT user_id, COUNT(*) FROM phase2_remedial WHERE user_id IN (?, ?) GROUP BY user_id', (1, 2), False),
+    ('admin students: phase completions', """
+        SELECT user_id, phase_number FROM user_phase_completion WHERE user_id IN (?, ?) AND completed = 1
+    """, (1, 2), False),
+
+    # routers/admin.py users_with_stats_page (/api/admin/users, /admin/export/users)
+    ('admin users: page', """
+        SELECT u.*, u.id as user_id FROM users u
+        WHERE COALESCE(u.created_at, '') <= ? AND (COALESCE(u.created_at, '') < ? OR u.id < ?)
+        ORDER BY COALESCE(u.created_at, '') DESC, u.id DESC LIMIT ? OFFSET ?
+    """, ('2026-01-01', '2026-01-01', 100, 21, 0), False),
+    ('admin users: search page', """
+        SELECT u.*, u.id as user_id FROM users u
+        WHERE u.id IN (SELECT rowid FROM users_search WHERE users_search MATCH ?)
+        ORDER BY COALESCE(u.created_at, '') DESC, u.id DESC LIMIT ? OFFSET ?
+    """, ('"trabelsi"', 21, 0), False),
+    ('admin users: search count', """
+        SELECT COUNT(*) as count FROM users
+        WHERE id IN (SELECT rowid FROM users_search WHERE users_search MATCH ?)
+    """, ('"trabelsi"',), False),
+    ('admin users: assessment stats', """
+        SELECT user_id, COUNT(*) AS total_assessments, SUM(xp_earned) AS total_xp,
+               overall_level, MAX(completed_at) AS latest
+        FROM assessment_results WHERE user_id IN (?, ?) GROUP BY user_id
+    """, (1, 2), False),
+    ('admin users: phase 2 steps', """
+        SELECT user_id, COUNT(DISTINCT step_id) AS steps_attempted,
+               COUNT(DISTINCT CASE WHEN step_completed = 1 THEN step_id END) AS steps_completed
+        FROM phase2_progress WHERE user_id IN (?, ?) GROUP BY user_id
+    """, (1, 2), False),
+
+    # models/auth.py get_ai_evaluations_page (/api/admin/ai-evaluations)
+    ('ai evaluations: feed page', """
+        SELECT r.id, r.submitted_at, u.username FROM phase2_responses r
+        LEFT JOIN users u ON u.id = r.user_id
+        WHERE r.assessment_data IS NOT NULL AND r.assessment_data NOT IN ('', '{}', 'null')
+          AND COALESCE(u.is_admin, 0) = 0
+          AND r.submitted_at <= ? AND (r.submitted_at < ? OR r.id < ?)
+        ORDER BY r.submitted_at DESC, r.id DESC LIMIT ?
+    """, ('2026-01-01', '2026-01-01', 100, 101), False),
+    ('ai evaluations: by user', """
+        SELECT r.id, r.submitted_at, u.username FROM phase2_responses r
+        LEFT JOIN users u ON u.id = r.user_id
+        WHERE r.assessment_data IS NOT NULL AND r.assessment_data NOT IN ('', '{}', 'null')
+          AND COALESCE(u.is_admin, 0) = 0
+          AND r.user_id = ?
+        ORDER BY r.submitted_at DESC, r.id DESC LIMIT ?
+    """, (1, 101), False),
+    ('ai evaluations: by step and date', """
+        SELECT r.id, r.submitted_at, u.username FROM phase2_responses r
+        LEFT JOIN users u ON u.id = r.user_id
+        WHERE r.assessment_data IS NOT NULL AND r.assessment_data NOT IN ('', '{}', 'null')
+          AND COALESCE(u.is_admin, 0) = 0
+          AND r.step_id = ? AND r.submitted_at >= ? AND r.submitted_at <= ?
+        ORDER BY r.submitted_at DESC, r.id DESC LIMIT ?
+    """, ('step_1', '2025-01-01', '2026-01-01', 101), False),
+    ('ai evaluations: by level', """
+        SELECT r.id, r.submitted_at, u.username FROM phase2_responses r
+        LEFT JOIN users u ON u.id = r.user_id
+        WHERE r.assessment_data IS NOT NULL AND r.assessment_data NOT IN ('', '{}', 'null')
+          AND COALESCE(u.is_admin, 0) = 0
+          AND r.cefr_level = ?
+        ORDER BY r.submitted_at DESC, r.id DESC LIMIT ?
+    """, ('B1', 101), False),
+
+    # services/analytics_rollup.py incremental refresh: only what changed since the last run
+    ('rollups: changed cohorts', """
+        SELECT DISTINCT COALESCE(strftime('%Y-%m', created_at), 'unknown') FROM users
+        WHERE id IN (
+            SELECT id FROM users WHERE COALESCE(created_at, '') >= ?
+            UNION SELECT user_id FROM assessment_results WHERE completed_at >= ?
+            UNION SELECT user_id FROM phase2_progress WHERE last_activity >= ?
+            UNION SELECT user_id FROM user_phase_completion WHERE updated_at >= ?
+        )
+    """, ('2026-01-01',) * 4, False),
+    ('rollups: cohort counts', """
+        SELECT COUNT(*),
+               SUM(u.is_admin = 0 AND EXISTS (SELECT 1 FROM assessment_results ar WHERE ar.user_id = u.id)),
+               SUM(u.is_admin = 0 AND EXISTS (
+                   SELECT 1 FROM user_phase_completion c
+                   WHERE c.user_id = u.id AND c.phase_number = 3 AND c.completed = 1
+               ))
+        FROM users u
+        WHERE COALESCE(u.created_at, '') >= ? AND COALESCE(u.created_at, '') < ?
+    """, ('2026-01', '2026-02'), False),
+    ('rollups: daily active users', """
+        SELECT date(at) AS day, COUNT(DISTINCT user_id) FROM (
+            SELECT user_id, completed_at AS at FROM assessment_results WHERE completed_at >= ?
+            UNION SELECT user_id, last_activity AS at FROM phase2_progress WHERE last_activity >= ?
+            UNION SELECT user_id, updated_at AS at FROM phase5_progress WHERE updated_at >= ?
+            UNION SELECT user_id, updated_at AS at FROM phase6_progress WHERE updated_at >= ?
+        ) GROUP BY day
+    """, ('2026-01-01',) * 4, False),
+    ('rollups: dashboard daily sums', """
+        SELECT SUM(new_users), SUM(CASE WHEN day >= date('now', '-7 days') THEN assessments END)
+        FROM analytics_daily WHERE day >= date('now', '-30 days')
+    """, (), False),
+
+    # Whole-table aggregates, now run by the analytics rollup refresh rather than per page view
+    ('admin: assessments total', 'SELECT COUNT(*) as count FROM assessment_results', (), True),
+    ('admin: latest assessment per user', """
+        SELECT ar1.user_id, ar1.overall_level
+        FROM assessment_results ar1
+        INNER JOIN (
+            SELECT user_id, MAX(completed_at) as max_date
+            FROM assessment_results
+            GROUP BY user_id
+        ) ar2 ON ar1.user_id = ar2.user_id AND ar1.completed_at = ar2.max_date
+    """, (), True),
+    ('admin: phase 2 users', 'SELECT COUNT(DISTINCT user_id) as count FROM phase2_responses', (), True),
+]
+
+SCAN = re.compile(r'^SCAN (\w+)(?: AS \w+)?$')
+
+
+def audit(conn):
+    """Returns [(name, plan_lines, problems, expected_scan)]"""
+    report = []
+    for name, sql, params, expected_scan in QUERIES:
+        plan = [row[3] for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}', params)]
+        problems = [detail for detail in plan if SCAN.match(detail)]
+        report.append((name, plan, problems, expected_scan))
+    return report
+
+
+def main():
+    if len(sys.argv) > 1:
+        db_path = sys.argv[1]
+    else:
+        db_path = os.path.join(tempfile.mkdtemp(prefix='fardi-audit-'), 'audit.db')
+        run_migrations(db_path)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        report = audit(conn)
+    finally:
+        conn.close()
+
+    flagged = 0
+    for name, plan, problems, expected_scan in report:
+        if not problems:
+            status = 'ok'
+        elif expected_scan:
+            status = 'scan (expected)'
+        else:
+            status = 'FLAG'
+            flagged += 1
+        print(f"[{status}] {name}")
+        for detail in plan:
+            marker = '!' if detail in problems else '~' if detail.startswith('USE TEMP B-TREE') else ' '
+            print(f"    {marker} {detail}")
+    print(f"\n{len(report)} statements, {flagged} flagged")
+    sys.exit(1 if flagged else 0)
+
+
+if __name__ == '__main__':
+    main()
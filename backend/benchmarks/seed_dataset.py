@@ -0,0 +1,266 @@
+"""
+Synthetic large-dataset generator.
+
+Fills a database with N users and the history a class of that size builds
+up: Phase 1 assessments, Phase 2 progress/responses/remedial rows, resume
+pointers and item responses for Phases 3-6, Phase 5/6 step scores, XP
+history and progression, streaks, phase completions and admin chat threads.
+
+Distributions are shaped like real usage rather than uniform: most students
+sit around A2-B1, each later phase is reached by fewer of them (95% start
+Phase 1, 15% reach Phase 6), recent activity is far more common than old
+activity, and XP history grows with progress.
+
+Users are appended after the highest existing id, so it can top up an
+existing database. Every seeded account (username seed<id>) has the password
+SEED_PASSWORD; the first --admins of a run are admins.
+
+    cd backend && python benchmarks/seed_dataset.py --users 100000 [--db path] [--seed 7]
+"""
+import os
+import sys
+import json
+import time
+import random
+import sqlite3
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from migrations.runner import DEFAULT_DB_PATH, run_migrations  # noqa: E402
+
+SEED_PASSWORD = 'SeedData2024'
+LEVELS = ['A1', 'A2', 'B1', 'B2', 'C1']
+LEVEL_WEIGHTS = [0.10, 0.25, 0.35, 0.20, 0.10]
+# Share of students who reach each phase
+PHASE_REACH = {1: 0.95, 2: 0.70, 3: 0.50, 4: 0.35, 5: 0.25, 6: 0.15}
+PHASE2_STEPS = {
+    'step_1': ['storytelling_intro', 'role_suggestion', 'peer_negotiation', 'role_confirmation', 'team_reflection'],
+    'step_2': ['meeting_proposal', 'purpose_explanation', 'schedule_negotiation', 'agenda_setting', 'meeting_confirmation'],
+    'step_3': ['task_proposal', 'task_purpose', 'task_negotiation', 'task_assignment', 'task_listening'],
+    'step_4': ['role_summary', 'schedule_summary', 'task_summary', 'plan_listening', 'complete_draft'],
+}
+XP_REASONS = ['action_item_completed', 'action_item_perfect', 'speed_bonus', 'daily_login',
+              'phase_2_step_completed', 'remedial_A2_completed']
+FIRST_NAMES = ['Amira', 'Youssef', 'Salma', 'Mehdi', 'Ines', 'Omar', 'Nour', 'Aziz', 'Lina', 'Karim']
+LAST_NAMES = ['Ben Ali', 'Trabelsi', 'Jaziri', 'Gharbi', 'Mansour', 'Haddad', 'Chaabane', 'Saidi']
+ANSWERS = [
+    'I think we should invite local musicians because they know the traditions.',
+    'We can meet on Tuesday after class to plan the schedule.',
+    'My role is to design the poster and share it with the team.',
+    'The festival was a success but the sound system was a challenge.',
+]
+
+BATCH_USERS = 5000
+
+INSERTS = {
+    'users': 'INSERT INTO users (id, username, email, password_hash, first_name, last_name, created_at, last_login, '
+             'is_admin) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+    'assessment_results': 'INSERT INTO assessment_results (user_id, session_id, overall_level, xp_earned, time_taken, '
+                          'completed_at, ai_usage_percentage) VALUES (?, ?, ?, ?, ?, ?, ?)',
+    'user_phase_completion': 'INSERT INTO user_phase_completion (user_id, phase_number, completed, completion_date, '
+                             'overall_score, final_level, updated_at) VALUES (?, ?, 1, ?, ?, ?, ?)',
+    'phase2_progress': 'INSERT INTO phase2_progress (user_id, session_id, step_id, current_item, step_score, '
+                       'step_completed, needs_remedial, remedial_level, started_at, completed_at, last_activity) '
+                       'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+    'phase2_responses': 'INSERT INTO phase2_responses (user_id, session_id, step_id, action_item_id, response_text, '
+                        'assessment_data, points_earned, cefr_level, ai_score, submitted_at) '
+                        'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+    'phase2_remedial': 'INSERT INTO phase2_remedial (user_id, session_id, step_id, level, activity_id, activity_index, '
+                       'score, completed, submitted_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+    'student_progress': 'INSERT INTO student_progress (user_id, phase, subphase, step, interaction, item_index, '
+                        'session_id, last_updated, is_complete) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+    'student_responses': 'INSERT INTO student_responses (user_id, phase, subphase, step, interaction, item_index, '
+                         'item_type, item_id, prompt, response, is_correct, score, session_id, timestamp) '
+                         'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+    'phase5_progress': 'INSERT INTO phase5_progress (user_id, subphase, step_id, interaction_scores, total_score, '
+                       'completed, remedial_level, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+    'phase6_progress': 'INSERT INTO phase6_progress (user_id, subphase, step_id, interaction_scores, total_score, '
+                       'completed, remedial_level, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+    'xp_history': 'INSERT INTO xp_history (user_id, xp_amount, reason, activity_id, activity_type, timestamp) '
+                  'VALUES (?, ?, ?, ?, ?, ?)',
+    'user_progression': 'INSERT INTO user_progression (user_id, total_xp, current_level, xp_to_next_level, updated_at) '
+                        'VALUES (?, ?, ?, ?, ?)',
+    'user_streaks': 'INSERT INTO user_streaks (user_id, current_streak, longest_streak, last_activity_date, '
+                    'freeze_tokens) VALUES (?, ?, ?, ?, ?)',
+    'chat_messages': 'INSERT INTO chat_messages (sender_id, receiver_id, message, is_read, created_at) '
+                     'VALUES (?, ?, ?, ?, ?)',
+}
+
+
+class _Clock:
+    """Timestamps skewed towards the present (exponential, mean 20 days)"""
+
+    def __init__(self, rng):
+        self.rng = rng
+        self.now = time.time()
+
+    def days_ago(self, mean=20.0, cap=365.0):
+        return min(cap, self.rng.expovariate(1 / mean))
+
+    def stamp(self, days_ago):
+        return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(self.now - days_ago * 86400))
+
+
+def _student(rows, rng, clock, user_id, admins, password_hash):
+    level_index = rng.choices(range(len(LEVELS)), LEVEL_WEIGHTS)[0]
+    level = LEVELS[level_index]
+    # Each phase is conditional on the previous one, so reach is a funnel
+    reached = 0
+    for phase in sorted(PHASE_REACH):
+        if rng.random() >= PHASE_REACH[phase] / PHASE_REACH.get(phase - 1, 1.0):
+            break
+        reached = phase
+    last_seen = clock.days_ago()
+    started = last_seen + clock.days_ago(mean=30)
+
+    def when(fraction):
+        # fraction 0 = start of the student's history, 1 = last activity
+        return clock.stamp(started - (started - last_seen) * fraction)
+
+    rows['users'].append((
+        user_id, f'seed{user_id}', f'seed{user_id}@example.com', password_hash,
+        rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES), clock.stamp(started + 1), clock.stamp(last_seen), 0,
+    ))
+    if reached >= 1:
+        for attempt in range(1 + (rng.random() < 0.2)):
+            rows['assessment_results'].append((
+                user_id, f'p1-{user_id}-{attempt}', level, rng.randint(60, 400), rng.randint(300, 2400),
+                when(0.1 + attempt * 0.05), round(rng.random() * 25, 1),
+            ))
+    for phase in range(1, reached):
+        completed_at = when(phase / 7)
+        rows['user_phase_completion'].append((user_id, phase, completed_at, rng.randint(40, 100), level, completed_at))
+
+    if reached >= 2:
+        session = f'p2-{user_id}'
+        steps = list(PHASE2_STEPS) if reached > 2 else list(PHASE2_STEPS)[:rng.randint(1, 4)]
+        for index, step in enumerate(steps):
+            completed = reached > 2 or index < len(steps) - 1
+            needs_remedial = level_index <= 1 and rng.random() < 0.5
+            at = when(0.2 + index * 0.04)
+            rows['phase2_progress'].append((
+                user_id, session, step, 5 if completed else rng.randint(0, 4), rng.randint(5, 25), int(completed),
+                int(needs_remedial), level if needs_remedial else None, at, at if completed else None, at,
+            ))
+            for item in PHASE2_STEPS[step][:5 if completed else rng.randint(1, 5)]:
+                rows['phase2_responses'].append((
+                    user_id, session, step, item, rng.choice(ANSWERS),
+                    json.dumps({'level': level, 'points': level_index + 1}), level_index + 1, level,
+                    round(rng.random() * 0.3, 2), at,
+                ))
+            if needs_remedial:
+                for activity in range(rng.randint(1, 3)):
+                    rows['phase2_remedial'].append((
+                        user_id, session, step, level, f'{level.lower()}_activity_{activity}', activity,
+                        rng.randint(2, 6), 1, at,
+                    ))
+
+    for phase in range(3, reached + 1):
+        session = f'p{phase}-{user_id}'
+        finished = phase < reached
+        step = 5 if finished else rng.randint(1, 4)
+        rows['student_progress'].append((
+            user_id, phase, 1, step, 3 if finished else rng.randint(1, 3), 0, session, when(phase / 7), int(finished),
+        ))
+        for item in range(rng.randint(4, 12) if finished else rng.randint(1, 6)):
+            correct = rng.random() < 0.4 + 0.12 * level_index
+            rows['student_responses'].append((
+                user_id, phase, 1, 1 + item // 3, 1 + item % 3, item, 'text', f'p{phase}_item{item}',
+                'Describe your plan for the festival.', rng.choice(ANSWERS), int(correct),
+                float(rng.randint(1, 5)), session, when(phase / 7),
+            ))
+        if phase in (5, 6):
+            for step_id in range(1, step + 1):
+                scores = {f'interaction{i}': rng.randint(1, 5) for i in range(1, 4)}
+                rows[f'phase{phase}_progress'].append((
+                    user_id, 1, step_id, json.dumps(scores), sum(scores.values()), int(step_id < step or finished),
+                    level if level_index <= 1 else None, when(phase / 7),
+                ))
+
+    total_xp = 0
+    for _ in range(rng.randint(1, 4) + 6 * reached):
+        amount = rng.choice((5, 10, 10, 15, 25, 50))
+        total_xp += amount
+        rows['xp_history'].append((
+            user_id, amount, rng.choice(XP_REASONS), f'step_{rng.randint(1, 4)}', 'action_item',
+            when(rng.random()),
+        ))
+    rows['user_progression'].append((user_id, total_xp, 1 + total_xp // 500, 500 - total_xp % 500, when(1)))
+
+    if rng.random() < 0.6:
+        current = int(rng.expovariate(1 / 4)) if last_seen < 2 else 0
+        rows['user_streaks'].append((
+            user_id, current, current + int(rng.expovariate(1 / 5)), clock.stamp(last_seen)[:10], rng.randint(0, 2),
+        ))
+
+    if admins and rng.random() < 0.2:
+        admin = rng.choice(admins)
+        for message in range(rng.randint(2, 8)):
+            sender, receiver = (user_id, admin) if message % 2 == 0 else (admin, user_id)
+            rows['chat_messages'].append((
+                sender, receiver, 'Could you check my answer for step 2?' if sender == user_id else 'Sure, looks good!',
+                int(rng.random() < 0.8), when(rng.random()),
+            ))
+
+
+def _flush(conn, rows):
+    for table, values in rows.items():
+        if values:
+            conn.executemany(INSERTS[table], values)
+            values.clear()
+
+
+def seed(conn, users, rng=None, admins=5, password_hash=None):
+    """
+    Append `users` synthetic users (the first `admins` of them admins) with
+    their history; commits. Returns {'admin_ids': [...], 'student_ids': range}.
+    """
+    rng = rng or random.Random(7)
+    clock = _Clock(rng)
+    if password_hash is None:
+        from services.password_hasher import hash_password
+        password_hash = hash_password(SEED_PASSWORD)
+
+    first_id = (conn.execute('SELECT MAX(id) FROM users').fetchone()[0] or 0) + 1
+    admin_ids = list(range(first_id, first_id + admins))
+    conn.executemany(INSERTS['users'], [
+        (i, f'seed{i}', f'seed{i}@example.com', password_hash, 'Admin', str(i), clock.stamp(400), clock.stamp(0), 1)
+        for i in admin_ids
+    ])
+    student_ids = range(first_id + admins, first_id + users)
+    rows = {table: [] for table in INSERTS}
+    for user_id in student_ids:
+        _student(rows, rng, clock, user_id, admin_ids, password_hash)
+        if len(rows['users']) >= BATCH_USERS:
+            _flush(conn, rows)
+    _flush(conn, rows)
+    conn.commit()
+    return {'admin_ids': admin_ids, 'student_ids': student_ids}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="fill a FARDI database with synthetic users and history")
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--admins', type=int, default=5)
+    parser.add_argument('--db', default=DEFAULT_DB_PATH)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    run_migrations(args.db)
+    started = time.perf_counter()
+    conn = sqlite3.connect(args.db)
+    try:
+        conn.execute('PRAGMA journal_mode=WAL')
+        seeded = seed(conn, args.users, random.Random(args.seed), admins=args.admins)
+        counts = {table: conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0] for table in INSERTS}
+    finally:
+        conn.close()
+    print(f"Seeded {args.users} users (ids {seeded['admin_ids'][0]}-{seeded['student_ids'][-1]}) "
+          f"into {args.db} in {time.perf_counter() - started:.1f} s; password {SEED_PASSWORD!r}")
+    for table, count in counts.items():
+        print(f"  {table:22s} {count:>10,d}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,44 @@
 """
 FastAPI dependency module - singleton instances for database access.
 Replaces Flask's module-level imports from auth_routes.
+
+Every router and service obtains SQLite connections through ``db_manager``
+so that the whole app writes to one file and shares one tuned pool.
 """
 import os
 from models.auth import DatabaseManager, User, AssessmentHistory
 
-db_path = os.environ.get("FARDI_DB_PATH", "fardi.db")
+
+def resolve_db_path():
+    """Single source of truth for the database location.
+
+    ``FARDI_DB_PATH`` wins (set by main.py / Electron); otherwise fall back to
+    ``FARDI_DATA_DIR``/fardi.db, and finally to backend/fardi.db next to this
+    module rather than whatever the current working directory happens to be.
+    """
+    explicit = os.environ.get("FARDI_DB_PATH")
+    if explicit:
+        return explicit
+    data_dir = os.environ.get("FARDI_DATA_DIR", os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(data_dir, "fardi.db")
+
+
+db_path = resolve_db_path()
 
 db_manager = DatabaseManager(db_path=db_path)
 user_manager = User(db_manager)
 assessment_history = AssessmentHistory(db_manager)
+
+
+def get_db():
+    """FastAPI dependency yielding a pooled connection, returned to the pool after the request"""
+    conn = db_manager.get_connection()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def get_db_manager():
+    """FastAPI dependency returning the shared DatabaseManager"""
+    return db_manager
@@ -17,7 +17,22 @@ os.environ.setdefault("FARDI_DB_PATH", os.path.join(_data_dir, "fardi.db"))
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="FARDI API", version="1.0.0")
+from contextlib import asynccontextmanager
+from services.startup import start_warm_up, wait_until_ready, is_ready
+from services.analytics_rollup import start_rollup_refresher
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Lazy startup (FARDI_LAZY_STARTUP): table creation, data files and heavy
+    # client libraries load in a background warm-up once the server is up
+    start_warm_up()
+    # Admin analytics rollups, refreshed in the background once warm-up is done
+    start_rollup_refresher()
+    yield
+
+
+app = FastAPI(title="FARDI API", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -27,6 +42,61 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Label LLM cache hit/miss counters with the route that triggered the call
+from services.llm_cache import llm_call_site
+
+
+@app.middleware("http")
+async def tag_llm_call_site(request, call_next):
+    token = llm_call_site.set(request.url.path)
+    try:
+        return await call_next(request)
+    finally:
+        llm_call_site.reset(token)
+
+
+# Coalesce game_sessions updates made during a request into one write at the end
+from services.game_session_service import begin_session_request, end_session_request
+
+
+@app.middleware("http")
+async def flush_game_session_updates(request, call_next):
+    token = begin_session_request()
+    try:
+        return await call_next(request)
+    finally:
+        end_session_request(token)
+
+
+# Until warm-up has finished only the health check and static files are answered
+@app.middleware("http")
+async def hold_until_warm(request, call_next):
+    if not is_ready() and request.url.path != "/api/health" and not request.url.path.startswith("/static/"):
+        await wait_until_ready()
+    return await call_next(request)
+
+
+# Per-route latency, SQL and LLM/TTS time, served by /api/admin/metrics
+import time
+from services.request_metrics import begin_request, end_request
+
+
+@app.middleware("http")
+async def record_request_metrics(request, call_next):
+    token = begin_request()
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by route template so /api/x/{id} is one series, not one per id
+        route = request.scope.get("route")
+        path = getattr(route, "path", None) or ("/static" if request.url.path.startswith("/static/") else "<unmatched>")
+        end_request(token, f"{request.method} {path}", status, time.perf_counter() - started)
+
+
 # --- Register routers ---
 from routers.auth import router as auth_router
 from routers.admin import router as admin_router
@@ -62,7 +132,19 @@ app.mount("/static", StaticFiles(directory=os.path.join(_base, "static")), name=
 
 @app.get("/api/health")
 def health_check():
-    return {"status": "ok"}
+    from dependencies import db_manager
+    from services.circuit_breaker import breaker_states
+    from services.game_session_service import session_cache_stats
+    from auth_utils import token_cache
+    from services.startup import startup_state
+    return {
+        "status": "ok",
+        "db_pool": db_manager.pool_stats(),
+        "upstreams": breaker_states(),
+        "game_session_cache": session_cache_stats(),
+        "auth_tokens": token_cache.stats(),
+        "startup": startup_state(),
+    }
 
 
 # /start-game must be at root level (not /api/start-game) because frontend calls it directly
@@ -0,0 +1,118 @@
+"""
+One-shot migration of game_sessions JSON blobs into game_session_items.
+
+Every Phase 1/2 answer used to live inside JSON text columns on
+game_sessions, rewritten in full on each submit. Each list entry / dict key
+now gets its own (user_id, kind, key) row. Rows already migrated are flagged
+with game_sessions.items_migrated, so the migration is safe to re-run; the
+old columns are reset to their empty defaults once copied.
+
+    python migrations/game_session_items.py [db_path]
+"""
+
+import os
+import sys
+import json
+import sqlite3
+
+# Same resolution as dependencies.resolve_db_path(), usable without the app on sys.path
+# (FARDI_DB_PATH, else FARDI_DATA_DIR/fardi.db, else backend/fardi.db)
+DEFAULT_DB_PATH = os.environ.get('FARDI_DB_PATH') or os.path.join(
+    os.environ.get('FARDI_DATA_DIR', os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'fardi.db'
+)
+
+# JSON columns on game_sessions and the container type each one holds
+SESSION_ITEM_KINDS = {
+    'responses': list,
+    'assessments': list,
+    'phase2_responses': dict,
+    'phase2_assessments': dict,
+    'phase2_remedial_responses': dict,
+    'phase2_level_completed': dict,
+    'phase2_current_level': dict,
+    'phase2_level_progress': dict,
+    'remedial_completed': dict,
+}
+
+
+def item_key(key, container):
+    """List positions are zero-padded so keys sort (and MAX() seeks) in list order"""
+    return f"{key:06d}" if container is list else str(key)
+
+
+def session_items_query(user_id, kind, keys=None):
+    """(SQL, params) game_session_service.load_session_items runs; keys are already item_key()ed"""
+    query = 'SELECT key, value FROM game_session_items WHERE user_id = ? AND kind = ?'
+    params = [user_id, kind]
+    if keys is not None:
+        query += f" AND key IN ({', '.join('?' for _ in keys)})"
+        params.extend(keys)
+    return query + ' ORDER BY key', params
+
+
+def create_game_session_items_table(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS game_session_items (
+            user_id INTEGER NOT NULL,
+            kind TEXT NOT NULL,
+            key TEXT NOT NULL,
+            value TEXT NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (user_id, kind, key),
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        ) WITHOUT ROWID
+    ''')
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(game_sessions)')]
+    if 'items_migrated' not in columns:
+        try:
+            conn.execute('ALTER TABLE game_sessions ADD COLUMN items_migrated INTEGER DEFAULT 0')
+        except sqlite3.OperationalError:
+            pass  # another worker added it first
+
+
+def _parse(blob, container):
+    if not blob:
+        return container()
+    try:
+        value = json.loads(blob)
+    except (TypeError, ValueError):
+        return container()
+    return value if isinstance(value, container) else container()
+
+
+def migrate_game_session_blobs(conn):
+    """Copy un-migrated blobs into game_session_items; returns the number of sessions moved. Does not commit."""
+    kinds = list(SESSION_ITEM_KINDS)
+    rows = conn.execute(
+        f"SELECT user_id, {', '.join(kinds)} FROM game_sessions WHERE COALESCE(items_migrated, 0) = 0"
+    ).fetchall()
+
+    reset = ', '.join(f"{kind} = '{'[]' if SESSION_ITEM_KINDS[kind] is list else '{}'}'" for kind in kinds)
+    for row in rows:
+        user_id = row[0]
+        items = []
+        for offset, kind in enumerate(kinds, start=1):
+            container = SESSION_ITEM_KINDS[kind]
+            value = _parse(row[offset], container)
+            pairs = enumerate(value) if container is list else value.items()
+            items.extend((user_id, kind, item_key(key, container), json.dumps(item)) for key, item in pairs)
+        # OR IGNORE: an item written by new code wins over the stale blob copy
+        conn.executemany(
+            'INSERT OR IGNORE INTO game_session_items (user_id, kind, key, value) VALUES (?, ?, ?, ?)',
+            items
+        )
+        conn.execute(f'UPDATE game_sessions SET items_migrated = 1, {reset} WHERE user_id = ?', (user_id,))
+    return len(rows)
+
+
+if __name__ == '__main__':
+    db_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DB_PATH
+    conn = sqlite3.connect(db_path)
+    try:
+        create_game_session_items_table(conn)
+        moved = migrate_game_session_blobs(conn)
+        conn.commit()
+        print(f"✅ Migrated {moved} game sessions into game_session_items")
+    finally:
+        conn.close()
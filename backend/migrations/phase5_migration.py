@@ -3,147 +3,190 @@ Database Migration Script for Phase 5 Advanced Features
 Creates tables for power-ups, collectibles, avatar customization, and adaptive learning
 """
 
+import os
 import sqlite3
 from datetime import datetime
 
-def migrate_phase5(db_path='instance/fardi.db'):
+# Same resolution as dependencies.resolve_db_path(), usable without the app on sys.path
+# (FARDI_DB_PATH, else FARDI_DATA_DIR/fardi.db, else backend/fardi.db)
+DEFAULT_DB_PATH = os.environ.get('FARDI_DB_PATH') or os.path.join(
+    os.environ.get('FARDI_DATA_DIR', os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'fardi.db'
+)
+
+def upgrade_gamification_tables(cursor):
+    """
+    add_gamification_tables.sql created user_powerups/user_collectibles with an
+    earlier column layout; rebuild them in the Phase 5 layout, keeping rows.
+    """
+    columns = [row[1] for row in cursor.execute("PRAGMA table_info(user_powerups)")]
+    if 'powerup_id' in columns:
+        cursor.execute('ALTER TABLE user_powerups RENAME TO user_powerups_old')
+        cursor.execute('DROP INDEX IF EXISTS idx_user_powerups_user')
+        create_phase5_tables(cursor)
+        cursor.execute('''
+            INSERT OR IGNORE INTO user_powerups (id, user_id, powerup_type, quantity, updated_at)
+            SELECT id, user_id, powerup_id, quantity, last_updated FROM user_powerups_old
+        ''')
+        cursor.execute('DROP TABLE user_powerups_old')
+
+    columns = [row[1] for row in cursor.execute("PRAGMA table_info(user_collectibles)")]
+    if columns and 'quantity' not in columns:
+        cursor.execute('ALTER TABLE user_collectibles RENAME TO user_collectibles_old')
+        cursor.execute('DROP INDEX IF EXISTS idx_user_collectibles_user')
+        create_phase5_tables(cursor)
+        cursor.execute('''
+            INSERT OR IGNORE INTO user_collectibles (id, user_id, collectible_id, acquired_at)
+            SELECT id, user_id, collectible_id, collected_at FROM user_collectibles_old
+        ''')
+        cursor.execute('DROP TABLE user_collectibles_old')
+
+
+def create_phase5_tables(cursor):
+    """Phase 5 tables and indexes (idempotent, does not commit)"""
+    # 1. Power-Ups Tables
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS user_powerups (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            powerup_type VARCHAR(50) NOT NULL,
+            quantity INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id),
+            UNIQUE(user_id, powerup_type)
+        )
+    ''')
+    
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS powerup_usage (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            powerup_type VARCHAR(50) NOT NULL,
+            activity_id VARCHAR(100),
+            used_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            effect_data TEXT,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    ''')
+    
+    # 2. Collectibles Tables
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS collectibles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            collectible_id VARCHAR(50) UNIQUE NOT NULL,
+            name VARCHAR(100) NOT NULL,
+            description TEXT,
+            rarity VARCHAR(20) NOT NULL,
+            icon VARCHAR(100),
+            category VARCHAR(50),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS user_collectibles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            collectible_id VARCHAR(50) NOT NULL,
+            acquired_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            quantity INTEGER DEFAULT 1,
+            FOREIGN KEY (user_id) REFERENCES users(id),
+            FOREIGN KEY (collectible_id) REFERENCES collectibles(collectible_id),
+            UNIQUE(user_id, collectible_id)
+        )
+    ''')
+    
+    # 3. Avatar Customization Tables
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS avatar_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            item_id VARCHAR(50) UNIQUE NOT NULL,
+            name VARCHAR(100) NOT NULL,
+            category VARCHAR(50) NOT NULL,
+            cost INTEGER NOT NULL,
+            icon VARCHAR(100),
+            description TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS user_avatar (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER UNIQUE NOT NULL,
+            outfit_id VARCHAR(50),
+            accessory_id VARCHAR(50),
+            background_id VARCHAR(50),
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    ''')
+    
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS user_avatar_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            item_id VARCHAR(50) NOT NULL,
+            purchased_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id),
+            FOREIGN KEY (item_id) REFERENCES avatar_items(item_id),
+            UNIQUE(user_id, item_id)
+        )
+    ''')
+    
+    # 4. Adaptive Learning Tables
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS performance_tracking (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            activity_id VARCHAR(100) NOT NULL,
+            activity_type VARCHAR(50),
+            success_rate FLOAT,
+            attempts INTEGER DEFAULT 1,
+            last_attempt TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            mastery_level FLOAT DEFAULT 0.0,
+            difficulty_level VARCHAR(20),
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    ''')
+    
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS spaced_repetition (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            activity_id VARCHAR(100) NOT NULL,
+            next_review_date DATE,
+            review_count INTEGER DEFAULT 0,
+            ease_factor FLOAT DEFAULT 2.5,
+            interval_days INTEGER DEFAULT 1,
+            FOREIGN KEY (user_id) REFERENCES users(id),
+            UNIQUE(user_id, activity_id)
+        )
+    ''')
+    
+    # Create indexes for performance
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_user_powerups_user ON user_powerups(user_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_user_collectibles_user ON user_collectibles(user_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_performance_user ON performance_tracking(user_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_powerup_usage_user ON powerup_usage(user_id)')
+
+
+def migrate_phase5(db_path=DEFAULT_DB_PATH):
     """Run Phase 5 database migrations"""
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     
     try:
-        # 1. Power-Ups Tables
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS user_powerups (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                powerup_type VARCHAR(50) NOT NULL,
-                quantity INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(id),
-                UNIQUE(user_id, powerup_type)
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS powerup_usage (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                powerup_type VARCHAR(50) NOT NULL,
-                activity_id VARCHAR(100),
-                used_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                effect_data TEXT,
-                FOREIGN KEY (user_id) REFERENCES users(id)
-            )
-        ''')
-        
-        # 2. Collectibles Tables
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS collectibles (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                collectible_id VARCHAR(50) UNIQUE NOT NULL,
-                name VARCHAR(100) NOT NULL,
-                description TEXT,
-                rarity VARCHAR(20) NOT NULL,
-                icon VARCHAR(100),
-                category VARCHAR(50),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS user_collectibles (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                collectible_id VARCHAR(50) NOT NULL,
-                acquired_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                quantity INTEGER DEFAULT 1,
-                FOREIGN KEY (user_id) REFERENCES users(id),
-                FOREIGN KEY (collectible_id) REFERENCES collectibles(collectible_id),
-                UNIQUE(user_id, collectible_id)
-            )
-        ''')
-        
-        # 3. Avatar Customization Tables
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS avatar_items (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                item_id VARCHAR(50) UNIQUE NOT NULL,
-                name VARCHAR(100) NOT NULL,
-                category VARCHAR(50) NOT NULL,
-                cost INTEGER NOT NULL,
-                icon VARCHAR(100),
-                description TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS user_avatar (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER UNIQUE NOT NULL,
-                outfit_id VARCHAR(50),
-                accessory_id VARCHAR(50),
-                background_id VARCHAR(50),
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(id)
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS user_avatar_items (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                item_id VARCHAR(50) NOT NULL,
-                purchased_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(id),
-                FOREIGN KEY (item_id) REFERENCES avatar_items(item_id),
-                UNIQUE(user_id, item_id)
-            )
-        ''')
-        
-        # 4. Adaptive Learning Tables
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS performance_tracking (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                activity_id VARCHAR(100) NOT NULL,
-                activity_type VARCHAR(50),
-                success_rate FLOAT,
-                attempts INTEGER DEFAULT 1,
-                last_attempt TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                mastery_level FLOAT DEFAULT 0.0,
-                difficulty_level VARCHAR(20),
-                FOREIGN KEY (user_id) REFERENCES users(id)
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS spaced_repetition (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                activity_id VARCHAR(100) NOT NULL,
-                next_review_date DATE,
-                review_count INTEGER DEFAULT 0,
-                ease_factor FLOAT DEFAULT 2.5,
-                interval_days INTEGER DEFAULT 1,
-                FOREIGN KEY (user_id) REFERENCES users(id),
-                UNIQUE(user_id, activity_id)
-            )
-        ''')
-        
-        # Create indexes for performance
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_user_powerups_user ON user_powerups(user_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_user_collectibles_user ON user_collectibles(user_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_performance_user ON performance_tracking(user_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_powerup_usage_user ON powerup_usage(user_id)')
-        
+        upgrade_gamification_tables(cursor)
+        create_phase5_tables(cursor)
         conn.commit()
         print("✅ Phase 5 database migration completed successfully")
         
         # Seed initial data
-        seed_phase5_data(cursor, conn)
+        seed_phase5_data(cursor)
+        conn.commit()
+        print("✅ Seeded collectibles and avatar items")
         
         return True
         
@@ -155,8 +198,8 @@ def migrate_phase5(db_path='instance/fardi.db'):
         conn.close()
 
 
-def seed_phase5_data(cursor, conn):
-    """Seed initial collectibles and avatar items"""
+def seed_phase5_data(cursor):
+    """Seed initial collectibles and avatar items (INSERT OR IGNORE, does not commit)"""
     
     # Seed Collectibles
     collectibles_data = [
@@ -194,9 +237,6 @@ def seed_phase5_data(cursor, conn):
             INSERT OR IGNORE INTO avatar_items (item_id, name, category, cost, icon, description)
             VALUES (?, ?, ?, ?, ?, ?)
         ''', item)
-    
-    conn.commit()
-    print("✅ Seeded collectibles and avatar items")
 
 
 if __name__ == '__main__':
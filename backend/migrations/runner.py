@@ -0,0 +1,372 @@
+"""
+Versioned schema migrations.
+
+Every table the app uses is created by exactly one numbered migration below.
+Applied versions are recorded in `schema_version`; DatabaseManager calls
+migrate() when a process starts, and when the database is already current
+that is a single read (no DDL, no write lock). Otherwise the first worker
+takes the write lock with BEGIN IMMEDIATE, re-checks the version and applies
+what is pending in one transaction; workers starting at the same time wait
+for that lock and then find nothing left to do.
+
+Migrations must be idempotent (CREATE ... IF NOT EXISTS, guarded ALTERs):
+databases created before this runner already contain most of the schema
+and start from version 0. New schema changes go at the end as a new version;
+never edit one that has shipped.
+
+    python migrations/runner.py [db_path]            apply pending migrations
+    python migrations/runner.py [db_path] --status   list applied versions
+"""
+import os
+import sys
+import time
+import sqlite3
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Same resolution as dependencies.resolve_db_path(), usable without the app on sys.path
+# (FARDI_DB_PATH, else FARDI_DATA_DIR/fardi.db, else backend/fardi.db)
+DEFAULT_DB_PATH = os.environ.get('FARDI_DB_PATH') or os.path.join(
+    os.environ.get('FARDI_DATA_DIR', os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'fardi.db'
+)
+GAMIFICATION_SQL = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'add_gamification_tables.sql')
+
+# How long a starting worker waits for another one that is mid-migration
+MIGRATION_LOCK_TIMEOUT = float(os.getenv('FARDI_MIGRATION_LOCK_TIMEOUT', 120))
+
+
+def _core_tables(conn):
+    from models.auth import DatabaseManager
+    DatabaseManager.create_core_tables(conn)
+
+
+def _game_sessions(conn):
+    from migrations.game_session_items import create_game_session_items_table, migrate_game_session_blobs
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS game_sessions (
+            user_id INTEGER PRIMARY KEY,
+            current_step INTEGER DEFAULT 0,
+            responses TEXT DEFAULT '[]',
+            assessments TEXT DEFAULT '[]',
+            xp INTEGER DEFAULT 0,
+            start_time TEXT,
+            player_name TEXT,
+            phase1_completed BOOLEAN DEFAULT 0,
+            overall_level TEXT,
+            phase2_session_id TEXT,
+            phase2_responses TEXT DEFAULT '{}',
+            phase2_assessments TEXT DEFAULT '{}',
+            phase2_remedial_responses TEXT DEFAULT '{}',
+            phase2_level_completed TEXT DEFAULT '{}',
+            phase2_current_level TEXT DEFAULT '{}',
+            phase2_level_progress TEXT DEFAULT '{}',
+            remedial_completed TEXT DEFAULT '{}',
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            items_migrated INTEGER DEFAULT 0,
+            version INTEGER DEFAULT 0,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    ''')
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(game_sessions)')]
+    if 'version' not in columns:
+        conn.execute('ALTER TABLE game_sessions ADD COLUMN version INTEGER DEFAULT 0')
+    create_game_session_items_table(conn)
+    moved = migrate_game_session_blobs(conn)
+    if moved:
+        logger.info(f"Moved {moved} game sessions from JSON blobs to game_session_items")
+
+
+def _chat_messages(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS chat_messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sender_id INTEGER NOT NULL,
+            receiver_id INTEGER NOT NULL,
+            message TEXT NOT NULL,
+            is_read INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (sender_id) REFERENCES users(id),
+            FOREIGN KEY (receiver_id) REFERENCES users(id)
+        )
+    ''')
+
+
+def _gamification_tables(conn):
+    # Statement by statement: executescript() would commit the open transaction
+    with open(GAMIFICATION_SQL, encoding='utf-8') as f:
+        statement = ''
+        for line in f:
+            if not statement and (not line.strip() or line.lstrip().startswith('--')):
+                continue
+            statement += line
+            if sqlite3.complete_statement(statement):
+                conn.execute(statement)
+                statement = ''
+
+
+def _phase5_tables(conn):
+    from migrations.phase5_migration import create_phase5_tables, seed_phase5_data, upgrade_gamification_tables
+
+    upgrade_gamification_tables(conn)
+    create_phase5_tables(conn)
+    seed_phase5_data(conn)
+
+
+def _llm_cache(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS llm_cache (
+            cache_key TEXT PRIMARY KEY,
+            model TEXT,
+            response TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            expires_at REAL NOT NULL,
+            last_used REAL NOT NULL,
+            hits INTEGER DEFAULT 0
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_llm_cache_expires ON llm_cache(expires_at)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache(last_used)')
+
+
+def _ai_detection_cache(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS ai_detection_cache (
+            text_hash TEXT NOT NULL,
+            source TEXT NOT NULL,
+            simhash INTEGER,
+            band0 INTEGER, band1 INTEGER, band2 INTEGER, band3 INTEGER,
+            band4 INTEGER, band5 INTEGER, band6 INTEGER, band7 INTEGER,
+            text_length INTEGER,
+            is_ai INTEGER NOT NULL,
+            score REAL NOT NULL,
+            reasons TEXT,
+            created_at REAL NOT NULL,
+            expires_at REAL NOT NULL,
+            last_used REAL NOT NULL,
+            hits INTEGER DEFAULT 0,
+            PRIMARY KEY (text_hash, source)
+        )
+    ''')
+    for i in range(8):
+        conn.execute(f'CREATE INDEX IF NOT EXISTS idx_ai_detection_band{i} ON ai_detection_cache(band{i}, source)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_ai_detection_last_used ON ai_detection_cache(last_used)')
+
+
+# Found by benchmarks/query_plan_audit.py: per-user lookups that scanned the whole table
+HOT_PATH_INDEXES = [
+    ('idx_xp_history_user_reason', 'xp_history(user_id, reason)'),
+    ('idx_user_streaks_leaderboard', 'user_streaks(current_streak DESC, longest_streak DESC, user_id)'),
+    ('idx_chat_messages_pair', 'chat_messages(sender_id, receiver_id, created_at)'),
+    ('idx_chat_messages_unread', 'chat_messages(receiver_id, is_read)'),
+    ('idx_users_admins', 'users(id) WHERE is_admin = 1'),
+    ('idx_assessment_results_user', 'assessment_results(user_id, completed_at)'),
+    ('idx_phase2_progress_user', 'phase2_progress(user_id, session_id, step_id)'),
+    ('idx_phase2_responses_user', 'phase2_responses(user_id, submitted_at)'),
+    ('idx_phase2_remedial_user', 'phase2_remedial(user_id, submitted_at)'),
+]
+
+
+def _hot_path_indexes(conn):
+    for name, target in HOT_PATH_INDEXES:
+        conn.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {target}')
+
+
+# Keyset pagination of /api/admin/students (AssessmentHistory.USER_SORT_KEYS);
+# the expressions must match the ORDER BY for the planner to use them
+def _admin_user_sort_indexes(conn):
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_users_created_at ON users(COALESCE(created_at, ''), id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_users_last_login ON users(COALESCE(last_login, ''), id)")
+
+
+# /api/admin/ai-evaluations feed (AssessmentHistory.get_ai_evaluations_page): newest
+# first overall or per step / CEFR level; the per-user feed uses idx_phase2_responses_user
+def _ai_evaluation_feed_indexes(conn):
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_phase2_responses_time ON phase2_responses(submitted_at)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_phase2_responses_step ON phase2_responses(step_id, submitted_at)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_phase2_responses_level ON phase2_responses(cefr_level, submitted_at)')
+
+
+# Admin analytics rollups (services/analytics_rollup.py), plus the time
+# indexes its incremental refresh uses to find what changed since the last run
+def _analytics_rollups(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS analytics_daily (
+            day TEXT PRIMARY KEY,
+            active_users INTEGER DEFAULT 0,
+            new_users INTEGER DEFAULT 0,
+            assessments INTEGER DEFAULT 0,
+            computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS analytics_cohorts (
+            cohort TEXT PRIMARY KEY, -- signup month, YYYY-MM ('unknown' without created_at)
+            accounts INTEGER DEFAULT 0, -- including admins
+            users INTEGER DEFAULT 0, -- students only, as are the counts below
+            phase1_completed INTEGER DEFAULT 0,
+            phase2_started INTEGER DEFAULT 0,
+            phase2_completed INTEGER DEFAULT 0,
+            phase3_completed INTEGER DEFAULT 0,
+            phase4_completed INTEGER DEFAULT 0,
+            phase5_completed INTEGER DEFAULT 0,
+            phase6_completed INTEGER DEFAULT 0,
+            cefr_levels TEXT DEFAULT '{}', -- JSON: {level: users whose latest assessment is at it}
+            computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS analytics_snapshot (
+            name TEXT PRIMARY KEY,
+            payload TEXT NOT NULL, -- JSON
+            computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_assessment_results_time ON assessment_results(completed_at)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_phase2_progress_activity ON phase2_progress(last_activity)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_phase5_progress_updated ON phase5_progress(updated_at)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_phase6_progress_updated ON phase6_progress(updated_at)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_user_phase_completion_updated ON user_phase_completion(updated_at)')
+
+
+# Admin user search (User.search_filter): a trigram FTS5 index over the four
+# searched columns, so '%term%' lookups are index probes rather than a scan of
+# users. External content, kept in sync by triggers; the update trigger only
+# fires for those columns, not on every login. SQLite builds without FTS5 or
+# the trigram tokenizer (< 3.34) skip it and search falls back to LIKE.
+USER_SEARCH_COLUMNS = ('username', 'email', 'first_name', 'last_name')
+
+
+def _user_search_index(conn):
+    columns = ', '.join(USER_SEARCH_COLUMNS)
+    old = ', '.join(f'old.{column}' for column in USER_SEARCH_COLUMNS)
+    new = ', '.join(f'new.{column}' for column in USER_SEARCH_COLUMNS)
+    try:
+        conn.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS users_search USING fts5(
+                {columns}, content='users', content_rowid='id', tokenize='trigram'
+            )
+        ''')
+    except sqlite3.OperationalError as e:
+        logger.warning(f"User search index unavailable, admin search will use LIKE: {e}")
+        return
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS users_search_insert AFTER INSERT ON users BEGIN
+            INSERT INTO users_search (rowid, {columns}) VALUES (new.id, {new});
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS users_search_delete AFTER DELETE ON users BEGIN
+            INSERT INTO users_search (users_search, rowid, {columns}) VALUES ('delete', old.id, {old});
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS users_search_update AFTER UPDATE OF {columns} ON users BEGIN
+            INSERT INTO users_search (users_search, rowid, {columns}) VALUES ('delete', old.id, {old});
+            INSERT INTO users_search (rowid, {columns}) VALUES (new.id, {new});
+        END
+    ''')
+    conn.execute("INSERT INTO users_search (users_search) VALUES ('rebuild')")
+
+
+# (version, name, step) - append only
+MIGRATIONS = [
+    (1, 'core_tables', _core_tables),
+    (2, 'game_sessions', _game_sessions),
+    (3, 'chat_messages', _chat_messages),
+    (4, 'gamification_tables', _gamification_tables),
+    (5, 'phase5_tables', _phase5_tables),
+    (6, 'llm_cache', _llm_cache),
+    (7, 'ai_detection_cache', _ai_detection_cache),
+    (8, 'hot_path_indexes', _hot_path_indexes),
+    (9, 'admin_user_sort_indexes', _admin_user_sort_indexes),
+    (10, 'ai_evaluation_feed_indexes', _ai_evaluation_feed_indexes),
+    (11, 'analytics_rollups', _analytics_rollups),
+    (12, 'user_search_index', _user_search_index),
+]
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(conn):
+    try:
+        row = conn.execute('SELECT MAX(version) FROM schema_version').fetchone()
+    except sqlite3.OperationalError:
+        return 0  # no schema_version table yet
+    return row[0] or 0
+
+
+def _begin_immediate(conn):
+    deadline = time.monotonic() + MIGRATION_LOCK_TIMEOUT
+    while True:
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            return
+        except sqlite3.OperationalError as e:
+            # busy_timeout already waited; keep waiting while another worker migrates
+            if 'locked' not in str(e) or time.monotonic() > deadline:
+                raise
+
+
+def migrate(conn):
+    """Apply pending migrations; returns the names applied (empty when already current)"""
+    if current_version(conn) >= LATEST_VERSION:
+        return []
+
+    _begin_immediate(conn)
+    try:
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                duration_ms REAL
+            )
+        ''')
+        done = current_version(conn)
+        applied = []
+        for version, name, step in MIGRATIONS:
+            if version <= done:
+                continue
+            started = time.perf_counter()
+            step(conn)
+            conn.execute(
+                'INSERT INTO schema_version (version, name, duration_ms) VALUES (?, ?, ?)',
+                (version, name, round((time.perf_counter() - started) * 1000, 2))
+            )
+            applied.append(f"{version}:{name}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return applied
+
+
+def run_migrations(db_path=DEFAULT_DB_PATH):
+    """Migrate the database at db_path with a plain connection (for scripts)"""
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        return migrate(conn)
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    db_path = args[0] if args else DEFAULT_DB_PATH
+    if '--status' in sys.argv:
+        conn = sqlite3.connect(db_path)
+        try:
+            rows = conn.execute('SELECT version, name, applied_at, duration_ms FROM schema_version ORDER BY version').fetchall()
+        except sqlite3.OperationalError:
+            rows = []
+        finally:
+            conn.close()
+        for version, name, applied_at, duration_ms in rows:
+            print(f"{version:3d}  {name:22s} {applied_at}  {duration_ms} ms")
+        print(f"schema version {rows[-1][0] if rows else 0} of {LATEST_VERSION}")
+    else:
+        applied = run_migrations(db_path)
+        print(f"✅ Applied {', '.join(applied)}" if applied else "✅ Schema already up to date")
@@ -1,28 +1,351 @@
 """
 User authentication models and database operations
 """
+import os
 import sqlite3
-import hashlib
 import secrets
+import gc
+import itertools
+import threading
+import time
+import weakref
+from collections import deque
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 import logging
 
+from services import password_hasher
+from services.request_metrics import current_request_stats
+
 logger = logging.getLogger(__name__)
 
+
+class TimedCursor(sqlite3.Cursor):
+    """Cursor that charges each statement and its run time to the current request (services/request_metrics.py)"""
+
+    def execute(self, sql, parameters=()):
+        stats = current_request_stats()
+        if stats is None:
+            return super().execute(sql, parameters)
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            stats.add_sql(sql, time.perf_counter() - started)
+
+    def executemany(self, sql, seq_of_parameters):
+        stats = current_request_stats()
+        if stats is None:
+            return super().executemany(sql, seq_of_parameters)
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            stats.add_sql(sql, time.perf_counter() - started)
+
+    def executescript(self, sql_script):
+        stats = current_request_stats()
+        if stats is None:
+            return super().executescript(sql_script)
+        started = time.perf_counter()
+        try:
+            return super().executescript(sql_script)
+        finally:
+            stats.add_sql(sql_script, time.perf_counter() - started)
+
+
+class PooledConnection(sqlite3.Connection):
+    """sqlite3 connection whose close() hands it back to the owning pool"""
+    _pool = None
+    _checked_out = False
+    _lease = None
+
+    # sqlite3.Connection.execute*() create their cursor internally; route
+    # them through TimedCursor so request metrics see every statement
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.release(self)
+        else:
+            super().close()
+
+
+class ConnectionPool:
+    """
+    Bounded pool of SQLite connections.
+
+    Up to ``size`` idle connections are kept open for reuse; under bursts up to
+    ``max_overflow`` extra connections are opened and discarded on release.
+    Once both are exhausted, callers wait up to ``timeout`` seconds.
+
+    Every checkout is a lease. A connection dropped without close() frees its
+    slot when the object is finalized. sqlite3 connections always sit in a
+    reference cycle (their statement cache), so an exhausted pool runs the
+    cycle collector itself rather than waiting for the next automatic pass.
+    A lease held longer than ``lease_timeout`` seconds is recycled once the
+    pool is exhausted, so a connection that is still referenced somewhere
+    cannot starve the pool either.
+    """
+
+    def __init__(self, db_path, size=8, max_overflow=32, timeout=30.0, busy_timeout_ms=5000,
+                 lease_timeout=300.0):
+        self.db_path = db_path
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.busy_timeout_ms = busy_timeout_ms
+        self.lease_timeout = lease_timeout
+
+        self._idle = deque()
+        self._open = 0
+        self._cond = threading.Condition()
+        # lease id -> checkout time, for every connection currently checked out
+        self._leases = {}
+        self._lease_ids = itertools.count()
+        # Lease ids whose connection was finalized without release
+        self._dropped = deque()
+        self._last_collect = 0.0
+
+        # Metrics
+        self._checkouts = 0
+        self._hits = 0
+        self._misses = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._max_wait = 0.0
+        self._leaked = 0
+        self._expired = 0
+
+    def _connect(self):
+        """Open a connection and apply per-connection PRAGMAs once"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000.0,
+            check_same_thread=False,
+            factory=PooledConnection,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout_ms)}')
+        conn._pool = self
+        return conn
+
+    def acquire(self):
+        """Check out a connection, reusing an idle one when available"""
+        started = None
+        with self._cond:
+            while True:
+                if self._idle:
+                    conn = self._idle.pop()
+                    self._hits += 1
+                    break
+                if self._open < self.size + self.max_overflow:
+                    self._open += 1
+                    self._misses += 1
+                    conn = None
+                    break
+                retry_in = self._reclaim()
+                if self._open < self.size + self.max_overflow:
+                    continue
+                if started is None:
+                    started = time.perf_counter()
+                    self._waits += 1
+                remaining = self.timeout - (time.perf_counter() - started)
+                if remaining <= 0:
+                    raise sqlite3.OperationalError(
+                        f"Connection pool exhausted ({self._open} connections in use)"
+                    )
+                self._cond.wait(min(remaining, retry_in))
+
+            if started is not None:
+                waited = time.perf_counter() - started
+                self._wait_time += waited
+                self._max_wait = max(self._max_wait, waited)
+            self._checkouts += 1
+            lease_id = next(self._lease_ids)
+            self._leases[lease_id] = time.monotonic()
+
+        if conn is None:
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._cond:
+                    del self._leases[lease_id]
+                    self._open -= 1
+                    self._cond.notify()
+                raise
+        conn._checked_out = True
+        finalizer = weakref.finalize(conn, self._dropped_lease, lease_id)
+        finalizer.atexit = False
+        conn._lease = (lease_id, finalizer)
+        return conn
+
+    def release(self, conn):
+        """Return a connection to the pool; closing twice is a no-op"""
+        if not conn._checked_out:
+            return
+        conn._checked_out = False
+        lease_id, finalizer = conn._lease
+        conn._lease = None
+        finalizer.detach()
+        with self._cond:
+            recycled = self._leases.pop(lease_id, None) is None
+        if recycled:
+            # The lease timed out and its slot was already handed on
+            sqlite3.Connection.close(conn)
+            return
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = sqlite3.Row
+            reusable = True
+        except sqlite3.Error:
+            reusable = False
+
+        with self._cond:
+            if reusable and len(self._idle) < self.size:
+                self._idle.append(conn)
+                conn = None
+            else:
+                self._open -= 1
+            self._cond.notify()
+
+        if conn is not None:
+            sqlite3.Connection.close(conn)
+
+    def _dropped_lease(self, lease_id):
+        """weakref.finalize callback: a checked-out connection died without close()"""
+        # May run mid-operation on any thread; the slot is freed under the lock by _reap_dropped()
+        self._dropped.append(lease_id)
+        with self._cond:
+            self._cond.notify()
+
+    def _reap_dropped(self):
+        """Free the slots of connections finalized without release; called with the lock held"""
+        while self._dropped:
+            if self._leases.pop(self._dropped.popleft(), None) is not None:
+                self._open -= 1
+                self._leaked += 1
+
+    def _reclaim(self):
+        """
+        Free the slots of dropped and expired leases; called with the lock held.
+        Returns the seconds until it is worth trying again.
+        """
+        now = time.monotonic()
+        if not self._dropped:
+            # Finalize dropped connections: the young generations are cheap to
+            # collect every time, a full collection runs at most once a second
+            if now - self._last_collect >= 1.0:
+                self._last_collect = now
+                gc.collect()
+            else:
+                gc.collect(1)
+            now = time.monotonic()
+        self._reap_dropped()
+        retry_in = min(self.lease_timeout, max(self._last_collect + 1.0 - now, 0.0))
+        for lease_id, leased_at in list(self._leases.items()):
+            held = now - leased_at
+            if held >= self.lease_timeout:
+                # The holder's connection is closed outright when it is released
+                del self._leases[lease_id]
+                self._open -= 1
+                self._expired += 1
+            else:
+                retry_in = min(retry_in, self.lease_timeout - held)
+        return retry_in
+
+    def close_all(self):
+        """Close every idle connection (checked-out ones close on release)"""
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+            self._open -= len(idle)
+        for conn in idle:
+            sqlite3.Connection.close(conn)
+
+    def stats(self):
+        """Snapshot of pool usage counters"""
+        with self._cond:
+            self._reap_dropped()
+            return {
+                'size': self.size,
+                'max_overflow': self.max_overflow,
+                'open': self._open,
+                'idle': len(self._idle),
+                'in_use': self._open - len(self._idle),
+                'checkouts': self._checkouts,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / self._checkouts, 4) if self._checkouts else 0.0,
+                'waits': self._waits,
+                'total_wait_ms': round(self._wait_time * 1000, 2),
+                'avg_wait_ms': round(self._wait_time * 1000 / self._waits, 2) if self._waits else 0.0,
+                'max_wait_ms': round(self._max_wait * 1000, 2),
+                'leaked': self._leaked,
+                'expired': self._expired,
+            }
+
+
 class DatabaseManager:
-    def __init__(self, db_path='fardi.db'):
+    def __init__(self, db_path='fardi.db', pool_size=None, max_overflow=None, busy_timeout_ms=None):
         self.db_path = db_path
+        self.pool = ConnectionPool(
+            db_path,
+            size=pool_size if pool_size is not None else int(os.getenv('FARDI_DB_POOL_SIZE', 8)),
+            max_overflow=max_overflow if max_overflow is not None else int(os.getenv('FARDI_DB_POOL_OVERFLOW', 32)),
+            busy_timeout_ms=busy_timeout_ms if busy_timeout_ms is not None else int(os.getenv('FARDI_DB_BUSY_TIMEOUT_MS', 5000)),
+            lease_timeout=float(os.getenv('FARDI_DB_POOL_LEASE_TIMEOUT', 300)),
+        )
         self.init_database()
-    
+
     def get_connection(self):
-        """Get database connection with row factory"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
-    
+        """Get a pooled database connection with row factory; close() returns it to the pool"""
+        return self.pool.acquire()
+
+    @contextmanager
+    def connection(self):
+        """Context manager yielding a pooled connection; commits on success, rolls back on error"""
+        conn = self.pool.acquire()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def pool_stats(self):
+        """Connection pool metrics (hit rate, wait time, usage)"""
+        return self.pool.stats()
+
     def init_database(self):
-        """Initialize database tables"""
+        """Bring the schema up to date; a no-op read when it already is (see migrations/runner.py)"""
+        from migrations.runner import migrate
+
         conn = self.get_connection()
+        try:
+            applied = migrate(conn)
+            if applied:
+                logger.info(f"Applied schema migrations: {', '.join(applied)}")
+        finally:
+            conn.close()
+
+    @staticmethod
+    def create_core_tables(conn):
+        """Baseline schema (migration 1). Idempotent; the caller owns the transaction."""
         try:
             # Users table
             conn.execute('''
@@ -569,36 +892,31 @@ class DatabaseManager:
                     ON student_responses (user_id, phase, step, interaction, context)
             ''')
 
-            conn.commit()
-            logger.info("Database tables initialized successfully")
-
         except Exception as e:
-            conn.rollback()
             logger.error(f"Error initializing database: {str(e)}")
             raise
-        finally:
-            conn.close()
 
 class User:
+    # users_search (migration 12) indexes trigrams, so it can only answer
+    # search terms at least this long; shorter ones fall back to LIKE
+    SEARCH_INDEX_MIN_LENGTH = 3
+    # Distinct (search, role) counts kept by get_user_count(max_age=...)
+    COUNT_CACHE_SIZE = 256
+
     def __init__(self, db_manager):
         self.db = db_manager
+        self._search_index = None
+        self._count_cache = {}
     
     @staticmethod
     def hash_password(password):
-        """Hash password using SHA-256 with salt"""
-        salt = secrets.token_hex(16)
-        password_hash = hashlib.sha256((password + salt).encode()).hexdigest()
-        return f"{salt}:{password_hash}"
+        """Hash password with scrypt (see services/password_hasher.py)"""
+        return password_hasher.hash_password(password)
     
     @staticmethod
     def verify_password(password, stored_hash):
-        """Verify password against stored hash"""
-        try:
-            salt, hash_value = stored_hash.split(':')
-            password_hash = hashlib.sha256((password + salt).encode()).hexdigest()
-            return hash_value == password_hash
-        except ValueError:
-            return False
+        """Verify password against a scrypt or legacy salted SHA-256 hash"""
+        return password_hasher.verify_password(password, stored_hash)
     
     def create_user(self, username, email, password, first_name=None, last_name=None):
         """Create a new user"""
@@ -653,11 +971,18 @@ class User:
             ''', (username_or_email, username_or_email)).fetchone()
             
             if user and self.verify_password(password, user['password_hash']):
-                # Update last login
-                conn.execute(
-                    'UPDATE users SET last_login = CURRENT_TIMESTAMP WHERE id = ?',
-                    (user['id'],)
-                )
+                if password_hasher.needs_rehash(user['password_hash']):
+                    # Upgrade legacy/outdated hashes while we have the plaintext
+                    conn.execute(
+                        'UPDATE users SET password_hash = ?, last_login = CURRENT_TIMESTAMP WHERE id = ?',
+                        (self.hash_password(password), user['id'])
+                    )
+                else:
+                    # Update last login
+                    conn.execute(
+                        'UPDATE users SET last_login = CURRENT_TIMESTAMP WHERE id = ?',
+                        (user['id'],)
+                    )
                 conn.commit()
                 
                 return dict(user)
@@ -736,23 +1061,58 @@ class User:
         finally:
             conn.close()
     
-    def get_all_users(self, limit=None, offset=0, search=None, role=None):
-        """Get all users with optional filtering and pagination"""
+    def has_search_index(self, conn):
+        """Whether migration 12 could build users_search on this SQLite"""
+        if self._search_index is None:
+            self._search_index = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'users_search'"
+            ).fetchone() is not None
+        return self._search_index
+
+    def search_filter(self, conn, search, alias='u'):
+        """
+        (SQL condition, params) for users whose username, email, first or
+        last name contains search, case-insensitively. Answered from the
+        users_search trigram index when the term is long enough, so it
+        costs the matches rather than a scan of every user.
+        """
+        column = f'{alias}.' if alias else ''
+        if len(search) >= self.SEARCH_INDEX_MIN_LENGTH and self.has_search_index(conn):
+            phrase = '"' + search.replace('"', '""') + '"'
+            return f'{column}id IN (SELECT rowid FROM users_search WHERE users_search MATCH ?)', [phrase]
+        # Match the index: %, _ and \ in the term are literal characters
+        escaped = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        term = f'%{escaped}%'
+        return (
+            f"({column}username LIKE ? ESCAPE '\\' OR {column}email LIKE ? ESCAPE '\\' "
+            f"OR {column}first_name LIKE ? ESCAPE '\\' OR {column}last_name LIKE ? ESCAPE '\\')"
+        ), [term] * 4
+
+    def get_all_users(self, limit=None, offset=0, search=None, role=None, after=None):
+        """
+        Get all users with optional filtering and pagination, newest first.
+        `after` is the (created_at, id) of the last user already seen, for
+        keyset pages that cost the same however deep they are.
+        """
         conn = self.db.get_connection()
         try:
             query = "SELECT * FROM users WHERE 1=1"
             params = []
             
             if search:
-                query += " AND (username LIKE ? OR email LIKE ? OR first_name LIKE ? OR last_name LIKE ?)"
-                search_param = f"%{search}%"
-                params.extend([search_param, search_param, search_param, search_param])
+                condition, search_params = self.search_filter(conn, search, alias='')
+                query += f" AND {condition}"
+                params.extend(search_params)
             
             if role:
                 query += " AND role = ?"
                 params.append(role)
+
+            if after is not None:
+                query += " AND COALESCE(created_at, '') <= ? AND (COALESCE(created_at, '') < ? OR id < ?)"
+                params.extend([after[0], after[0], after[1]])
             
-            query += " ORDER BY created_at DESC"
+            query += " ORDER BY COALESCE(created_at, '') DESC, id DESC"
             
             if limit:
                 query += " LIMIT ? OFFSET ?"
@@ -767,24 +1127,38 @@ class User:
         finally:
             conn.close()
     
-    def get_user_count(self, search=None, role=None):
-        """Get total count of users with optional filtering"""
+    def get_user_count(self, search=None, role=None, max_age=0):
+        """
+        Get total count of users with optional filtering. With max_age, a
+        count this process worked out within that many seconds is reused,
+        so paging through a list doesn't recount it on every page.
+        """
+        key = (search or '', role or '')
+        if max_age > 0:
+            cached = self._count_cache.get(key)
+            if cached and time.monotonic() - cached[0] < max_age:
+                return cached[1]
+
         conn = self.db.get_connection()
         try:
             query = "SELECT COUNT(*) as count FROM users WHERE 1=1"
             params = []
             
             if search:
-                query += " AND (username LIKE ? OR email LIKE ? OR first_name LIKE ? OR last_name LIKE ?)"
-                search_param = f"%{search}%"
-                params.extend([search_param, search_param, search_param, search_param])
+                condition, search_params = self.search_filter(conn, search, alias='')
+                query += f" AND {condition}"
+                params.extend(search_params)
             
             if role:
                 query += " AND role = ?"
                 params.append(role)
             
             result = conn.execute(query, params).fetchone()
-            return result['count'] if result else 0
+            count = result['count'] if result else 0
+            if len(self._count_cache) >= self.COUNT_CACHE_SIZE:
+                self._count_cache.clear()
+            self._count_cache[key] = (time.monotonic(), count)
+            return count
             
         except Exception as e:
             logger.error(f"Error getting user count: {str(e)}")
@@ -1368,102 +1742,13 @@ class AssessmentHistory:
             conn.close()
     
     def get_system_statistics(self):
-        """Get comprehensive system statistics for admin dashboard"""
-        conn = self.db.get_connection()
+        """Get comprehensive system statistics for admin dashboard (from the analytics rollups)"""
+        from services.analytics_rollup import get_analytics_rollups
         try:
-            import json
-            
-            # Overall statistics
-            overall_stats = conn.execute('''
-                SELECT 
-                    COUNT(DISTINCT u.id) as total_users,
-                    COUNT(DISTINCT ar.id) as total_assessments,
-                    COUNT(DISTINCT p2p.id) as total_phase2_sessions,
-                    AVG(ar.xp_earned) as avg_xp,
-                    MAX(ar.completed_at) as last_assessment
-                FROM users u
-                LEFT JOIN assessment_results ar ON u.id = ar.user_id
-                LEFT JOIN phase2_progress p2p ON u.id = p2p.user_id
-            ''').fetchone()
-            
-            # User activity by month
-            user_activity = conn.execute('''
-                SELECT 
-                    strftime('%Y-%m', created_at) as month,
-                    COUNT(*) as new_users
-                FROM users 
-                WHERE created_at >= date('now', '-12 months')
-                GROUP BY strftime('%Y-%m', created_at)
-                ORDER BY month
-            ''').fetchall()
-            
-            # Assessment statistics
-            assessment_stats = conn.execute('''
-                SELECT 
-                    overall_level,
-                    COUNT(*) as count,
-                    AVG(xp_earned) as avg_xp,
-                    AVG(time_taken) as avg_time
-                FROM assessment_results 
-                GROUP BY overall_level
-                ORDER BY overall_level
-            ''').fetchall()
-            
-            # Phase 2 progress stats
-            phase2_stats = conn.execute('''
-                SELECT 
-                    step_id,
-                    COUNT(*) as attempts,
-                    COUNT(CASE WHEN step_completed = 1 THEN 1 END) as completions,
-                    AVG(step_score) as avg_score
-                FROM phase2_progress 
-                GROUP BY step_id
-                ORDER BY step_id
-            ''').fetchall()
-            
-            # Recent activity
-            recent_activity = conn.execute('''
-                SELECT 
-                    'assessment' as type,
-                    ar.overall_level as level,
-                    ar.completed_at as timestamp,
-                    u.username,
-                    u.first_name,
-                    ar.xp_earned as points
-                FROM assessment_results ar
-                JOIN users u ON ar.user_id = u.id
-                WHERE ar.completed_at >= date('now', '-7 days')
-                
-                UNION ALL
-                
-                SELECT 
-                    'phase2_response' as type,
-                    p2r.cefr_level as level,
-                    p2r.submitted_at as timestamp,
-                    u.username,
-                    u.first_name,
-                    p2r.points_earned as points
-                FROM phase2_responses p2r
-                JOIN users u ON p2r.user_id = u.id
-                WHERE p2r.submitted_at >= date('now', '-7 days')
-                
-                ORDER BY timestamp DESC
-                LIMIT 20
-            ''').fetchall()
-            
-            return {
-                'overall': dict(overall_stats) if overall_stats else {},
-                'user_activity': [dict(ua) for ua in user_activity] if user_activity else [],
-                'assessment_stats': [dict(astat) for astat in assessment_stats] if assessment_stats else [],
-                'phase2_stats': [dict(p2stat) for p2stat in phase2_stats] if phase2_stats else [],
-                'recent_activity': [dict(ra) for ra in recent_activity] if recent_activity else []
-            }
-            
+            return get_analytics_rollups().system_statistics()
         except Exception as e:
             logger.error(f"Error getting system statistics: {str(e)}")
             return {}
-        finally:
-            conn.close()
     
     def get_user_detailed_progress(self, user_id):
         """Get detailed progress for a specific user"""
@@ -1590,3 +1875,164 @@ class AssessmentHistory:
         finally:
             conn.close()
 
+
+    # Sort keys for get_users_progress_page -> SQL expression. Each has an index
+    # (username's UNIQUE, the others migration 9) and ties break on id
+    USER_SORT_KEYS = {
+        'created_at': "COALESCE(u.created_at, '')",
+        'last_login': "COALESCE(u.last_login, '')",
+        'username': 'u.username',
+        'id': 'u.id',
+    }
+
+    def get_users_progress_page(self, limit=100, sort='created_at', descending=True, after=None):
+        """
+        One page of users with their progress summary, in five queries
+        whatever the page size: the page itself (keyset on (sort key, id),
+        starting after the `after` pair), then one grouped query per table
+        for just those users. Returns (rows, last_key); last_key is the
+        (sort value, id) to pass as `after` for the next page, or None when
+        this was the last one.
+        """
+        sort_expr = self.USER_SORT_KEYS[sort]
+        direction, comparison = ('DESC', '<') if descending else ('ASC', '>')
+        conn = self.db.get_connection()
+        try:
+            where, params = '', []
+            if after is not None:
+                # Spelled out rather than a row value, which SQLite will not
+                # turn into an index range on the expression indexes
+                where = f'WHERE {sort_expr} {comparison}= ? AND ({sort_expr} {comparison} ? OR u.id {comparison} ?)'
+                params.extend([after[0], after[0], after[1]])
+            rows = conn.execute(f'''
+                SELECT u.id AS user_id, u.username, u.first_name, u.last_name, u.email,
+                       u.is_admin, u.created_at, u.last_login, {sort_expr} AS sort_value
+                FROM users u
+                {where}
+                ORDER BY {sort_expr} {direction}, u.id {direction}
+                LIMIT ?
+            ''', params + [limit + 1]).fetchall()
+
+            users = [dict(row) for row in rows[:limit]]
+            last_key = None
+            if len(rows) > limit:
+                last_key = [users[-1]['sort_value'], users[-1]['user_id']]
+            if not users:
+                return users, last_key
+
+            ids = [u['user_id'] for u in users]
+            marks = ','.join('?' * len(ids))
+
+            # SQLite takes the bare columns from the row holding MAX(): the latest assessment
+            phase1 = {row['user_id']: row for row in conn.execute(f'''
+                SELECT user_id, overall_level, MAX(completed_at) AS completed_at
+                FROM assessment_results
+                WHERE user_id IN ({marks})
+                GROUP BY user_id
+            ''', ids)}
+
+            # Best completed score per step, so a step redone in a new session counts once
+            phase2 = {row['user_id']: row for row in conn.execute(f'''
+                SELECT user_id, COUNT(*) AS steps_completed, SUM(best_score) AS score
+                FROM (
+                    SELECT user_id, step_id, MAX(step_score) AS best_score
+                    FROM phase2_progress
+                    WHERE user_id IN ({marks}) AND step_completed = 1
+                    GROUP BY user_id, step_id
+                )
+                GROUP BY user_id
+            ''', ids)}
+
+            remedial = {row[0]: row[1] for row in conn.execute(f'''
+                SELECT user_id, COUNT(*) FROM phase2_remedial
+                WHERE user_id IN ({marks})
+                GROUP BY user_id
+            ''', ids)}
+
+            completed = {(row[0], row[1]) for row in conn.execute(f'''
+                SELECT user_id, phase_number FROM user_phase_completion
+                WHERE user_id IN ({marks}) AND completed = 1
+            ''', ids)}
+
+            for u in users:
+                del u['sort_value']
+                uid = u['user_id']
+                p1 = phase1.get(uid)
+                p2 = phase2.get(uid)
+                u['is_admin'] = bool(u['is_admin'])
+                u['phase1_level'] = p1['overall_level'] if p1 else None
+                u['phase1_date'] = p1['completed_at'] if p1 else None
+                u['phase2_score'] = (p2['score'] or 0) if p2 else 0
+                u['phase2_steps_completed'] = p2['steps_completed'] if p2 else 0
+                u['total_remedial_activities'] = remedial.get(uid, 0)
+                for phase in (3, 4, 5, 6):
+                    u[f'phase{phase}_completed'] = (uid, phase) in completed
+            return users, last_key
+        finally:
+            conn.close()
+
+    def get_ai_evaluations_page(self, limit=100, after=None, user_id=None, step_id=None,
+                                level=None, date_from=None, date_to=None):
+        """
+        One page of AI-evaluated Phase 2 responses from non-admin users,
+        newest first. Keyset on (submitted_at, id) starting after the `after`
+        pair, so each page is an index range whatever the history size.
+        date_from/date_to are inclusive 'YYYY-MM-DD HH:MM:SS' bounds. Returns
+        (rows, last_key) like get_users_progress_page.
+        """
+        import json
+
+        conditions = ["r.assessment_data IS NOT NULL", "r.assessment_data NOT IN ('', '{}', 'null')",
+                      "COALESCE(u.is_admin, 0) = 0"]
+        params = []
+        for clause, value in (('r.user_id = ?', user_id), ('r.step_id = ?', step_id),
+                              ('r.cefr_level = ?', level), ('r.submitted_at >= ?', date_from),
+                              ('r.submitted_at <= ?', date_to)):
+            if value is not None:
+                conditions.append(clause)
+                params.append(value)
+        if after is not None:
+            conditions.append('r.submitted_at <= ? AND (r.submitted_at < ? OR r.id < ?)')
+            params.extend([after[0], after[0], after[1]])
+
+        conn = self.db.get_connection()
+        try:
+            # LEFT JOIN keeps phase2_responses the outer loop, walked in index order
+            rows = conn.execute(f'''
+                SELECT r.id, r.user_id, u.username, r.step_id, r.action_item_id,
+                       r.submitted_at, r.response_text, r.points_earned,
+                       r.assessment_data, r.cefr_level, r.ai_detected, r.ai_score
+                FROM phase2_responses r
+                LEFT JOIN users u ON u.id = r.user_id
+                WHERE {' AND '.join(conditions)}
+                ORDER BY r.submitted_at DESC, r.id DESC
+                LIMIT ?
+            ''', params + [limit + 1]).fetchall()
+        finally:
+            conn.close()
+
+        evaluations = []
+        for row in rows[:limit]:
+            try:
+                evaluation = json.loads(row['assessment_data'])
+            except (json.JSONDecodeError, TypeError):
+                evaluation = {}
+            evaluations.append({
+                'id': row['id'],
+                'user_id': row['user_id'],
+                'username': row['username'],
+                'context': 'Phase 2 Step Response',
+                'step_id': row['step_id'],
+                'action_item_id': row['action_item_id'],
+                'timestamp': row['submitted_at'],
+                'response_text': row['response_text'],
+                'score': row['points_earned'],
+                'ai_evaluation': evaluation,
+                'cefr_level': row['cefr_level'],
+                'ai_detected': bool(row['ai_detected']),
+                'ai_score': row['ai_score'],
+            })
+        last_key = None
+        if len(rows) > limit:
+            last_key = [rows[limit - 1]['submitted_at'], rows[limit - 1]['id']]
+        return evaluations, last_key
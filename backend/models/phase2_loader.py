@@ -7,6 +7,7 @@ import os
 import sys
 from pathlib import Path
 import logging
+from collections.abc import Mapping
 
 logger = logging.getLogger(__name__)
 
@@ -140,27 +141,51 @@ def convert_remedial_to_old_format():
     logger.info(f"Converted remedial activities for {len(remedial)} steps")
     return remedial
 
-# Load and convert data on module import
-try:
-    PHASE_2_STEPS = convert_steps_to_old_format()
-    PHASE_2_REMEDIAL_ACTIVITIES = convert_remedial_to_old_format()
-    
-    # Scoring constants from JSON metadata
-    PHASE_2_POINTS = {
-        'A1': 1,
-        'A2': 2,
-        'B1': 3,
-        'B2': 4
-    }
-    
-    PHASE_2_SUCCESS_THRESHOLD = 20
-    
-    logger.info("Phase 2 JSON data loaded successfully")
-    
-except Exception as e:
-    logger.error(f"Error loading Phase 2 JSON data: {e}")
-    # Provide empty defaults to prevent import errors
-    PHASE_2_STEPS = {}
-    PHASE_2_REMEDIAL_ACTIVITIES = {}
-    PHASE_2_POINTS = {'A1': 1, 'A2': 2, 'B1': 3, 'B2': 4}
-    PHASE_2_SUCCESS_THRESHOLD = 20
+class _LazyPhase2Data(Mapping):
+    """Read-only dict view that parses phase2.json on first access instead of at import"""
+
+    def __init__(self, loader):
+        self._loader = loader
+        self._data = None
+
+    def _load(self):
+        if self._data is None:
+            try:
+                self._data = self._loader()
+            except Exception as e:
+                logger.error(f"Error loading Phase 2 JSON data: {e}")
+                # Empty data rather than failing every Phase 2 request
+                self._data = {}
+        return self._data
+
+    def __getitem__(self, key):
+        return self._load()[key]
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self):
+        return len(self._load())
+
+    def __repr__(self):
+        return repr(self._load())
+
+
+PHASE_2_STEPS = _LazyPhase2Data(convert_steps_to_old_format)
+PHASE_2_REMEDIAL_ACTIVITIES = _LazyPhase2Data(convert_remedial_to_old_format)
+
+# Scoring constants from JSON metadata
+PHASE_2_POINTS = {
+    'A1': 1,
+    'A2': 2,
+    'B1': 3,
+    'B2': 4
+}
+
+PHASE_2_SUCCESS_THRESHOLD = 20
+
+
+def preload_phase2_data():
+    """Parse phase2.json now (startup warm-up) instead of on the first Phase 2 request"""
+    len(PHASE_2_STEPS)
+    len(PHASE_2_REMEDIAL_ACTIVITIES)
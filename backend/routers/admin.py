@@ -4,10 +4,15 @@ and AI evaluation monitoring — migrated from Flask to FastAPI.
 """
 import csv
 import io
+import os
+import itertools
+import json
+import zlib
+import base64
 import logging
 from datetime import datetime
 from fastapi import APIRouter, Depends, Request, HTTPException
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from dependencies import db_manager, user_manager, assessment_history
 from auth_utils import get_current_user, get_current_admin
 
@@ -19,221 +24,174 @@ router = APIRouter(tags=["admin"])
 #  Helper functions (ported from app.py module-level helpers)
 # ──────────────────────────────────────────────────────────────────
 
-def get_admin_statistics() -> dict:
-    """Get comprehensive admin statistics"""
-    try:
-        conn = db_manager.get_connection()
+MAX_PAGE_SIZE = 1000
 
-        # Overall stats (simplified to work with existing tables)
-        total_users = conn.execute(
-            'SELECT COUNT(*) as count FROM users'
-        ).fetchone()['count']
-        total_assessments = conn.execute(
-            'SELECT COUNT(*) as count FROM assessment_results'
-        ).fetchone()['count']
-        total_phase2_sessions = conn.execute(
-            'SELECT COUNT(DISTINCT user_id) as count FROM phase2_responses'
-        ).fetchone()['count']
-        avg_xp = 0  # Simplified since user_stats table doesn't exist
-
-        # Assessment stats by level (simplified)
-        assessment_stats = []  # Empty since assessments table doesn't exist
-
-        # Recent activity (simplified to show recent user registrations)
-        recent_activity = conn.execute('''
-            SELECT 'registration' as type, first_name, username, 'N/A' as level,
-                   0 as points, created_at as timestamp
-            FROM users
-            ORDER BY created_at DESC
-            LIMIT 10
-        ''').fetchall()
 
-        conn.close()
-
-        return {
-            'overall': {
-                'total_users': total_users,
-                'total_assessments': total_assessments,
-                'total_phase2_sessions': total_phase2_sessions,
-                'avg_xp': avg_xp
-            },
-            'assessment_stats': [dict(row) for row in assessment_stats],
-            'recent_activity': [dict(row) for row in recent_activity]
-        }
-    except Exception as e:
-        logger.error(f"Error getting admin statistics: {e}")
-        return {
-            'overall': {
-                'total_users': 0,
-                'total_assessments': 0,
-                'total_phase2_sessions': 0,
-                'avg_xp': 0
-            },
-            'assessment_stats': [],
-            'recent_activity': []
-        }
+def encode_cursor(key) -> str:
+    """Opaque keyset cursor for the last row of a page"""
+    return base64.urlsafe_b64encode(json.dumps(key, separators=(',', ':')).encode()).decode().rstrip('=')
 
 
-def get_users_with_stats(page=1, per_page=20, search='', role_filter=''):
-    """Get users with their stats and pagination"""
+def decode_cursor(cursor: str):
+    """Inverse of encode_cursor; raises ValueError on anything malformed"""
     try:
-        conn = db_manager.get_connection()
+        key = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(key, list):
+        raise ValueError('Invalid cursor')
+    return key
 
-        # Build query conditions
-        conditions = []
-        params = []
 
-        if search:
-            conditions.append(
-                '(u.username LIKE ? OR u.email LIKE ? '
-                'OR u.first_name LIKE ? OR u.last_name LIKE ?)'
-            )
-            search_term = f'%{search}%'
-            params.extend([search_term, search_term, search_term, search_term])
+def phase2_max_score() -> int:
+    """Phase 2 points for every action item at the top level"""
+    from models.game_data import PHASE_2_STEPS, PHASE_2_POINTS
+    items = sum(len(step.get('action_items', [])) for step in PHASE_2_STEPS.values())
+    return items * max(PHASE_2_POINTS.values())
+
+
+# Seconds a /api/admin/users total may be reused while paging (User.get_user_count)
+USER_COUNT_MAX_AGE = int(os.getenv('FARDI_USER_COUNT_MAX_AGE', 30))
+
 
+def users_with_stats_page(search='', role_filter='', limit=20, after=None, offset=0):
+    """
+    One page of users matching the admin list filters, newest first, with
+    their assessment and phase 2 stats. Keyset on (created_at, id) starting
+    after the `after` pair: the page is a range of idx_users_created_at
+    (probing users_search for a search), and the stats are two grouped
+    queries over just its users. Returns (users, last_key) like
+    AssessmentHistory.get_users_progress_page.
+    """
+    conn = db_manager.get_connection()
+    try:
+        conditions, params = [], []
+        if search:
+            condition, search_params = user_manager.search_filter(conn, search)
+            conditions.append(condition)
+            params.extend(search_params)
         if role_filter:
             conditions.append('u.role = ?')
             params.append(role_filter)
-
+        if after is not None:
+            conditions.append("COALESCE(u.created_at, '') <= ? AND (COALESCE(u.created_at, '') < ? OR u.id < ?)")
+            params.extend([after[0], after[0], after[1]])
         where_clause = ' WHERE ' + ' AND '.join(conditions) if conditions else ''
 
-        # Get total count
-        total_query = f'SELECT COUNT(*) as count FROM users u{where_clause}'
-        total = conn.execute(total_query, params).fetchone()['count']
-
-        # Calculate pagination
-        offset = (page - 1) * per_page
-
-        # Get users with real assessment stats
-        query = f'''
-            SELECT u.*, u.id as user_id,
-                   COALESCE(ar.total_assessments, 0) as total_assessments,
-                   COALESCE(ar.latest_level, 'N/A') as best_level,
-                   COALESCE(ar.total_xp, 0) as total_xp,
-                   COALESCE(p2.steps_attempted, 0) as phase2_steps_attempted,
-                   COALESCE(p2.steps_completed, 0) as phase2_steps_completed
-            FROM users u
-            LEFT JOIN (
-                SELECT ar1.user_id,
-                       COUNT(*) as total_assessments,
-                       ar2.overall_level as latest_level,
-                       SUM(ar1.xp_earned) as total_xp
-                FROM assessment_results ar1
-                LEFT JOIN (
-                    SELECT user_id, overall_level,
-                           ROW_NUMBER() OVER (
-                               PARTITION BY user_id ORDER BY completed_at DESC
-                           ) as rn
-                    FROM assessment_results
-                ) ar2 ON ar1.user_id = ar2.user_id AND ar2.rn = 1
-                GROUP BY ar1.user_id, ar2.overall_level
-            ) ar ON u.id = ar.user_id
-            LEFT JOIN (
-                SELECT user_id,
-                       COUNT(DISTINCT step_id) as steps_attempted,
-                       COUNT(DISTINCT CASE WHEN step_completed = 1
-                             THEN step_id END) as steps_completed
-                FROM phase2_progress
-                GROUP BY user_id
-            ) p2 ON u.id = p2.user_id
-            {where_clause}
-            ORDER BY u.created_at DESC
+        rows = conn.execute(f'''
+            SELECT u.*, u.id as user_id, COALESCE(u.created_at, '') AS sort_value
+            FROM users u{where_clause}
+            ORDER BY COALESCE(u.created_at, '') DESC, u.id DESC
             LIMIT ? OFFSET ?
-        '''
+        ''', params + [limit + 1, offset]).fetchall()
+
+        users = [dict(row) for row in rows[:limit]]
+        last_key = None
+        if len(rows) > limit:
+            last_key = [users[-1]['sort_value'], users[-1]['id']]
+        if not users:
+            return users, last_key
+
+        ids = [u['id'] for u in users]
+        marks = ','.join('?' * len(ids))
+
+        # SQLite takes overall_level from the row holding MAX(): the latest assessment
+        assessments = {row['user_id']: row for row in conn.execute(f'''
+            SELECT user_id, COUNT(*) AS total_assessments, SUM(xp_earned) AS total_xp,
+                   overall_level, MAX(completed_at) AS latest
+            FROM assessment_results
+            WHERE user_id IN ({marks})
+            GROUP BY user_id
+        ''', ids)}
+        phase2 = {row['user_id']: row for row in conn.execute(f'''
+            SELECT user_id,
+                   COUNT(DISTINCT step_id) AS steps_attempted,
+                   COUNT(DISTINCT CASE WHEN step_completed = 1 THEN step_id END) AS steps_completed
+            FROM phase2_progress
+            WHERE user_id IN ({marks})
+            GROUP BY user_id
+        ''', ids)}
+    finally:
+        conn.close()
 
-        params.extend([per_page, offset])
-        users = conn.execute(query, params).fetchall()
+    for u in users:
+        del u['sort_value']
+        u.pop('password_hash', None)
+        ar = assessments.get(u['id'])
+        p2 = phase2.get(u['id'])
+        u['total_assessments'] = ar['total_assessments'] if ar else 0
+        u['best_level'] = (ar['overall_level'] or 'N/A') if ar else 'N/A'
+        u['total_xp'] = (ar['total_xp'] or 0) if ar else 0
+        u['phase2_steps_attempted'] = p2['steps_attempted'] if p2 else 0
+        u['phase2_steps_completed'] = p2['steps_completed'] if p2 else 0
+    return users, last_key
 
-        conn.close()
+
+def get_users_with_stats(page=1, per_page=20, search='', role_filter='', after=None):
+    """
+    Get users with their stats and pagination. Pass pagination['next_cursor']
+    back (decoded) as `after` to page by keyset; without it `page` is an
+    OFFSET into the users index. The total may be up to USER_COUNT_MAX_AGE
+    seconds old.
+    """
+    try:
+        offset = 0 if after is not None else (page - 1) * per_page
+        users, last_key = users_with_stats_page(
+            search=search, role_filter=role_filter, limit=per_page, after=after, offset=offset
+        )
+        total = user_manager.get_user_count(search=search, role=role_filter, max_age=USER_COUNT_MAX_AGE)
+        has_next = last_key is not None
 
         # Create pagination object
+        pages = max((total + per_page - 1) // per_page, page + 1 if has_next else page)
         pagination = {
             'page': page,
             'per_page': per_page,
             'total': total,
-            'pages': (total + per_page - 1) // per_page,
+            'pages': pages,
             'has_prev': page > 1,
-            'has_next': page * per_page < total,
+            'has_next': has_next,
             'prev_num': page - 1 if page > 1 else None,
-            'next_num': page + 1 if page * per_page < total else None
+            'next_num': page + 1 if has_next else None,
+            'next_cursor': encode_cursor(last_key) if last_key else None
         }
 
         # Add iter_pages as a list instead of function (for JSON serialization)
         iter_pages_list = list(
-            range(max(1, page - 2), min(pagination['pages'] + 1, page + 3))
+            range(max(1, page - 2), min(pages + 1, page + 3))
         )
         pagination['iter_pages'] = iter_pages_list
 
-        return [dict(row) for row in users], pagination
+        return users, pagination
 
     except Exception as e:
         logger.error(f"Error getting users with stats: {e}")
         return [], {
             'page': 1, 'pages': 1, 'total': 0,
-            'has_prev': False, 'has_next': False
+            'has_prev': False, 'has_next': False, 'next_cursor': None
         }
 
 
-def get_new_users_count(period='month') -> int:
-    """Get count of new users in specified period"""
-    try:
-        conn = db_manager.get_connection()
-
-        if period == 'month':
-            date_filter = "DATE(created_at) >= DATE('now', '-30 days')"
-        elif period == 'week':
-            date_filter = "DATE(created_at) >= DATE('now', '-7 days')"
-        else:  # today
-            date_filter = "DATE(created_at) = DATE('now')"
-
-        count = conn.execute(
-            f'SELECT COUNT(*) as count FROM users WHERE {date_filter}'
-        ).fetchone()['count']
-        conn.close()
-        return count
-    except Exception as e:
-        logger.error(f"Error getting new users count: {e}")
-        return 0
-
-
-def get_assessments_count(period='week') -> int:
-    """Get count of assessments in specified period"""
-    try:
-        conn = db_manager.get_connection()
-
-        if period == 'week':
-            date_filter = "DATE(completed_at) >= DATE('now', '-7 days')"
-        else:  # today
-            date_filter = "DATE(completed_at) = DATE('now')"
-
-        count = conn.execute(
-            f'SELECT COUNT(*) as count FROM assessments WHERE {date_filter}'
-        ).fetchone()['count']
-        conn.close()
-        return count
-    except Exception as e:
-        logger.error(f"Error getting assessments count: {e}")
-        return 0
-
+# Rows per query while streaming exports
+EXPORT_CHUNK = 500
 
-def get_active_users_count(period='today') -> int:
-    """Get count of active users in specified period"""
-    try:
-        conn = db_manager.get_connection()
 
-        if period == 'today':
-            date_filter = "DATE(last_login) = DATE('now')"
-        else:  # week
-            date_filter = "DATE(last_login) >= DATE('now', '-7 days')"
-
-        count = conn.execute(
-            f'SELECT COUNT(*) as count FROM users WHERE {date_filter}'
-        ).fetchone()['count']
-        conn.close()
-        return count
-    except Exception as e:
-        logger.error(f"Error getting active users count: {e}")
-        return 0
+def iter_users_with_stats(search='', role_filter='', chunk_size=EXPORT_CHUNK):
+    """
+    Every user matching get_users_with_stats' filters, newest first, with
+    the same stats, yielded as lists of up to chunk_size dicts. Each chunk is
+    one users_with_stats_page on its own short connection checkout, so
+    memory and pool use stay flat however many users there are.
+    """
+    after = None
+    while True:
+        users, after = users_with_stats_page(
+            search=search, role_filter=role_filter, limit=chunk_size, after=after
+        )
+        if users:
+            yield users
+        if after is None:
+            return
 
 
 # ──────────────────────────────────────────────────────────────────
@@ -256,13 +214,9 @@ async def api_admin_dashboard(user: dict = Depends(get_current_admin)):
             raise HTTPException(status_code=403,
                                 detail='Access denied. Admin privileges required.')
 
-        # Get admin statistics
-        stats = get_admin_statistics()
-
-        # Get additional metrics
-        new_users_this_month = get_new_users_count('month')
-        assessments_this_week = get_assessments_count('week')
-        active_users_today = get_active_users_count('today')
+        # Served from the analytics rollups (services/analytics_rollup.py)
+        from services.analytics_rollup import get_analytics_rollups
+        rollup = get_analytics_rollups().dashboard()
 
         return {
             'success': True,
@@ -275,12 +229,7 @@ async def api_admin_dashboard(user: dict = Depends(get_current_admin)):
                     ),
                     'username': current_user['username']
                 },
-                'stats': stats,
-                'metrics': {
-                    'new_users_this_month': new_users_this_month,
-                    'assessments_this_week': assessments_this_week,
-                    'active_users_today': active_users_today
-                }
+                **rollup
             }
         }
 
@@ -302,10 +251,17 @@ async def api_admin_users(request: Request, user: dict = Depends(get_current_adm
         page = int(request.query_params.get('page', 1))
         search = request.query_params.get('search', '')
         role_filter = request.query_params.get('role', '')
+        cursor = request.query_params.get('cursor')
+        try:
+            after = decode_cursor(cursor) if cursor else None
+            if after is not None and len(after) != 2:
+                raise ValueError('Invalid cursor')
+        except ValueError:
+            return JSONResponse(status_code=400, content={'error': 'Invalid cursor'})
 
         # Get users with pagination
         users, pagination = get_users_with_stats(
-            page=page, search=search, role_filter=role_filter
+            page=page, search=search, role_filter=role_filter, after=after
         )
 
         return {
@@ -326,295 +282,12 @@ async def api_admin_users(request: Request, user: dict = Depends(get_current_adm
 
 @router.get('/api/admin/analytics')
 async def api_admin_analytics(user: dict = Depends(get_current_admin)):
-    """API endpoint for comprehensive admin analytics"""
+    """API endpoint for comprehensive admin analytics, served from the analytics rollups"""
     try:
-        conn = db_manager.get_connection()
-
-        # 1. Learning Progress Analytics
-        cefr_distribution = conn.execute('''
-            SELECT overall_level as level, COUNT(*) as count
-            FROM assessment_results ar
-            INNER JOIN (
-                SELECT user_id, MAX(completed_at) as latest_date
-                FROM assessment_results GROUP BY user_id
-            ) latest ON ar.user_id = latest.user_id
-                    AND ar.completed_at = latest.latest_date
-            GROUP BY overall_level
-            ORDER BY
-                CASE overall_level
-                    WHEN 'A1' THEN 1 WHEN 'A2' THEN 2 WHEN 'B1' THEN 3
-                    WHEN 'B2' THEN 4 WHEN 'C1' THEN 5 WHEN 'C2' THEN 6
-                END
-        ''').fetchall()
-
-        phase_completion = conn.execute('''
-            SELECT
-                COUNT(DISTINCT u.id) as total_users,
-                COUNT(DISTINCT ar.user_id) as phase1_completed,
-                COUNT(DISTINCT p2.user_id) as phase2_started,
-                COUNT(DISTINCT CASE WHEN p2.steps_completed >= 4
-                      THEN p2.user_id END) as phase2_completed,
-                COUNT(DISTINCT pc3.user_id) as phase3_completed,
-                COUNT(DISTINCT pc4.user_id) as phase4_completed,
-                COUNT(DISTINCT pc5.user_id) as phase5_completed,
-                COUNT(DISTINCT pc6.user_id) as phase6_completed
-            FROM users u
-            LEFT JOIN assessment_results ar ON u.id = ar.user_id
-            LEFT JOIN (
-                SELECT user_id,
-                       COUNT(DISTINCT CASE WHEN step_completed = 1
-                             THEN step_id END) as steps_completed
-                FROM phase2_progress GROUP BY user_id
-            ) p2 ON u.id = p2.user_id
-            LEFT JOIN (SELECT user_id FROM user_phase_completion
-                       WHERE phase_number = 3 AND completed = 1) pc3
-                ON u.id = pc3.user_id
-            LEFT JOIN (SELECT user_id FROM user_phase_completion
-                       WHERE phase_number = 4 AND completed = 1) pc4
-                ON u.id = pc4.user_id
-            LEFT JOIN (SELECT user_id FROM user_phase_completion
-                       WHERE phase_number = 5 AND completed = 1) pc5
-                ON u.id = pc5.user_id
-            LEFT JOIN (SELECT user_id FROM user_phase_completion
-                       WHERE phase_number = 6 AND completed = 1) pc6
-                ON u.id = pc6.user_id
-            WHERE u.is_admin = 0
-        ''').fetchone()
-
-        avg_assessment_times = conn.execute('''
-            SELECT
-                'Phase 1' as phase,
-                AVG(time_taken) / 60.0 as avg_minutes
-            FROM assessment_results
-            UNION ALL
-            SELECT
-                'Phase 2 - ' || step_id as phase,
-                AVG(CAST(
-                    (julianday(completed_at) - julianday(started_at))
-                    * 24 * 60 AS INTEGER
-                )) as avg_minutes
-            FROM phase2_progress
-            WHERE completed_at IS NOT NULL
-            GROUP BY step_id
-        ''').fetchall()
-
-        # 2. Student Engagement Metrics
-        active_users_7d = conn.execute('''
-            SELECT COUNT(DISTINCT user_id) as count
-            FROM (
-                SELECT user_id, completed_at as activity_date
-                FROM assessment_results
-                WHERE completed_at >= datetime('now', '-7 days')
-                UNION
-                SELECT user_id, last_activity as activity_date
-                FROM phase2_progress
-                WHERE last_activity >= datetime('now', '-7 days')
-                UNION
-                SELECT user_id, updated_at as activity_date
-                FROM phase5_progress
-                WHERE updated_at >= datetime('now', '-7 days')
-                UNION
-                SELECT user_id, updated_at as activity_date
-                FROM phase6_progress
-                WHERE updated_at >= datetime('now', '-7 days')
-            )
-        ''').fetchone()
-
-        active_users_30d = conn.execute('''
-            SELECT COUNT(DISTINCT user_id) as count
-            FROM (
-                SELECT user_id, completed_at as activity_date
-                FROM assessment_results
-                WHERE completed_at >= datetime('now', '-30 days')
-                UNION
-                SELECT user_id, last_activity as activity_date
-                FROM phase2_progress
-                WHERE last_activity >= datetime('now', '-30 days')
-                UNION
-                SELECT user_id, updated_at as activity_date
-                FROM phase5_progress
-                WHERE updated_at >= datetime('now', '-30 days')
-                UNION
-                SELECT user_id, updated_at as activity_date
-                FROM phase6_progress
-                WHERE updated_at >= datetime('now', '-30 days')
-            )
-        ''').fetchone()
-
-        daily_activity = conn.execute('''
-            SELECT DATE(activity_date) as date,
-                   COUNT(DISTINCT user_id) as active_users
-            FROM (
-                SELECT user_id, completed_at as activity_date
-                FROM assessment_results
-                WHERE completed_at >= datetime('now', '-30 days')
-                UNION
-                SELECT user_id, last_activity as activity_date
-                FROM phase2_progress
-                WHERE last_activity >= datetime('now', '-30 days')
-                UNION
-                SELECT user_id, updated_at as activity_date
-                FROM phase5_progress
-                WHERE updated_at >= datetime('now', '-30 days')
-                UNION
-                SELECT user_id, updated_at as activity_date
-                FROM phase6_progress
-                WHERE updated_at >= datetime('now', '-30 days')
-            )
-            GROUP BY DATE(activity_date)
-            ORDER BY date DESC
-            LIMIT 30
-        ''').fetchall()
-
-        session_duration_dist = conn.execute('''
-            SELECT
-                CASE
-                    WHEN time_taken < 300 THEN '0-5 min'
-                    WHEN time_taken < 600 THEN '5-10 min'
-                    WHEN time_taken < 1200 THEN '10-20 min'
-                    WHEN time_taken < 1800 THEN '20-30 min'
-                    ELSE '30+ min'
-                END as duration_range,
-                COUNT(*) as count
-            FROM assessment_results
-            WHERE time_taken IS NOT NULL
-            GROUP BY duration_range
-        ''').fetchall()
-
-        # 3. Assessment Quality Insights
-        ai_detection_stats = conn.execute('''
-            SELECT
-                AVG(ai_usage_percentage) as avg_ai_usage,
-                COUNT(CASE WHEN ai_usage_percentage > 30 THEN 1 END)
-                    as high_ai_count,
-                COUNT(*) as total_assessments
-            FROM assessment_results
-            WHERE ai_usage_percentage IS NOT NULL
-        ''').fetchone()
-
-        score_distribution = conn.execute('''
-            SELECT
-                CASE
-                    WHEN xp_earned < 200 THEN 'Low (0-199)'
-                    WHEN xp_earned < 400 THEN 'Medium (200-399)'
-                    WHEN xp_earned < 600 THEN 'High (400-599)'
-                    ELSE 'Excellent (600+)'
-                END as score_range,
-                COUNT(*) as count
-            FROM assessment_results
-            GROUP BY score_range
-        ''').fetchall()
-
-        most_challenging_steps = conn.execute('''
-            SELECT
-                step_id,
-                COUNT(*) as attempts,
-                COUNT(CASE WHEN step_completed = 1 THEN 1 END) as completions,
-                ROUND(
-                    CAST(COUNT(CASE WHEN step_completed = 1 THEN 1 END) AS FLOAT)
-                    / COUNT(*) * 100, 1
-                ) as success_rate
-            FROM phase2_progress
-            GROUP BY step_id
-            HAVING attempts > 0
-            ORDER BY success_rate ASC
-        ''').fetchall()
-
-        # 4. Risk Identification
-        at_risk_students = conn.execute('''
-            SELECT
-                u.id, u.username, u.first_name, u.last_name,
-                MAX(COALESCE(
-                    ar.completed_at, p2.last_activity,
-                    p5.updated_at, p6.updated_at, u.created_at
-                )) as last_activity,
-                COUNT(DISTINCT ar.id) as assessments_completed,
-                COUNT(DISTINCT p2.step_id) as phase2_steps_attempted
-            FROM users u
-            LEFT JOIN assessment_results ar ON u.id = ar.user_id
-            LEFT JOIN phase2_progress p2 ON u.id = p2.user_id
-            LEFT JOIN phase5_progress p5 ON u.id = p5.user_id
-            LEFT JOIN phase6_progress p6 ON u.id = p6.user_id
-            WHERE u.is_admin = 0
-            GROUP BY u.id, u.username, u.first_name, u.last_name
-            HAVING last_activity < datetime('now', '-7 days')
-                OR assessments_completed = 0
-            ORDER BY last_activity ASC
-            LIMIT 10
-        ''').fetchall()
-
-        stuck_students = conn.execute('''
-            SELECT
-                u.id, u.username, u.first_name, u.last_name, p2.step_id,
-                p2.started_at, p2.last_activity,
-                CAST(
-                    (julianday('now') - julianday(p2.last_activity)) AS INTEGER
-                ) as days_stuck
-            FROM users u
-            INNER JOIN phase2_progress p2 ON u.id = p2.user_id
-            WHERE p2.step_completed = 0
-              AND p2.last_activity < datetime('now', '-3 days')
-              AND u.is_admin = 0
-            ORDER BY days_stuck DESC
-            LIMIT 10
-        ''').fetchall()
-
-        # 5. System Health (basic metrics)
-        recent_errors = conn.execute('''
-            SELECT COUNT(*) as error_count
-            FROM phase2_progress
-            WHERE step_score = 0
-              AND started_at >= datetime('now', '-24 hours')
-        ''').fetchone()
-
-        total_sessions = conn.execute('''
-            SELECT COUNT(DISTINCT session_id) as count
-            FROM assessment_results
-            WHERE completed_at >= datetime('now', '-7 days')
-        ''').fetchone()
-
-        conn.close()
-
+        from services.analytics_rollup import get_analytics_rollups
         return {
             'success': True,
-            'data': {
-                'learning_progress': {
-                    'cefr_distribution': [dict(row) for row in cefr_distribution],
-                    'phase_completion': dict(phase_completion),
-                    'avg_assessment_times': [
-                        dict(row) for row in avg_assessment_times
-                    ]
-                },
-                'engagement': {
-                    'active_users_7d': active_users_7d['count'],
-                    'active_users_30d': active_users_30d['count'],
-                    'daily_activity': [dict(row) for row in daily_activity],
-                    'session_duration_dist': [
-                        dict(row) for row in session_duration_dist
-                    ]
-                },
-                'quality': {
-                    'ai_detection': (
-                        dict(ai_detection_stats) if ai_detection_stats else {}
-                    ),
-                    'score_distribution': [
-                        dict(row) for row in score_distribution
-                    ],
-                    'challenging_steps': [
-                        dict(row) for row in most_challenging_steps
-                    ]
-                },
-                'risk': {
-                    'at_risk_students': [
-                        dict(row) for row in at_risk_students
-                    ],
-                    'stuck_students': [dict(row) for row in stuck_students]
-                },
-                'system': {
-                    'recent_errors': recent_errors['error_count'],
-                    'total_sessions_7d': total_sessions['count']
-                }
-            }
+            'data': get_analytics_rollups().analytics()
         }
 
     except Exception as e:
@@ -824,77 +497,190 @@ async def admin_toggle_user(
         )
 
 
+USER_EXPORT_COLUMNS = [
+    'ID', 'Username', 'Email', 'First Name', 'Last Name',
+    'Role', 'Active', 'Created At', 'Last Login',
+    'Total Assessments', 'Best Level', 'Total XP',
+    'Phase2 Steps Completed', 'Phase2 Steps Attempted'
+]
+
+
+def csv_text(rows) -> str:
+    """rows as CSV text, for one chunk of a streamed export"""
+    output = io.StringIO()
+    csv.writer(output).writerows(rows)
+    return output.getvalue()
+
+
 @router.get('/admin/export/users')
 async def admin_export_users(
     request: Request,
     user: dict = Depends(get_current_admin)
 ):
-    """Export users data to CSV"""
-    try:
-        search = request.query_params.get('search', '')
-        role_filter = request.query_params.get('role', '')
+    """Export users data to CSV, streamed a chunk of users at a time"""
+    search = request.query_params.get('search', '')
+    role_filter = request.query_params.get('role', '')
+
+    def stream():
+        yield csv_text([USER_EXPORT_COLUMNS])
+        try:
+            for users in iter_users_with_stats(search=search, role_filter=role_filter):
+                yield csv_text([
+                    [
+                        u.get('id', ''),
+                        u.get('username', ''),
+                        u.get('email', ''),
+                        u.get('first_name', ''),
+                        u.get('last_name', ''),
+                        'Admin' if u.get('is_admin') else 'User',
+                        'Yes' if u.get('is_active') else 'No',
+                        u.get('created_at', ''),
+                        u.get('last_login', ''),
+                        u.get('total_assessments', 0),
+                        u.get('best_level', 'N/A'),
+                        u.get('total_xp', 0),
+                        u.get('phase2_steps_completed', 0),
+                        u.get('phase2_steps_attempted', 0)
+                    ]
+                    for u in users
+                ])
+        except Exception as e:
+            # Headers are already sent; the client sees a truncated download
+            logger.error(f"Error exporting users: {str(e)}")
+            raise
+
+    filename = f'fardi_users_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
+
+    return StreamingResponse(
+        stream(),
+        media_type='text/csv',
+        headers={
+            'Content-Disposition': f'attachment; filename={filename}'
+        }
+    )
 
-        # Use get_users_with_stats to get all users
-        users, _ = get_users_with_stats(
-            page=1, per_page=10000, search=search, role_filter=role_filter
-        )
 
-        # Create CSV
-        output = io.StringIO()
-        writer = csv.writer(output)
+@router.get('/admin/export-data')
+async def admin_export_data(
+    request: Request,
+    user: dict = Depends(get_current_admin)
+):
+    """Export all users data to CSV - alias for export/users"""
+    return await admin_export_users(request=request, user=user)
 
-        # Headers
-        writer.writerow([
-            'ID', 'Username', 'Email', 'First Name', 'Last Name',
-            'Role', 'Active', 'Created At', 'Last Login',
-            'Total Assessments', 'Best Level', 'Total XP',
-            'Phase2 Steps Completed', 'Phase2 Steps Attempted'
-        ])
 
-        # Write user data
-        for u in users:
-            writer.writerow([
-                u.get('id', ''),
-                u.get('username', ''),
-                u.get('email', ''),
-                u.get('first_name', ''),
-                u.get('last_name', ''),
-                'Admin' if u.get('is_admin') else 'User',
-                'Yes' if u.get('is_active') else 'No',
-                u.get('created_at', ''),
-                u.get('last_login', ''),
-                u.get('total_assessments', 0),
-                u.get('best_level', 'N/A'),
-                u.get('total_xp', 0),
-                u.get('phase2_steps_completed', 0),
-                u.get('phase2_steps_attempted', 0)
-            ])
-
-        filename = f'fardi_users_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
+# Tables offered by /admin/export/responses/{table}, with the columns each can be filtered on
+RESPONSE_EXPORT_TABLES = {
+    'student_responses': ('user_id', 'phase', 'subphase'),
+    'phase5_progress': ('user_id', 'subphase'),
+    'phase6_progress': ('user_id', 'subphase'),
+}
 
-        return StreamingResponse(
-            iter([output.getvalue()]),
-            media_type='text/csv',
-            headers={
-                'Content-Disposition': f'attachment; filename={filename}'
-            }
-        )
 
-    except Exception as e:
-        logger.error(f"Error exporting users: {str(e)}")
-        return JSONResponse(
-            status_code=500,
-            content={'error': 'Error exporting users data'}
-        )
+def iter_table_rows(table, filters, chunk_size=EXPORT_CHUNK * 2):
+    """(columns, chunks of row tuples) for every row of table matching filters, in id order"""
+    conditions = [f'{column} = ?' for column in filters]
+    params = list(filters.values())
 
+    conn = db_manager.get_connection()
+    try:
+        columns = [row['name'] for row in conn.execute(f'PRAGMA table_info({table})').fetchall()]
+    finally:
+        conn.close()
 
-@router.get('/admin/export-data')
-async def admin_export_data(
-    request: Request,
+    def chunks():
+        last_id = 0
+        while True:
+            conn = db_manager.get_connection()
+            try:
+                rows = conn.execute(f'''
+                    SELECT * FROM {table}
+                    WHERE {' AND '.join(conditions + ['id > ?'])}
+                    ORDER BY id
+                    LIMIT ?
+                ''', params + [last_id, chunk_size]).fetchall()
+            finally:
+                conn.close()
+            if not rows:
+                return
+            last_id = rows[-1]['id']
+            yield [tuple(row) for row in rows]
+            if len(rows) < chunk_size:
+                return
+
+    return columns, chunks()
+
+
+@router.get('/admin/export/responses/{table}')
+async def admin_export_responses(
+    table: str,
+    format: str = 'csv',
+    compress: str = 'gzip',
+    user_id: int = None,
+    phase: int = None,
+    subphase: int = None,
     user: dict = Depends(get_current_admin)
 ):
-    """Export all users data to CSV - alias for export/users"""
-    return await admin_export_users(request=request, user=user)
+    """Export every row of a per-phase response table as CSV or NDJSON, streamed and gzip-compressed by default"""
+    if table not in RESPONSE_EXPORT_TABLES:
+        return JSONResponse(
+            status_code=400,
+            content={'error': f"table must be one of {', '.join(RESPONSE_EXPORT_TABLES)}"}
+        )
+    if format not in ('csv', 'ndjson') or compress not in ('gzip', 'none'):
+        return JSONResponse(
+            status_code=400,
+            content={'error': 'format must be csv or ndjson, compress gzip or none'}
+        )
+    requested = {'user_id': user_id, 'phase': phase, 'subphase': subphase}
+    filters = {column: value for column, value in requested.items() if value is not None}
+    unsupported = [column for column in filters if column not in RESPONSE_EXPORT_TABLES[table]]
+    if unsupported:
+        return JSONResponse(
+            status_code=400,
+            content={'error': f"{table} cannot be filtered by {', '.join(unsupported)}"}
+        )
+
+    columns, chunks = iter_table_rows(table, filters)
+
+    def encode(rows) -> bytes:
+        if format == 'csv':
+            return csv_text(rows).encode('utf-8')
+        return ''.join(json.dumps(dict(zip(columns, row))) + '\n' for row in rows).encode('utf-8')
+
+    def stream():
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress == 'gzip' else None
+
+        def output(data):
+            return compressor.compress(data) if compressor is not None else data
+
+        try:
+            header = [[columns]] if format == 'csv' else []
+            for rows in itertools.chain(header, chunks):
+                data = output(encode(rows))
+                if data:
+                    yield data
+            if compressor is not None:
+                yield compressor.flush()
+        except Exception as e:
+            # Headers are already sent; the client sees a truncated download
+            logger.error(f"Error exporting {table}: {str(e)}")
+            raise
+
+    extension = 'csv' if format == 'csv' else 'ndjson'
+    filename = f'fardi_{table}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{extension}'
+    media_type = 'text/csv' if format == 'csv' else 'application/x-ndjson'
+    if compress == 'gzip':
+        filename += '.gz'
+        media_type = 'application/gzip'
+
+    return StreamingResponse(
+        stream(),
+        media_type=media_type,
+        headers={
+            'Content-Disposition': f'attachment; filename={filename}'
+        }
+    )
 
 
 # ──────────────────────────────────────────────────────────────────
@@ -902,76 +688,48 @@ async def admin_export_data(
 # ──────────────────────────────────────────────────────────────────
 
 @router.get('/api/admin/students')
-async def get_all_users_blueprint(user: dict = Depends(get_current_admin)):
+async def get_all_users_blueprint(
+    limit: int = 100,
+    sort: str = 'created_at',
+    order: str = 'desc',
+    cursor: str = None,
+    user: dict = Depends(get_current_admin)
+):
     """
-    Get all users with their progress summary.
+    Users with their progress summary, a page at a time.
     Ported from admin_bp blueprint's /api/admin/users.
     Exposed at /api/admin/students to avoid path collision with the
     paginated /api/admin/users from app.py.
+
+    Keyset-paginated: pass data.next_cursor back as ?cursor= for the next
+    page (same sort/order). Each page costs five grouped queries
+    (AssessmentHistory.get_users_progress_page) regardless of user count.
     """
+    if sort not in assessment_history.USER_SORT_KEYS or order not in ('asc', 'desc'):
+        return JSONResponse(
+            status_code=400,
+            content={"error": f"sort must be one of {', '.join(assessment_history.USER_SORT_KEYS)}; order asc or desc"}
+        )
     try:
-        all_users = user_manager.get_all_users()
-
-        users_with_stats = []
-        for u in all_users:
-            uid = u.get('user_id')
-
-            # Get Phase 1 progress
-            phase1_history = assessment_history.get_user_assessments(uid)
-            latest_phase1 = phase1_history[0] if phase1_history else None
-
-            # Get Phase 2 progress
-            phase2_progress = assessment_history.get_phase2_progress(uid)
-            phase2_score = phase2_progress.get('overall_score', 0)
-            phase2_total = phase2_progress.get('max_score', 100)
-
-            # Get phase completion for all phases
-            user_stats = assessment_history.get_user_stats(uid)
-            phase_completion = {
-                pc['phase_number']: pc['completed']
-                for pc in user_stats.get('phase_completion', [])
-            }
-
-            users_with_stats.append({
-                'user_id': uid,
-                'username': u.get('username'),
-                'first_name': u.get('first_name', ''),
-                'last_name': u.get('last_name', ''),
-                'email': u.get('email', ''),
-                'is_admin': u.get('is_admin', False),
-                'created_at': u.get('created_at'),
-                'last_login': u.get('last_login'),
-                'phase1_level': (
-                    latest_phase1.get('overall_level')
-                    if latest_phase1 else None
-                ),
-                'phase1_date': (
-                    latest_phase1.get('timestamp')
-                    if latest_phase1 else None
-                ),
-                'phase2_score': phase2_score,
-                'phase2_percentage': round(
-                    (phase2_score / phase2_total * 100)
-                    if phase2_total > 0 else 0,
-                    1
-                ),
-                'phase2_steps_completed': len(
-                    phase2_progress.get('steps_completed', [])
-                ),
-                'total_remedial_activities': len(
-                    phase2_progress.get('remedial_activities', [])
-                ),
-                'phase3_completed': bool(phase_completion.get(3)),
-                'phase4_completed': bool(phase_completion.get(4)),
-                'phase5_completed': bool(phase_completion.get(5)),
-                'phase6_completed': bool(phase_completion.get(6)),
-            })
+        after = decode_cursor(cursor) if cursor else None
+        if after is not None and len(after) != 2:
+            raise ValueError('Invalid cursor')
+    except ValueError:
+        return JSONResponse(status_code=400, content={"error": "Invalid cursor"})
+    try:
+        users, last_key = assessment_history.get_users_progress_page(
+            limit=max(1, min(limit, MAX_PAGE_SIZE)), sort=sort, descending=order == 'desc', after=after
+        )
+        phase2_max = phase2_max_score()
+        for u in users:
+            u['phase2_percentage'] = round(u['phase2_score'] / phase2_max * 100, 1) if phase2_max else 0
 
         return {
             "success": True,
             "data": {
-                "users": users_with_stats,
-                "total_count": len(users_with_stats)
+                "users": users,
+                "total_count": user_manager.get_user_count(),
+                "next_cursor": encode_cursor(last_key) if last_key else None
             }
         }
     except Exception as e:
@@ -1085,66 +843,81 @@ async def get_student_progress(
         )
 
 
+def parse_date_bound(value: str, end_of_day: bool = False) -> str:
+    """ISO date or datetime as a stored-timestamp bound; a bare date as end bound covers the whole day"""
+    parsed = datetime.fromisoformat(value)
+    if end_of_day and len(value) == 10:
+        parsed = parsed.replace(hour=23, minute=59, second=59)
+    return parsed.strftime('%Y-%m-%d %H:%M:%S')
+
+
+# Rows fetched per query while streaming the NDJSON export
+EVALUATION_EXPORT_CHUNK = 500
+
+
 @router.get('/api/admin/ai-evaluations')
-async def get_ai_evaluations(user: dict = Depends(get_current_admin)):
-    """Get all AI evaluations across all students"""
+async def get_ai_evaluations(
+    limit: int = 100,
+    cursor: str = None,
+    user_id: int = None,
+    step_id: str = None,
+    level: str = None,
+    date_from: str = None,
+    date_to: str = None,
+    format: str = 'json',
+    user: dict = Depends(get_current_admin)
+):
+    """AI evaluations of Phase 2 responses across all students, newest first; keyset-paginated or ?format=ndjson for the whole filtered feed"""
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        return JSONResponse(status_code=400, content={"error": f"limit must be between 1 and {MAX_PAGE_SIZE}"})
+    if format not in ('json', 'ndjson'):
+        return JSONResponse(status_code=400, content={"error": "format must be json or ndjson"})
     try:
-        all_users = user_manager.get_all_users()
-        all_evaluations = []
-
-        for u in all_users:
-            if u.get('is_admin'):
-                continue
-
-            uid = u.get('user_id')
-            username = u.get('username')
-
-            # Get Phase 2 progress
-            phase2_progress = assessment_history.get_phase2_progress(uid)
-
-            # Extract all responses with AI evaluations
-            for step_data in phase2_progress.get('steps', []):
-                for response in step_data.get('responses', []):
-                    if response.get('ai_evaluation'):
-                        all_evaluations.append({
-                            'user_id': uid,
-                            'username': username,
-                            'context': 'Phase 2 Step Response',
-                            'step_id': step_data.get('step_id'),
-                            'action_item_id': response.get('action_item_id'),
-                            'timestamp': response.get('timestamp'),
-                            'response_text': response.get('response'),
-                            'score': response.get('score'),
-                            'ai_evaluation': response.get('ai_evaluation'),
-                            'cefr_level': response.get('cefr_level')
-                        })
-
-            # Extract remedial activity AI evaluations
-            for activity in phase2_progress.get('remedial_activities', []):
-                if activity.get('ai_evaluation'):
-                    all_evaluations.append({
-                        'user_id': uid,
-                        'username': username,
-                        'context': 'Remedial Activity',
-                        'step_id': activity.get('step_id'),
-                        'level': activity.get('level'),
-                        'activity_id': activity.get('activity_id'),
-                        'timestamp': activity.get('timestamp'),
-                        'responses': activity.get('responses', {}),
-                        'score': activity.get('score'),
-                        'ai_evaluation': activity.get('ai_evaluation')
-                    })
-
-        # Sort by timestamp
-        all_evaluations.sort(
-            key=lambda x: x.get('timestamp', ''), reverse=True
+        filters = {
+            'user_id': user_id,
+            'step_id': step_id,
+            'level': level,
+            'date_from': parse_date_bound(date_from) if date_from else None,
+            'date_to': parse_date_bound(date_to, end_of_day=True) if date_to else None,
+        }
+    except ValueError:
+        return JSONResponse(status_code=400, content={"error": "date_from and date_to must be ISO dates"})
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+            if len(after) != 2:
+                raise ValueError('Invalid cursor')
+        except ValueError:
+            return JSONResponse(status_code=400, content={"error": "Invalid cursor"})
+
+    if format == 'ndjson':
+        def stream(after):
+            # One chunk in memory at a time, each on its own pooled connection
+            while True:
+                rows, after = assessment_history.get_ai_evaluations_page(
+                    limit=EVALUATION_EXPORT_CHUNK, after=after, **filters
+                )
+                yield ''.join(json.dumps(row) + '\n' for row in rows)
+                if after is None:
+                    return
+
+        filename = f'fardi_ai_evaluations_{datetime.now().strftime("%Y%m%d_%H%M%S")}.ndjson'
+        return StreamingResponse(
+            stream(after),
+            media_type='application/x-ndjson',
+            headers={
+                'Content-Disposition': f'attachment; filename={filename}'
+            }
         )
 
+    try:
+        evaluations, last_key = assessment_history.get_ai_evaluations_page(limit=limit, after=after, **filters)
         return {
             "success": True,
             "data": {
-                "evaluations": all_evaluations,
-                "total_count": len(all_evaluations)
+                "evaluations": evaluations,
+                "next_cursor": encode_cursor(last_key) if last_key else None
             }
         }
     except Exception as e:
@@ -1155,6 +928,29 @@ async def get_ai_evaluations(user: dict = Depends(get_current_admin)):
         )
 
 
+@router.get('/api/admin/llm-cache')
+async def get_llm_cache_stats(user: dict = Depends(get_current_admin)):
+    """LLM response cache hit/miss counters per call site, in-flight coalescing and the AI-detection cache"""
+    from services.llm_cache import get_llm_cache
+    from services.detection_cache import get_detection_cache
+    from services.ai_service import AIService
+    llm_cache = get_llm_cache()
+    detection_cache = get_detection_cache()
+    data = llm_cache.stats() if llm_cache is not None else {"enabled": False}
+    data["coalescing"] = AIService.coalescing_stats()
+    data["ai_detection"] = detection_cache.stats() if detection_cache is not None else {"enabled": False}
+    return {"success": True, "data": data}
+
+
+@router.get('/api/admin/metrics')
+async def get_request_metrics(format: str = 'json', user: dict = Depends(get_current_admin)):
+    """Per-route latency histograms, SQL statements/time and LLM/AI-detection/TTS time for this worker; ?format=prometheus for text exposition"""
+    from services.request_metrics import metrics_snapshot, prometheus_text
+    if format == 'prometheus':
+        return PlainTextResponse(prometheus_text(), media_type='text/plain; version=0.0.4')
+    return {"success": True, "data": metrics_snapshot()}
+
+
 @router.get('/api/admin/progress/{user_id}')
 async def get_user_progress(
     user_id: str,
@@ -1164,6 +960,7 @@ async def get_user_progress(
     """Get detailed progress summary and timeline for a specific user"""
     if not user.get("is_admin"):
         raise HTTPException(status_code=403, detail="Admin required")
+    conn = None
     try:
         conn = db_manager.get_connection()
 
@@ -1257,3 +1054,6 @@ async def get_user_progress(
             status_code=500,
             content={"error": str(e)}
         )
+    finally:
+        if conn is not None:
+            conn.close()
@@ -7,7 +7,6 @@ import logging
 import uuid
 import json
 import re
-import sqlite3
 from datetime import datetime
 from fastapi import APIRouter, Depends, Request, HTTPException
 from fastapi.responses import JSONResponse
@@ -35,6 +34,18 @@ from models.game_data import (
     PHASE_2_POINTS,
     PHASE_2_SUCCESS_THRESHOLD,
 )
+from services.game_session_service import (
+    get_game_session,
+    update_game_session,
+    get_session_json,
+    put_session_item,
+    put_session_item_if_absent,
+    append_session_item,
+    add_to_session_list,
+    delete_session_items,
+)
+from models.phase2_loader import preload_phase2_data
+from services.startup import on_startup
 from dependencies import db_manager, user_manager, assessment_history
 from auth_utils import get_current_user, get_current_admin, get_optional_user
 
@@ -49,92 +60,11 @@ assessment_service = AssessmentService()
 
 
 # ======================================================================
-# game_sessions table + helpers  (replaces Flask filesystem sessions)
+# game_sessions helpers  (replaces Flask filesystem sessions); the tables
+# are created by migrations/runner.py
 # ======================================================================
 
-def init_game_sessions_table():
-    conn = db_manager.get_connection()
-    try:
-        conn.execute('''
-            CREATE TABLE IF NOT EXISTS game_sessions (
-                user_id INTEGER PRIMARY KEY,
-                current_step INTEGER DEFAULT 0,
-                responses TEXT DEFAULT '[]',
-                assessments TEXT DEFAULT '[]',
-                xp INTEGER DEFAULT 0,
-                start_time TEXT,
-                player_name TEXT,
-                phase1_completed BOOLEAN DEFAULT 0,
-                overall_level TEXT,
-                phase2_session_id TEXT,
-                phase2_responses TEXT DEFAULT '{}',
-                phase2_assessments TEXT DEFAULT '{}',
-                phase2_remedial_responses TEXT DEFAULT '{}',
-                phase2_level_completed TEXT DEFAULT '{}',
-                phase2_current_level TEXT DEFAULT '{}',
-                phase2_level_progress TEXT DEFAULT '{}',
-                remedial_completed TEXT DEFAULT '{}',
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(id)
-            )
-        ''')
-        conn.commit()
-    finally:
-        conn.close()
-
-init_game_sessions_table()
-
-
-def get_game_session(user_id):
-    """Get game session data for user, creating if needed."""
-    conn = db_manager.get_connection()
-    try:
-        row = conn.execute('SELECT * FROM game_sessions WHERE user_id = ?', (user_id,)).fetchone()
-        if not row:
-            conn.execute('INSERT INTO game_sessions (user_id) VALUES (?)', (user_id,))
-            conn.commit()
-            row = conn.execute('SELECT * FROM game_sessions WHERE user_id = ?', (user_id,)).fetchone()
-        return dict(row)
-    finally:
-        conn.close()
-
-
-def update_game_session(user_id, **kwargs):
-    """Update game session fields. JSON fields are auto-serialized."""
-    conn = db_manager.get_connection()
-    try:
-        json_fields = {
-            'responses', 'assessments', 'phase2_responses', 'phase2_assessments',
-            'phase2_remedial_responses', 'phase2_level_completed', 'phase2_current_level',
-            'phase2_level_progress', 'remedial_completed',
-        }
-        sets = []
-        values = []
-        for key, val in kwargs.items():
-            sets.append(f"{key} = ?")
-            if key in json_fields and not isinstance(val, str):
-                values.append(json.dumps(val))
-            else:
-                values.append(val)
-        sets.append("updated_at = CURRENT_TIMESTAMP")
-        values.append(user_id)
-        conn.execute(f"UPDATE game_sessions SET {', '.join(sets)} WHERE user_id = ?", values)
-        conn.commit()
-    finally:
-        conn.close()
-
-
-def get_session_json(session_data, field, default):
-    """Parse a JSON field from game session row."""
-    val = session_data.get(field)
-    if val is None:
-        return default
-    if isinstance(val, str):
-        try:
-            return json.loads(val)
-        except Exception:
-            return default
-    return val
+on_startup("phase 2 data", preload_phase2_data, required=False)
 
 
 def replace_player_placeholders(text, player_name=None):
@@ -194,11 +124,11 @@ def check_level_completion(gs, step_id, level):
 def mark_activity_completed(user_id, gs, step_id, level, activity_index):
     level_completed = get_session_json(gs, 'phase2_level_completed', {})
     completed_key = f"{step_id}_{level}_completed"
-    if completed_key not in level_completed:
-        level_completed[completed_key] = []
-    if activity_index not in level_completed[completed_key]:
-        level_completed[completed_key].append(activity_index)
-        update_game_session(user_id, phase2_level_completed=level_completed)
+    if activity_index not in level_completed.get(completed_key, []):
+        # Server-side insert: a concurrent tab marking another activity is not lost
+        level_completed[completed_key] = add_to_session_list(
+            user_id, 'phase2_level_completed', completed_key, activity_index
+        )
         logger.info(f"Marked {level} activity {activity_index} as completed for step {step_id}")
     # Return updated gs
     gs['phase2_level_completed'] = json.dumps(level_completed)
@@ -208,15 +138,14 @@ def mark_activity_completed(user_id, gs, step_id, level, activity_index):
 def get_current_level_for_step(user_id, gs, step_id, initial_level):
     current_level_map = get_session_json(gs, 'phase2_current_level', {})
     if step_id not in current_level_map:
-        current_level_map[step_id] = initial_level
-        update_game_session(user_id, phase2_current_level=current_level_map)
+        current_level_map[step_id] = put_session_item_if_absent(user_id, 'phase2_current_level', step_id, initial_level)
     return current_level_map[step_id]
 
 
 def set_current_level_for_step(user_id, gs, step_id, level):
     current_level_map = get_session_json(gs, 'phase2_current_level', {})
     current_level_map[step_id] = level
-    update_game_session(user_id, phase2_current_level=current_level_map)
+    put_session_item(user_id, 'phase2_current_level', step_id, level)
     logger.info(f"Set current level for step {step_id} to {level}")
 
 
@@ -298,7 +227,7 @@ def score_dialogue_completion(activity, responses):
     return correct_count, total_blanks
 
 
-def ai_score_writing(activity, responses, max_score):
+async def ai_score_writing(activity, responses, max_score):
     """Call Groq to score a writing/dialogue exercise. Returns an int 0..max_score."""
     try:
         if not ai_service.client:
@@ -342,14 +271,11 @@ Return JSON only:
   "feedback": "Short, encouraging, level-appropriate feedback."
 }}"""
 
-        completion = ai_service.client.chat.completions.create(
-            model=ai_service.model,
+        raw = (await ai_service.complete_async(
             messages=[{"role": "user", "content": prompt}],
             max_tokens=300,
             temperature=0.2,
-        )
-        import re
-        raw = completion.choices[0].message.content.strip()
+        )).strip()
         logger.info(f"AI writing raw response: {raw[:300]}")
         # Extract the first JSON object from the response regardless of fences or preamble
         match = re.search(r'\{[\s\S]*\}', raw)
@@ -651,7 +577,7 @@ async def api_submit_response(request: Request, user: dict = Depends(get_current
         question_text = question_data['question']
 
         # AI detection
-        is_ai, ai_score, ai_reasons = assessment_service.check_ai_response(response_text)
+        is_ai, ai_score, ai_reasons = await assessment_service.check_ai_response_async(response_text)
         if is_ai and ai_score > 0.5:
             raise HTTPException(status_code=400, detail={
                 "error": "AI content detected",
@@ -660,8 +586,7 @@ async def api_submit_response(request: Request, user: dict = Depends(get_current
                 "ai_reasons": ai_reasons,
             })
 
-        responses = get_session_json(gs, 'responses', [])
-        responses.append({
+        append_session_item(user_id, 'responses', {
             "step": current_step + 1,
             "question": question_text,
             "response": response_text,
@@ -672,22 +597,21 @@ async def api_submit_response(request: Request, user: dict = Depends(get_current
             "ai_reasons": ai_reasons,
         })
 
-        assessment = assessment_service.assess_response(question_text, response_text, question_type or question_data.get('type'))
+        assessment = await assessment_service.assess_response_async(question_text, response_text, question_type or question_data.get('type'))
         assessment["type"] = question_type or question_data.get('type')
         assessment["step"] = current_step + 1
         assessment["ai_generated"] = is_ai
         assessment["ai_score"] = ai_score
         assessment["ai_reasons"] = ai_reasons
 
-        assessments = get_session_json(gs, 'assessments', [])
-        assessments.append(assessment)
+        append_session_item(user_id, 'assessments', assessment)
 
         xp_earned = question_data.get('xp_reward', 10)
         level_multipliers = {"A1": 1.0, "A2": 1.2, "B1": 1.5, "B2": 1.8, "C1": 2.0}
         xp_earned = int(xp_earned * level_multipliers.get(assessment.get('level', 'B1'), 1.0))
         new_xp = (gs.get('xp') or 0) + xp_earned
 
-        update_game_session(user_id, responses=responses, assessments=assessments, xp=new_xp, current_step=current_step + 1)
+        update_game_session(user_id, xp=new_xp, current_step=current_step + 1)
 
         return {"success": True, "xp_earned": xp_earned, "assessment": assessment}
     except HTTPException:
@@ -706,9 +630,9 @@ async def get_ai_feedback(request: Request, user: dict = Depends(get_current_use
     speaker = data.get('speaker', 'Ms. Mabrouki')
     question_type = data.get('type', '')
 
-    is_ai, ai_score, ai_reasons = assessment_service.check_ai_response(response)
+    is_ai, ai_score, ai_reasons = await assessment_service.check_ai_response_async(response)
 
-    quick_assessment = assessment_service.assess_response(question, response, question_type)
+    quick_assessment = await assessment_service.assess_response_async(question, response, question_type)
     level = quick_assessment.get('level', 'B1')
     strengths = quick_assessment.get('specific_strengths', [])
     improvements = quick_assessment.get('specific_areas_for_improvement', [])
@@ -770,7 +694,7 @@ async def get_ai_feedback(request: Request, user: dict = Depends(get_current_use
     - If student writes "i don't know" -> Say "Good effort! Remember to capitalize 'I' and use 'do not' instead of 'don't' - so 'I do not know'"
     """
 
-    ai_response = ai_service.get_ai_response(prompt, speaker)
+    ai_response = await ai_service.get_ai_response_async(prompt, speaker, cache=False)
 
     return {
         "ai_response": ai_response,
@@ -812,7 +736,7 @@ async def check_ai_response(request: Request, user: dict = Depends(get_current_u
         if len(response_text.strip()) < 20:
             return {"is_ai": False, "score": 0, "message": "Response too short for AI detection", "reasons": []}
 
-        is_ai, ai_score, ai_reasons = assessment_service.check_ai_response(response_text)
+        is_ai, ai_score, ai_reasons = await assessment_service.check_ai_response_async(response_text)
         logger.info(f"AI Detection result - is_ai: {is_ai}, score: {ai_score}")
 
         return {
@@ -862,7 +786,7 @@ async def submit_phase2_response(request: Request, user: dict = Depends(get_curr
         if step_id not in PHASE_2_STEPS:
             raise HTTPException(status_code=400, detail="Invalid step ID")
 
-        is_ai, ai_score, ai_reasons = assessment_service.check_ai_response(response_text)
+        is_ai, ai_score, ai_reasons = await assessment_service.check_ai_response_async(response_text)
         if is_ai and ai_score > 0.5:
             return JSONResponse(status_code=400, content={
                 "error": "AI content detected",
@@ -871,7 +795,7 @@ async def submit_phase2_response(request: Request, user: dict = Depends(get_curr
                 "ai_reasons": ai_reasons,
             })
 
-        assessment = assessment_service.assess_phase2_response(step_id, action_item_id, response_text)
+        assessment = await assessment_service.assess_phase2_response_async(step_id, action_item_id, response_text)
 
         user_id = user["user_id"]
         gs = get_game_session(user_id)
@@ -884,18 +808,13 @@ async def submit_phase2_response(request: Request, user: dict = Depends(get_curr
 
         session_key = f"phase2_{step_id}_{action_item_id}"
 
-        p2_responses = get_session_json(gs, 'phase2_responses', {})
-        p2_assessments = get_session_json(gs, 'phase2_assessments', {})
-
-        p2_responses[session_key] = {
+        put_session_item(user_id, 'phase2_responses', session_key, {
             'response': response_text,
             'timestamp': datetime.now().isoformat(),
             'ai_generated': is_ai,
             'ai_score': ai_score,
-        }
-        p2_assessments[session_key] = assessment
-
-        update_game_session(user_id, phase2_responses=p2_responses, phase2_assessments=p2_assessments)
+        })
+        put_session_item(user_id, 'phase2_assessments', session_key, assessment)
 
         # Save to database
         try:
@@ -1170,13 +1089,7 @@ async def submit_remedial_activity(request: Request, user: dict = Depends(get_cu
         user_id = user["user_id"]
         gs = get_game_session(user_id)
 
-        # Initialize gamification XP service
         xp_data = None
-        try:
-            from services.xp_service import XPService
-            xp_service = XPService(db_manager.get_connection())
-        except Exception:
-            xp_service = None
 
         # Create phase2_session_id if needed
         session_id = gs.get('phase2_session_id')
@@ -1192,7 +1105,7 @@ async def submit_remedial_activity(request: Request, user: dict = Depends(get_cu
             logger.info(f"Dialogue completion — exact match score: {score}/{total}")
         elif not is_skip and task_type in WRITING_TASK_TYPES:
             max_score_for_ai = current_activity.get('success_threshold', 6)
-            ai_score = ai_score_writing(current_activity, responses, max_score_for_ai)
+            ai_score = await ai_score_writing(current_activity, responses, max_score_for_ai)
             if ai_score is not None:
                 score = ai_score
                 logger.info(f"Writing exercise — AI score used: {score}/{max_score_for_ai}")
@@ -1208,12 +1121,11 @@ async def submit_remedial_activity(request: Request, user: dict = Depends(get_cu
 
         # Store remedial response in game session
         session_key = f"remedial_{step_id}_{level}_{activity_id}"
-        p2_remedial = get_session_json(gs, 'phase2_remedial_responses', {})
-        p2_remedial[session_key] = {
+        put_session_item(user_id, 'phase2_remedial_responses', session_key, {
             'responses': responses,
             'score': score,
             'timestamp': datetime.now().isoformat(),
-        }
+        })
 
         # Track progression per level
         p2_level_progress = get_session_json(gs, 'phase2_level_progress', {})
@@ -1221,10 +1133,9 @@ async def submit_remedial_activity(request: Request, user: dict = Depends(get_cu
         current_highest = p2_level_progress.get(progress_key, -1)
         if activity_index > current_highest:
             p2_level_progress[progress_key] = activity_index
+            put_session_item(user_id, 'phase2_level_progress', progress_key, activity_index)
             logger.info(f"Updated progress for {level}: highest completed activity = {activity_index}")
 
-        update_game_session(user_id, phase2_remedial_responses=p2_remedial, phase2_level_progress=p2_level_progress)
-
         # Sequential level progression
         max_score = current_activity.get('success_threshold', 6)
         passing_threshold = max(1, round(max_score * 0.60))
@@ -1291,9 +1202,12 @@ async def submit_remedial_activity(request: Request, user: dict = Depends(get_cu
         else:
             gs = mark_activity_completed(user_id, gs, step_id, current_level, activity_index)
 
-        # Award XP
+        # Award XP via the gamification XP service
         try:
-            if xp_service:
+            from services.xp_service import XPService
+            xp_conn = db_manager.get_connection()
+            try:
+                xp_service = XPService(xp_conn)
                 is_perfect = score >= max_score
                 activity_type = f"remedial_{current_level}_completed"
                 xp_result = xp_service.award_activity_xp(
@@ -1304,13 +1218,15 @@ async def submit_remedial_activity(request: Request, user: dict = Depends(get_cu
                     is_first_try=activity_index == 0,
                     speed_bonus=False,
                 )
-                xp_data = {
-                    "xp_awarded": xp_result.get("total_xp_awarded", 0),
-                    "level_up": xp_result.get("progression", {}).get("leveled_up", False),
-                    "new_level": xp_result.get("progression", {}).get("current_level", 1),
-                    "total_xp": xp_result.get("progression", {}).get("total_xp", 0),
-                }
-                logger.info(f"Awarded {xp_data['xp_awarded']} XP for {activity_type} (perfect: {is_perfect})")
+            finally:
+                xp_conn.close()
+            xp_data = {
+                "xp_awarded": xp_result.get("total_xp_awarded", 0),
+                "level_up": xp_result.get("progression", {}).get("leveled_up", False),
+                "new_level": xp_result.get("progression", {}).get("current_level", 1),
+                "total_xp": xp_result.get("progression", {}).get("total_xp", 0),
+            }
+            logger.info(f"Awarded {xp_data['xp_awarded']} XP for {activity_type} (perfect: {is_perfect})")
         except Exception as xp_error:
             logger.error(f"Failed to award XP for remedial activity: {str(xp_error)}")
             xp_data = {"xp_awarded": 0, "level_up": False}
@@ -1367,7 +1283,7 @@ async def submit_remedial_activity(request: Request, user: dict = Depends(get_cu
 
         if not is_skip and overall_percentage < 50 and not has_been_warned:
             remedial_completed_data[revisit_warning_key] = True
-            update_game_session(user_id, remedial_completed=remedial_completed_data)
+            put_session_item(user_id, 'remedial_completed', revisit_warning_key, True)
             update_remedial_resume_state(current_level, 0)
 
             return {
@@ -1389,7 +1305,7 @@ async def submit_remedial_activity(request: Request, user: dict = Depends(get_cu
         if overall_percentage < 50 and has_been_warned:
             logger.info("User already warned about low performance, allowing progression")
             remedial_completed_data[revisit_warning_key] = False
-            update_game_session(user_id, remedial_completed=remedial_completed_data)
+            put_session_item(user_id, 'remedial_completed', revisit_warning_key, False)
 
         # Check all activities for completion
         logger.info(f"=== CHECKING ALL ACTIVITIES FOR {step_id}/{level} ===")
@@ -1448,9 +1364,7 @@ async def submit_remedial_activity(request: Request, user: dict = Depends(get_cu
                     }
 
             # All remedial levels complete
-            remedial_completed_data = get_session_json(gs, 'remedial_completed', {})
-            remedial_completed_data[f'remedial_completed_{step_id}'] = True
-            update_game_session(user_id, remedial_completed=remedial_completed_data)
+            put_session_item(user_id, 'remedial_completed', f'remedial_completed_{step_id}', True)
 
             next_step = get_next_phase2_step(step_id)
             if next_step:
@@ -1644,8 +1558,8 @@ async def get_phase2_ai_feedback(request: Request, user: dict = Depends(get_curr
         if not action_item:
             raise HTTPException(status_code=400, detail="Action item not found")
 
-        is_ai, ai_score, ai_reasons = assessment_service.check_ai_response(response_text)
-        assessment = assessment_service.assess_phase2_response(step_id, action_item_id, response_text)
+        is_ai, ai_score, ai_reasons = await assessment_service.check_ai_response_async(response_text)
+        assessment = await assessment_service.assess_phase2_response_async(step_id, action_item_id, response_text)
 
         speaker = action_item.get('speaker', 'Ms. Mabrouki')
         character_info = NPCS.get(speaker, {})
@@ -1675,7 +1589,7 @@ async def get_phase2_ai_feedback(request: Request, user: dict = Depends(get_curr
         Example tone: "Great teamwork spirit! Your suggestion shows good understanding of our cultural goals. Try adding more specific details about how this would benefit our Tunisian event."
         """
 
-        ai_feedback = ai_service.get_ai_response(feedback_prompt, speaker)
+        ai_feedback = await ai_service.get_ai_response_async(feedback_prompt, speaker, cache=False)
 
         return {
             "success": True,
@@ -1789,20 +1703,8 @@ async def reset_phase2_step(request: Request, user: dict = Depends(get_current_u
             raise HTTPException(status_code=400, detail="Invalid step ID")
 
         user_id = user["user_id"]
-        gs = get_game_session(user_id)
-
-        p2_responses = get_session_json(gs, 'phase2_responses', {})
-        p2_assessments = get_session_json(gs, 'phase2_assessments', {})
-
-        keys_to_remove_r = [k for k in p2_responses if k.startswith(f"phase2_{step_id}_")]
-        for k in keys_to_remove_r:
-            del p2_responses[k]
-
-        keys_to_remove_a = [k for k in p2_assessments if k.startswith(f"phase2_{step_id}_")]
-        for k in keys_to_remove_a:
-            del p2_assessments[k]
-
-        update_game_session(user_id, phase2_responses=p2_responses, phase2_assessments=p2_assessments)
+        delete_session_items(user_id, 'phase2_responses', f"phase2_{step_id}_")
+        delete_session_items(user_id, 'phase2_assessments', f"phase2_{step_id}_")
 
         return {"success": True, "message": f"Step {step_id} has been reset"}
     except HTTPException:
@@ -2158,7 +2060,7 @@ async def get_phase2_remedial_feedback(request: Request, user: dict = Depends(ge
         The student scored {score} on a remedial activity for {step_id.replace('_',' ')} at level {level}.
         Acknowledge effort, suggest one clear next improvement, and keep a supportive tone.
         """
-        feedback_text = ai_service.get_ai_response(prompt, speaker)
+        feedback_text = await ai_service.get_ai_response_async(prompt, speaker, cache=False)
         return {'feedback': feedback_text or 'Great effort--keep going! Focus on one detail to improve next time.'}
     except Exception as e:
         logger.error(f"Error generating remedial feedback: {str(e)}")
@@ -2222,8 +2124,7 @@ async def get_dashboard_data(user: dict = Depends(get_current_user)):
         phase3_progress = None
         phase4_progress = None
         try:
-            conn34 = sqlite3.connect('fardi.db')
-            conn34.row_factory = sqlite3.Row
+            conn34 = db_manager.get_connection()
             for ph in [3, 4]:
                 row = conn34.execute(
                     'SELECT phase, subphase, step, interaction, item_index, context, is_complete FROM student_progress WHERE user_id = ? AND phase = ?',
@@ -2825,169 +2726,3 @@ async def admin_export_users(request: Request, user: dict = Depends(get_current_
 @router.get('/admin/export-data')
 async def admin_export_data(request: Request, user: dict = Depends(get_current_admin)):
     return await admin_export_users(request, user)
-
-
-# ======================================================================
-# Chat System (from app.py)
-# ======================================================================
-
-def _init_chat_tables():
-    """Create chat tables if they don't exist."""
-    conn = db_manager.get_connection()
-    conn.execute('''
-        CREATE TABLE IF NOT EXISTS chat_messages (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            sender_id INTEGER NOT NULL,
-            receiver_id INTEGER NOT NULL,
-            message TEXT NOT NULL,
-            is_read INTEGER DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (sender_id) REFERENCES users(id),
-            FOREIGN KEY (receiver_id) REFERENCES users(id)
-        )
-    ''')
-    conn.commit()
-
-_init_chat_tables()
-
-
-@router.get('/chat/conversations')
-async def chat_conversations(user: dict = Depends(get_current_user)):
-    """Get all conversations for the current user."""
-    try:
-        user_id = user["user_id"]
-        is_admin = user.get("is_admin", False)
-        conn = db_manager.get_connection()
-
-        if is_admin:
-            conversations = conn.execute('''
-                SELECT
-                    u.id as user_id, u.username, u.first_name, u.last_name,
-                    (SELECT message FROM chat_messages
-                     WHERE (sender_id = u.id AND receiver_id = ?) OR (sender_id = ? AND receiver_id = u.id)
-                     ORDER BY created_at DESC LIMIT 1) as last_message,
-                    (SELECT created_at FROM chat_messages
-                     WHERE (sender_id = u.id AND receiver_id = ?) OR (sender_id = ? AND receiver_id = u.id)
-                     ORDER BY created_at DESC LIMIT 1) as last_message_at,
-                    (SELECT COUNT(*) FROM chat_messages
-                     WHERE sender_id = u.id AND receiver_id = ? AND is_read = 0) as unread_count
-                FROM users u WHERE u.is_admin = 0
-                ORDER BY last_message_at DESC NULLS LAST, u.first_name ASC
-            ''', (user_id, user_id, user_id, user_id, user_id)).fetchall()
-        else:
-            conversations = conn.execute('''
-                SELECT
-                    u.id as user_id, u.username, u.first_name, u.last_name,
-                    (SELECT message FROM chat_messages
-                     WHERE (sender_id = u.id AND receiver_id = ?) OR (sender_id = ? AND receiver_id = u.id)
-                     ORDER BY created_at DESC LIMIT 1) as last_message,
-                    (SELECT created_at FROM chat_messages
-                     WHERE (sender_id = u.id AND receiver_id = ?) OR (sender_id = ? AND receiver_id = u.id)
-                     ORDER BY created_at DESC LIMIT 1) as last_message_at,
-                    (SELECT COUNT(*) FROM chat_messages
-                     WHERE sender_id = u.id AND receiver_id = ? AND is_read = 0) as unread_count
-                FROM users u WHERE u.is_admin = 1
-                ORDER BY last_message_at DESC NULLS LAST
-            ''', (user_id, user_id, user_id, user_id, user_id)).fetchall()
-
-        return {
-            'success': True,
-            'data': [{
-                'user_id': c['user_id'],
-                'username': c['username'],
-                'first_name': c['first_name'],
-                'last_name': c['last_name'],
-                'last_message': c['last_message'],
-                'last_message_at': c['last_message_at'],
-                'unread_count': c['unread_count'] or 0,
-            } for c in conversations],
-        }
-    except Exception as e:
-        logger.error(f"Error getting conversations: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
-
-
-@router.get('/chat/messages/{other_user_id}')
-async def chat_get_messages(other_user_id: int, user: dict = Depends(get_current_user)):
-    """Get messages between current user and another user."""
-    try:
-        user_id = user["user_id"]
-        conn = db_manager.get_connection()
-
-        messages = conn.execute('''
-            SELECT id, sender_id, receiver_id, message, is_read, created_at
-            FROM chat_messages
-            WHERE (sender_id = ? AND receiver_id = ?) OR (sender_id = ? AND receiver_id = ?)
-            ORDER BY created_at ASC
-        ''', (user_id, other_user_id, other_user_id, user_id)).fetchall()
-
-        # Mark messages from the other user as read
-        conn.execute('''
-            UPDATE chat_messages SET is_read = 1
-            WHERE sender_id = ? AND receiver_id = ? AND is_read = 0
-        ''', (other_user_id, user_id))
-        conn.commit()
-
-        return {
-            'success': True,
-            'data': [{
-                'id': m['id'],
-                'sender_id': m['sender_id'],
-                'receiver_id': m['receiver_id'],
-                'message': m['message'],
-                'is_read': bool(m['is_read']),
-                'created_at': m['created_at'],
-                'is_mine': m['sender_id'] == user_id,
-            } for m in messages],
-        }
-    except Exception as e:
-        logger.error(f"Error getting messages: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
-
-
-@router.post('/chat/send')
-async def chat_send_message(request: Request, user: dict = Depends(get_current_user)):
-    """Send a message to another user."""
-    try:
-        user_id = user["user_id"]
-        data = await request.json()
-        receiver_id = data.get('receiver_id')
-        message = (data.get('message', '') or '').strip()
-
-        if not receiver_id or not message:
-            raise HTTPException(status_code=400, detail="receiver_id and message are required")
-        if len(message) > 2000:
-            raise HTTPException(status_code=400, detail="Message too long (max 2000 characters)")
-
-        conn = db_manager.get_connection()
-        receiver = conn.execute('SELECT id, is_admin FROM users WHERE id = ?', (receiver_id,)).fetchone()
-        if not receiver:
-            raise HTTPException(status_code=404, detail="User not found")
-
-        conn.execute('''
-            INSERT INTO chat_messages (sender_id, receiver_id, message) VALUES (?, ?, ?)
-        ''', (user_id, receiver_id, message))
-        conn.commit()
-
-        return {'success': True}
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error sending message: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
-
-
-@router.get('/chat/unread-count')
-async def chat_unread_count(user: dict = Depends(get_current_user)):
-    """Get total unread message count for current user."""
-    try:
-        user_id = user["user_id"]
-        conn = db_manager.get_connection()
-        result = conn.execute(
-            'SELECT COUNT(*) as count FROM chat_messages WHERE receiver_id = ? AND is_read = 0',
-            (user_id,)
-        ).fetchone()
-        return {'success': True, 'count': result['count'] or 0}
-    except Exception as e:
-        logger.error(f"Error getting unread count: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
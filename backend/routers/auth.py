@@ -9,6 +9,7 @@ from auth_utils import (
     create_access_token, set_auth_cookie, clear_auth_cookie,
     get_current_user, get_current_admin, get_optional_user
 )
+from services.password_hasher import run_password_task
 import re
 import logging
 
@@ -77,7 +78,7 @@ async def api_login(request: Request):
         if not username_or_email or not password:
             return JSONResponse({"success": False, "error": "Missing credentials"}, status_code=400)
 
-        user = user_manager.authenticate_user(username_or_email, password)
+        user = await run_password_task(user_manager.authenticate_user, username_or_email, password)
         if not user:
             return JSONResponse({"success": False, "error": "Invalid username/email or password"}, status_code=401)
 
@@ -138,7 +139,8 @@ async def api_signup(request: Request):
         if errors:
             return JSONResponse({"success": False, "error": errors[0]}, status_code=400)
 
-        user_data, error = user_manager.create_user(
+        user_data, error = await run_password_task(
+            user_manager.create_user,
             username=username,
             email=email,
             password=password,
@@ -207,7 +209,9 @@ async def api_change_password(request: Request, user: dict = Depends(get_current
         if confirm_password and new_password != confirm_password:
             return JSONResponse({"success": False, "error": "New passwords do not match"}, status_code=400)
 
-        success, message = user_manager.change_password(user["user_id"], current_password, new_password)
+        success, message = await run_password_task(
+            user_manager.change_password, user["user_id"], current_password, new_password
+        )
         if success:
             return {"success": True, "message": "Password changed successfully"}
         return JSONResponse({"success": False, "error": message}, status_code=400)
@@ -323,7 +327,7 @@ async def api_delete_account(request: Request, user: dict = Depends(get_current_
             return JSONResponse({"success": False, "error": 'Please type "DELETE" to confirm'}, status_code=400)
 
         user_data = user_manager.get_user_by_id(user["user_id"])
-        if not user_manager.verify_password(password, user_data["password_hash"]):
+        if not await run_password_task(user_manager.verify_password, password, user_data["password_hash"]):
             return JSONResponse({"success": False, "error": "Incorrect password"}, status_code=400)
 
         success = user_manager.deactivate_user(user["user_id"])
@@ -423,7 +427,7 @@ async def reset_password(request: Request):
         if not pw_ok:
             raise HTTPException(status_code=400, detail=pw_msg)
 
-        success, message = user_manager.reset_password_with_token(token, new_password)
+        success, message = await run_password_task(user_manager.reset_password_with_token, token, new_password)
         if not success:
             raise HTTPException(status_code=400, detail=message)
         return {"message": message}
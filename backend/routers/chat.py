@@ -12,30 +12,6 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/chat", tags=["chat"])
 
-# ──────────────────────────────────────────────────────────────────
-#  Table initialization (runs at import time, same as Flask version)
-# ──────────────────────────────────────────────────────────────────
-
-def init_chat_tables():
-    """Create chat tables if they don't exist"""
-    conn = db_manager.get_connection()
-    conn.execute('''
-        CREATE TABLE IF NOT EXISTS chat_messages (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            sender_id INTEGER NOT NULL,
-            receiver_id INTEGER NOT NULL,
-            message TEXT NOT NULL,
-            is_read INTEGER DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (sender_id) REFERENCES users(id),
-            FOREIGN KEY (receiver_id) REFERENCES users(id)
-        )
-    ''')
-    conn.commit()
-    conn.close()
-
-init_chat_tables()
-
 # ──────────────────────────────────────────────────────────────────
 #  Endpoints
 # ──────────────────────────────────────────────────────────────────
@@ -43,6 +19,7 @@ init_chat_tables()
 @router.get("/conversations")
 async def chat_conversations(user: dict = Depends(get_current_user)):
     """Get all conversations for the current user (admin sees all students, student sees admin)"""
+    conn = None
     try:
         user_id = user["user_id"]
         is_admin = user.get("is_admin")
@@ -104,11 +81,15 @@ async def chat_conversations(user: dict = Depends(get_current_user)):
     except Exception as e:
         logger.error(f"Error getting conversations: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        if conn is not None:
+            conn.close()
 
 
 @router.get("/messages/{other_user_id}")
 async def chat_get_messages(other_user_id: int, user: dict = Depends(get_current_user)):
     """Get messages between current user and another user"""
+    conn = None
     try:
         user_id = user["user_id"]
         conn = db_manager.get_connection()
@@ -142,16 +123,20 @@ async def chat_get_messages(other_user_id: int, user: dict = Depends(get_current
     except Exception as e:
         logger.error(f"Error getting messages: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        if conn is not None:
+            conn.close()
 
 
 @router.post("/send")
 async def chat_send_message(request: Request, user: dict = Depends(get_current_user)):
     """Send a message to another user"""
+    conn = None
     try:
         user_id = user["user_id"]
         data = await request.json()
         receiver_id = data.get('receiver_id')
-        message = data.get('message', '').strip()
+        message = (data.get('message', '') or '').strip()
 
         if not receiver_id or not message:
             raise HTTPException(status_code=400, detail="receiver_id and message are required")
@@ -178,11 +163,15 @@ async def chat_send_message(request: Request, user: dict = Depends(get_current_u
     except Exception as e:
         logger.error(f"Error sending message: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        if conn is not None:
+            conn.close()
 
 
 @router.get("/unread-count")
 async def chat_unread_count(user: dict = Depends(get_current_user)):
     """Get total unread message count for current user"""
+    conn = None
     try:
         user_id = user["user_id"]
         conn = db_manager.get_connection()
@@ -194,3 +183,6 @@ async def chat_unread_count(user: dict = Depends(get_current_user)):
     except Exception as e:
         logger.error(f"Error getting unread count: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        if conn is not None:
+            conn.close()
@@ -3,9 +3,12 @@ Evaluation routes - FastAPI migration of routes/evaluation_routes.py
 AI-powered evaluation endpoints for Phase 2 writing tasks.
 Preserves exact response shapes expected by the frontend.
 """
+import os
 import json
+import asyncio
 import logging
 from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from services.ai_service import AIService
 
 logger = logging.getLogger(__name__)
@@ -118,30 +121,24 @@ async def evaluate_writing(request: Request):
     """
     try:
         data = await request.json()
-        response_text = data.get('response', '').strip()
-        eval_prompt = data.get('prompt', '')
-        context = data.get('context', '')
-        task_type = data.get('task_type', 'writing')
+        return await evaluate_writing_item(
+            data.get('response', '').strip(),
+            data.get('prompt', ''),
+            data.get('context', ''),
+            data.get('task_type', 'writing'),
+        )
 
-        if not response_text:
-            return {
-                'is_correct': False,
-                'score': 0,
-                'feedback': 'No response provided.',
-                'suggestions': ['Please write your response.']
-            }
+    except Exception as e:
+        logger.error(f"Evaluation route error: {str(e)}")
+        return {
+            'is_correct': True,
+            'score': 70,
+            'feedback': 'Response recorded.',
+            'suggestions': []
+        }
 
-        # For very short responses, don't use AI
-        if len(response_text) < 10:
-            return {
-                'is_correct': False,
-                'score': 20,
-                'feedback': 'Your response is too short.',
-                'suggestions': ['Please provide a more detailed response.']
-            }
 
-        # Build AI evaluation prompt
-        system_prompt = """You are a CEFR language assessment expert evaluating student responses.
+WRITING_EVAL_SYSTEM_PROMPT = """You are a CEFR language assessment expert evaluating student responses.
 Evaluate the response based on:
 1. Task completion - Did they address what was asked?
 2. Language accuracy - Grammar, vocabulary, spelling
@@ -157,7 +154,44 @@ Respond in JSON format:
     "detected_level": "A1/A2/B1/B2"
 }"""
 
-        user_prompt = f"""
+
+def _strip_code_fences(result_text):
+    """Handle markdown code blocks around model JSON"""
+    if '```json' in result_text:
+        return result_text.split('```json')[1].split('```')[0]
+    if '```' in result_text:
+        return result_text.split('```')[1].split('```')[0]
+    return result_text
+
+
+def _short_circuit_writing(response_text):
+    """Results that never need the model (empty or very short responses)"""
+    if not response_text:
+        return {
+            'is_correct': False,
+            'score': 0,
+            'feedback': 'No response provided.',
+            'suggestions': ['Please write your response.']
+        }
+
+    # For very short responses, don't use AI
+    if len(response_text) < 10:
+        return {
+            'is_correct': False,
+            'score': 20,
+            'feedback': 'Your response is too short.',
+            'suggestions': ['Please provide a more detailed response.']
+        }
+    return None
+
+
+async def evaluate_writing_item(response_text, eval_prompt, context, task_type):
+    """Evaluate one writing response with the AI, falling back to evaluate_locally"""
+    short = _short_circuit_writing(response_text)
+    if short is not None:
+        return short
+
+    user_prompt = f"""
 Task Type: {task_type}
 Context/Instructions: {context}
 Evaluation Criteria: {eval_prompt}
@@ -168,69 +202,250 @@ Student Response:
 Evaluate this response and provide JSON feedback.
 """
 
-        # Try to get AI evaluation
-        if ai_service.client:
+    # Try to get AI evaluation
+    if ai_service.client:
+        try:
+            ai_response = await ai_service.complete_async(
+                messages=[
+                    {"role": "system", "content": WRITING_EVAL_SYSTEM_PROMPT},
+                    {"role": "user", "content": user_prompt}
+                ],
+                max_tokens=500,
+                temperature=0.3
+            )
+
+            # Parse JSON from response
             try:
-                ai_response = ai_service.client.chat.completions.create(
-                    model=ai_service.model,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
-                    max_tokens=500,
-                    temperature=0.3
-                )
+                return json.loads(_strip_code_fences(ai_response))
+            except json.JSONDecodeError:
+                # Fallback if JSON parsing fails
+                pass
 
-                result_text = ai_response.choices[0].message.content
+        except Exception as e:
+            logger.error(f"AI evaluation error: {str(e)}")
 
-                # Parse JSON from response
-                try:
-                    # Handle markdown code blocks
-                    if '```json' in result_text:
-                        result_text = result_text.split('```json')[1].split('```')[0]
-                    elif '```' in result_text:
-                        result_text = result_text.split('```')[1].split('```')[0]
+    # Fallback local evaluation
+    return evaluate_locally(response_text, context, task_type)
 
-                    result = json.loads(result_text)
-                    return result
-                except json.JSONDecodeError:
-                    # Fallback if JSON parsing fails
-                    pass
 
-            except Exception as e:
-                logger.error(f"AI evaluation error: {str(e)}")
+# ----------------------------------------------------------------------
+# Batch evaluation
+# ----------------------------------------------------------------------
+
+BATCH_MAX_ITEMS = int(os.getenv("FARDI_EVAL_BATCH_MAX_ITEMS", 300))
+BATCH_PARALLELISM = int(os.getenv("FARDI_EVAL_BATCH_PARALLELISM", 8))
+# Responses up to this many characters that share a rubric are packed into one prompt
+BATCH_PACK_MAX_CHARS = 300
+BATCH_PACK_SIZE = 8
+
 
-        # Fallback local evaluation
-        return evaluate_locally(response_text, context, task_type)
+def _plan_batch(items):
+    """
+    Split a batch into LLM work units.
+    Short responses sharing (task_type, prompt, context) are packed together;
+    everything else is evaluated on its own.
+    """
+    packs = {}
+    units = []
+    for index, item in enumerate(items):
+        text = item['response']
+        if len(text) <= BATCH_PACK_MAX_CHARS:
+            rubric = (item['task_type'], item['prompt'], item['context'])
+            pack = packs.get(rubric)
+            if pack is None or len(pack) >= BATCH_PACK_SIZE:
+                pack = packs[rubric] = []
+                units.append(pack)
+            pack.append(index)
+        else:
+            units.append([index])
+    return units
+
+
+async def _evaluate_pack(items, indices):
+    """Evaluate several short answers to the same rubric in one completion.
+    Returns {index: result}; items the model skipped or garbled are missing."""
+    first = items[indices[0]]
+    numbered = "\n".join(
+        f'{n + 1}. "{items[i]["response"]}"' for n, i in enumerate(indices)
+    )
+    user_prompt = f"""
+Task Type: {first['task_type']}
+Context/Instructions: {first['context']}
+Evaluation Criteria: {first['prompt']}
+
+Evaluate each of these {len(indices)} independent student responses separately:
+{numbered}
+
+Return a JSON array with exactly {len(indices)} objects in the same order, each in the format above plus "item": <number>.
+"""
+    ai_response = await ai_service.complete_async(
+        messages=[
+            {"role": "system", "content": WRITING_EVAL_SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ],
+        max_tokens=min(250 * len(indices), 4000),
+        temperature=0.3
+    )
+
+    parsed = json.loads(_strip_code_fences(ai_response))
+    if not isinstance(parsed, list):
+        return {}
+
+    results = {}
+    for position, entry in enumerate(parsed):
+        if not isinstance(entry, dict) or 'score' not in entry:
+            continue
+        number = entry.pop('item', position + 1)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            continue
+        if 1 <= number <= len(indices):
+            results[indices[number - 1]] = entry
+    return results
+
+
+async def _evaluate_unit(items, indices):
+    """Yield (index, result) pairs for one work unit, falling back locally per item"""
+    results = {}
+    if ai_service.client:
+        try:
+            if len(indices) == 1:
+                item = items[indices[0]]
+                results[indices[0]] = await evaluate_writing_item(
+                    item['response'], item['prompt'], item['context'], item['task_type']
+                )
+            else:
+                results = await _evaluate_pack(items, indices)
+        except Exception as e:
+            logger.error(f"Batch AI evaluation error: {str(e)}")
 
+    for index in indices:
+        result = results.get(index)
+        if result is None:
+            result = _fallback_result(items[index])
+        yield index, result
+
+
+def _fallback_result(item):
+    """evaluate_locally for one batch item, or a zero score if even that fails"""
+    try:
+        return evaluate_locally(item['response'], item['context'], item['task_type'])
     except Exception as e:
-        logger.error(f"Evaluation route error: {str(e)}")
+        logger.error(f"Local batch evaluation error: {str(e)}")
         return {
-            'is_correct': True,
-            'score': 70,
-            'feedback': 'Response recorded.',
+            'is_correct': False,
+            'score': 0,
+            'feedback': 'This response could not be evaluated.',
             'suggestions': []
         }
 
 
+async def _iter_batch_results(items, parallelism):
+    """Run the batch with at most `parallelism` LLM units in flight; yield results as they finish"""
+    queue = asyncio.Queue()
+    semaphore = asyncio.Semaphore(parallelism)
+    pending = []
+
+    # Trivial answers never reach the model
+    llm_items = []
+    for index, item in enumerate(items):
+        short = _short_circuit_writing(item['response'])
+        if short is None:
+            llm_items.append(index)
+        else:
+            queue.put_nowait((index, short))
+
+    async def run(indices):
+        # Every index must reach the queue, or the consumer below waits forever
+        remaining = set(indices)
+        try:
+            async with semaphore:
+                async for index, result in _evaluate_unit(items, indices):
+                    remaining.discard(index)
+                    await queue.put((index, result))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Batch unit error: {str(e)}")
+            for index in sorted(remaining):
+                await queue.put((index, _fallback_result(items[index])))
+
+    units = _plan_batch([items[i] for i in llm_items])
+    for unit in units:
+        pending.append(asyncio.ensure_future(run([llm_items[i] for i in unit])))
+
+    try:
+        for _ in range(len(items)):
+            yield await queue.get()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def _normalise_batch_item(raw):
+    """Batch item with defaults filled in; raises ValueError for a malformed one"""
+    if raw is None or isinstance(raw, str):
+        raw = {'response': raw or ''}
+    if not isinstance(raw, dict):
+        raise ValueError('Each item must be an object or a string')
+    fields = {'response': '', 'prompt': '', 'context': '', 'task_type': 'writing'}
+    for field, default in fields.items():
+        value = raw.get(field)
+        if value is None:
+            value = default
+        elif not isinstance(value, str):
+            raise ValueError(f'{field} must be a string')
+        fields[field] = value
+    fields['response'] = fields['response'].strip()
+    return {'id': raw.get('id'), **fields}
+
+
 @router.post('/evaluate-batch')
 async def evaluate_batch(request: Request):
     """
-    Evaluate multiple responses in batch
+    Evaluate multiple responses concurrently through the AI
+
+    Request body:
+    {
+        "responses": [{"response": "...", "prompt": "...", "context": "...", "task_type": "...", "id": optional}],
+        "parallelism": optional int, capped at FARDI_EVAL_BATCH_PARALLELISM,
+        "stream": optional bool - NDJSON lines {"index", "id", "result"} as items complete
+    }
+
+    Returns (non-streaming): list of results in request order.
+    Items the model cannot evaluate fall back to evaluate_locally.
     """
     try:
         data = await request.json()
         responses = data.get('responses', [])
-
-        results = []
-        for resp in responses:
-            result = evaluate_locally(
-                resp.get('response', ''),
-                resp.get('context', ''),
-                resp.get('task_type', 'writing')
+        if len(responses) > BATCH_MAX_ITEMS:
+            return JSONResponse(
+                status_code=413,
+                content={'error': f'Batch too large: {len(responses)} items (max {BATCH_MAX_ITEMS})'}
             )
-            results.append(result)
 
+        try:
+            items = [_normalise_batch_item(r) for r in responses]
+        except ValueError as e:
+            return JSONResponse(status_code=422, content={'error': str(e)})
+        try:
+            parallelism = int(data.get('parallelism') or BATCH_PARALLELISM)
+        except (TypeError, ValueError):
+            parallelism = BATCH_PARALLELISM
+        parallelism = max(1, min(parallelism, BATCH_PARALLELISM))
+
+        stream = data.get('stream') or 'application/x-ndjson' in request.headers.get('accept', '')
+        if stream:
+            async def ndjson():
+                async for index, result in _iter_batch_results(items, parallelism):
+                    yield json.dumps({'index': index, 'id': items[index]['id'], 'result': result}) + '\n'
+
+            return StreamingResponse(ndjson(), media_type='application/x-ndjson')
+
+        results = [None] * len(items)
+        async for index, result in _iter_batch_results(items, parallelism):
+            results[index] = result
         return results
 
     except Exception as e:
@@ -326,7 +541,7 @@ Current text: {current_text}
 
 Provide a brief, encouraging hint (1 sentence) to help complete this writing task.
 """
-                ai_response = ai_service.client.chat.completions.create(
+                ai_response = await ai_service.complete_async(
                     model=ai_service.model,
                     messages=[
                         {"role": "system", "content": "You are a helpful language learning assistant. Provide brief, encouraging hints."},
@@ -335,7 +550,7 @@ Provide a brief, encouraging hint (1 sentence) to help complete this writing tas
                     max_tokens=100,
                     temperature=0.7
                 )
-                hint = ai_response.choices[0].message.content.strip()
+                hint = ai_response.strip()
             except Exception as e:
                 logger.error(f"Hint generation error: {str(e)}")
 
@@ -439,7 +654,7 @@ Evaluate this sentence and assign a CEFR level. Consider:
 
 Return ONLY valid JSON."""
 
-                ai_response = ai_service.client.chat.completions.create(
+                ai_response = await ai_service.complete_async(
                     model=ai_service.model,
                     messages=[
                         {"role": "system", "content": system_prompt},
@@ -449,7 +664,7 @@ Return ONLY valid JSON."""
                     temperature=0.3
                 )
 
-                result_text = ai_response.choices[0].message.content.strip()
+                result_text = ai_response.strip()
 
                 # Parse JSON
                 if '```json' in result_text:
@@ -608,7 +823,7 @@ Student's expansion: "{expansion}"
 Is this expansion valid? Remember to be flexible for A2 level students.
 Return ONLY valid JSON."""
 
-                ai_response = ai_service.client.chat.completions.create(
+                ai_response = await ai_service.complete_async(
                     model=ai_service.model,
                     messages=[
                         {"role": "system", "content": system_prompt},
@@ -618,7 +833,7 @@ Return ONLY valid JSON."""
                     temperature=0.3
                 )
 
-                result_text = ai_response.choices[0].message.content.strip()
+                result_text = ai_response.strip()
 
                 # Parse JSON
                 if '```json' in result_text:
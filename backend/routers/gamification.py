@@ -11,7 +11,6 @@ from services.xp_service import XPService
 from services.achievement_service import AchievementService
 from services.streak_service import StreakService
 from models.gamification_data import PLAYER_LEVELS, ACHIEVEMENTS, RARITY_TIERS
-import sqlite3
 import logging
 
 logger = logging.getLogger(__name__)
@@ -21,9 +20,7 @@ router = APIRouter(prefix="/api/gamification", tags=["gamification"])
 
 def get_db_connection():
     """Get database connection"""
-    conn = sqlite3.connect('fardi.db')
-    conn.row_factory = sqlite3.Row
-    return conn
+    return db_manager.get_connection()
 
 
 # ============================================================
@@ -6,18 +6,17 @@ Preserves exact response shapes expected by the frontend.
 import json
 import re
 import logging
-import sqlite3
 from fastapi import APIRouter, Request, Depends, HTTPException
 from fastapi.responses import JSONResponse
 
 from auth_utils import get_current_user
+from dependencies import db_manager
 from services.ai_service import AIService
 
 
 def get_db_connection():
-    conn = sqlite3.connect('fardi.db')
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Get a pooled connection to the shared database"""
+    return db_manager.get_connection()
 
 
 def save_phase3_progress(user_id, step, interaction=None, context='main', score=None, item_id=None, item_type=None, prompt=None, answer=None, is_correct=None):
@@ -423,7 +422,7 @@ Respond ONLY with a JSON object in this exact format:
 
             try:
                 # Get AI evaluation
-                response = ai_service.get_ai_response(prompt)
+                response = await ai_service.get_ai_response_async(prompt)
 
                 # Extract JSON from response (in case there's extra text)
                 json_match = re.search(r'\{.*\}', response, re.DOTALL)
@@ -6,7 +6,6 @@ Preserves exact response shapes expected by the frontend.
 import json
 import re
 import logging
-import sqlite3
 
 from fastapi import APIRouter, Request, Depends, HTTPException
 from fastapi.responses import JSONResponse
@@ -25,9 +24,8 @@ ai_service = AIService()
 
 
 def get_db_connection_p4():
-    conn = sqlite3.connect('fardi.db')
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Get a pooled connection to the shared database"""
+    return db_manager.get_connection()
 
 
 def save_phase4_progress(
@@ -1193,7 +1191,7 @@ Student's Answer:
 Does this answer demonstrate comparison writing at {level} level?
 Return ONLY valid JSON."""
 
-                ai_response = ai_service.client.chat.completions.create(
+                ai_response = await ai_service.complete_async(
                     model=ai_service.model,
                     messages=[
                         {"role": "system", "content": system_prompt},
@@ -1203,7 +1201,7 @@ Return ONLY valid JSON."""
                     temperature=0.3
                 )
 
-                result_text = ai_response.choices[0].message.content.strip()
+                result_text = ai_response.strip()
 
                 # Parse JSON
                 if '```json' in result_text:
@@ -1430,7 +1428,7 @@ Respond ONLY with valid JSON array with exactly one result per sentence:
 
 Return ONLY valid JSON with results array."""
 
-                ai_response = ai_service.client.chat.completions.create(
+                ai_response = await ai_service.complete_async(
                     model=ai_service.model,
                     messages=[
                         {"role": "system", "content": system_prompt},
@@ -1440,7 +1438,7 @@ Return ONLY valid JSON with results array."""
                     temperature=0.2
                 )
 
-                result_text = ai_response.choices[0].message.content.strip()
+                result_text = ai_response.strip()
 
                 # Parse JSON
                 if '```json' in result_text:
@@ -1549,7 +1547,7 @@ Student's Answer: "{user_answer}"
 Is this sentence correct at A1 level? Remember to ignore minor spelling mistakes.
 Return ONLY valid JSON."""
 
-                ai_response = ai_service.client.chat.completions.create(
+                ai_response = await ai_service.complete_async(
                     model=ai_service.model,
                     messages=[
                         {"role": "system", "content": system_prompt},
@@ -1559,7 +1557,7 @@ Return ONLY valid JSON."""
                     temperature=0.2
                 )
 
-                result_text = ai_response.choices[0].message.content.strip()
+                result_text = ai_response.strip()
 
                 # Parse JSON
                 if '```json' in result_text:
@@ -1691,7 +1689,7 @@ Student's Answer:
 Evaluate this definition and assign a CEFR level.
 Return ONLY valid JSON."""
 
-                ai_response = ai_service.client.chat.completions.create(
+                ai_response = await ai_service.complete_async(
                     model=ai_service.model,
                     messages=[
                         {"role": "system", "content": system_prompt},
@@ -1701,7 +1699,7 @@ Return ONLY valid JSON."""
                     temperature=0.3
                 )
 
-                result_text = ai_response.choices[0].message.content.strip()
+                result_text = ai_response.strip()
 
                 # Parse JSON
                 if '```json' in result_text:
@@ -2059,7 +2057,7 @@ Student's answer: "{student_answer}"
 
 Evaluate and return ONLY valid JSON."""
 
-                    ai_response = ai_service.client.chat.completions.create(
+                    ai_response = await ai_service.complete_async(
                         model=ai_service.model,
                         messages=[
                             {"role": "system", "content": system_prompt},
@@ -2069,7 +2067,7 @@ Evaluate and return ONLY valid JSON."""
                         temperature=0.3
                     )
 
-                    result_text = ai_response.choices[0].message.content.strip()
+                    result_text = ai_response.strip()
 
                     # Parse JSON
                     if '```json' in result_text:
@@ -2174,8 +2172,8 @@ async def evaluate_b2_explanations(request: Request, user: dict = Depends(get_cu
                         explanations_text += f"\n--- Explanation {i} ---\nTerm: {expl['term']}\nQuestion: {expl['question']}\nExpected concepts: {', '.join(expl['expected_concepts'])}\nStudent's answer: \"{expl['answer']}\"\n"
                     system_prompt = "You are evaluating B2 level English explanations for advertising concepts.\nFor EACH explanation, evaluate based on: 1) B2-level depth 2) Video reference 3) Specific concepts 4) Clear paragraph 5) 2-3 sentences min.\nScore 1 if B2-level depth with video reference. Score 0 if too simple.\nRespond ONLY with valid JSON: {\"results\": [{\"score\": 0 or 1, \"feedback\": \"brief feedback\"}, ...]}"
                     user_prompt = f"Evaluate these {len(valid_explanations)} B2 explanations:{explanations_text}\nReturn ONLY valid JSON with results array."
-                    ai_response = ai_service.client.chat.completions.create(model=ai_service.model, messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}], max_tokens=1500, temperature=0.3)
-                    result_text = ai_response.choices[0].message.content.strip()
+                    ai_response = await ai_service.complete_async(model=ai_service.model, messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}], max_tokens=1500, temperature=0.3)
+                    result_text = ai_response.strip()
                     if '```json' in result_text:
                         result_text = result_text.split('```json')[1].split('```')[0]
                     elif '```' in result_text:
@@ -2232,8 +2230,8 @@ async def evaluate_game_explanation(request: Request):
             try:
                 system_prompt = f"You are a CEFR language assessment expert evaluating explanations about game-based vocabulary learning.\nCEFR Scoring: A1(1): very basic. A2(2): mentions vocab word, 5+ words. B1(3): word + game element, 8+ words. B2(4): word + game + video ref, 12+ words. C1(5): sophisticated connection, 15+ words.\nExpected elements: {', '.join(expected_elements)}\nVocabulary words: {', '.join(vocabulary_words)}\nRespond ONLY in JSON: {{\"score\": 1-5, \"level\": \"A1\"|\"A2\"|\"B1\"|\"B2\"|\"C1\", \"feedback\": \"1-2 sentences\"}}"
                 user_prompt = f"Question: {data.get('question', '')}\n\nStudent's Answer:\n\"{answer}\"\n\nReturn ONLY valid JSON."
-                ai_response = ai_service.client.chat.completions.create(model=ai_service.model, messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}], max_tokens=150, temperature=0.3)
-                result_text = ai_response.choices[0].message.content.strip()
+                ai_response = await ai_service.complete_async(model=ai_service.model, messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}], max_tokens=150, temperature=0.3)
+                result_text = ai_response.strip()
                 if '```json' in result_text:
                     result_text = result_text.split('```json')[1].split('```')[0]
                 elif '```' in result_text:
@@ -2279,8 +2277,8 @@ async def evaluate_b2_spell_explanation(request: Request, user: dict = Depends(g
             try:
                 system_prompt = f"You are evaluating a B2 level English explanation for '{term}'.\nExpected concepts: {', '.join(expected_concepts)}\nScore 1 if B2-level depth with video reference. Score 0 if too simple.\nRespond ONLY in JSON: {{\"score\": 0 or 1, \"feedback\": \"brief feedback\"}}"
                 user_prompt = f"Term: {term}\nStudent's explanation: \"{explanation}\"\nReturn ONLY valid JSON."
-                ai_response = ai_service.client.chat.completions.create(model=ai_service.model, messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}], max_tokens=200, temperature=0.3)
-                result_text = ai_response.choices[0].message.content.strip()
+                ai_response = await ai_service.complete_async(model=ai_service.model, messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}], max_tokens=200, temperature=0.3)
+                result_text = ai_response.strip()
                 if '```json' in result_text:
                     result_text = result_text.split('```json')[1].split('```')[0]
                 elif '```' in result_text:
@@ -2335,8 +2333,8 @@ async def evaluate_c1_analyses(request: Request, user: dict = Depends(get_curren
                         analyses_text += f"\n--- Analysis {i} ---\nTerm: {anal['term']}\nQuestion: {anal['question']}\nExample: {anal['example']}\nExpected concepts: {', '.join(anal['expected_concepts'])}\nStudent's answer: \"{anal['answer']}\"\n"
                     system_prompt = "You are evaluating C1 level English analytical sentences for advertising concepts.\nFor EACH analysis, evaluate: 1) Nuanced understanding 2) Analytical depth 3) Video reference 4) Sophisticated vocabulary 5) Addresses complexity/trade-offs.\nScore 1 if C1-level sophistication. Score 0 if too simple.\nRespond ONLY with valid JSON: {\"results\": [{\"score\": 0 or 1, \"feedback\": \"brief feedback\"}, ...]}"
                     user_prompt = f"Evaluate these {len(valid_analyses)} C1 analytical sentences:{analyses_text}\nReturn ONLY valid JSON."
-                    ai_response = ai_service.client.chat.completions.create(model=ai_service.model, messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}], max_tokens=1500, temperature=0.3)
-                    result_text = ai_response.choices[0].message.content.strip()
+                    ai_response = await ai_service.complete_async(model=ai_service.model, messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}], max_tokens=1500, temperature=0.3)
+                    result_text = ai_response.strip()
                     if '```json' in result_text:
                         result_text = result_text.split('```json')[1].split('```')[0]
                     elif '```' in result_text:
@@ -2396,8 +2394,8 @@ async def evaluate_c1_justification(request: Request, user: dict = Depends(get_c
             try:
                 system_prompt = "You are evaluating C1 level English justifications for quiz answers about advertising.\nScore 1 if has video reference + relevant concepts + explains why. Score 0 if missing.\nRespond ONLY with valid JSON: {\"score\": 0 or 1, \"feedback\": \"brief feedback\"}"
                 user_prompt = f"Question: {question}\nCorrect Answer: {correct_answer}\nExpected video: {video_reference}\nExpected concepts: {', '.join(expected_concepts)}\nStudent's justification: \"{justification}\"\nReturn JSON."
-                ai_response = ai_service.client.chat.completions.create(model=ai_service.model, messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}], max_tokens=200, temperature=0.3)
-                result_text = ai_response.choices[0].message.content.strip()
+                ai_response = await ai_service.complete_async(model=ai_service.model, messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}], max_tokens=200, temperature=0.3)
+                result_text = ai_response.strip()
                 if '```json' in result_text:
                     result_text = result_text.split('```json')[1].split('```')[0]
                 elif '```' in result_text:
@@ -2433,8 +2431,8 @@ async def evaluate_c1_critique(request: Request, user: dict = Depends(get_curren
             try:
                 system_prompt = "You are evaluating C1 level English critiques of advertising terms.\nA good critique must: 1) Show NUANCE 2) Address BOTH strengths AND weaknesses 3) Use relevant concepts 4) Show critical thinking.\nScore 1 if clear nuance with relevant concepts. Score 0 if too simple.\nRespond ONLY with valid JSON: {\"score\": 0 or 1, \"feedback\": \"brief feedback\"}"
                 user_prompt = f"Term: {term}\nExpected concepts: {', '.join(expected_concepts)}\nVideo reference: {video_reference}\nStudent's critique: \"{critique}\"\nReturn JSON."
-                ai_response = ai_service.client.chat.completions.create(model=ai_service.model, messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}], max_tokens=200, temperature=0.3)
-                result_text = ai_response.choices[0].message.content.strip()
+                ai_response = await ai_service.complete_async(model=ai_service.model, messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}], max_tokens=200, temperature=0.3)
+                result_text = ai_response.strip()
                 if '```json' in result_text:
                     result_text = result_text.split('```json')[1].split('```')[0]
                 elif '```' in result_text:
@@ -2480,8 +2478,8 @@ async def evaluate_c1_critiques_batch(request: Request, user: dict = Depends(get
                         critiques_text += f"\n--- Critique {i} ---\nTerm: {crit['term']}\nExpected concepts: {', '.join(crit['expected_concepts'])}\nStudent's critique: \"{crit['critique']}\"\n"
                     system_prompt = "You are evaluating C1 level English critiques of advertising terms.\nFor EACH critique: Score 1 if clear nuance (both pros and cons) with relevant concepts. Score 0 if too simple.\nRespond ONLY with valid JSON: {\"results\": [{\"score\": 0 or 1, \"feedback\": \"brief feedback\"}, ...]}"
                     user_prompt = f"Evaluate these {len(valid_critiques)} C1 critiques:{critiques_text}\nReturn ONLY valid JSON."
-                    ai_response = ai_service.client.chat.completions.create(model=ai_service.model, messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}], max_tokens=1200, temperature=0.3)
-                    result_text = ai_response.choices[0].message.content.strip()
+                    ai_response = await ai_service.complete_async(model=ai_service.model, messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}], max_tokens=1200, temperature=0.3)
+                    result_text = ai_response.strip()
                     if '```json' in result_text:
                         result_text = result_text.split('```json')[1].split('```')[0]
                     elif '```' in result_text:
@@ -2538,8 +2536,8 @@ async def evaluate_c1_clauses_batch(request: Request):
         for i, sent in enumerate(sentences, 1):
             sentences_text += f"\n--- Sentence {i} ---\nSentence: {sent.get('sentence', '')}\nGrammar Concept: {sent.get('concept', '')}\n"
         prompt = f"You are evaluating C1-level English grammar focusing on RELATIVE CLAUSES and PASSIVE VOICE.\n{sentences_text}\nFor EACH sentence, provide Score (1 or 0) and Feedback.\nFormat:\nSentence 1:\nScore: [0 or 1]\nFeedback: [brief feedback]\n..."
-        ai_response = ai_service.client.chat.completions.create(model=ai_service.model, messages=[{"role": "system", "content": "You are an expert English grammar teacher specializing in C1-level evaluation."}, {"role": "user", "content": prompt}], max_tokens=1000, temperature=0.3)
-        evaluation_text = ai_response.choices[0].message.content
+        ai_response = await ai_service.complete_async(model=ai_service.model, messages=[{"role": "system", "content": "You are an expert English grammar teacher specializing in C1-level evaluation."}, {"role": "user", "content": prompt}], max_tokens=1000, temperature=0.3)
+        evaluation_text = ai_response
         results = []
         sentence_blocks = evaluation_text.split('Sentence ')[1:]
         for block in sentence_blocks:
@@ -2572,12 +2570,12 @@ async def _ai_evaluate_json(system_prompt: str, user_prompt: str, max_tokens: in
     if not ai_service.client:
         return None
     try:
-        ai_response = ai_service.client.chat.completions.create(
+        ai_response = await ai_service.complete_async(
             model=model or ai_service.model,
             messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}],
             max_tokens=max_tokens, temperature=0.3
         )
-        result_text = ai_response.choices[0].message.content.strip()
+        result_text = ai_response.strip()
         if '```json' in result_text:
             result_text = result_text.split('```json')[1].split('```')[0]
         elif '```' in result_text:
@@ -2875,8 +2873,8 @@ async def evaluate_step4_b1_definitions(request: Request, user: dict = Depends(g
                     example_answer = examples.get(term, '')
                     system_prompt = f"You are evaluating a B1 level English definition for '{term}' in advertising context.\nExample: {example_answer}\nBE FLEXIBLE. Score 1 if understanding shown. Score 0 if irrelevant.\nRespond ONLY in JSON: {{\"score\": 0 or 1, \"feedback\": \"brief feedback\"}}"
                     user_prompt = f"Term: {term}\nStudent's answer: \"{student_answer}\"\nReturn ONLY valid JSON."
-                    ai_response = ai_service.client.chat.completions.create(model=ai_service.model, messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}], max_tokens=150, temperature=0.3)
-                    response_text = ai_response.choices[0].message.content.strip()
+                    ai_response = await ai_service.complete_async(model=ai_service.model, messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}], max_tokens=150, temperature=0.3)
+                    response_text = ai_response.strip()
                     evaluation = json.loads(response_text)
                     score = evaluation.get('score', 0)
                     results.append({'term': term, 'score': score, 'feedback': evaluation.get('feedback', 'Good effort!')})
@@ -2918,10 +2916,8 @@ async def calculate_step4_b1_final_score(request: Request, user: dict = Depends(
         user_id = user["user_id"]
         logger.info(f"Step 4 B1 Scores - A:{task_a}/4, B:{task_b}/8, C:{task_c}/6, D:{task_d}/8, E:{task_e}/6, F:{task_f}/6 = {total}/38 {'PASS' if passed else 'FAIL'} -> {next_url}")
         try:
-            db = sqlite3.connect('fardi.db')
-            cursor = db.cursor()
-            cursor.execute('INSERT INTO remedial_scores (user_id, phase, step, level, task_a_score, task_b_score, task_c_score, task_d_score, task_e_score, task_f_score, total_score, max_score, passed, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)', (user_id, 4, 4, 'B1', task_a, task_b, task_c, task_d, task_e, task_f, total, 38, passed))
-            db.commit()
+            with db_manager.connection() as db:
+                db.execute('INSERT INTO remedial_scores (user_id, phase, step, level, task_a_score, task_b_score, task_c_score, task_d_score, task_e_score, task_f_score, total_score, max_score, passed, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)', (user_id, 4, 4, 'B1', task_a, task_b, task_c, task_d, task_e, task_f, total, 38, passed))
         except Exception as db_error:
             logger.error(f"Database error: {db_error}")
         return {'success': True, 'data': {'task_a': task_a, 'task_b': task_b, 'task_c': task_c, 'task_d': task_d, 'task_e': task_e, 'task_f': task_f, 'total': total, 'max_score': 38, 'threshold': 22, 'passed': passed, 'next_url': next_url}}
@@ -3292,7 +3288,7 @@ Student's correction: "{user_answer}"
 Evaluate if this correction meets {level}-level requirements.
 Return ONLY valid JSON."""
 
-                ai_response = ai_service.client.chat.completions.create(
+                ai_response = await ai_service.complete_async(
                     model=ai_service.model,
                     messages=[
                         {"role": "system", "content": system_prompt},
@@ -3300,7 +3296,7 @@ Return ONLY valid JSON."""
                     ],
                     max_tokens=200, temperature=0.3
                 )
-                result_text = ai_response.choices[0].message.content.strip()
+                result_text = ai_response.strip()
                 if '```json' in result_text:
                     result_text = result_text.split('```json')[1].split('```')[0]
                 elif '```' in result_text:
@@ -3366,7 +3362,7 @@ Student's answer: "{user_answer}"
 Evaluate if this answer meets C1-level requirements and demonstrates understanding.
 Return ONLY valid JSON."""
 
-                ai_response = ai_service.client.chat.completions.create(
+                ai_response = await ai_service.complete_async(
                     model=ai_service.model,
                     messages=[
                         {"role": "system", "content": system_prompt},
@@ -3374,7 +3370,7 @@ Return ONLY valid JSON."""
                     ],
                     max_tokens=200, temperature=0.3
                 )
-                result_text = ai_response.choices[0].message.content.strip()
+                result_text = ai_response.strip()
                 if '```json' in result_text:
                     result_text = result_text.split('```json')[1].split('```')[0]
                 elif '```' in result_text:
@@ -3444,7 +3440,7 @@ Student's correction: "{user_answer}"
 Evaluate if this correction meets C1-level requirements for tense, grammar, and structure.
 Return ONLY valid JSON."""
 
-                ai_response = ai_service.client.chat.completions.create(
+                ai_response = await ai_service.complete_async(
                     model=ai_service.model,
                     messages=[
                         {"role": "system", "content": system_prompt},
@@ -3452,7 +3448,7 @@ Return ONLY valid JSON."""
                     ],
                     max_tokens=200, temperature=0.3
                 )
-                result_text = ai_response.choices[0].message.content.strip()
+                result_text = ai_response.strip()
                 if '```json' in result_text:
                     result_text = result_text.split('```json')[1].split('```')[0]
                 elif '```' in result_text:
@@ -3528,7 +3524,7 @@ Student's answer: "{user_answer}"
 Did the student correctly recognize this sentence as grammatically correct?
 Return ONLY valid JSON."""
 
-                ai_response = ai_service.client.chat.completions.create(
+                ai_response = await ai_service.complete_async(
                     model=ai_service.model,
                     messages=[
                         {"role": "system", "content": system_prompt},
@@ -3536,7 +3532,7 @@ Return ONLY valid JSON."""
                     ],
                     max_tokens=150, temperature=0.3
                 )
-                result_text = ai_response.choices[0].message.content.strip()
+                result_text = ai_response.strip()
                 if '```json' in result_text:
                     result_text = result_text.split('```json')[1].split('```')[0]
                 elif '```' in result_text:
@@ -3616,7 +3612,7 @@ Student's answer: "{user_answer}"
 Did the student correctly recognize this sentence has proper subjunctive/modal usage?
 Return ONLY valid JSON."""
 
-                ai_response = ai_service.client.chat.completions.create(
+                ai_response = await ai_service.complete_async(
                     model=ai_service.model,
                     messages=[
                         {"role": "system", "content": system_prompt},
@@ -3626,7 +3622,7 @@ Return ONLY valid JSON."""
                     temperature=0.3
                 )
 
-                result_text = ai_response.choices[0].message.content.strip()
+                result_text = ai_response.strip()
                 if '```json' in result_text:
                     result_text = result_text.split('```json')[1].split('```')[0]
                 elif '```' in result_text:
@@ -3702,7 +3698,7 @@ Student's correction: "{user_answer}"
 Did the student successfully fix all the errors at C1 level?
 Return ONLY valid JSON."""
 
-                ai_response = ai_service.client.chat.completions.create(
+                ai_response = await ai_service.complete_async(
                     model=ai_service.model,
                     messages=[
                         {"role": "system", "content": system_prompt},
@@ -3712,7 +3708,7 @@ Return ONLY valid JSON."""
                     temperature=0.3
                 )
 
-                result_text = ai_response.choices[0].message.content.strip()
+                result_text = ai_response.strip()
                 if '```json' in result_text:
                     result_text = result_text.split('```json')[1].split('```')[0]
                 elif '```' in result_text:
@@ -3785,7 +3781,7 @@ Student's correction: "{user_answer}"
 Did the student successfully fix the subjunctive/modal error at C1 level?
 Return ONLY valid JSON."""
 
-                ai_response = ai_service.client.chat.completions.create(
+                ai_response = await ai_service.complete_async(
                     model=ai_service.model,
                     messages=[
                         {"role": "system", "content": system_prompt},
@@ -3795,7 +3791,7 @@ Return ONLY valid JSON."""
                     temperature=0.3
                 )
 
-                result_text = ai_response.choices[0].message.content.strip()
+                result_text = ai_response.strip()
                 if '```json' in result_text:
                     result_text = result_text.split('```json')[1].split('```')[0]
                 elif '```' in result_text:
@@ -3915,7 +3911,7 @@ Return a JSON object with:
 
             user_prompt = f"Student response:\n{response}"
 
-            ai_response = ai_service.client.chat.completions.create(
+            ai_response = await ai_service.complete_async(
                 model="llama-3.1-70b-versatile",
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -3925,7 +3921,7 @@ Return a JSON object with:
                 temperature=0.3
             )
 
-            result_text = ai_response.choices[0].message.content.strip()
+            result_text = ai_response.strip()
             if '```json' in result_text:
                 result_text = result_text.split('```json')[1].split('```')[0]
             elif '```' in result_text:
@@ -4089,7 +4085,7 @@ Return ONLY JSON:
   "feedback": "<constructive feedback>"
 }"""
 
-            ai_response = ai_service.client.chat.completions.create(
+            ai_response = await ai_service.complete_async(
                 model="llama-3.1-70b-versatile",
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -4098,7 +4094,7 @@ Return ONLY JSON:
                 max_tokens=250,
                 temperature=0.3
             )
-            result_text = ai_response.choices[0].message.content.strip()
+            result_text = ai_response.strip()
             if '```json' in result_text:
                 result_text = result_text.split('```json')[1].split('```')[0]
             elif '```' in result_text:
@@ -4183,7 +4179,7 @@ Return a JSON object with:
 
             user_prompt = f"Original caption:\n{caption}\n\nStudent explanation:\n{explanation}"
 
-            ai_response = ai_service.client.chat.completions.create(
+            ai_response = await ai_service.complete_async(
                 model="llama-3.1-70b-versatile",
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -4193,7 +4189,7 @@ Return a JSON object with:
                 temperature=0.3
             )
 
-            result_text = ai_response.choices[0].message.content.strip()
+            result_text = ai_response.strip()
             if '```json' in result_text:
                 result_text = result_text.split('```json')[1].split('```')[0]
             elif '```' in result_text:
@@ -4265,7 +4261,7 @@ Return a JSON object with:
 
             user_prompt = f"Original caption:\n{original_caption}\n\nStudent revision:\n{revision}"
 
-            ai_response = ai_service.client.chat.completions.create(
+            ai_response = await ai_service.complete_async(
                 model="llama-3.1-70b-versatile",
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -4275,7 +4271,7 @@ Return a JSON object with:
                 temperature=0.3
             )
 
-            result_text = ai_response.choices[0].message.content.strip()
+            result_text = ai_response.strip()
             if '```json' in result_text:
                 result_text = result_text.split('```json')[1].split('```')[0]
             elif '```' in result_text:
@@ -4341,7 +4337,7 @@ Return ONLY a JSON object:
 }}"""
 
         try:
-            ai_response = ai_service.evaluate_response(ai_prompt, max_tokens=300)
+            ai_response = await ai_service.evaluate_response_async(ai_prompt, max_tokens=300)
             result = json.loads(ai_response)
             return {'success': True, 'score': result.get('score', 1), 'level': result.get('level', 'A2'), 'feedback': result.get('feedback', 'Good effort!'), 'details': {}}
         except Exception as ai_error:
@@ -4403,7 +4399,7 @@ Return ONLY a JSON object:
 }}"""
 
         try:
-            ai_response = ai_service.evaluate_response(ai_prompt, max_tokens=300)
+            ai_response = await ai_service.evaluate_response_async(ai_prompt, max_tokens=300)
             result = json.loads(ai_response)
             return {'success': True, 'score': result.get('score', 1), 'level': result.get('level', 'A2'), 'feedback': result.get('feedback', 'Good effort!'), 'details': {}}
         except Exception as ai_error:
@@ -4468,7 +4464,7 @@ Return ONLY a JSON object:
 }}"""
 
         try:
-            ai_response = ai_service.evaluate_response(ai_prompt, max_tokens=300)
+            ai_response = await ai_service.evaluate_response_async(ai_prompt, max_tokens=300)
             result = json.loads(ai_response)
             return {'success': True, 'score': result.get('score', 1), 'level': result.get('level', 'A2'), 'feedback': result.get('feedback', 'Good effort!'), 'details': {}}
         except Exception as ai_error:
@@ -4535,7 +4531,7 @@ Return ONLY a JSON object:
 }}"""
 
         try:
-            ai_response = ai_service.evaluate_response(ai_prompt, max_tokens=300)
+            ai_response = await ai_service.evaluate_response_async(ai_prompt, max_tokens=300)
             result = json.loads(ai_response)
             return {'success': True, 'score': result.get('score', 1), 'level': result.get('level', 'A2'), 'feedback': result.get('feedback', 'Good effort!'), 'details': {}}
         except Exception as ai_error:
@@ -4601,7 +4597,7 @@ Return ONLY a JSON object:
 }}"""
 
         try:
-            ai_response = ai_service.evaluate_response(ai_prompt, max_tokens=300)
+            ai_response = await ai_service.evaluate_response_async(ai_prompt, max_tokens=300)
             result = json.loads(ai_response)
             return {'success': True, 'score': result.get('score', 1), 'level': result.get('level', 'A2'), 'feedback': result.get('feedback', 'Good effort!'), 'details': {}}
         except Exception as ai_error:
@@ -4669,7 +4665,7 @@ Return ONLY a JSON object:
 }}"""
 
         try:
-            ai_response = ai_service.evaluate_response(ai_prompt, max_tokens=300)
+            ai_response = await ai_service.evaluate_response_async(ai_prompt, max_tokens=300)
             result = json.loads(ai_response)
             return {'success': True, 'score': result.get('score', 1), 'level': result.get('level', 'A2'), 'feedback': result.get('feedback', 'Good effort!'), 'details': {}}
         except Exception as ai_error:
@@ -4733,7 +4729,7 @@ Return ONLY a JSON object:
 }}"""
 
         try:
-            ai_response = ai_service.evaluate_response(ai_prompt, max_tokens=300)
+            ai_response = await ai_service.evaluate_response_async(ai_prompt, max_tokens=300)
             result = json.loads(ai_response)
             return {'success': True, 'score': result.get('score', 3), 'feedback': result.get('feedback', 'Good spelling corrections!'), 'details': {}}
         except Exception as ai_error:
@@ -4787,7 +4783,7 @@ Return ONLY a JSON object:
 }}"""
 
         try:
-            ai_response = ai_service.evaluate_response(ai_prompt, max_tokens=300)
+            ai_response = await ai_service.evaluate_response_async(ai_prompt, max_tokens=300)
             result = json.loads(ai_response)
             return {'success': True, 'score': result.get('score', 3), 'feedback': result.get('feedback', 'Good grammar corrections!'), 'details': {}}
         except Exception as ai_error:
@@ -4842,7 +4838,7 @@ Return ONLY a JSON object:
 }}"""
 
         try:
-            ai_response = ai_service.evaluate_response(ai_prompt, max_tokens=300)
+            ai_response = await ai_service.evaluate_response_async(ai_prompt, max_tokens=300)
             result = json.loads(ai_response)
             return {'success': True, 'score': result.get('score', 3), 'feedback': result.get('feedback', 'Good enhancements!'), 'details': {}}
         except Exception as ai_error:
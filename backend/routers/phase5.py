@@ -16,25 +16,22 @@ import json
 import logging
 import math
 import re
-import sqlite3
 
 router = APIRouter(prefix="/api/phase5", tags=["phase5"])
 
 logger = logging.getLogger(__name__)
 
 # Initialize services
-powerup_service = PowerUpService()
-collectible_service = CollectibleService()
-avatar_service = AvatarService()
-adaptive_service = AdaptiveService()
+powerup_service = PowerUpService(db_manager)
+collectible_service = CollectibleService(db_manager)
+avatar_service = AvatarService(db_manager)
+adaptive_service = AdaptiveService(db_manager)
 ai_service = AIService()
 
 
 def get_db_connection():
     """Get database connection"""
-    conn = sqlite3.connect('fardi.db')
-    conn.row_factory = sqlite3.Row
-    return conn
+    return db_manager.get_connection()
 
 
 def _phase5_subphase1_step_path(step: int) -> str:
@@ -463,7 +460,7 @@ async def evaluate_step1_interaction2(request: Request, user: dict = Depends(get
         }}
         """
         try:
-            ai_response = ai_service.get_ai_response(evaluation_prompt)
+            ai_response = await ai_service.get_ai_response_async(evaluation_prompt)
             json_match = re.search(r'\{.*\}', ai_response, re.DOTALL)
             if json_match:
                 evaluation = json.loads(json_match.group())
@@ -685,7 +682,7 @@ async def evaluate_step2_interaction1_announcement(request: Request, user: dict
         }}
         """
         try:
-            ai_response = ai_service.get_ai_response(evaluation_prompt)
+            ai_response = await ai_service.get_ai_response_async(evaluation_prompt)
             json_match = re.search(r'\{.*\}', ai_response, re.DOTALL)
             if json_match:
                 evaluation = json.loads(json_match.group())
@@ -772,7 +769,7 @@ async def evaluate_step2_interaction2(request: Request, user: dict = Depends(get
         }}
         """
         try:
-            ai_response = ai_service.get_ai_response(evaluation_prompt)
+            ai_response = await ai_service.get_ai_response_async(evaluation_prompt)
             json_match = re.search(r'\{.*\}', ai_response, re.DOTALL)
             if json_match:
                 evaluation = json.loads(json_match.group())
@@ -887,7 +884,7 @@ async def evaluate_step2_interaction3_revision(request: Request, user: dict = De
         }}
         """
         try:
-            ai_response = ai_service.get_ai_response(evaluation_prompt)
+            ai_response = await ai_service.get_ai_response_async(evaluation_prompt)
             json_match = re.search(r'\{.*\}', ai_response, re.DOTALL)
             if json_match:
                 evaluation = json.loads(json_match.group())
@@ -1085,7 +1082,7 @@ async def evaluate_step3_interaction1_definition(request: Request, user: dict =
         }}
         """
         try:
-            ai_response = ai_service.get_ai_response(evaluation_prompt)
+            ai_response = await ai_service.get_ai_response_async(evaluation_prompt)
             json_match = re.search(r'\{.*\}', ai_response, re.DOTALL)
             if json_match:
                 evaluation = json.loads(json_match.group())
@@ -1179,7 +1176,7 @@ async def evaluate_step3_interaction2(request: Request, user: dict = Depends(get
         }}
         """
         try:
-            ai_response = ai_service.get_ai_response(evaluation_prompt)
+            ai_response = await ai_service.get_ai_response_async(evaluation_prompt)
             json_match = re.search(r'\{.*\}', ai_response, re.DOTALL)
             if json_match:
                 evaluation = json.loads(json_match.group())
@@ -1300,7 +1297,7 @@ async def evaluate_step3_interaction3_term_explanation(request: Request, user: d
         }}
         """
         try:
-            ai_response = ai_service.get_ai_response(evaluation_prompt)
+            ai_response = await ai_service.get_ai_response_async(evaluation_prompt)
             json_match = re.search(r'\{.*\}', ai_response, re.DOTALL)
             if json_match:
                 evaluation = json.loads(json_match.group())
@@ -1478,7 +1475,7 @@ async def evaluate_step4_interaction1_social_media(request: Request, user: dict
         }}
         """
         try:
-            ai_response = ai_service.get_ai_response(evaluation_prompt)
+            ai_response = await ai_service.get_ai_response_async(evaluation_prompt)
             json_match = re.search(r'\{.*\}', ai_response, re.DOTALL)
             if json_match:
                 evaluation = json.loads(json_match.group())
@@ -1573,7 +1570,7 @@ async def evaluate_step4_interaction2_email(request: Request, user: dict = Depen
         }}
         """
         try:
-            ai_response = ai_service.get_ai_response(evaluation_prompt)
+            ai_response = await ai_service.get_ai_response_async(evaluation_prompt)
             json_match = re.search(r'\{.*\}', ai_response, re.DOTALL)
             if json_match:
                 evaluation = json.loads(json_match.group())
@@ -1687,7 +1684,7 @@ async def evaluate_step4_interaction3_revision(request: Request, user: dict = De
         }}
         """
         try:
-            ai_response = ai_service.get_ai_response(evaluation_prompt)
+            ai_response = await ai_service.get_ai_response_async(evaluation_prompt)
             json_match = re.search(r'\{.*\}', ai_response, re.DOTALL)
             if json_match:
                 evaluation = json.loads(json_match.group())
@@ -1857,7 +1854,7 @@ async def evaluate_step5_interaction1_spelling(request: Request, user: dict = De
           "spelling_errors_found": [], "spelling_errors_corrected": [], "missed_errors": [], "accuracy_percentage": 0-100}}
         """
         try:
-            ai_response = ai_service.get_ai_response(evaluation_prompt)
+            ai_response = await ai_service.get_ai_response_async(evaluation_prompt)
             json_match = re.search(r'\{.*\}', ai_response, re.DOTALL)
             if json_match:
                 evaluation = json.loads(json_match.group())
@@ -1926,7 +1923,7 @@ async def evaluate_step5_interaction2_grammar(request: Request, user: dict = Dep
           "grammar_errors_found": [], "grammar_errors_corrected": [], "missed_errors": [], "accuracy_percentage": 0-100}}
         """
         try:
-            ai_response = ai_service.get_ai_response(evaluation_prompt)
+            ai_response = await ai_service.get_ai_response_async(evaluation_prompt)
             json_match = re.search(r'\{.*\}', ai_response, re.DOTALL)
             if json_match:
                 evaluation = json.loads(json_match.group())
@@ -2015,7 +2012,7 @@ async def evaluate_step5_interaction3_enhancement(request: Request, user: dict =
           "enhancement_percentage": 0-100}}
         """
         try:
-            ai_response = ai_service.get_ai_response(evaluation_prompt)
+            ai_response = await ai_service.get_ai_response_async(evaluation_prompt)
             json_match = re.search(r'\{.*\}', ai_response, re.DOTALL)
             if json_match:
                 evaluation = json.loads(json_match.group())
@@ -2300,7 +2297,7 @@ async def evaluate_subphase2_step1_interaction2(request: Request, user: dict = D
           "vocabulary_used": [], "strengths": [], "improvements": []}}
         """
         try:
-            ai_response = ai_service.get_ai_response(evaluation_prompt)
+            ai_response = await ai_service.get_ai_response_async(evaluation_prompt)
             json_match = re.search(r'\{.*\}', ai_response, re.DOTALL)
             if json_match:
                 evaluation = json.loads(json_match.group())
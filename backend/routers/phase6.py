@@ -9,10 +9,10 @@ Migrated from routes/phase6_routes.py (Flask Blueprint).
 
 from fastapi import APIRouter, Depends, Request, HTTPException
 from auth_utils import get_current_user
+from dependencies import db_manager
 from services.ai_service import AIService
 import json
 import logging
-import sqlite3
 import re
 import math
 
@@ -33,9 +33,7 @@ VOCAB_62 = ['feedback', 'constructive', 'positive', 'suggestion', 'strength',
 
 def get_db_connection():
     """Get database connection"""
-    conn = sqlite3.connect('fardi.db')
-    conn.row_factory = sqlite3.Row
-    return conn
+    return db_manager.get_connection()
 
 
 def _phase6_subphase1_step_path(step: int) -> str:
@@ -471,10 +469,10 @@ def _build_final_score_response(level, task_scores):
     }}
 
 
-def _ai_evaluate(prompt, fallback_fn, response_text):
+async def _ai_evaluate(prompt, fallback_fn, response_text):
     """Run AI evaluation with fallback"""
     try:
-        ai_resp = ai_service.get_ai_response(prompt)
+        ai_resp = await ai_service.get_ai_response_async(prompt)
         match = re.search(r'\{.*\}', ai_resp, re.DOTALL)
         if match:
             return json.loads(match.group())
@@ -533,7 +531,7 @@ Return JSON: {{"score": 2-5, "level": "A2"|"B1"|"B2"|"C1", "feedback": "...",
         def fallback(r):
             return _generic_fallback(r, VOCAB_61)
 
-        evaluation = _ai_evaluate(prompt, fallback, response)
+        evaluation = await _ai_evaluate(prompt, fallback, response)
         score = max(2, min(5, evaluation.get('score', 2)))
         level = evaluation.get('level', 'A2')
         logger.info(f"Phase 6.1 Step 1 I2 - User {user_id}: Score={score}, Level={level}")
@@ -645,7 +643,7 @@ Return JSON: {{"score": 2-5, "level": "A2"|"B1"|"B2"|"C1", "feedback": "...",
         def fallback(r):
             return _generic_fallback(r, VOCAB_61)
 
-        evaluation = _ai_evaluate(prompt, fallback, response)
+        evaluation = await _ai_evaluate(prompt, fallback, response)
         score = max(2, min(5, evaluation.get('score', 2)))
         level = evaluation.get('level', 'A2')
         logger.info(f"Phase 6.1 Step 2 I2 - User {user_id}: Score={score}, Level={level}")
@@ -757,7 +755,7 @@ Return JSON: {{"score": 2-5, "level": "A2"|"B1"|"B2"|"C1", "feedback": "...",
         def fallback(r):
             return _generic_fallback(r, VOCAB_61)
 
-        evaluation = _ai_evaluate(prompt, fallback, response)
+        evaluation = await _ai_evaluate(prompt, fallback, response)
         score = max(2, min(5, evaluation.get('score', 2)))
         level = evaluation.get('level', 'A2')
         logger.info(f"Phase 6.1 Step 3 I2 - User {user_id}: Score={score}, Level={level}")
@@ -869,7 +867,7 @@ Return JSON: {{"score": 2-5, "level": "A2"|"B1"|"B2"|"C1", "feedback": "...",
         def fallback(r):
             return _generic_fallback(r, VOCAB_61)
 
-        evaluation = _ai_evaluate(prompt, fallback, response)
+        evaluation = await _ai_evaluate(prompt, fallback, response)
         score = max(2, min(5, evaluation.get('score', 2)))
         level = evaluation.get('level', 'A2')
         logger.info(f"Phase 6.1 Step 4 I2 - User {user_id}: Score={score}, Level={level}")
@@ -981,7 +979,7 @@ Return JSON: {{"score": 2-5, "level": "A2"|"B1"|"B2"|"C1", "feedback": "...",
                     'feedback': f'You fixed {fixed} spelling errors — {level} level.',
                     'corrections_found': [], 'strengths': [], 'improvements': []}
 
-        evaluation = _ai_evaluate(prompt, fallback, corrected_text)
+        evaluation = await _ai_evaluate(prompt, fallback, corrected_text)
         score = max(2, min(5, evaluation.get('score', 2)))
         level = evaluation.get('level', 'A2')
         logger.info(f"Phase 6.1 Step 5 I1 - User {user_id}: Score={score}, Level={level}")
@@ -1040,7 +1038,7 @@ Return JSON: {{"score": 2-5, "level": "A2"|"B1"|"B2"|"C1", "feedback": "...",
                     'feedback': f'Grammar correction at {level} level.',
                     'strengths': [], 'improvements': []}
 
-        evaluation = _ai_evaluate(prompt, fallback, corrected_text)
+        evaluation = await _ai_evaluate(prompt, fallback, corrected_text)
         score = max(2, min(5, evaluation.get('score', 2)))
         level = evaluation.get('level', 'A2')
         logger.info(f"Phase 6.1 Step 5 I2 - User {user_id}: Score={score}, Level={level}")
@@ -1093,7 +1091,7 @@ Return JSON: {{"score": 2-5, "level": "A2"|"B1"|"B2"|"C1", "feedback": "...",
         def fallback(r):
             return _generic_fallback(r, VOCAB_61)
 
-        evaluation = _ai_evaluate(prompt, fallback, enhanced_text)
+        evaluation = await _ai_evaluate(prompt, fallback, enhanced_text)
         score = max(2, min(5, evaluation.get('score', 2)))
         level = evaluation.get('level', 'A2')
         logger.info(f"Phase 6.1 Step 5 I3 - User {user_id}: Score={score}, Level={level}")
@@ -1268,7 +1266,7 @@ Return JSON: {{"score": 2-5, "level": "A2"|"B1"|"B2"|"C1", "feedback": "...",
         def fallback(r):
             return _generic_fallback(r, VOCAB_62)
 
-        evaluation = _ai_evaluate(prompt, fallback, response)
+        evaluation = await _ai_evaluate(prompt, fallback, response)
         score = max(2, min(5, evaluation.get('score', 2)))
         level = evaluation.get('level', 'A2')
         logger.info(f"Phase 6.2 Step 1 I2 - User {user_id}: Score={score}, Level={level}")
@@ -1380,7 +1378,7 @@ Return JSON: {{"score": 2-5, "level": "A2"|"B1"|"B2"|"C1", "feedback": "...",
         def fallback(r):
             return _generic_fallback(r, VOCAB_62)
 
-        evaluation = _ai_evaluate(prompt, fallback, response)
+        evaluation = await _ai_evaluate(prompt, fallback, response)
         score = max(2, min(5, evaluation.get('score', 2)))
         level = evaluation.get('level', 'A2')
         logger.info(f"Phase 6.2 Step 2 I2 - User {user_id}: Score={score}, Level={level}")
@@ -1492,7 +1490,7 @@ Return JSON: {{"score": 2-5, "level": "A2"|"B1"|"B2"|"C1", "feedback": "...",
         def fallback(r):
             return _generic_fallback(r, VOCAB_62)
 
-        evaluation = _ai_evaluate(prompt, fallback, response)
+        evaluation = await _ai_evaluate(prompt, fallback, response)
         score = max(2, min(5, evaluation.get('score', 2)))
         level = evaluation.get('level', 'A2')
         logger.info(f"Phase 6.2 Step 3 I2 - User {user_id}: Score={score}, Level={level}")
@@ -1605,7 +1603,7 @@ Return JSON: {{"score": 2-5, "level": "A2"|"B1"|"B2"|"C1", "feedback": "...",
         def fallback(r):
             return _generic_fallback(r, VOCAB_62)
 
-        evaluation = _ai_evaluate(prompt, fallback, response)
+        evaluation = await _ai_evaluate(prompt, fallback, response)
         score = max(2, min(5, evaluation.get('score', 2)))
         level = evaluation.get('level', 'A2')
         logger.info(f"Phase 6.2 Step 4 I2 - User {user_id}: Score={score}, Level={level}")
@@ -1715,7 +1713,7 @@ Return JSON: {{"score": 2-5, "level": "A2"|"B1"|"B2"|"C1", "feedback": "...",
                     'feedback': f'Fixed {fixed} spelling errors — {level} level.',
                     'strengths': [], 'improvements': []}
 
-        evaluation = _ai_evaluate(prompt, fallback, corrected_text)
+        evaluation = await _ai_evaluate(prompt, fallback, corrected_text)
         score = max(2, min(5, evaluation.get('score', 2)))
         level = evaluation.get('level', 'A2')
         logger.info(f"Phase 6.2 Step 5 I1 - User {user_id}: Score={score}, Level={level}")
@@ -1776,7 +1774,7 @@ Return JSON: {{"score": 2-5, "level": "A2"|"B1"|"B2"|"C1", "feedback": "...",
                     'feedback': f'Tone improvement at {level} level.',
                     'strengths': [], 'improvements': []}
 
-        evaluation = _ai_evaluate(prompt, fallback, corrected_text)
+        evaluation = await _ai_evaluate(prompt, fallback, corrected_text)
         score = max(2, min(5, evaluation.get('score', 2)))
         level = evaluation.get('level', 'A2')
         logger.info(f"Phase 6.2 Step 5 I2 - User {user_id}: Score={score}, Level={level}")
@@ -1829,7 +1827,7 @@ Return JSON: {{"score": 2-5, "level": "A2"|"B1"|"B2"|"C1", "feedback": "...",
         def fallback(r):
             return _generic_fallback(r, VOCAB_62)
 
-        evaluation = _ai_evaluate(prompt, fallback, improved_text)
+        evaluation = await _ai_evaluate(prompt, fallback, improved_text)
         score = max(2, min(5, evaluation.get('score', 2)))
         level = evaluation.get('level', 'A2')
         logger.info(f"Phase 6.2 Step 5 I3 - User {user_id}: Score={score}, Level={level}")
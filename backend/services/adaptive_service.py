@@ -3,7 +3,6 @@ Adaptive Learning Service
 Tracks performance and adjusts difficulty dynamically
 """
 
-import sqlite3
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 from collections import deque
@@ -21,14 +20,14 @@ MASTERY_THRESHOLD = 0.95
 class AdaptiveService:
     """Service for adaptive learning and spaced repetition"""
     
-    def __init__(self, db_path='instance/fardi.db'):
-        self.db_path = db_path
+    def __init__(self, db_manager=None):
+        if db_manager is None:
+            from dependencies import db_manager
+        self.db = db_manager
     
     def get_connection(self):
-        """Get database connection"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+        """Get a pooled connection to the shared database"""
+        return self.db.get_connection()
     
     def track_performance(self, user_id: int, activity_id: str, 
                          success: bool, score: float, activity_type: str = "remedial") -> Dict:
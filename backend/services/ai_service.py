@@ -3,79 +3,305 @@ AI Service for handling Groq API interactions and AI-generated content detection
 """
 import os
 import json
+import time
+import random
+import asyncio
 import logging
-import requests
-import groq
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from models.game_data import NPCS
+from services.llm_cache import get_llm_cache, make_cache_key
+from services.singleflight import AsyncSingleFlight, SingleFlight
+from services.circuit_breaker import CircuitOpenError, get_breaker
+from services.detection_cache import Fingerprint, get_detection_cache
+from services.local_ai_detector import detect as detect_ai_text, detect_batch as detect_ai_text_batch
+from services.startup import on_startup
+from services.request_metrics import timed
 
 logger = logging.getLogger(__name__)
 
+# Global LLM gateway limits, shared by every AIService instance in the worker
+LLM_CONCURRENCY = int(os.getenv("FARDI_LLM_CONCURRENCY", 16))
+LLM_TIMEOUT = float(os.getenv("FARDI_LLM_TIMEOUT", 30))
+SAPLING_TIMEOUT = (
+    float(os.getenv("FARDI_SAPLING_CONNECT_TIMEOUT", 3)),
+    float(os.getenv("FARDI_SAPLING_READ_TIMEOUT", 10)),
+)
+SAPLING_API_URL = os.getenv("SAPLING_API_URL", "https://api.sapling.ai/api/v1/aidetect")
+SAPLING_POOL_SIZE = int(os.getenv("FARDI_SAPLING_POOL_SIZE", 8))
+SAPLING_RETRIES = int(os.getenv("FARDI_SAPLING_RETRIES", 2))
+SAPLING_BACKOFF = float(os.getenv("FARDI_SAPLING_BACKOFF", 0.25))
+_SAPLING_RETRY_STATUS = (429, 502, 503, 504)
+
+_llm_semaphore = asyncio.Semaphore(LLM_CONCURRENCY)
+_llm_sync_semaphore = threading.BoundedSemaphore(LLM_CONCURRENCY)
+_llm_executor = ThreadPoolExecutor(max_workers=LLM_CONCURRENCY, thread_name_prefix="llm")
+
+# Identical concurrent completions share one upstream call
+_llm_inflight = AsyncSingleFlight()
+_llm_sync_inflight = SingleFlight()
+
+# Fail fast to the local heuristics while an upstream is down or slow
+groq_breaker = get_breaker("groq")
+sapling_breaker = get_breaker("sapling")
+
+# Keep-alive HTTP pool for Sapling, plus the threads async routes hand detection calls to
+_sapling_session = None
+_sapling_session_lock = threading.Lock()
+_sapling_executor = ThreadPoolExecutor(max_workers=SAPLING_POOL_SIZE, thread_name_prefix="sapling")
+
+
+# groq and requests are imported on first use (or during warm-up): together
+# they are a large share of the app's import time
+_groq_clients = {}
+_groq_clients_lock = threading.Lock()
+
+
+def get_groq_clients(api_key, timeout):
+    """Shared (Groq, AsyncGroq) pair per key/timeout; either is None if it could not be built"""
+    key = (api_key, timeout)
+    clients = _groq_clients.get(key)
+    if clients is None:
+        with _groq_clients_lock:
+            clients = _groq_clients.get(key)
+            if clients is None:
+                import groq
+                try:
+                    client = groq.Groq(api_key=api_key, timeout=timeout)
+                except Exception as e:
+                    logger.error(f"Error initializing Groq client: {str(e)}")
+                    logger.warning("Groq client unavailable. AI responses will be disabled.")
+                    client = None
+                try:
+                    async_client = groq.AsyncGroq(api_key=api_key, timeout=timeout)
+                except Exception as e:
+                    logger.warning(f"AsyncGroq unavailable, using thread pool for LLM calls: {str(e)}")
+                    async_client = None
+                clients = _groq_clients[key] = (client, async_client)
+    return clients
+
+
+def get_sapling_session():
+    """Shared requests.Session so repeated Sapling calls reuse TCP/TLS connections"""
+    global _sapling_session
+    if _sapling_session is None:
+        with _sapling_session_lock:
+            if _sapling_session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=SAPLING_POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _sapling_session = session
+    return _sapling_session
+
+
+def _post_with_retries(url, payload, timeout=SAPLING_TIMEOUT, retries=SAPLING_RETRIES, backoff=SAPLING_BACKOFF):
+    """
+    POST through the shared session. Connection failures and 429/502/503/504
+    are retried with exponential backoff and full jitter; read timeouts are
+    not, so one slow call costs at most one read timeout.
+    """
+    import requests
+    session = get_sapling_session()
+    for attempt in range(retries + 1):
+        try:
+            response = session.post(url, json=payload, timeout=timeout)
+            if response.status_code not in _SAPLING_RETRY_STATUS or attempt == retries:
+                return response
+        except requests.ConnectionError:
+            if attempt == retries:
+                raise
+        time.sleep(random.uniform(0, backoff * (2 ** attempt)))
+
+
 class AIService:
     def __init__(self):
         self.groq_api_key = os.getenv("GROQ_API_KEY")
         self.sapling_api_key = os.getenv("SAPLING_API_KEY")
-        self.sapling_api_url = "https://api.sapling.ai/api/v1/aidetect"
+        self.sapling_api_url = SAPLING_API_URL
         self.model = os.getenv("GROQ_MODEL", "meta-llama/llama-4-scout-17b-16e-instruct")
         self.max_tokens = 500
         self.temperature = 0.7
+        self.timeout = LLM_TIMEOUT
         
-        if self.groq_api_key:
-            try:
-                self.client = groq.Groq(api_key=self.groq_api_key)
-            except Exception as e:
-                logger.error(f"Error initializing Groq client: {str(e)}")
-                logger.warning("Groq client unavailable. AI responses will be disabled.")
-                self.client = None
-        else:
-            self.client = None
+        if not self.groq_api_key:
             logger.warning("Groq API key not found. AI responses will be disabled.")
 
-    def get_ai_response(self, prompt, character=None):
+    # Clients are built on first use; every instance shares the same pair
+    @property
+    def client(self):
+        if not self.groq_api_key:
+            return None
+        return get_groq_clients(self.groq_api_key, self.timeout)[0]
+
+    @property
+    def async_client(self):
+        if not self.groq_api_key:
+            return None
+        return get_groq_clients(self.groq_api_key, self.timeout)[1]
+
+    # ------------------------------------------------------------------
+    # LLM gateway - every chat completion in the app goes through here
+    # ------------------------------------------------------------------
+
+    def _completion_kwargs(self, messages, model, max_tokens, temperature):
+        return {
+            "model": model or self.model,
+            "messages": messages,
+            "max_tokens": max_tokens if max_tokens is not None else self.max_tokens,
+            "temperature": temperature if temperature is not None else self.temperature,
+        }
+
+    async def complete_async(self, messages, model=None, max_tokens=None, temperature=None, timeout=None, cache=True):
+        """
+        Run a chat completion without blocking the event loop.
+        Bounded by the global LLM semaphore and a per-call timeout.
+        Identical requests are served from the LLM cache unless cache=False,
+        and identical concurrent requests always share one upstream call.
+        Raises CircuitOpenError without calling Groq while its breaker is open.
+        Returns the message content; raises on failure or when AI is disabled.
+        """
+        if not self.client and not self.async_client:
+            raise RuntimeError("Groq client unavailable")
+        kwargs = self._completion_kwargs(messages, model, max_tokens, temperature)
+        timeout = timeout or self.timeout
+        key = make_cache_key(kwargs["model"], messages, kwargs["temperature"], kwargs["max_tokens"])
+
+        llm_cache = get_llm_cache() if cache else None
+        if llm_cache:
+            cached = llm_cache.get_memory(key)
+            if cached is None:
+                cached = await asyncio.to_thread(llm_cache.get, key)
+            if cached is not None:
+                return cached
+
+        groq_breaker.ensure_available()
+
+        async def upstream():
+            async with _llm_semaphore:
+                with groq_breaker.guard():
+                    if self.async_client:
+                        call = self.async_client.chat.completions.create(**kwargs)
+                    else:
+                        # Thread-pool fallback when only the sync client is available
+                        loop = asyncio.get_running_loop()
+                        call = loop.run_in_executor(_llm_executor, partial(self.client.chat.completions.create, **kwargs))
+                    response = await asyncio.wait_for(call, timeout=timeout)
+
+            content = response.choices[0].message.content
+            if llm_cache:
+                await asyncio.to_thread(llm_cache.set, key, content, kwargs["model"])
+            return content
+
+        with timed("llm"):
+            return await _llm_inflight.do(key, upstream)
+
+    def complete(self, messages, model=None, max_tokens=None, temperature=None, timeout=None, cache=True):
+        """Blocking chat completion for sync callers (scripts, threadpool-run helpers)"""
+        if not self.client:
+            raise RuntimeError("Groq client unavailable")
+        kwargs = self._completion_kwargs(messages, model, max_tokens, temperature)
+        key = make_cache_key(kwargs["model"], messages, kwargs["temperature"], kwargs["max_tokens"])
+
+        llm_cache = get_llm_cache() if cache else None
+        if llm_cache:
+            cached = llm_cache.get(key)
+            if cached is not None:
+                return cached
+
+        groq_breaker.ensure_available()
+
+        def upstream():
+            with _llm_sync_semaphore, groq_breaker.guard():
+                response = self.client.chat.completions.create(timeout=timeout or self.timeout, **kwargs)
+
+            content = response.choices[0].message.content
+            if llm_cache:
+                llm_cache.set(key, content, kwargs["model"])
+            return content
+
+        with timed("llm"):
+            return _llm_sync_inflight.do(key, upstream)
+
+    @staticmethod
+    def coalescing_stats():
+        """Single-flight counters for the async and blocking gateways"""
+        return {'async': _llm_inflight.stats(), 'sync': _llm_sync_inflight.stats()}
+
+    def _character_messages(self, prompt, character=None):
+        character_prompt = ""
+        if character and character in NPCS:
+            npc = NPCS[character]
+            character_prompt = f"""
+            You are {character}, {npc['role']} at the Cultural Event Planning Committee.
+            Your personality: {npc['personality']}
+            Background: {npc['background']}
+            
+            Respond in character based on this persona. Keep your response encouraging but authentic to your character.
+            """
+
+        return [
+            {"role": "system", "content": f"You are an AI language learning assistant in a game about planning a cultural event. {character_prompt}"},
+            {"role": "user", "content": prompt}
+        ]
+
+    def get_ai_response(self, prompt, character=None, cache=True):
         """Get a responsive, in-character response from Groq"""
         if not self.client:
             return "I'm sorry, I couldn't process that response."
             
         try:
-            character_prompt = ""
-            if character and character in NPCS:
-                npc = NPCS[character]
-                character_prompt = f"""
-                You are {character}, {npc['role']} at the Cultural Event Planning Committee.
-                Your personality: {npc['personality']}
-                Background: {npc['background']}
-                
-                Respond in character based on this persona. Keep your response encouraging but authentic to your character.
-                """
-
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": f"You are an AI language learning assistant in a game about planning a cultural event. {character_prompt}"},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=self.max_tokens,
-                temperature=self.temperature
-            )
+            return self.complete(self._character_messages(prompt, character), cache=cache)
+        except Exception as e:
+            logger.error(f"Error getting AI response: {str(e)}")
+            return "I'm sorry, I couldn't process that response."
 
-            return response.choices[0].message.content
+    async def get_ai_response_async(self, prompt, character=None, cache=True):
+        """Async variant of get_ai_response for use inside request handlers"""
+        if not self.client:
+            return "I'm sorry, I couldn't process that response."
 
+        try:
+            return await self.complete_async(self._character_messages(prompt, character), cache=cache)
         except Exception as e:
             logger.error(f"Error getting AI response: {str(e)}")
             return "I'm sorry, I couldn't process that response."
 
+    async def evaluate_response_async(self, prompt, max_tokens=None, temperature=0.3, cache=True):
+        """Single-prompt evaluation call; returns raw model text and raises on failure"""
+        return await self.complete_async(
+            [{"role": "user", "content": prompt}],
+            max_tokens=max_tokens,
+            temperature=temperature,
+            cache=cache,
+        )
+
     def check_with_sapling_api(self, text):
         """
         Check if text is AI-generated using Sapling's AI Detector API
         Returns tuple of (is_ai_generated, score, reasons)
+        Sapling results for the same (or a near-identical) text are reused from
+        the detection cache. Local detection is cheaper than a cache lookup, so
+        its results (no key, or fallback after a Sapling failure) are not cached.
         """
         # Skip API call for very short texts
         if len(text) < 50:
             return (False, 0, ["Text too short for reliable detection"])
-        
+
         try:
             if not self.sapling_api_key:
                 logger.info("Sapling API key not found. Falling back to local detection.")
                 return self._is_ai_generated_local(text)
+
+            detection_cache = get_detection_cache()
+            if detection_cache:
+                fingerprint = Fingerprint(text)
+                cached = detection_cache.get(fingerprint, "sapling")
+                if cached is not None:
+                    return cached
                 
             # Prepare the request
             payload = {
@@ -86,8 +312,12 @@ class AIService:
                 }
             }
             
-            # Make the API call
-            response = requests.post(self.sapling_api_url, json=payload)
+            # Make the API call; 5xx/429 count against the breaker
+            with timed("ai_detection"), sapling_breaker.guard():
+                response = _post_with_retries(self.sapling_api_url, payload)
+                if response.status_code >= 500 or response.status_code == 429:
+                    from requests import HTTPError
+                    raise HTTPError(f"Sapling API error: {response.status_code}")
             
             if response.status_code == 200:
                 result = response.json()
@@ -116,7 +346,9 @@ class AIService:
                     reasons.append("High confidence of AI-generated content")
                 elif score > 0.5:
                     reasons.append("Moderate confidence of AI-generated content")
-                
+
+                if detection_cache:
+                    detection_cache.set(fingerprint, "sapling", (is_ai, score, reasons))
                 return (is_ai, score, reasons)
                 
             else:
@@ -127,91 +359,52 @@ class AIService:
                 # Fall back to local detection
                 return self._is_ai_generated_local(text)
                 
+        except CircuitOpenError:
+            return self._is_ai_generated_local(text)
         except Exception as e:
             logger.error(f"Error with Sapling API: {str(e)}")
             # Fall back to local detection
             return self._is_ai_generated_local(text)
 
+    async def check_with_sapling_api_async(self, text):
+        """
+        check_with_sapling_api for async routes: the HTTP call runs on the
+        Sapling thread pool so it never blocks the event loop.
+        """
+        if len(text) < 50 or not self.sapling_api_key:
+            # Local detection only: no cache lookup or network call to offload
+            return self.check_with_sapling_api(text)
+        detection_cache = get_detection_cache()
+        if detection_cache:
+            cached = detection_cache.get_memory(Fingerprint(text), "sapling")
+            if cached is not None:
+                return cached
+        try:
+            sapling_breaker.ensure_available()
+        except CircuitOpenError:
+            return self._is_ai_generated_local(text)
+        loop = asyncio.get_running_loop()
+        # The pool thread does not see the request context, so time the wait here
+        with timed("ai_detection"):
+            return await loop.run_in_executor(_sapling_executor, self.check_with_sapling_api, text)
+
     def _is_ai_generated_local(self, text):
         """
         Local AI detection using simple heuristics as fallback
         Returns a tuple (is_generated_by_ai, score, details).
         """
-        import re
-        import math
-        from collections import Counter
-        
-        # Don't analyze texts that are too short
-        if len(text) < 50:
-            return (False, 0, "Text too short for reliable detection")
-        
-        # Score initialization and indicators
-        total_score = 0
-        reasons = []
-        
-        # 1. Check length (AI responses tend to be long and elaborate)
-        if len(text) > 500:
-            total_score += 0.15
-            reasons.append("Unusually long response")
-        
-        # 2. Check for typical AI phrasings
-        ai_phrases = [
-            "en tant que", "je suis heureux de", "je suis ravi de", "il est important de noter que",
-            "il convient de souligner", "comme mentionné précédemment", "pour résumer", 
-            "en conclusion", "je n'ai pas accès à", "je ne peux pas", "en effet,", "par conséquent,"
-        ]
-        
-        phrases_found = sum(1 for phrase in ai_phrases if phrase.lower() in text.lower())
-        if phrases_found >= 2:
-            total_score += min(0.25 * phrases_found / 3, 0.25)  # Capped at 0.25
-            reasons.append(f"Contains {phrases_found} phrases often used by AI")
-        
-        # 3. Analyze sentence structure
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s.strip() for s in sentences if s.strip()]
-        
-        if len(sentences) > 3:
-            # Calculate sentence length variability
-            sentence_lengths = [len(s) for s in sentences]
-            avg_length = sum(sentence_lengths) / len(sentence_lengths)
-            
-            # Standard deviation of lengths
-            variance = sum((length - avg_length) ** 2 for length in sentence_lengths) / len(sentence_lengths)
-            std_dev = math.sqrt(variance)
-            
-            # Coefficient of variation
-            variation_coeff = std_dev / max(avg_length, 1)
-            
-            if variation_coeff < 0.4:
-                total_score += 0.2
-                reasons.append("Unusually consistent sentence structure")
-        
-        # 4. Analyze vocabulary diversity (TTR - Type-Token Ratio)
-        words = re.findall(r'\b\w+\b', text.lower())
-        unique_words = len(set(words))
-        
-        if len(words) > 30:
-            ttr = unique_words / len(words)
-            if ttr > 0.8:
-                total_score += 0.2
-                reasons.append("Unusually high vocabulary diversity")
-        
-        # 5. Check n-gram consistency (word triplets)
-        if len(words) > 20:
-            # Create word triplets
-            triplets = [' '.join(words[i:i+3]) for i in range(len(words)-2)]
-            # Count occurrences
-            triplet_counts = Counter(triplets)
-            # Check if certain triplets are repeated
-            repeated_triplets = sum(1 for count in triplet_counts.values() if count > 1)
-            
-            if repeated_triplets == 0 and len(triplets) > 10:
-                # Human texts tend to repeat certain patterns
-                total_score += 0.1
-                reasons.append("No repeated phrase patterns (unusual for human writing)")
-        
-        # Round the score for readability
-        final_score = min(round(total_score, 2), 1.0)
-        
-        # Consider as AI-generated if score is above 0.5
-        return (final_score > 0.5, final_score, reasons)
\ No newline at end of file
+        return detect_ai_text(text)
+
+    @staticmethod
+    def detect_local_batch(texts):
+        """Local heuristic scores for many texts at once"""
+        return detect_ai_text_batch(texts)
+
+
+def _warm_up_clients():
+    get_sapling_session()
+    if os.getenv("GROQ_API_KEY"):
+        get_groq_clients(os.getenv("GROQ_API_KEY"), LLM_TIMEOUT)
+
+
+on_startup("AI clients", _warm_up_clients, required=False)
@@ -0,0 +1,634 @@
+"""
+Materialised rollups behind the admin dashboard and analytics.
+
+Those pages used to recompute everything from the raw tables on every view
+(the latest-assessment self-join for the CEFR distribution, LEFT JOINs over
+user_phase_completion for phases 3-6, UNION scans for active users), so
+their cost grew with the tables. They now read three small tables that a
+background thread refreshes every FARDI_ANALYTICS_REFRESH seconds:
+
+- analytics_daily: one row per UTC day (active users, sign-ups,
+  assessments). A refresh recomputes only the days since the previous one;
+  older days keep the values they had.
+- analytics_cohorts: one row per signup month (students, phase 1-6
+  completion, CEFR levels of their latest assessments). A refresh recomputes
+  only the cohorts with a user who signed up or made progress since the
+  previous one, and all of them once a day to pick up deletions.
+- analytics_snapshot: JSON payloads for the whole-table aggregates that have
+  no daily or cohort grain (step success rates, score bands, students at
+  risk...), recomputed on every refresh.
+
+Reads cost the same however big the tables get and carry a `freshness`
+block with the time of the last refresh. Workers share the tables, and a
+worker skips its refresh when another one has just done it.
+"""
+import os
+import json
+import time
+import logging
+import threading
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Seconds between refreshes; 0 turns the thread off and refreshes on every read
+ANALYTICS_REFRESH_SECONDS = int(os.getenv("FARDI_ANALYTICS_REFRESH", 300))
+# Recompute every cohort this often, not just the ones with new activity
+_FULL_REFRESH_SECONDS = 24 * 3600
+# Re-read this much before the previous refresh, for rows committed while it ran
+_OVERLAP = '-1 minute'
+
+CEFR_ORDER = ['A1', 'A2', 'B1', 'B2', 'C1', 'C2']
+COHORT_COUNTS = ['accounts', 'users', 'phase1_completed', 'phase2_started', 'phase2_completed',
+                 'phase3_completed', 'phase4_completed', 'phase5_completed', 'phase6_completed']
+
+# Rows that make a user active on a day: (table, timestamp column)
+ACTIVITY_SOURCES = [
+    ('assessment_results', 'completed_at'),
+    ('phase2_progress', 'last_activity'),
+    ('phase5_progress', 'updated_at'),
+    ('phase6_progress', 'updated_at'),
+]
+_ACTIVITY_SINCE = ' UNION '.join(
+    f'SELECT user_id, {column} AS at FROM {table} WHERE {column} >= ?' for table, column in ACTIVITY_SOURCES
+)
+
+
+def _seconds_between(earlier, later):
+    if not earlier:
+        return float('inf')
+    return (datetime.fromisoformat(later) - datetime.fromisoformat(earlier)).total_seconds()
+
+
+def _next_month(cohort):
+    year, month = int(cohort[:4]), int(cohort[5:7])
+    return f'{year + month // 12:04d}-{month % 12 + 1:02d}'
+
+
+class AnalyticsRollups:
+    """Refreshes the rollup tables and serves the admin pages from them"""
+
+    def __init__(self, db_manager):
+        self.db = db_manager
+        self._lock = threading.Lock()
+
+    # ── refresh ────────────────────────────────────────────────────
+
+    def refresh(self, force=False):
+        """Bring the rollups up to date; returns False when another worker just did"""
+        with self._lock:
+            conn = self.db.get_connection()
+            try:
+                now = conn.execute("SELECT datetime('now')").fetchone()[0]
+                state = self._snapshot(conn, 'refresh')
+                if state and not force and \
+                        _seconds_between(state['computed_at'], now) < ANALYTICS_REFRESH_SECONDS / 2:
+                    return False
+
+                started = time.perf_counter()
+                since = ''
+                if state:
+                    since = conn.execute('SELECT datetime(?, ?)', (state['computed_at'], _OVERLAP)).fetchone()[0]
+                full = not state or _seconds_between(state.get('full_at'), now) >= _FULL_REFRESH_SECONDS
+
+                daily = self._daily_rows(conn, since[:10])
+                cohorts = self._cohort_rows(conn, None if full else self._changed_cohorts(conn, since))
+                snapshots = {
+                    'dashboard': self._dashboard_snapshot(conn),
+                    'analytics': self._analytics_snapshot(conn),
+                    'system_statistics': self._system_statistics_snapshot(conn),
+                }
+                snapshots['refresh'] = {
+                    'computed_at': now,
+                    'full_at': now if full else state['full_at'],
+                    'duration_ms': round((time.perf_counter() - started) * 1000, 1),
+                    'cohorts_recomputed': len(cohorts),
+                    'days_recomputed': len(daily),
+                }
+
+                try:
+                    conn.execute('DELETE FROM analytics_daily WHERE day >= ?', (since[:10],))
+                    conn.executemany(
+                        'INSERT INTO analytics_daily (day, active_users, new_users, assessments, computed_at) '
+                        'VALUES (?, ?, ?, ?, ?)',
+                        [(day, row['active_users'], row['new_users'], row['assessments'], now)
+                         for day, row in daily.items()]
+                    )
+                    if full:
+                        conn.execute('DELETE FROM analytics_cohorts')
+                    conn.executemany(
+                        f'INSERT OR REPLACE INTO analytics_cohorts (cohort, {", ".join(COHORT_COUNTS)}, '
+                        f'cefr_levels, computed_at) VALUES ({", ".join("?" * (len(COHORT_COUNTS) + 3))})',
+                        [(cohort, *[row[key] for key in COHORT_COUNTS], json.dumps(row['cefr_levels']), now)
+                         for cohort, row in cohorts.items()]
+                    )
+                    conn.executemany(
+                        'INSERT OR REPLACE INTO analytics_snapshot (name, payload, computed_at) VALUES (?, ?, ?)',
+                        [(name, json.dumps(payload), now) for name, payload in snapshots.items()]
+                    )
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                logger.info(
+                    f"Analytics rollups refreshed in {snapshots['refresh']['duration_ms']:.0f} ms "
+                    f"({'full' if full else f'{len(cohorts)} cohorts'}, {len(daily)} days)"
+                )
+                return True
+            finally:
+                conn.close()
+
+    def _daily_rows(self, conn, since_day):
+        """Per-day counts for every day from since_day ('' for all history)"""
+        days = {}
+
+        def row(day):
+            return days.setdefault(day, {'active_users': 0, 'new_users': 0, 'assessments': 0})
+
+        queries = [
+            ('active_users', f'''
+                SELECT date(at) AS day, COUNT(DISTINCT user_id) FROM ({_ACTIVITY_SINCE})
+                GROUP BY day
+            ''', [since_day] * len(ACTIVITY_SOURCES)),
+            ('new_users', '''
+                SELECT date(created_at) AS day, COUNT(*) FROM users
+                WHERE COALESCE(created_at, '') >= ? GROUP BY day
+            ''', [since_day]),
+            ('assessments', '''
+                SELECT date(completed_at) AS day, COUNT(*) FROM assessment_results
+                WHERE completed_at >= ? GROUP BY day
+            ''', [since_day]),
+        ]
+        for key, sql, params in queries:
+            for day, count in conn.execute(sql, params).fetchall():
+                if day:
+                    row(day)[key] = count
+        return days
+
+    def _changed_cohorts(self, conn, since):
+        """Signup months of users who signed up or made progress since `since`"""
+        return [row[0] for row in conn.execute('''
+            SELECT DISTINCT COALESCE(strftime('%Y-%m', created_at), 'unknown') FROM users
+            WHERE id IN (
+                SELECT id FROM users WHERE COALESCE(created_at, '') >= ?
+                UNION SELECT user_id FROM assessment_results WHERE completed_at >= ?
+                UNION SELECT user_id FROM phase2_progress WHERE last_activity >= ?
+                UNION SELECT user_id FROM user_phase_completion WHERE updated_at >= ?
+            )
+        ''', (since, since, since, since)).fetchall()]
+
+    def _cohort_rows(self, conn, cohorts=None):
+        """Counts per signup month, for the given cohorts or (None) all of them"""
+        if cohorts is None:
+            scopes = [('', [])]
+        else:
+            # One range per cohort so each query walks idx_users_created_at
+            scopes = [
+                ("WHERE strftime('%Y-%m', u.created_at) IS NULL", []) if cohort == 'unknown' else
+                ("WHERE COALESCE(u.created_at, '') >= ? AND COALESCE(u.created_at, '') < ?",
+                 [cohort, _next_month(cohort)])
+                for cohort in cohorts
+            ]
+
+        completed = ',\n'.join(
+            f'''SUM(u.is_admin = 0 AND EXISTS (
+                    SELECT 1 FROM user_phase_completion c
+                    WHERE c.user_id = u.id AND c.phase_number = {phase} AND c.completed = 1
+                )) AS phase{phase}_completed''' for phase in (3, 4, 5, 6)
+        )
+        rows = {}
+        for where, params in scopes:
+            for row in conn.execute(f'''
+                SELECT COALESCE(strftime('%Y-%m', u.created_at), 'unknown') AS cohort,
+                       COUNT(*) AS accounts,
+                       SUM(u.is_admin = 0) AS users,
+                       SUM(u.is_admin = 0 AND EXISTS (
+                           SELECT 1 FROM assessment_results ar WHERE ar.user_id = u.id
+                       )) AS phase1_completed,
+                       SUM(u.is_admin = 0 AND EXISTS (
+                           SELECT 1 FROM phase2_progress p WHERE p.user_id = u.id
+                       )) AS phase2_started,
+                       SUM(u.is_admin = 0 AND (
+                           SELECT COUNT(DISTINCT step_id) FROM phase2_progress p
+                           WHERE p.user_id = u.id AND p.step_completed = 1
+                       ) >= 4) AS phase2_completed,
+                       {completed}
+                FROM users u
+                {where}
+                GROUP BY cohort
+            ''', params).fetchall():
+                rows[row['cohort']] = {**{key: row[key] or 0 for key in COHORT_COUNTS}, 'cefr_levels': {}}
+
+            for cohort, level, count in conn.execute(f'''
+                SELECT cohort, level, COUNT(*) FROM (
+                    SELECT COALESCE(strftime('%Y-%m', u.created_at), 'unknown') AS cohort,
+                           (SELECT overall_level FROM assessment_results ar
+                            WHERE ar.user_id = u.id ORDER BY completed_at DESC LIMIT 1) AS level
+                    FROM users u
+                    {where}
+                )
+                WHERE level IS NOT NULL
+                GROUP BY cohort, level
+            ''', params).fetchall():
+                rows[cohort]['cefr_levels'][level] = count
+
+        # A recomputed cohort with no users left is written as zeros
+        for cohort in cohorts or []:
+            rows.setdefault(cohort, {**{key: 0 for key in COHORT_COUNTS}, 'cefr_levels': {}})
+        return rows
+
+    def _dashboard_snapshot(self, conn):
+        return {
+            'total_assessments': conn.execute('SELECT COUNT(*) FROM assessment_results').fetchone()[0],
+            'total_phase2_sessions': conn.execute(
+                'SELECT COUNT(DISTINCT user_id) FROM phase2_responses'
+            ).fetchone()[0],
+            'active_users_today': conn.execute(
+                "SELECT COUNT(*) FROM users WHERE COALESCE(last_login, '') >= date('now')"
+            ).fetchone()[0],
+            'recent_activity': [dict(row) for row in conn.execute('''
+                SELECT 'registration' as type, first_name, username, 'N/A' as level,
+                       0 as points, created_at as timestamp
+                FROM users
+                ORDER BY COALESCE(created_at, '') DESC, id DESC
+                LIMIT 10
+            ''').fetchall()],
+        }
+
+    def _analytics_snapshot(self, conn):
+        def rows(sql, params=()):
+            return [dict(row) for row in conn.execute(sql, params).fetchall()]
+
+        def active_since(modifier):
+            since = conn.execute("SELECT datetime('now', ?)", (modifier,)).fetchone()[0]
+            return conn.execute(
+                f'SELECT COUNT(DISTINCT user_id) FROM ({_ACTIVITY_SINCE})', [since] * len(ACTIVITY_SOURCES)
+            ).fetchone()[0]
+
+        ai_detection = conn.execute('''
+            SELECT
+                AVG(ai_usage_percentage) as avg_ai_usage,
+                COUNT(CASE WHEN ai_usage_percentage > 30 THEN 1 END)
+                    as high_ai_count,
+                COUNT(*) as total_assessments
+            FROM assessment_results
+            WHERE ai_usage_percentage IS NOT NULL
+        ''').fetchone()
+
+        return {
+            'avg_assessment_times': rows('''
+                SELECT
+                    'Phase 1' as phase,
+                    AVG(time_taken) / 60.0 as avg_minutes
+                FROM assessment_results
+                UNION ALL
+                SELECT
+                    'Phase 2 - ' || step_id as phase,
+                    AVG(CAST(
+                        (julianday(completed_at) - julianday(started_at))
+                        * 24 * 60 AS INTEGER
+                    )) as avg_minutes
+                FROM phase2_progress
+                WHERE completed_at IS NOT NULL
+                GROUP BY step_id
+            '''),
+            'active_users_7d': active_since('-7 days'),
+            'active_users_30d': active_since('-30 days'),
+            'session_duration_dist': rows('''
+                SELECT
+                    CASE
+                        WHEN time_taken < 300 THEN '0-5 min'
+                        WHEN time_taken < 600 THEN '5-10 min'
+                        WHEN time_taken < 1200 THEN '10-20 min'
+                        WHEN time_taken < 1800 THEN '20-30 min'
+                        ELSE '30+ min'
+                    END as duration_range,
+                    COUNT(*) as count
+                FROM assessment_results
+                WHERE time_taken IS NOT NULL
+                GROUP BY duration_range
+            '''),
+            'ai_detection': dict(ai_detection) if ai_detection else {},
+            'score_distribution': rows('''
+                SELECT
+                    CASE
+                        WHEN xp_earned < 200 THEN 'Low (0-199)'
+                        WHEN xp_earned < 400 THEN 'Medium (200-399)'
+                        WHEN xp_earned < 600 THEN 'High (400-599)'
+                        ELSE 'Excellent (600+)'
+                    END as score_range,
+                    COUNT(*) as count
+                FROM assessment_results
+                GROUP BY score_range
+            '''),
+            'challenging_steps': rows('''
+                SELECT
+                    step_id,
+                    COUNT(*) as attempts,
+                    COUNT(CASE WHEN step_completed = 1 THEN 1 END) as completions,
+                    ROUND(
+                        CAST(COUNT(CASE WHEN step_completed = 1 THEN 1 END) AS FLOAT)
+                        / COUNT(*) * 100, 1
+                    ) as success_rate
+                FROM phase2_progress
+                GROUP BY step_id
+                HAVING attempts > 0
+                ORDER BY success_rate ASC
+            '''),
+            # Per-user subqueries instead of joining all four tables, which
+            # multiplied every user's rows together before grouping
+            'at_risk_students': rows('''
+                SELECT * FROM (
+                    SELECT
+                        u.id, u.username, u.first_name, u.last_name,
+                        MAX(
+                            COALESCE((SELECT MAX(completed_at) FROM assessment_results WHERE user_id = u.id), ''),
+                            COALESCE((SELECT MAX(last_activity) FROM phase2_progress WHERE user_id = u.id), ''),
+                            COALESCE((SELECT MAX(updated_at) FROM phase5_progress WHERE user_id = u.id), ''),
+                            COALESCE((SELECT MAX(updated_at) FROM phase6_progress WHERE user_id = u.id), ''),
+                            COALESCE(u.created_at, '')
+                        ) as last_activity,
+                        (SELECT COUNT(*) FROM assessment_results WHERE user_id = u.id) as assessments_completed,
+                        (SELECT COUNT(DISTINCT step_id) FROM phase2_progress WHERE user_id = u.id)
+                            as phase2_steps_attempted
+                    FROM users u
+                    WHERE u.is_admin = 0
+                )
+                WHERE last_activity < datetime('now', '-7 days')
+                   OR assessments_completed = 0
+                ORDER BY last_activity ASC
+                LIMIT 10
+            '''),
+            'stuck_students': rows('''
+                SELECT
+                    u.id, u.username, u.first_name, u.last_name, p2.step_id,
+                    p2.started_at, p2.last_activity,
+                    CAST(
+                        (julianday('now') - julianday(p2.last_activity)) AS INTEGER
+                    ) as days_stuck
+                FROM users u
+                INNER JOIN phase2_progress p2 ON u.id = p2.user_id
+                WHERE p2.step_completed = 0
+                  AND p2.last_activity < datetime('now', '-3 days')
+                  AND u.is_admin = 0
+                ORDER BY days_stuck DESC
+                LIMIT 10
+            '''),
+            'recent_errors': conn.execute('''
+                SELECT COUNT(*)
+                FROM phase2_progress
+                WHERE step_score = 0
+                  AND started_at >= datetime('now', '-24 hours')
+            ''').fetchone()[0],
+            'total_sessions_7d': conn.execute('''
+                SELECT COUNT(DISTINCT session_id)
+                FROM assessment_results
+                WHERE completed_at >= datetime('now', '-7 days')
+            ''').fetchone()[0],
+        }
+
+    def _system_statistics_snapshot(self, conn):
+        def rows(sql):
+            return [dict(row) for row in conn.execute(sql).fetchall()]
+
+        # Separate aggregates: joining both tables onto users multiplied their rows
+        overall = conn.execute('''
+            SELECT
+                (SELECT COUNT(*) FROM users) as total_users,
+                COUNT(*) as total_assessments,
+                (SELECT COUNT(*) FROM phase2_progress) as total_phase2_sessions,
+                AVG(xp_earned) as avg_xp,
+                MAX(completed_at) as last_assessment
+            FROM assessment_results
+        ''').fetchone()
+
+        return {
+            'overall': dict(overall),
+            'assessment_stats': rows('''
+                SELECT
+                    overall_level,
+                    COUNT(*) as count,
+                    AVG(xp_earned) as avg_xp,
+                    AVG(time_taken) as avg_time
+                FROM assessment_results
+                GROUP BY overall_level
+                ORDER BY overall_level
+            '''),
+            'phase2_stats': rows('''
+                SELECT
+                    step_id,
+                    COUNT(*) as attempts,
+                    COUNT(CASE WHEN step_completed = 1 THEN 1 END) as completions,
+                    AVG(step_score) as avg_score
+                FROM phase2_progress
+                GROUP BY step_id
+                ORDER BY step_id
+            '''),
+            'recent_activity': rows('''
+                SELECT * FROM (
+                    SELECT
+                        'assessment' as type,
+                        ar.overall_level as level,
+                        ar.completed_at as timestamp,
+                        u.username,
+                        u.first_name,
+                        ar.xp_earned as points
+                    FROM assessment_results ar
+                    JOIN users u ON ar.user_id = u.id
+                    WHERE ar.completed_at >= date('now', '-7 days')
+
+                    UNION ALL
+
+                    SELECT
+                        'phase2_response' as type,
+                        p2r.cefr_level as level,
+                        p2r.submitted_at as timestamp,
+                        u.username,
+                        u.first_name,
+                        p2r.points_earned as points
+                    FROM phase2_responses p2r
+                    JOIN users u ON p2r.user_id = u.id
+                    WHERE p2r.submitted_at >= date('now', '-7 days')
+                )
+                ORDER BY timestamp DESC
+                LIMIT 20
+            '''),
+        }
+
+    # ── reads ──────────────────────────────────────────────────────
+
+    def _snapshot(self, conn, name):
+        row = conn.execute('SELECT payload FROM analytics_snapshot WHERE name = ?', (name,)).fetchone()
+        return json.loads(row['payload']) if row else None
+
+    def _read(self, conn):
+        """Make sure there is something to serve, then return the refresh state"""
+        state = self._snapshot(conn, 'refresh')
+        # Without the refresher thread (FARDI_ANALYTICS_REFRESH=0, scripts) reads refresh when due
+        if state is None or not _refresher_running.is_set() and _seconds_between(
+                state['computed_at'], conn.execute("SELECT datetime('now')").fetchone()[0]
+        ) >= ANALYTICS_REFRESH_SECONDS:
+            self.refresh()
+            state = self._snapshot(conn, 'refresh')
+        return state
+
+    @staticmethod
+    def _freshness(conn, state):
+        now = conn.execute("SELECT datetime('now')").fetchone()[0]
+        return {
+            'computed_at': state['computed_at'],
+            'age_seconds': int(_seconds_between(state['computed_at'], now)),
+            'refresh_interval_seconds': ANALYTICS_REFRESH_SECONDS,
+        }
+
+    def _cohort_totals(self, conn, months=None):
+        where, params = '', []
+        if months is not None:
+            where = "WHERE cohort >= strftime('%Y-%m', 'now', ?)"
+            params.append(f'-{months} months')
+        totals = {key: 0 for key in COHORT_COUNTS}
+        levels = {}
+        for row in conn.execute(f'SELECT * FROM analytics_cohorts {where} ORDER BY cohort', params).fetchall():
+            for key in COHORT_COUNTS:
+                totals[key] += row[key]
+            for level, count in json.loads(row['cefr_levels']).items():
+                levels[level] = levels.get(level, 0) + count
+        return totals, levels
+
+    def dashboard(self):
+        """`stats` and `metrics` for /api/admin/dashboard"""
+        conn = self.db.get_connection()
+        try:
+            state = self._read(conn)
+            snapshot = self._snapshot(conn, 'dashboard')
+            totals, _ = self._cohort_totals(conn)
+            recent = conn.execute('''
+                SELECT
+                    SUM(new_users) as new_users_this_month,
+                    SUM(CASE WHEN day >= date('now', '-7 days') THEN assessments END) as assessments_this_week
+                FROM analytics_daily
+                WHERE day >= date('now', '-30 days')
+            ''').fetchone()
+            return {
+                'stats': {
+                    'overall': {
+                        'total_users': totals['accounts'],
+                        'total_assessments': snapshot['total_assessments'],
+                        'total_phase2_sessions': snapshot['total_phase2_sessions'],
+                        'avg_xp': 0
+                    },
+                    'assessment_stats': [],
+                    'recent_activity': snapshot['recent_activity']
+                },
+                'metrics': {
+                    'new_users_this_month': recent['new_users_this_month'] or 0,
+                    'assessments_this_week': recent['assessments_this_week'] or 0,
+                    'active_users_today': snapshot['active_users_today']
+                },
+                'freshness': self._freshness(conn, state)
+            }
+        finally:
+            conn.close()
+
+    def analytics(self):
+        """The /api/admin/analytics payload"""
+        conn = self.db.get_connection()
+        try:
+            state = self._read(conn)
+            snapshot = self._snapshot(conn, 'analytics')
+            totals, levels = self._cohort_totals(conn)
+            daily_activity = [dict(row) for row in conn.execute('''
+                SELECT day as date, active_users FROM analytics_daily
+                WHERE day >= date('now', '-30 days') AND active_users > 0
+                ORDER BY day DESC
+                LIMIT 30
+            ''').fetchall()]
+            phase_completion = {'total_users': totals['users']}
+            phase_completion.update({key: totals[key] for key in COHORT_COUNTS[2:]})
+            return {
+                'learning_progress': {
+                    'cefr_distribution': [
+                        {'level': level, 'count': levels[level]}
+                        for level in sorted(levels, key=lambda l: (CEFR_ORDER.index(l) if l in CEFR_ORDER else -1, l))
+                    ],
+                    'phase_completion': phase_completion,
+                    'avg_assessment_times': snapshot['avg_assessment_times']
+                },
+                'engagement': {
+                    'active_users_7d': snapshot['active_users_7d'],
+                    'active_users_30d': snapshot['active_users_30d'],
+                    'daily_activity': daily_activity,
+                    'session_duration_dist': snapshot['session_duration_dist']
+                },
+                'quality': {
+                    'ai_detection': snapshot['ai_detection'],
+                    'score_distribution': snapshot['score_distribution'],
+                    'challenging_steps': snapshot['challenging_steps']
+                },
+                'risk': {
+                    'at_risk_students': snapshot['at_risk_students'],
+                    'stuck_students': snapshot['stuck_students']
+                },
+                'system': {
+                    'recent_errors': snapshot['recent_errors'],
+                    'total_sessions_7d': snapshot['total_sessions_7d']
+                },
+                'freshness': self._freshness(conn, state)
+            }
+        finally:
+            conn.close()
+
+    def system_statistics(self):
+        """AssessmentHistory.get_system_statistics, from the rollups"""
+        conn = self.db.get_connection()
+        try:
+            state = self._read(conn)
+            snapshot = self._snapshot(conn, 'system_statistics')
+            # Sign-ups per month over the last year are the cohort sizes
+            user_activity = [dict(row) for row in conn.execute('''
+                SELECT cohort as month, accounts as new_users FROM analytics_cohorts
+                WHERE cohort >= strftime('%Y-%m', 'now', '-12 months') AND cohort != 'unknown'
+                ORDER BY cohort
+            ''').fetchall()]
+            return {**snapshot, 'user_activity': user_activity, 'freshness': self._freshness(conn, state)}
+        finally:
+            conn.close()
+
+
+_rollups = None
+_rollups_lock = threading.Lock()
+_refresher_running = threading.Event()
+
+
+def get_analytics_rollups():
+    """Shared instance for the worker"""
+    global _rollups
+    if _rollups is None:
+        with _rollups_lock:
+            if _rollups is None:
+                from dependencies import db_manager
+                _rollups = AnalyticsRollups(db_manager)
+    return _rollups
+
+
+def _refresh_loop():
+    from services.startup import is_ready
+    while not is_ready():
+        time.sleep(1)
+    while True:
+        try:
+            get_analytics_rollups().refresh()
+        except Exception as e:
+            logger.error(f"Analytics rollup refresh failed: {str(e)}")
+        time.sleep(ANALYTICS_REFRESH_SECONDS)
+
+
+def start_rollup_refresher():
+    """Called from the app's startup hook; no-op when FARDI_ANALYTICS_REFRESH is 0"""
+    if ANALYTICS_REFRESH_SECONDS <= 0:
+        return
+    with _rollups_lock:
+        if _refresher_running.is_set():
+            return
+        _refresher_running.set()
+    threading.Thread(target=_refresh_loop, name="analytics-rollups", daemon=True).start()
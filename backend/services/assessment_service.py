@@ -18,68 +18,88 @@ class AssessmentService:
         try:
             # Special handling for listening questions
             if question_type == "listening":
-                # Get the expected sentence from DIALOGUE_QUESTIONS
-                expected_sentence = ""
-                for q in DIALOGUE_QUESTIONS:
-                    if q["type"] == "listening":
-                        expected_sentence = q.get("expected_sentence", "We could have a dance show or a food tasting.")
-                        break
-
-                # Use specialized assessment for listening
-                return self.assess_listening_response(expected_sentence, answer)
-
-            # Get detailed prompt with example responses and criteria
-            prompt = self._get_level_assessment_prompt(question, answer, question_type)
-
-            logger.info(f"Sending prompt to Groq for assessment: {prompt[:100]}...")
-
-            # Call Groq API for assessment
-            if self.ai_service.client:
-                response = self.ai_service.client.chat.completions.create(
-                    model=self.ai_service.model,
-                    messages=[
-                        {"role": "system", "content": "You are an expert language assessor specializing in CEFR levels."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    max_tokens=self.ai_service.max_tokens,
-                    temperature=0.3  # Lower temperature for more consistent assessments
-                )
-
-                result = response.choices[0].message.content
-                logger.info(f"Groq response received, length: {len(result)}")
-
-                # Parse the JSON response
-                try:
-                    assessment = json.loads(result)
-
-                    # Extract what we need and ensure all fields exist
-                    clean_assessment = {
-                        "level": assessment.get("level", "B1"),
-                        "justification": assessment.get("justification", "No justification provided"),
-                        "vocabulary_assessment": assessment.get("vocabulary_assessment", ""),
-                        "grammar_assessment": assessment.get("grammar_assessment", ""),
-                        "spelling_assessment": assessment.get("spelling_assessment", ""),
-                        "comprehension_assessment": assessment.get("comprehension_assessment", ""),
-                        "fluency_assessment": assessment.get("fluency_assessment", ""),
-                        "specific_strengths": assessment.get("specific_strengths", []),
-                        "specific_areas_for_improvement": assessment.get("specific_areas_for_improvement", []),
-                        "tips_for_improvement": assessment.get("tips_for_improvement", "")
-                    }
-                    return clean_assessment
-
-                except json.JSONDecodeError:
-                    logger.error(f"Failed to parse JSON from Groq response: {result}")
-                    # Use fallback assessment method
-                    return self._fallback_assessment(answer)
-            else:
-                # Use fallback assessment method
+                return self._assess_listening_question(answer)
+
+            if not self.ai_service.client:
                 return self._fallback_assessment(answer)
 
+            result = self.ai_service.complete(
+                self._level_assessment_messages(question, answer, question_type),
+                temperature=0.3  # Lower temperature for more consistent assessments
+            )
+            return self._parse_level_assessment(result, answer)
+
         except Exception as e:
             logger.error(f"Error assessing response with Groq: {str(e)}")
             # Use fallback assessment method
             return self._fallback_assessment(answer)
 
+    async def assess_response_async(self, question, answer, question_type=None):
+        """Async variant of assess_response that does not block the event loop"""
+        try:
+            if question_type == "listening":
+                return self._assess_listening_question(answer)
+
+            if not self.ai_service.client:
+                return self._fallback_assessment(answer)
+
+            result = await self.ai_service.complete_async(
+                self._level_assessment_messages(question, answer, question_type),
+                temperature=0.3
+            )
+            return self._parse_level_assessment(result, answer)
+
+        except Exception as e:
+            logger.error(f"Error assessing response with Groq: {str(e)}")
+            return self._fallback_assessment(answer)
+
+    def _assess_listening_question(self, answer):
+        # Get the expected sentence from DIALOGUE_QUESTIONS
+        expected_sentence = ""
+        for q in DIALOGUE_QUESTIONS:
+            if q["type"] == "listening":
+                expected_sentence = q.get("expected_sentence", "We could have a dance show or a food tasting.")
+                break
+
+        # Use specialized assessment for listening
+        return self.assess_listening_response(expected_sentence, answer)
+
+    def _level_assessment_messages(self, question, answer, question_type=None):
+        # Get detailed prompt with example responses and criteria
+        prompt = self._get_level_assessment_prompt(question, answer, question_type)
+        logger.info(f"Sending prompt to Groq for assessment: {prompt[:100]}...")
+        return [
+            {"role": "system", "content": "You are an expert language assessor specializing in CEFR levels."},
+            {"role": "user", "content": prompt}
+        ]
+
+    def _parse_level_assessment(self, result, answer):
+        logger.info(f"Groq response received, length: {len(result)}")
+
+        # Parse the JSON response
+        try:
+            assessment = json.loads(result)
+
+            # Extract what we need and ensure all fields exist
+            clean_assessment = {
+                "level": assessment.get("level", "B1"),
+                "justification": assessment.get("justification", "No justification provided"),
+                "vocabulary_assessment": assessment.get("vocabulary_assessment", ""),
+                "grammar_assessment": assessment.get("grammar_assessment", ""),
+                "spelling_assessment": assessment.get("spelling_assessment", ""),
+                "comprehension_assessment": assessment.get("comprehension_assessment", ""),
+                "fluency_assessment": assessment.get("fluency_assessment", ""),
+                "specific_strengths": assessment.get("specific_strengths", []),
+                "specific_areas_for_improvement": assessment.get("specific_areas_for_improvement", []),
+                "tips_for_improvement": assessment.get("tips_for_improvement", "")
+            }
+            return clean_assessment
+
+        except json.JSONDecodeError:
+            logger.error(f"Failed to parse JSON from Groq response: {result}")
+            # Use fallback assessment method
+            return self._fallback_assessment(answer)
+
     def assess_listening_response(self, expected_sentence, user_response):
         """
         Compare a user's listening response to the expected sentence and determine accuracy level
@@ -177,6 +197,10 @@ class AssessmentService:
         """Check if response is AI-generated using the AI service"""
         return self.ai_service.check_with_sapling_api(text)
 
+    async def check_ai_response_async(self, text):
+        """Async variant of check_ai_response for request handlers"""
+        return await self.ai_service.check_with_sapling_api_async(text)
+
     def _get_keyword_analysis(self, text):
         """Analyze keywords in text to help determine vocabulary level"""
         # Advanced vocabulary (C1-B2)
@@ -389,82 +413,102 @@ class AssessmentService:
     def assess_phase2_response(self, step_id, action_item_id, response):
         """Assess Phase 2 responses with specific cultural event planning criteria"""
         try:
-            from models.game_data import PHASE_2_STEPS, PHASE_2_POINTS
-            
-            # Get action item data
-            step_data = PHASE_2_STEPS.get(step_id, {})
-            action_items = step_data.get('action_items', [])
-            
-            action_item = None
-            for item in action_items:
-                if item['id'] == action_item_id:
-                    action_item = item
-                    break
-            
-            if not action_item:
+            context = self._phase2_assessment_context(step_id, action_item_id, response)
+            if context is None or not self.ai_service.client:
                 return self._fallback_phase2_assessment(response)
-            
-            # Analyze response
-            keyword_analysis = self._get_keyword_analysis(response)
-            grammar_analysis = self._get_grammar_analysis(response)
-            cultural_keywords = ['tunisian', 'culture', 'tradition', 'music', 'malouf', 'heritage', 'food', 'art']
-            teamwork_keywords = ['team', 'together', 'collaborate', 'work with', 'suggest', 'agree']
-            has_cultural_ref = any(keyword in response.lower() for keyword in cultural_keywords)
-            has_teamwork_ref = any(keyword in response.lower() for keyword in teamwork_keywords)
-            
-            # Create Phase 2 specific assessment prompt
-            prompt = self._get_phase2_assessment_prompt(action_item, response, step_id)
-            
-            if self.ai_service.client:
-                response_obj = self.ai_service.client.chat.completions.create(
-                    model=self.ai_service.model,
-                    messages=[
-                        {
-                            "role": "system", 
-                            "content": "You are an expert assessor for Phase 2 cultural event planning activities, specializing in teamwork, cultural awareness, and communication skills."
-                        },
-                        {"role": "user", "content": prompt}
-                    ],
-                    max_tokens=self.ai_service.max_tokens,
-                    temperature=0.3
-                )
-                
-                result = response_obj.choices[0].message.content
-                
-                try:
-                    assessment = json.loads(result)
-                    level = assessment.get("level", "B1")
-                    points = PHASE_2_POINTS.get(level, 1)
-                    
-                    # Adjust level based on cultural and teamwork references
-                    if level == "A1" and has_cultural_ref and has_teamwork_ref:
-                        level = "A2"
-                        points = PHASE_2_POINTS.get("A2", 2)
-                    elif level == "A2" and has_cultural_ref and has_teamwork_ref and grammar_analysis['has_complex_sentences']:
-                        level = "B1"
-                        points = PHASE_2_POINTS.get("B1", 3)
-                    
-                    return {
-                        "level": level,
-                        "points": points,
-                        "justification": assessment.get("justification", ""),
-                        "feedback": assessment.get("feedback", ""),
-                        "strengths": assessment.get("strengths", []),
-                        "improvements": assessment.get("improvements", []),
-                        "cultural_awareness": assessment.get("cultural_awareness", "Good" if has_cultural_ref else "Could be improved"),
-                        "teamwork_skills": assessment.get("teamwork_skills", "Good" if has_teamwork_ref else "Could be improved"),
-                        "communication_clarity": assessment.get("communication_clarity", "Clear" if level in ["B1", "B2"] else "Basic")
-                    }
-                    
-                except json.JSONDecodeError:
-                    logger.error(f"Failed to parse Phase 2 assessment JSON: {result}")
-                    return self._fallback_phase2_assessment(response)
-            else:
+
+            result = self.ai_service.complete(context['messages'], temperature=0.3)
+            return self._parse_phase2_assessment(result, response, context)
+
+        except Exception as e:
+            logger.error(f"Error in Phase 2 assessment: {str(e)}")
+            return self._fallback_phase2_assessment(response)
+
+    async def assess_phase2_response_async(self, step_id, action_item_id, response):
+        """Async variant of assess_phase2_response that does not block the event loop"""
+        try:
+            context = self._phase2_assessment_context(step_id, action_item_id, response)
+            if context is None or not self.ai_service.client:
                 return self._fallback_phase2_assessment(response)
-                    
+
+            result = await self.ai_service.complete_async(context['messages'], temperature=0.3)
+            return self._parse_phase2_assessment(result, response, context)
+
         except Exception as e:
             logger.error(f"Error in Phase 2 assessment: {str(e)}")
             return self._fallback_phase2_assessment(response)
+
+    def _phase2_assessment_context(self, step_id, action_item_id, response):
+        """Build the prompt and local analysis for a Phase 2 item; None if the item is unknown"""
+        from models.game_data import PHASE_2_STEPS
+        
+        # Get action item data
+        step_data = PHASE_2_STEPS.get(step_id, {})
+        action_items = step_data.get('action_items', [])
+        
+        action_item = None
+        for item in action_items:
+            if item['id'] == action_item_id:
+                action_item = item
+                break
+        
+        if not action_item:
+            return None
+        
+        # Analyze response
+        grammar_analysis = self._get_grammar_analysis(response)
+        cultural_keywords = ['tunisian', 'culture', 'tradition', 'music', 'malouf', 'heritage', 'food', 'art']
+        teamwork_keywords = ['team', 'together', 'collaborate', 'work with', 'suggest', 'agree']
+        
+        # Create Phase 2 specific assessment prompt
+        prompt = self._get_phase2_assessment_prompt(action_item, response, step_id)
+        
+        return {
+            'has_cultural_ref': any(keyword in response.lower() for keyword in cultural_keywords),
+            'has_teamwork_ref': any(keyword in response.lower() for keyword in teamwork_keywords),
+            'has_complex_sentences': grammar_analysis['has_complex_sentences'],
+            'messages': [
+                {
+                    "role": "system", 
+                    "content": "You are an expert assessor for Phase 2 cultural event planning activities, specializing in teamwork, cultural awareness, and communication skills."
+                },
+                {"role": "user", "content": prompt}
+            ],
+        }
+
+    def _parse_phase2_assessment(self, result, response, context):
+        from models.game_data import PHASE_2_POINTS
+
+        has_cultural_ref = context['has_cultural_ref']
+        has_teamwork_ref = context['has_teamwork_ref']
+        try:
+            assessment = json.loads(result)
+            level = assessment.get("level", "B1")
+            points = PHASE_2_POINTS.get(level, 1)
+            
+            # Adjust level based on cultural and teamwork references
+            if level == "A1" and has_cultural_ref and has_teamwork_ref:
+                level = "A2"
+                points = PHASE_2_POINTS.get("A2", 2)
+            elif level == "A2" and has_cultural_ref and has_teamwork_ref and context['has_complex_sentences']:
+                level = "B1"
+                points = PHASE_2_POINTS.get("B1", 3)
+            
+            return {
+                "level": level,
+                "points": points,
+                "justification": assessment.get("justification", ""),
+                "feedback": assessment.get("feedback", ""),
+                "strengths": assessment.get("strengths", []),
+                "improvements": assessment.get("improvements", []),
+                "cultural_awareness": assessment.get("cultural_awareness", "Good" if has_cultural_ref else "Could be improved"),
+                "teamwork_skills": assessment.get("teamwork_skills", "Good" if has_teamwork_ref else "Could be improved"),
+                "communication_clarity": assessment.get("communication_clarity", "Clear" if level in ["B1", "B2"] else "Basic")
+            }
+            
+        except json.JSONDecodeError:
+            logger.error(f"Failed to parse Phase 2 assessment JSON: {result}")
+            return self._fallback_phase2_assessment(response)
     
     def _get_phase2_assessment_prompt(self, action_item, response, step_id):
         """Create assessment prompt for Phase 2 activities"""
@@ -3,22 +3,28 @@ Audio Service for generating speech using Edge TTS
 """
 import os
 import asyncio
-import edge_tts
+import importlib
 import logging
 from models.game_data import DIALOGUE_QUESTIONS
+from services.startup import on_startup
+from services.request_metrics import timed
 
 logger = logging.getLogger(__name__)
 
 class AudioService:
     def __init__(self):
+        # The directory is created when the first file is written
         self.audio_dir = os.path.join('static', 'audio')
-        os.makedirs(self.audio_dir, exist_ok=True)
 
     async def generate_audio(self, text, output_path, voice="en-US-ChristopherNeural"):
         """Generate audio file using Edge TTS"""
         try:
+            # edge_tts pulls in aiohttp; imported on first use (or during warm-up)
+            import edge_tts
+            os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
             communicate = edge_tts.Communicate(text, voice)
-            await communicate.save(output_path)
+            with timed("tts"):
+                await communicate.save(output_path)
             logger.info(f"Generated audio file: {output_path}")
         except Exception as e:
             logger.error(f"Error generating audio: {str(e)}")
@@ -127,4 +133,7 @@ class AudioService:
                 raise Exception("Failed to generate audio")
         except Exception as e:
             logger.error(f"Error generating custom audio: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+
+
+on_startup("edge-tts", lambda: importlib.import_module("edge_tts"), required=False)
@@ -3,21 +3,20 @@ Avatar Customization Service
 Handles avatar items, purchases, and customization
 """
 
-import sqlite3
 from typing import Dict, List, Optional
 
 
 class AvatarService:
     """Service for avatar customization"""
     
-    def __init__(self, db_path='instance/fardi.db'):
-        self.db_path = db_path
+    def __init__(self, db_manager=None):
+        if db_manager is None:
+            from dependencies import db_manager
+        self.db = db_manager
     
     def get_connection(self):
-        """Get database connection"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+        """Get a pooled connection to the shared database"""
+        return self.db.get_connection()
     
     def get_available_items(self, category: Optional[str] = None) -> List[Dict]:
         """Get all available avatar items, optionally filtered by category"""
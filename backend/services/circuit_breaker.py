@@ -0,0 +1,197 @@
+"""
+Per-upstream circuit breakers.
+
+Each breaker keeps a rolling window of recent call outcomes (success/failure
+and latency). When the failure rate or the share of slow calls in the window
+crosses its threshold the breaker opens and callers fail fast with
+CircuitOpenError, which the AI helpers already turn into their local
+fallbacks. After a cool-down the breaker lets a single probe through
+(half-open); a good probe closes it again, a bad one re-opens it.
+"""
+import os
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+BREAKER_WINDOW_SECONDS = float(os.getenv("FARDI_BREAKER_WINDOW_SECONDS", 60))
+BREAKER_MIN_CALLS = int(os.getenv("FARDI_BREAKER_MIN_CALLS", 5))
+BREAKER_FAILURE_RATE = float(os.getenv("FARDI_BREAKER_FAILURE_RATE", 0.5))
+BREAKER_SLOW_CALL_SECONDS = float(os.getenv("FARDI_BREAKER_SLOW_CALL_SECONDS", 10))
+BREAKER_SLOW_CALL_RATE = float(os.getenv("FARDI_BREAKER_SLOW_CALL_RATE", 0.8))
+BREAKER_OPEN_SECONDS = float(os.getenv("FARDI_BREAKER_OPEN_SECONDS", 30))
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling an upstream whose breaker is open"""
+
+    def __init__(self, name, retry_in):
+        super().__init__(f"{name} circuit open, retry in {retry_in:.1f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    def __init__(self, name, window_seconds=None, min_calls=None, failure_rate=None,
+                 slow_call_seconds=None, slow_call_rate=None, open_seconds=None):
+        self.name = name
+        self.window_seconds = window_seconds or BREAKER_WINDOW_SECONDS
+        self.min_calls = min_calls or BREAKER_MIN_CALLS
+        self.failure_rate = failure_rate or BREAKER_FAILURE_RATE
+        self.slow_call_seconds = slow_call_seconds or BREAKER_SLOW_CALL_SECONDS
+        self.slow_call_rate = slow_call_rate or BREAKER_SLOW_CALL_RATE
+        self.open_seconds = open_seconds or BREAKER_OPEN_SECONDS
+
+        self._lock = threading.Lock()
+        self._calls = deque()  # (finished_at, ok, latency)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+        self.rejected = 0
+        self.times_opened = 0
+        self.last_error = None
+
+    def _trim(self, now):
+        cutoff = now - self.window_seconds
+        while self._calls and self._calls[0][0] < cutoff:
+            self._calls.popleft()
+
+    def _open(self, now):
+        self._state = OPEN
+        self._opened_at = now
+        self._probe_in_flight = False
+        self.times_opened += 1
+
+    def _acquire(self):
+        """Return True if the call may proceed, and whether it is the half-open probe"""
+        now = time.monotonic()
+        with self._lock:
+            if self._state == OPEN and now - self._opened_at >= self.open_seconds:
+                self._state = HALF_OPEN
+            if self._state == CLOSED:
+                return True, False
+            if self._state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True, True
+            self.rejected += 1
+            return False, False
+
+    def _retry_in(self):
+        if self._state == OPEN:
+            return max(0.0, self.open_seconds - (time.monotonic() - self._opened_at))
+        return 0.0
+
+    def allow(self):
+        """Non-consuming check: False while open (or while a half-open probe is running)"""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                return time.monotonic() - self._opened_at >= self.open_seconds
+            return not self._probe_in_flight
+
+    def ensure_available(self):
+        """Cheap pre-check so callers skip queueing for an upstream that is open"""
+        if not self.allow():
+            with self._lock:
+                self.rejected += 1
+                retry_in = self._retry_in()
+            raise CircuitOpenError(self.name, retry_in)
+
+    def record(self, ok, latency, probe=False, error=None):
+        now = time.monotonic()
+        with self._lock:
+            if error is not None:
+                self.last_error = str(error)[:200]
+            if probe or self._state == HALF_OPEN:
+                self._probe_in_flight = False
+                if ok and latency < self.slow_call_seconds:
+                    self._state = CLOSED
+                    self._calls.clear()
+                else:
+                    self._open(now)
+                return
+
+            if self._state == OPEN:
+                return
+            self._calls.append((now, ok, latency))
+            self._trim(now)
+            total = len(self._calls)
+            if total < self.min_calls:
+                return
+            failures = sum(1 for _, call_ok, _ in self._calls if not call_ok)
+            slow = sum(1 for _, _, call_latency in self._calls if call_latency >= self.slow_call_seconds)
+            if failures / total >= self.failure_rate or slow / total >= self.slow_call_rate:
+                self._open(now)
+
+    @contextmanager
+    def guard(self):
+        """
+        Wrap one upstream call. Raises CircuitOpenError when the call is not
+        allowed; records success, failure (any Exception) and latency otherwise.
+        Cancellation releases a half-open probe without counting as a result.
+        """
+        allowed, probe = self._acquire()
+        if not allowed:
+            with self._lock:
+                retry_in = self._retry_in()
+            raise CircuitOpenError(self.name, retry_in)
+
+        started = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            self.record(False, time.monotonic() - started, probe, error=e)
+            raise
+        except BaseException:
+            if probe:
+                with self._lock:
+                    self._probe_in_flight = False
+            raise
+        else:
+            self.record(True, time.monotonic() - started, probe)
+
+    def state(self):
+        now = time.monotonic()
+        with self._lock:
+            if self._state == OPEN and now - self._opened_at >= self.open_seconds:
+                self._state = HALF_OPEN
+            self._trim(now)
+            total = len(self._calls)
+            failures = sum(1 for _, ok, _ in self._calls if not ok)
+            latencies = sorted(latency for _, _, latency in self._calls)
+            return {
+                "state": self._state,
+                "window_calls": total,
+                "window_failure_rate": round(failures / total, 4) if total else 0.0,
+                "window_p50_ms": round(latencies[total // 2] * 1000, 1) if total else None,
+                "window_max_ms": round(latencies[-1] * 1000, 1) if total else None,
+                "retry_in_seconds": round(self._retry_in(), 1),
+                "times_opened": self.times_opened,
+                "rejected": self.rejected,
+                "last_error": self.last_error,
+            }
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name):
+    """Process-wide breaker for the named upstream"""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name)
+        return breaker
+
+
+def breaker_states():
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.state() for breaker in breakers}
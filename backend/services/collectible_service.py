@@ -4,7 +4,6 @@ Handles collectible drops, user collections, and rarity system
 """
 
 import random
-import sqlite3
 from typing import Dict, List, Optional
 from datetime import datetime
 
@@ -30,14 +29,14 @@ RARITY_COLORS = {
 class CollectibleService:
     """Service for managing collectibles"""
     
-    def __init__(self, db_path='instance/fardi.db'):
-        self.db_path = db_path
+    def __init__(self, db_manager=None):
+        if db_manager is None:
+            from dependencies import db_manager
+        self.db = db_manager
     
     def get_connection(self):
-        """Get database connection"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+        """Get a pooled connection to the shared database"""
+        return self.db.get_connection()
     
     def get_all_collectibles(self) -> List[Dict]:
         """Get all available collectibles"""
@@ -0,0 +1,266 @@
+"""
+Fingerprinted cache for AI-detection results.
+
+Students often resubmit the same paragraph, or one with small edits. Results
+are stored per normalised-text hash, together with a 64-bit SimHash of the
+words and word bigrams split into eight 8-bit bands. Two fingerprints within
+7 bits of each other share at least one band, so a band match narrows the
+candidates and the exact Hamming distance decides. A one- or two-word edit
+of a paragraph typically moves the fingerprint by 3-9 bits; unrelated texts
+on the same topic differ by 20+.
+"""
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+AI_DETECT_CACHE_ENABLED = os.getenv("FARDI_AI_DETECT_CACHE", "1") not in ("0", "false", "False")
+AI_DETECT_CACHE_TTL = int(os.getenv("FARDI_AI_DETECT_CACHE_TTL", 30 * 24 * 3600))
+AI_DETECT_NEAR_DUPLICATES = os.getenv("FARDI_AI_DETECT_NEAR_DUP", "1") not in ("0", "false", "False")
+# Share of the 64 SimHash bits that must agree; 0.89 allows 7 differing bits (the band limit)
+AI_DETECT_SIMILARITY = float(os.getenv("FARDI_AI_DETECT_SIMILARITY", 0.89))
+AI_DETECT_MEMORY_ENTRIES = 2048
+AI_DETECT_MAX_ENTRIES = int(os.getenv("FARDI_AI_DETECT_CACHE_MAX_ENTRIES", 100000))
+
+_EVICT_EVERY = 200
+_BANDS = 8
+_BAND_BITS = 64 // _BANDS
+_BAND_MASK = (1 << _BAND_BITS) - 1
+
+_WORDS = re.compile(r"\w+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalise_text(text):
+    return _WHITESPACE.sub(" ", (text or "").lower()).strip()
+
+
+def text_hash(normalised):
+    return hashlib.sha256(normalised.encode("utf-8")).hexdigest()
+
+
+def simhash(normalised):
+    """64-bit SimHash over words and word bigrams"""
+    words = _WORDS.findall(normalised)
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    if not features:
+        return 0
+    weights = [0] * 64
+    for feature in features:
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if h >> bit & 1 else -1
+    value = 0
+    for bit in range(64):
+        if weights[bit] > 0:
+            value |= 1 << bit
+    return value
+
+
+class Fingerprint:
+    """Normalised text and its hash for one lookup; the SimHash is computed on first use"""
+
+    __slots__ = ("normalised", "digest", "_simhash")
+
+    def __init__(self, text):
+        self.normalised = normalise_text(text)
+        self.digest = text_hash(self.normalised)
+        self._simhash = None
+
+    @property
+    def simhash(self):
+        if self._simhash is None:
+            self._simhash = simhash(self.normalised)
+        return self._simhash
+
+
+def _to_signed(value):
+    """SQLite INTEGER is signed 64-bit"""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def _bands(value):
+    return [(value >> (i * _BAND_BITS)) & _BAND_MASK for i in range(_BANDS)]
+
+
+class DetectionCache:
+    """Exact (memory + SQLite) and near-duplicate (SimHash) cache of detection results"""
+
+    def __init__(self, db_manager, ttl=AI_DETECT_CACHE_TTL, near_duplicates=AI_DETECT_NEAR_DUPLICATES,
+                 similarity=AI_DETECT_SIMILARITY, max_entries=AI_DETECT_MAX_ENTRIES):
+        self.db = db_manager
+        self.ttl = ttl
+        self.near_duplicates = near_duplicates
+        self.max_distance = min(int(round(64 * (1 - similarity))), _BANDS - 1)
+        self.max_entries = max_entries
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._stats = {"memory_hits": 0, "exact_hits": 0, "near_hits": 0, "misses": 0}
+
+    def _count(self, kind):
+        with self._lock:
+            self._stats[kind] += 1
+
+    @staticmethod
+    def _result(row):
+        return (bool(row['is_ai']), row['score'], json.loads(row['reasons'] or '[]'))
+
+    def get_memory(self, fingerprint, source):
+        key = (fingerprint.digest, source)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            result, expires_at = entry
+            if expires_at <= now:
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            self._stats["memory_hits"] += 1
+        return result
+
+    def _remember(self, key, result, expires_at):
+        with self._lock:
+            self._memory[key] = (result, expires_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > AI_DETECT_MEMORY_ENTRIES:
+                self._memory.popitem(last=False)
+
+    def get(self, fingerprint, source):
+        """
+        Return a cached (is_ai, score, reasons) for this text or a near-duplicate,
+        else None. Pass the same Fingerprint on to set() after a miss.
+        """
+        result = self.get_memory(fingerprint, source)
+        if result is not None:
+            return result
+
+        digest = fingerprint.digest
+        now = time.time()
+        try:
+            with self.db.connection() as conn:
+                row = conn.execute('''
+                    SELECT is_ai, score, reasons, expires_at FROM ai_detection_cache
+                    WHERE text_hash = ? AND source = ? AND expires_at > ?
+                ''', (digest, source, now)).fetchone()
+                kind = "exact_hits"
+                matched_hash = digest
+
+                if row is None and self.near_duplicates:
+                    row, matched_hash = self._nearest(conn, fingerprint, source, now)
+                    kind = "near_hits"
+
+                if row is not None:
+                    conn.execute(
+                        'UPDATE ai_detection_cache SET last_used = ?, hits = hits + 1 WHERE text_hash = ? AND source = ?',
+                        (now, matched_hash, source)
+                    )
+        except Exception as e:
+            logger.warning(f"AI detection cache read failed: {str(e)}")
+            row = None
+
+        if row is None:
+            self._count("misses")
+            return None
+
+        result = self._result(row)
+        self._remember((digest, source), result, row['expires_at'])
+        self._count(kind)
+        return result
+
+    def _nearest(self, conn, fingerprint, source, now):
+        value = fingerprint.simhash
+        bands = _bands(value)
+        length = len(fingerprint.normalised)
+        band_match = " OR ".join(f"band{i} = ?" for i in range(_BANDS))
+        # Large length changes are new drafts, not small edits
+        rows = conn.execute(f'''
+            SELECT text_hash, simhash, is_ai, score, reasons, expires_at FROM ai_detection_cache
+            WHERE source = ? AND expires_at > ? AND text_length BETWEEN ? AND ? AND ({band_match})
+        ''', (source, now, int(length * 0.8), int(length / 0.8) + 1, *bands)).fetchall()
+
+        best, best_distance = None, self.max_distance + 1
+        for row in rows:
+            distance = bin((row['simhash'] & ((1 << 64) - 1)) ^ value).count("1")
+            if distance < best_distance:
+                best, best_distance = row, distance
+        return best, (best['text_hash'] if best is not None else None)
+
+    def set(self, fingerprint, source, result):
+        is_ai, score, reasons = result
+        digest, value = fingerprint.digest, fingerprint.simhash
+        now = time.time()
+        expires_at = now + self.ttl
+        self._remember((digest, source), result, expires_at)
+        try:
+            with self.db.connection() as conn:
+                conn.execute('''
+                    INSERT OR REPLACE INTO ai_detection_cache
+                    (text_hash, source, simhash, band0, band1, band2, band3, band4, band5, band6, band7,
+                     text_length, is_ai, score, reasons, created_at, expires_at, last_used)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (digest, source, _to_signed(value), *_bands(value), len(fingerprint.normalised),
+                      int(bool(is_ai)), float(score), json.dumps(list(reasons) if not isinstance(reasons, str) else [reasons]),
+                      now, expires_at, now))
+        except Exception as e:
+            logger.warning(f"AI detection cache write failed: {str(e)}")
+            return
+
+        with self._lock:
+            self._writes += 1
+            evict = self._writes % _EVICT_EVERY == 0
+        if evict:
+            self.evict()
+
+    def evict(self):
+        try:
+            with self.db.connection() as conn:
+                conn.execute('DELETE FROM ai_detection_cache WHERE expires_at <= ?', (time.time(),))
+                conn.execute('''
+                    DELETE FROM ai_detection_cache WHERE rowid IN (
+                        SELECT rowid FROM ai_detection_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                    )
+                ''', (self.max_entries,))
+        except Exception as e:
+            logger.warning(f"AI detection cache eviction failed: {str(e)}")
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self._stats)
+            memory_size = len(self._memory)
+        lookups = counts["memory_hits"] + counts["exact_hits"] + counts["near_hits"] + counts["misses"]
+        hits = lookups - counts["misses"]
+        return {
+            "enabled": AI_DETECT_CACHE_ENABLED,
+            "near_duplicates": self.near_duplicates,
+            "max_hamming_distance": self.max_distance,
+            "memory_entries": memory_size,
+            **counts,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_detection_cache():
+    """Shared detection cache for the worker, or None when disabled"""
+    global _cache
+    if not AI_DETECT_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                from dependencies import db_manager
+                _cache = DetectionCache(db_manager)
+    return _cache
@@ -0,0 +1,427 @@
+"""
+Game session storage for the Phase 1/2 API (replaces Flask filesystem sessions).
+
+Scalar state (current step, XP, level, ...) lives on one game_sessions row
+per user. Answers, assessments and per-step maps live in game_session_items,
+one row per (user_id, kind, key), so a submit writes a single small row and a
+read fetches only the kinds it needs instead of re-parsing the whole history.
+
+game_sessions rows are cached per worker (LRU). Entries carry the row's
+`version`, which every write increments: the first read in a request checks
+it with a primary-key lookup so changes made by other workers are picked up,
+later reads in the same request are served from memory, and scalar updates
+made during a request are coalesced into one UPDATE when the request ends
+(see flush_session_updates / the middleware in main.py). A flush whose
+version no longer matches re-applies only its own fields, so concurrent
+writers from other workers are not overwritten wholesale.
+"""
+import os
+import json
+import logging
+import threading
+from collections import OrderedDict
+from contextvars import ContextVar
+
+from dependencies import db_manager
+from migrations.game_session_items import SESSION_ITEM_KINDS, item_key, session_items_query
+
+logger = logging.getLogger(__name__)
+
+SESSION_CACHE_ENABLED = os.getenv("FARDI_SESSION_CACHE", "1") not in ("0", "false", "False")
+SESSION_CACHE_ENTRIES = int(os.getenv("FARDI_SESSION_CACHE_ENTRIES", 5000))
+
+# Set by the HTTP middleware for the duration of a request; None outside requests
+_request_scope = ContextVar("game_session_request_scope", default=None)
+
+
+class _Entry:
+    __slots__ = ('data', 'version', 'dirty')
+
+    def __init__(self, data, version):
+        self.data = data
+        self.version = version
+        self.dirty = {}
+
+
+class SessionCache:
+    """Per-worker LRU of game_sessions rows with versioned, write-behind updates"""
+
+    def __init__(self, max_entries=SESSION_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats_counters = {
+            'hits': 0, 'validated': 0, 'stale': 0, 'misses': 0,
+            'deferred_updates': 0, 'flushes': 0, 'conflicts': 0,
+        }
+
+    def _count(self, name):
+        with self._lock:
+            self.stats_counters[name] += 1
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                self._entries.move_to_end(user_id)
+            return entry
+
+    def put(self, user_id, data):
+        entry = _Entry(data, data.get('version') or 0)
+        with self._lock:
+            previous = self._entries.get(user_id)
+            if previous is not None and previous.dirty:
+                # Keep unflushed changes from this worker on top of the fresh row
+                entry.dirty = previous.dirty
+                entry.data.update(previous.dirty)
+            self._entries[user_id] = entry
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                oldest_id, oldest = next(iter(self._entries.items()))
+                if oldest.dirty:
+                    break  # never drop unflushed changes; they go at request end
+                del self._entries[oldest_id]
+        return entry
+
+    def discard(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.stats_counters)
+            size = len(self._entries)
+        return {'enabled': SESSION_CACHE_ENABLED, 'entries': size, **counters}
+
+
+session_cache = SessionCache()
+
+
+def _load_session_row(conn, user_id):
+    row = conn.execute('SELECT * FROM game_sessions WHERE user_id = ?', (user_id,)).fetchone()
+    if not row:
+        conn.execute('INSERT OR IGNORE INTO game_sessions (user_id, items_migrated) VALUES (?, 1)', (user_id,))
+        conn.commit()
+        row = conn.execute('SELECT * FROM game_sessions WHERE user_id = ?', (user_id,)).fetchone()
+    data = dict(row)
+    for kind in SESSION_ITEM_KINDS:
+        data.pop(kind, None)
+    data.pop('items_migrated', None)
+    return data
+
+
+def get_game_session(user_id):
+    """
+    Get game session data for user, creating if needed.
+    Item kinds (responses, phase2_assessments, ...) are not included; they are
+    loaded on first access through get_session_json.
+    """
+    scope = _request_scope.get()
+    if SESSION_CACHE_ENABLED:
+        entry = session_cache.get(user_id)
+        if entry is not None:
+            if entry.dirty or (scope is not None and user_id in scope['validated']):
+                session_cache._count('hits')
+                return dict(entry.data)
+            conn = db_manager.get_connection()
+            try:
+                row = conn.execute('SELECT version FROM game_sessions WHERE user_id = ?', (user_id,)).fetchone()
+            finally:
+                conn.close()
+            if row is not None and (row['version'] or 0) == entry.version:
+                session_cache._count('validated')
+                if scope is not None:
+                    scope['validated'].add(user_id)
+                return dict(entry.data)
+            session_cache._count('stale')
+        else:
+            session_cache._count('misses')
+
+    conn = db_manager.get_connection()
+    try:
+        data = _load_session_row(conn, user_id)
+    finally:
+        conn.close()
+
+    if not SESSION_CACHE_ENABLED:
+        return data
+    entry = session_cache.put(user_id, data)
+    if scope is not None:
+        scope['validated'].add(user_id)
+    return dict(entry.data)
+
+
+def _item_rows(user_id, kind, items):
+    container = SESSION_ITEM_KINDS[kind]
+    return [(user_id, kind, item_key(key, container), json.dumps(value)) for key, value in items]
+
+
+def _replace_items(conn, user_id, kind, value):
+    container = SESSION_ITEM_KINDS[kind]
+    if isinstance(value, str):
+        value = json.loads(value) if value else container()
+    conn.execute('DELETE FROM game_session_items WHERE user_id = ? AND kind = ?', (user_id, kind))
+    conn.executemany(
+        'INSERT INTO game_session_items (user_id, kind, key, value) VALUES (?, ?, ?, ?)',
+        _item_rows(user_id, kind, enumerate(value) if container is list else value.items())
+    )
+
+
+def _write_fields(conn, user_id, fields, expected_version=None):
+    """UPDATE the given scalar fields and bump version; returns rows changed"""
+    sets = [f"{key} = ?" for key in fields]
+    sets.append("updated_at = CURRENT_TIMESTAMP")
+    sets.append("version = COALESCE(version, 0) + 1")
+    values = list(fields.values()) + [user_id]
+    where = "user_id = ?"
+    if expected_version is not None:
+        where += " AND COALESCE(version, 0) = ?"
+        values.append(expected_version)
+    return conn.execute(f"UPDATE game_sessions SET {', '.join(sets)} WHERE {where}", values).rowcount
+
+
+def update_game_session(user_id, **kwargs):
+    """
+    Update game session fields. Item kinds passed here replace that kind's
+    contents entirely; hot paths should use put_session_item / append_session_item.
+    Inside a request, scalar fields are applied to the cached row and written
+    once when the request ends.
+    """
+    items = {k: v for k, v in kwargs.items() if k in SESSION_ITEM_KINDS}
+    fields = {k: v for k, v in kwargs.items() if k not in SESSION_ITEM_KINDS}
+
+    scope = _request_scope.get()
+    if fields and SESSION_CACHE_ENABLED and scope is not None and not scope['closed']:
+        entry = session_cache.get(user_id)
+        if entry is None:
+            get_game_session(user_id)
+            entry = session_cache.get(user_id)
+        if entry is not None:
+            with session_cache._lock:
+                entry.dirty.update(fields)
+                entry.data.update(fields)
+            scope['dirty'].add(user_id)
+            session_cache._count('deferred_updates')
+            fields = {}
+            if not items:
+                return
+
+    conn = db_manager.get_connection()
+    try:
+        for kind, value in items.items():
+            _replace_items(conn, user_id, kind, value)
+        _write_fields(conn, user_id, fields)
+        conn.commit()
+    finally:
+        conn.close()
+    if fields and SESSION_CACHE_ENABLED:
+        entry = session_cache.get(user_id)
+        if entry is not None and not entry.dirty:
+            session_cache.discard(user_id)
+
+
+def flush_session_updates(user_ids=None):
+    """
+    Write the coalesced scalar updates for the given users (default: every
+    dirty cached session) in one UPDATE per user.
+    """
+    if not SESSION_CACHE_ENABLED:
+        return
+    if user_ids is None:
+        with session_cache._lock:
+            user_ids = [uid for uid, entry in session_cache._entries.items() if entry.dirty]
+
+    for user_id in user_ids:
+        entry = session_cache.get(user_id)
+        if entry is None:
+            continue
+        with session_cache._lock:
+            fields, entry.dirty = entry.dirty, {}
+            expected = entry.version
+        if not fields:
+            continue
+
+        conn = db_manager.get_connection()
+        try:
+            if _write_fields(conn, user_id, fields, expected_version=expected):
+                entry.version = expected + 1
+                entry.data['version'] = entry.version
+            else:
+                # Another worker wrote first: apply only our fields, then refresh the entry
+                session_cache._count('conflicts')
+                _write_fields(conn, user_id, fields)
+                session_cache.put(user_id, _load_session_row(conn, user_id))
+            conn.commit()
+            session_cache._count('flushes')
+        except Exception:
+            with session_cache._lock:
+                entry.dirty = {**fields, **entry.dirty}
+            raise
+        finally:
+            conn.close()
+
+
+def begin_session_request():
+    """Open a request scope; pass the returned token to end_session_request"""
+    return _request_scope.set({'validated': set(), 'dirty': set(), 'closed': False})
+
+
+def end_session_request(token):
+    """Flush the request's coalesced session updates and close its scope"""
+    scope = _request_scope.get()
+    try:
+        # Anything still running with this context (e.g. a streaming body) writes through from now on
+        scope['closed'] = True
+        if scope['dirty']:
+            flush_session_updates(scope['dirty'])
+    finally:
+        _request_scope.reset(token)
+
+
+def session_cache_stats():
+    return session_cache.stats()
+
+
+def load_session_items(user_id, kind, keys=None):
+    """Load one kind as its container (list or dict), optionally only some keys"""
+    container = SESSION_ITEM_KINDS[kind]
+    if keys is not None:
+        keys = [item_key(k, container) for k in keys]
+        if not keys:
+            return container()
+    query, params = session_items_query(user_id, kind, keys)
+
+    conn = db_manager.get_connection()
+    try:
+        rows = conn.execute(query, params).fetchall()
+    finally:
+        conn.close()
+
+    if container is list:
+        return [json.loads(row['value']) for row in rows]
+    return {row['key']: json.loads(row['value']) for row in rows}
+
+
+def get_session_item(user_id, kind, key, default=None):
+    """Fetch a single item without loading the rest of its kind"""
+    conn = db_manager.get_connection()
+    try:
+        row = conn.execute(
+            'SELECT value FROM game_session_items WHERE user_id = ? AND kind = ? AND key = ?',
+            (user_id, kind, item_key(key, SESSION_ITEM_KINDS[kind]))
+        ).fetchone()
+    finally:
+        conn.close()
+    return json.loads(row['value']) if row else default
+
+
+def put_session_item(user_id, kind, key, value):
+    """Insert or replace one item - the whole write for a typical submit"""
+    put_session_items(user_id, kind, {key: value})
+
+
+def put_session_items(user_id, kind, items):
+    conn = db_manager.get_connection()
+    try:
+        conn.executemany(
+            'INSERT OR REPLACE INTO game_session_items (user_id, kind, key, value) VALUES (?, ?, ?, ?)',
+            _item_rows(user_id, kind, items.items())
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def put_session_item_if_absent(user_id, kind, key, value):
+    """Store a default without overwriting a value another request already set; returns the stored value"""
+    key = item_key(key, SESSION_ITEM_KINDS[kind])
+    conn = db_manager.get_connection()
+    try:
+        conn.execute(
+            'INSERT OR IGNORE INTO game_session_items (user_id, kind, key, value) VALUES (?, ?, ?, ?)',
+            (user_id, kind, key, json.dumps(value))
+        )
+        row = conn.execute(
+            'SELECT value FROM game_session_items WHERE user_id = ? AND kind = ? AND key = ?',
+            (user_id, kind, key)
+        ).fetchone()
+        conn.commit()
+    finally:
+        conn.close()
+    return json.loads(row['value'])
+
+
+def add_to_session_list(user_id, kind, key, value):
+    """
+    Add a scalar to the JSON list stored at (kind, key) unless it is already
+    there. The check and json_insert run inside one UPSERT, so concurrent
+    requests adding different values never overwrite each other.
+    Returns the list as stored after the update.
+    """
+    key = item_key(key, SESSION_ITEM_KINDS[kind])
+    conn = db_manager.get_connection()
+    try:
+        conn.execute('''
+            INSERT INTO game_session_items (user_id, kind, key, value)
+            VALUES (?, ?, ?, json_array(json(?)))
+            ON CONFLICT (user_id, kind, key) DO UPDATE SET
+                value = json_insert(game_session_items.value, '$[#]', json(?)),
+                updated_at = CURRENT_TIMESTAMP
+            WHERE NOT EXISTS (
+                SELECT 1 FROM json_each(game_session_items.value) WHERE json_each.value = ?
+            )
+        ''', (user_id, kind, key, json.dumps(value), json.dumps(value), value))
+        row = conn.execute(
+            'SELECT value FROM game_session_items WHERE user_id = ? AND kind = ? AND key = ?',
+            (user_id, kind, key)
+        ).fetchone()
+        conn.commit()
+    finally:
+        conn.close()
+    return json.loads(row['value'])
+
+
+def append_session_item(user_id, kind, value):
+    """Append to a list kind; the next position comes from an index seek inside the INSERT"""
+    conn = db_manager.get_connection()
+    try:
+        conn.execute('''
+            INSERT INTO game_session_items (user_id, kind, key, value)
+            SELECT ?, ?, printf('%06d', COALESCE(CAST(MAX(key) AS INTEGER) + 1, 0)), ?
+            FROM game_session_items WHERE user_id = ? AND kind = ?
+        ''', (user_id, kind, json.dumps(value), user_id, kind))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def delete_session_items(user_id, kind, key_prefix):
+    """Remove every item of a kind whose key starts with key_prefix"""
+    conn = db_manager.get_connection()
+    try:
+        conn.execute(
+            'DELETE FROM game_session_items WHERE user_id = ? AND kind = ? AND substr(key, 1, ?) = ?',
+            (user_id, kind, len(key_prefix), key_prefix)
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def get_session_json(session_data, field, default):
+    """
+    Parse a JSON field from game session row.
+    Item kinds are loaded from game_session_items on first access and kept on
+    session_data, so later reads in the same request reuse them.
+    """
+    if field in SESSION_ITEM_KINDS and field not in session_data and 'user_id' in session_data:
+        session_data[field] = load_session_items(session_data['user_id'], field)
+    val = session_data.get(field)
+    if val is None:
+        return default
+    if isinstance(val, str):
+        try:
+            return json.loads(val)
+        except Exception:
+            return default
+    return val
@@ -0,0 +1,192 @@
+"""
+Content-addressed cache for LLM completions.
+
+Two tiers: a per-worker in-memory LRU in front of an SQLite table shared by
+every worker. Entries are keyed on a hash of (model, normalised messages,
+temperature, max_tokens), expire after a TTL and the table is trimmed to a
+maximum number of rows.
+"""
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict, defaultdict
+from contextvars import ContextVar
+
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_ENABLED = os.getenv("FARDI_LLM_CACHE", "1") not in ("0", "false", "False")
+LLM_CACHE_TTL = int(os.getenv("FARDI_LLM_CACHE_TTL", 7 * 24 * 3600))
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv("FARDI_LLM_CACHE_MEMORY_ENTRIES", 1024))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("FARDI_LLM_CACHE_MAX_ENTRIES", 50000))
+
+# Trim the SQLite tier every N writes rather than on every insert
+_EVICT_EVERY = 200
+
+# Label used for hit/miss counters; main.py sets it to the request path
+llm_call_site = ContextVar("llm_call_site", default="internal")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalise_prompt(text):
+    """Collapse whitespace so cosmetic prompt differences share a cache entry"""
+    return _WHITESPACE.sub(" ", text or "").strip()
+
+
+def make_cache_key(model, messages, temperature, max_tokens):
+    payload = json.dumps(
+        [
+            model,
+            [[m.get("role"), normalise_prompt(m.get("content"))] for m in messages],
+            temperature,
+            max_tokens,
+        ],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """Two-tier (memory LRU + SQLite) completion cache with hit/miss counters"""
+
+    def __init__(self, db_manager, ttl=LLM_CACHE_TTL, memory_entries=LLM_CACHE_MEMORY_ENTRIES,
+                 max_entries=LLM_CACHE_MAX_ENTRIES):
+        self.db = db_manager
+        self.ttl = ttl
+        self.memory_entries = memory_entries
+        self.max_entries = max_entries
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._stats = defaultdict(lambda: {"memory_hits": 0, "db_hits": 0, "misses": 0})
+
+    def _count(self, kind):
+        with self._lock:
+            self._stats[llm_call_site.get()][kind] += 1
+
+    def get_memory(self, key):
+        """Memory-tier lookup only; cheap enough to call on the event loop"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= now:
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+        self._count("memory_hits")
+        return value
+
+    def _remember(self, key, value, expires_at):
+        with self._lock:
+            self._memory[key] = (value, expires_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, key):
+        """Full lookup: memory first, then SQLite. Records a miss when both are empty."""
+        value = self.get_memory(key)
+        if value is not None:
+            return value
+
+        now = time.time()
+        try:
+            with self.db.connection() as conn:
+                row = conn.execute(
+                    'SELECT response, expires_at FROM llm_cache WHERE cache_key = ? AND expires_at > ?',
+                    (key, now)
+                ).fetchone()
+                if row:
+                    conn.execute(
+                        'UPDATE llm_cache SET last_used = ?, hits = hits + 1 WHERE cache_key = ?',
+                        (now, key)
+                    )
+        except Exception as e:
+            logger.warning(f"LLM cache read failed: {str(e)}")
+            row = None
+
+        if row is None:
+            self._count("misses")
+            return None
+
+        self._remember(key, row['response'], row['expires_at'])
+        self._count("db_hits")
+        return row['response']
+
+    def set(self, key, value, model=None):
+        if not value:
+            return
+        now = time.time()
+        expires_at = now + self.ttl
+        self._remember(key, value, expires_at)
+        try:
+            with self.db.connection() as conn:
+                conn.execute('''
+                    INSERT OR REPLACE INTO llm_cache (cache_key, model, response, created_at, expires_at, last_used)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (key, model, value, now, expires_at, now))
+        except Exception as e:
+            logger.warning(f"LLM cache write failed: {str(e)}")
+            return
+
+        with self._lock:
+            self._writes += 1
+            evict = self._writes % _EVICT_EVERY == 0
+        if evict:
+            self.evict()
+
+    def evict(self):
+        """Drop expired rows, then the least recently used rows beyond max_entries"""
+        try:
+            with self.db.connection() as conn:
+                conn.execute('DELETE FROM llm_cache WHERE expires_at <= ?', (time.time(),))
+                conn.execute('''
+                    DELETE FROM llm_cache WHERE cache_key IN (
+                        SELECT cache_key FROM llm_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                    )
+                ''', (self.max_entries,))
+        except Exception as e:
+            logger.warning(f"LLM cache eviction failed: {str(e)}")
+
+    def stats(self):
+        with self._lock:
+            by_site = {site: dict(counts) for site, counts in self._stats.items()}
+            memory_size = len(self._memory)
+        totals = {"memory_hits": 0, "db_hits": 0, "misses": 0}
+        for counts in by_site.values():
+            for k in totals:
+                totals[k] += counts[k]
+        lookups = sum(totals.values())
+        totals["hit_rate"] = round((totals["memory_hits"] + totals["db_hits"]) / lookups, 4) if lookups else 0.0
+        return {
+            "enabled": LLM_CACHE_ENABLED,
+            "memory_entries": memory_size,
+            "totals": totals,
+            "by_call_site": by_site,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """Shared cache instance for the worker, or None when disabled"""
+    global _cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                from dependencies import db_manager
+                _cache = LLMCache(db_manager)
+    return _cache
@@ -0,0 +1,89 @@
+"""
+Password hashing.
+
+New hashes use scrypt (hashlib, no extra dependency) and are stored as
+``scrypt$<n>$<r>$<p>$<salt>$<hash>`` with base64 salt/hash, so the cost can be
+raised later without invalidating existing passwords. Legacy ``salt:sha256``
+hashes still verify and are upgraded on the next successful login
+(see User.authenticate_user).
+
+A KDF costs tens of milliseconds of CPU per call, so async routes run it on a
+small dedicated thread pool (hashlib.scrypt releases the GIL) instead of on
+the event loop or the default executor shared with other blocking work.
+"""
+import os
+import hmac
+import base64
+import asyncio
+import hashlib
+import logging
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+SCRYPT_N = int(os.getenv("FARDI_SCRYPT_N", 2 ** 14))
+SCRYPT_R = int(os.getenv("FARDI_SCRYPT_R", 8))
+SCRYPT_P = int(os.getenv("FARDI_SCRYPT_P", 1))
+PASSWORD_HASH_WORKERS = int(os.getenv("FARDI_PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+
+_SCHEME = "scrypt"
+_KEY_BYTES = 32
+
+_executor = ThreadPoolExecutor(max_workers=max(PASSWORD_HASH_WORKERS, 1), thread_name_prefix="password-hash")
+
+
+def _scrypt(password, salt, n, r, p):
+    # OpenSSL's default memory cap (32 MB) is too low for n=2**15 and above
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                          maxmem=256 * n * r * p + (1 << 20), dklen=_KEY_BYTES)
+
+
+def _b64(data):
+    return base64.b64encode(data).decode("ascii").rstrip("=")
+
+
+def _unb64(text):
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+def hash_password(password):
+    salt = os.urandom(16)
+    digest = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    return f"{_SCHEME}${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${_b64(salt)}${_b64(digest)}"
+
+
+def verify_password(password, stored_hash):
+    """Check a password against either hash format; malformed hashes never match"""
+    if not stored_hash:
+        return False
+    try:
+        if stored_hash.startswith(_SCHEME + "$"):
+            _, n, r, p, salt, expected = stored_hash.split("$")
+            digest = _scrypt(password, _unb64(salt), int(n), int(r), int(p))
+            return hmac.compare_digest(digest, _unb64(expected))
+
+        # Legacy format: "<hex salt>:<sha256(password + salt)>"
+        salt, hash_value = stored_hash.split(":")
+        password_hash = hashlib.sha256((password + salt).encode()).hexdigest()
+        return hmac.compare_digest(hash_value, password_hash)
+    except (ValueError, TypeError) as e:
+        logger.warning(f"Unreadable password hash: {str(e)}")
+        return False
+
+
+def needs_rehash(stored_hash):
+    """True for legacy hashes and scrypt hashes made with other cost parameters"""
+    if not stored_hash or not stored_hash.startswith(_SCHEME + "$"):
+        return True
+    try:
+        _, n, r, p, _, _ = stored_hash.split("$")
+        return (int(n), int(r), int(p)) != (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    except ValueError:
+        return True
+
+
+async def run_password_task(func, *args, **kwargs):
+    """Run a blocking call that hashes or verifies a password on the hashing pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
@@ -5,7 +5,6 @@ Handles power-up purchases, inventory management, and usage
 
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
-import sqlite3
 
 # Power-Up Definitions
 POWERUPS = {
@@ -48,14 +47,14 @@ POWERUPS = {
 class PowerUpService:
     """Service for managing user power-ups"""
     
-    def __init__(self, db_path='instance/fardi.db'):
-        self.db_path = db_path
+    def __init__(self, db_manager=None):
+        if db_manager is None:
+            from dependencies import db_manager
+        self.db = db_manager
     
     def get_connection(self):
-        """Get database connection"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+        """Get a pooled connection to the shared database"""
+        return self.db.get_connection()
     
     def get_available_powerups(self) -> List[Dict]:
         """Get list of all available power-ups"""
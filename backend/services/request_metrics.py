@@ -0,0 +1,243 @@
+"""
+Per-route request metrics.
+
+main.py opens a RequestStats for every request in a ContextVar. While the
+request runs, pooled SQLite connections (models/auth.py) add each statement
+and its time to it, and the AI and audio services add their LLM,
+AI-detection and TTS call time. When the request ends its totals are folded
+into per-route aggregates: a latency histogram, recent samples for
+percentiles, SQL statement count and time, and upstream call count and time.
+A request that issues more than FARDI_METRICS_N_PLUS_ONE statements is
+logged as a likely N+1, with its most repeated statement.
+
+Aggregates are per worker process and are served by /api/admin/metrics as
+JSON or Prometheus text.
+"""
+import os
+import re
+import time
+import logging
+import threading
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+logger = logging.getLogger(__name__)
+
+METRICS_ENABLED = os.getenv("FARDI_METRICS", "1") not in ("0", "false", "False")
+N_PLUS_ONE_THRESHOLD = int(os.getenv("FARDI_METRICS_N_PLUS_ONE", 50))
+
+# Histogram upper bounds in milliseconds (Prometheus-style cumulative buckets)
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+# Latest samples per route kept for percentiles
+_RECENT_SAMPLES = 1024
+UPSTREAMS = ("llm", "ai_detection", "tts")
+
+_WHITESPACE = re.compile(r"\s+")
+
+_current = ContextVar("request_stats", default=None)
+
+
+class RequestStats:
+    """What one request spent on SQL and upstream calls"""
+    __slots__ = ("sql_statements", "sql_seconds", "statements", "upstream")
+
+    def __init__(self):
+        self.sql_statements = 0
+        self.sql_seconds = 0.0
+        self.statements = Counter()
+        self.upstream = {}
+
+    def add_sql(self, sql, seconds):
+        self.sql_statements += 1
+        self.sql_seconds += seconds
+        self.statements[sql] += 1
+
+    def add_upstream(self, kind, seconds):
+        calls, total = self.upstream.get(kind, (0, 0.0))
+        self.upstream[kind] = (calls + 1, total + seconds)
+
+
+def current_request_stats():
+    """The running request's RequestStats, or None outside a request / when disabled"""
+    return _current.get()
+
+
+@contextmanager
+def timed(kind):
+    """Charge the enclosed block to the running request as one `kind` call"""
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.add_upstream(kind, time.perf_counter() - started)
+
+
+class _RouteMetrics:
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+        self.recent = deque(maxlen=_RECENT_SAMPLES)
+        self.sql_statements = 0
+        self.sql_ms = 0.0
+        self.max_sql_statements = 0
+        self.n_plus_one = 0
+        self.upstream = {kind: [0, 0.0] for kind in UPSTREAMS}
+
+    def add(self, elapsed_ms, status, stats, n_plus_one):
+        self.count += 1
+        if status >= 500:
+            self.errors += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        index = 0
+        while index < len(BUCKETS_MS) and elapsed_ms > BUCKETS_MS[index]:
+            index += 1
+        self.buckets[index] += 1
+        self.recent.append(elapsed_ms)
+        self.sql_statements += stats.sql_statements
+        self.sql_ms += stats.sql_seconds * 1000
+        self.max_sql_statements = max(self.max_sql_statements, stats.sql_statements)
+        self.n_plus_one += n_plus_one
+        for kind, (calls, seconds) in stats.upstream.items():
+            totals = self.upstream.setdefault(kind, [0, 0.0])
+            totals[0] += calls
+            totals[1] += seconds * 1000
+
+    def snapshot(self):
+        recent = sorted(self.recent)
+
+        def percentile(pct):
+            return round(recent[min(len(recent) - 1, int(len(recent) * pct / 100))], 2) if recent else 0.0
+
+        cumulative, histogram = 0, {}
+        for bound, hits in zip(BUCKETS_MS + ('+Inf',), self.buckets):
+            cumulative += hits
+            histogram[str(bound)] = cumulative
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'latency_ms': {
+                'mean': round(self.total_ms / self.count, 2) if self.count else 0.0,
+                'p50': percentile(50),
+                'p95': percentile(95),
+                'p99': percentile(99),
+                'max': round(self.max_ms, 2),
+                'total': round(self.total_ms, 2),
+            },
+            'histogram_ms': histogram,
+            'sql': {
+                'statements': self.sql_statements,
+                'per_request': round(self.sql_statements / self.count, 2) if self.count else 0.0,
+                'max_per_request': self.max_sql_statements,
+                'time_ms': round(self.sql_ms, 2),
+                'n_plus_one_requests': self.n_plus_one,
+            },
+            'upstream': {
+                kind: {'calls': calls, 'time_ms': round(ms, 2)}
+                for kind, (calls, ms) in self.upstream.items()
+            },
+        }
+
+
+_routes = {}
+_routes_lock = threading.Lock()
+_started_at = time.time()
+
+
+def begin_request():
+    """Start collecting for the current request; returns a token for end_request (None when disabled)"""
+    if not METRICS_ENABLED:
+        return None
+    return _current.set(RequestStats())
+
+
+def end_request(token, route, status, elapsed_seconds):
+    """Fold the finished request into its route's aggregates"""
+    if token is None:
+        return
+    stats = _current.get()
+    _current.reset(token)
+
+    n_plus_one = stats.sql_statements > N_PLUS_ONE_THRESHOLD
+    if n_plus_one:
+        sql, repeats = stats.statements.most_common(1)[0]
+        logger.warning(
+            f"Possible N+1 in {route}: {stats.sql_statements} SQL statements "
+            f"({stats.sql_seconds * 1000:.1f} ms); most repeated ({repeats}x): "
+            f"{_WHITESPACE.sub(' ', sql).strip()[:200]}"
+        )
+
+    with _routes_lock:
+        metrics = _routes.get(route)
+        if metrics is None:
+            metrics = _routes[route] = _RouteMetrics()
+        metrics.add(elapsed_seconds * 1000, status, stats, n_plus_one)
+
+
+def metrics_snapshot():
+    with _routes_lock:
+        routes = {route: metrics.snapshot() for route, metrics in sorted(_routes.items())}
+    return {
+        'enabled': METRICS_ENABLED,
+        'since': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(_started_at)),
+        'n_plus_one_threshold': N_PLUS_ONE_THRESHOLD,
+        'routes': routes,
+    }
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def prometheus_text():
+    """The aggregates in the Prometheus text exposition format (version 0.0.4)"""
+    with _routes_lock:
+        routes = {route: metrics.snapshot() for route, metrics in sorted(_routes.items())}
+
+    lines = [
+        '# HELP fardi_request_duration_seconds Request latency by route.',
+        '# TYPE fardi_request_duration_seconds histogram',
+    ]
+    for route, data in routes.items():
+        label = _label(route)
+        for bound, cumulative in data['histogram_ms'].items():
+            le = bound if bound == '+Inf' else f"{int(bound) / 1000:g}"
+            lines.append(f'fardi_request_duration_seconds_bucket{{route="{label}",le="{le}"}} {cumulative}')
+        lines.append(f'fardi_request_duration_seconds_sum{{route="{label}"}} {data["latency_ms"]["total"] / 1000:.6f}')
+        lines.append(f'fardi_request_duration_seconds_count{{route="{label}"}} {data["count"]}')
+
+    counters = [
+        ('fardi_request_errors_total', 'Requests answered with a 5xx status.',
+         lambda data: data['errors']),
+        ('fardi_sql_statements_total', 'SQL statements executed by requests.',
+         lambda data: data['sql']['statements']),
+        ('fardi_sql_seconds_total', 'Time spent executing SQL statements.',
+         lambda data: f"{data['sql']['time_ms'] / 1000:.6f}"),
+        ('fardi_n_plus_one_requests_total', 'Requests over the N+1 statement threshold.',
+         lambda data: data['sql']['n_plus_one_requests']),
+    ]
+    for name, help_text, value in counters:
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+        for route, data in routes.items():
+            lines.append(f'{name}{{route="{_label(route)}"}} {value(data)}')
+
+    lines += ['# HELP fardi_upstream_calls_total LLM, AI-detection and TTS calls made by requests.',
+              '# TYPE fardi_upstream_calls_total counter']
+    for route, data in routes.items():
+        for kind, totals in data['upstream'].items():
+            lines.append(f'fardi_upstream_calls_total{{route="{_label(route)}",kind="{kind}"}} {totals["calls"]}')
+    lines += ['# HELP fardi_upstream_seconds_total Time requests spent waiting on LLM, AI-detection and TTS calls.',
+              '# TYPE fardi_upstream_seconds_total counter']
+    for route, data in routes.items():
+        for kind, totals in data['upstream'].items():
+            lines.append(f'fardi_upstream_seconds_total{{route="{_label(route)}",kind="{kind}"}} '
+                         f'{totals["time_ms"] / 1000:.6f}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,91 @@
+"""
+Single-flight request coalescing.
+
+Concurrent callers asking for the same key share one in-flight call: the
+first caller runs it, the others wait for and receive the same result (or
+exception). Nothing is kept once the call finishes - persistence is the
+LLM cache's job.
+"""
+import asyncio
+import threading
+
+
+class AsyncSingleFlight:
+    """Coalesces identical concurrent coroutine calls within one event loop"""
+
+    def __init__(self):
+        self._inflight = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def do(self, key, coro_fn):
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(coro_fn())
+            self._inflight[key] = future
+            future.add_done_callback(lambda f: self._done(key, f))
+            self.leaders += 1
+        else:
+            self.followers += 1
+        # Shield so one disconnected client does not cancel the shared call
+        return await asyncio.shield(future)
+
+    def _done(self, key, future):
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if not future.cancelled():
+            future.exception()  # mark retrieved even if every waiter went away
+
+    def stats(self):
+        return {'leaders': self.leaders, 'coalesced': self.followers, 'in_flight': len(self._inflight)}
+
+
+class _Call:
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Thread-based counterpart for blocking callers"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.leaders = 0
+        self.followers = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                self.followers += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    def stats(self):
+        with self._lock:
+            in_flight = len(self._calls)
+        return {'leaders': self.leaders, 'coalesced': self.followers, 'in_flight': in_flight}
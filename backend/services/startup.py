@@ -0,0 +1,108 @@
+"""
+One-time initialisers (data files, heavy client libraries).
+
+Modules register them with on_startup() instead of running them at import.
+In the default eager mode they still run immediately, exactly as before. With
+FARDI_LAZY_STARTUP=1 (the default for the packaged desktop build) they are
+queued and run by a background warm-up thread once the server has started,
+so the port is bound and /api/health answers while they load. Requests wait
+in main.py only for the steps they cannot do without; pure
+warm-ups (preloading imports and data that also load on first use) run after
+and never hold a request.
+"""
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+LAZY_STARTUP = os.getenv(
+    "FARDI_LAZY_STARTUP", "1" if getattr(sys, "frozen", False) else "0"
+) not in ("0", "false", "False")
+
+_pending = []
+_warm_ups = []
+_timings = {}
+_failed = {}
+_ready = threading.Event()
+_warm = threading.Event()
+_lock = threading.Lock()
+_started = False
+
+
+def _run(name, func):
+    started = time.perf_counter()
+    try:
+        func()
+    finally:
+        _timings[name] = round((time.perf_counter() - started) * 1000, 1)
+
+
+def on_startup(name, func, required=True):
+    """
+    Run func now (eager mode) or during warm-up (lazy mode). required=False
+    marks a pure warm-up whose work would otherwise happen on first use.
+    """
+    if LAZY_STARTUP:
+        with _lock:
+            (_pending if required else _warm_ups).append((name, func))
+    else:
+        _run(name, func)
+
+
+def _drain(queue):
+    while True:
+        with _lock:
+            if not queue:
+                return
+            name, func = queue.pop(0)
+        try:
+            _run(name, func)
+        except Exception as e:
+            _failed[name] = str(e)
+            logger.error(f"Warm-up step '{name}' failed: {str(e)}")
+
+
+def _warm_up():
+    _drain(_pending)
+    _ready.set()
+    _drain(_warm_ups)
+    _warm.set()
+    logger.info(f"Warm-up finished in {sum(_timings.values()):.0f} ms")
+
+
+def start_warm_up():
+    """Called from the app's startup hook; returns immediately in lazy mode"""
+    global _started
+    if not LAZY_STARTUP:
+        _ready.set()
+        _warm.set()
+        return
+    with _lock:
+        if _started:
+            return
+        _started = True
+    threading.Thread(target=_warm_up, name="warm-up", daemon=True).start()
+
+
+def is_ready():
+    return _ready.is_set() or not LAZY_STARTUP
+
+
+async def wait_until_ready():
+    """Hold a request until warm-up is done (no-op once ready)"""
+    while not is_ready():
+        await asyncio.sleep(0.01)
+
+
+def startup_state():
+    return {
+        "mode": "lazy" if LAZY_STARTUP else "eager",
+        "ready": is_ready(),
+        "warm": _warm.is_set() or not LAZY_STARTUP,
+        "steps_ms": dict(_timings),
+        "failed": dict(_failed),
+    }